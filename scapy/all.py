@@ -51,3 +51,20 @@ if conf.ipv6_enabled:  # noqa: F405
     from scapy.route6 import *  # noqa: F401
 
 from scapy.ansmachine import *
+
+import scapy.layers.all as _layers_all
+
+from typing import Any, List
+
+
+def __getattr__(attr):
+    # type: (str) -> Any
+    """With conf.lazy_layers, the layers are imported when first used"""
+    if attr in _layers_all._lazy_symbols:
+        return getattr(_layers_all, attr)
+    raise AttributeError("module %r has no attribute %r" % (__name__, attr))
+
+
+def __dir__():
+    # type: () -> List[str]
+    return sorted(set(globals()) | set(_layers_all._lazy_symbols))
@@ -12,6 +12,8 @@ Answering machines.
 ########################
 
 import abc
+import asyncio
+import concurrent.futures
 import functools
 import threading
 import socket
@@ -19,9 +21,13 @@ import warnings
 
 from scapy.arch import get_if_addr
 from scapy.config import conf
+from scapy.consts import WINDOWS
+from scapy.data import MTU
+from scapy.error import log_runtime
 from scapy.sendrecv import sendp, sniff, AsyncSniffer
-from scapy.packet import Packet
+from scapy.packet import NoPayload, Packet
 from scapy.plist import PacketList
+from scapy.supersocket import SuperSocket
 
 from typing import (
     Any,
@@ -29,6 +35,7 @@ from typing import (
     Dict,
     Generic,
     Optional,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -76,6 +83,10 @@ class AnsweringMachine(Generic[_T], metaclass=ReferenceAM):
     send_options = {"verbose": 0}  # type: Dict[str, Any]
     send_options_list = ["iface", "inter", "loop", "verbose", "socket"]
     send_function = staticmethod(sendp)
+    # Used by serve(): the maximum number of requests answered concurrently,
+    # and the number of seconds after which an idle client is disconnected
+    max_inflight = 64
+    client_timeout = None  # type: Optional[float]
 
     def __init__(self, **kargs):
         # type: (Any) -> None
@@ -196,15 +207,19 @@ class AnsweringMachine(Generic[_T], metaclass=ReferenceAM):
         self(*args, **kwargs)
         return self.sniffer
 
-    def __call__(self, *args, **kargs):
-        # type: (Any, Any) -> None
-        bg = kargs.pop("bg", False)
+    def _set_call_options(self, kargs):
+        # type: (Dict[str, Any]) -> None
         optsend, optsniff = self.parse_all_options(2, kargs)
         self.optsend = self.defoptsend.copy()
         self.optsend.update(optsend)
         self.optsniff = self.defoptsniff.copy()
         self.optsniff.update(optsniff)
 
+    def __call__(self, *args, **kargs):
+        # type: (Any, Any) -> None
+        bg = kargs.pop("bg", False)
+        self._set_call_options(kargs)
+
         if bg:
             self.sniff_bg()
         else:
@@ -222,13 +237,76 @@ class AnsweringMachine(Generic[_T], metaclass=ReferenceAM):
         self.sniffer = AsyncSniffer(**self.optsniff)
         self.sniffer.start()
 
+    async def serve(self, *args, **kargs):
+        # type: (Any, Any) -> None
+        """
+        Run the answering machine in the running asyncio event loop.
+
+        This takes the same arguments as calling the answering machine. The
+        requests are read when the socket becomes readable, and up to
+        ``max_inflight`` of them are answered concurrently in threads. When
+        that many are pending, the socket is not read until one of them is
+        answered.
+
+        Example::
+
+            >>> asyncio.run(DNS_am().serve(iface="eth0", joker="192.168.1.1"))
+        """
+        self._set_call_options(kargs)
+        await self._serve()
+
+    async def _serve(self):
+        # type: () -> None
+        loop = asyncio.get_running_loop()
+        sock = self.optsniff.get("opened_socket")
+        if sock is None:
+            sock = conf.L2listen(
+                iface=self.optsniff.get("iface"),
+                **{k: self.optsniff[k] for k in ["type", "promisc", "filter"]
+                   if k in self.optsniff}
+            )
+        prn = self.optsniff.get("prn") or self.reply
+        count = self.optsniff.get("count", 0)
+        stop_filter = self.optsniff.get("stop_filter")
+        pool = concurrent.futures.ThreadPoolExecutor(self.max_inflight)
+        inflight = set()  # type: Set[asyncio.Future[Any]]
+        received = 0
+        try:
+            while True:
+                if len(inflight) >= self.max_inflight:
+                    # Do not read more requests until one is answered
+                    await asyncio.wait(
+                        inflight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                try:
+                    pkt = await _async_recv(loop, sock)
+                except EOFError:
+                    break
+                if pkt is None:
+                    continue
+                fut = loop.run_in_executor(pool, prn, pkt)
+                inflight.add(fut)
+                fut.add_done_callback(functools.partial(_answered, inflight))
+                received += 1
+                if (count and received >= count) or \
+                        (stop_filter and stop_filter(pkt)):
+                    break
+            if inflight:
+                await asyncio.wait(inflight)
+        finally:
+            pool.shutdown(wait=False)
+            if "opened_socket" not in self.optsniff:
+                sock.close()
+
 
 class AnsweringMachineTCP(AnsweringMachine[Packet]):
     """
-    An answering machine that use the classic socket.socket to
-    answer multiple TCP clients
+    An answering machine that uses an asyncio server to answer multiple
+    TCP clients concurrently. The requests of a client are answered in
+    order, and it is not read until its previous answer was sent.
     """
     TYPE = socket.SOCK_STREAM
+    _serve_task = None  # type: Optional[asyncio.Task[Any]]
 
     def parse_options(self, port=80, cls=conf.raw_layer):
         # type: (int, Type[Packet]) -> None
@@ -241,38 +319,99 @@ class AnsweringMachineTCP(AnsweringMachine[Packet]):
 
     def sniff(self):
         # type: () -> None
-        from scapy.supersocket import StreamSocket
-        ssock = socket.socket(socket.AF_INET, self.TYPE)
+        asyncio.run(self._run())
+
+    async def _run(self):
+        # type: () -> None
+        self._serve_task = asyncio.current_task()
         try:
-            ssock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        except OSError:
+            await self._serve()
+        except asyncio.CancelledError:
             pass
-        ssock.bind(
-            (get_if_addr(self.optsniff.get("iface", conf.iface)), self.port))
-        ssock.listen()
-        sniffers = []
+        finally:
+            self._serve_task = None
+
+    def stop(self):
+        # type: () -> None
+        """Stop the answering machine, e.g. when started with bg=True"""
+        task = self._serve_task
+        if task is not None:
+            task.get_loop().call_soon_threadsafe(task.cancel)
+        sniffer = self.__dict__.get("sniffer")
+        if sniffer is not None and sniffer is not threading.current_thread():
+            sniffer.join()
+
+    async def _serve(self):
+        # type: () -> None
+        pool = concurrent.futures.ThreadPoolExecutor(self.max_inflight)
+        slots = asyncio.Semaphore(self.max_inflight)
         try:
-            while True:
-                clientsocket, address = ssock.accept()
-                print("%s connected" % repr(address))
-                sock = StreamSocket(clientsocket, self.cls)
-                optsniff = self.optsniff.copy()
-                optsniff["prn"] = functools.partial(self.reply,
-                                                    send_function=sock.send,
-                                                    address=address)
-                del optsniff["iface"]
-                sniffer = AsyncSniffer(opened_socket=sock, **optsniff)
-                sniffer.start()
-                sniffers.append((sniffer, sock))
+            server = await asyncio.start_server(
+                functools.partial(self._handle_client, pool, slots),
+                get_if_addr(self.optsniff.get("iface", conf.iface)),
+                self.port,
+                reuse_address=True,
+            )
+            async with server:
+                await server.serve_forever()
         finally:
-            for (sniffer, sock) in sniffers:
-                try:
-                    sniffer.stop()
-                except Exception:
-                    pass
-                sock.close()
+            pool.shutdown(wait=False)
             self.close()
-            ssock.close()
+
+    async def _handle_client(self,
+                             pool,  # type: concurrent.futures.Executor
+                             slots,  # type: asyncio.Semaphore
+                             reader,  # type: asyncio.StreamReader
+                             writer,  # type: asyncio.StreamWriter
+                             ):
+        # type: (...) -> None
+        from scapy.sessions import streamcls
+        loop = asyncio.get_running_loop()
+        address = writer.get_extra_info("peername")
+        print("%s connected" % repr(address))
+        rcvcls = streamcls(self.cls)
+        metadata = {}  # type: Dict[str, Any]
+        session = {}  # type: Dict[str, Any]
+        buf = b""
+
+        def send(x):
+            # type: (Packet) -> None
+            loop.call_soon_threadsafe(writer.write, bytes(x))
+
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(
+                        reader.read(MTU), self.client_timeout
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if not data:
+                    break
+                buf += data
+                while buf:
+                    pkt = rcvcls(buf, metadata, session)
+                    if pkt is None:  # Incomplete packet.
+                        break
+                    metadata.clear()
+                    # Strip any padding: it belongs to the next packet
+                    x = len(buf)
+                    pad = pkt.getlayer(conf.padding_layer)
+                    if pad is not None and pad.underlayer is not None:
+                        del pad.underlayer.payload
+                    while pad is not None and not isinstance(pad, NoPayload):
+                        x -= len(pad.load)
+                        pad = pad.payload
+                    buf = buf[x:] if x > 0 else b""
+                    async with slots:
+                        await loop.run_in_executor(pool, functools.partial(
+                            self.reply, pkt, send_function=send, address=address
+                        ))
+                    await writer.drain()
+        except Exception:
+            log_runtime.exception("Failed to answer %s", repr(address))
+        finally:
+            writer.close()
 
     def sniff_bg(self):
         # type: () -> None
@@ -286,7 +425,84 @@ class AnsweringMachineTCP(AnsweringMachine[Packet]):
 
 class AnsweringMachineUDP(AnsweringMachineTCP):
     """
-    An answering machine that use the classic socket.socket to
-    answer multiple UDP clients
+    An answering machine that uses an asyncio datagram endpoint to answer
+    multiple UDP clients concurrently. The requests that arrive while
+    ``max_inflight`` are being answered are dropped.
     """
     TYPE = socket.SOCK_DGRAM
+
+    async def _serve(self):
+        # type: () -> None
+        loop = asyncio.get_running_loop()
+        pool = concurrent.futures.ThreadPoolExecutor(self.max_inflight)
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramAM(self, pool),
+            local_addr=(
+                get_if_addr(self.optsniff.get("iface", conf.iface)),
+                self.port,
+            ),
+        )
+        try:
+            await loop.create_future()  # Forever
+        finally:
+            transport.close()
+            pool.shutdown(wait=False)
+            self.close()
+
+
+class _DatagramAM(asyncio.DatagramProtocol):
+    def __init__(self, am, pool):
+        # type: (AnsweringMachineUDP, concurrent.futures.Executor) -> None
+        self.am = am
+        self.pool = pool
+        self.inflight = set()  # type: Set[asyncio.Future[Any]]
+        self.transport = None  # type: Optional[asyncio.DatagramTransport]
+
+    def connection_made(self, transport):
+        # type: (asyncio.BaseTransport) -> None
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def datagram_received(self, data, addr):
+        # type: (bytes, Tuple[str, int]) -> None
+        if len(self.inflight) >= self.am.max_inflight:
+            return
+        loop = asyncio.get_running_loop()
+        transport = cast(asyncio.DatagramTransport, self.transport)
+
+        def send(x):
+            # type: (Packet) -> None
+            loop.call_soon_threadsafe(transport.sendto, bytes(x), addr)
+
+        fut = loop.run_in_executor(self.pool, functools.partial(
+            self.am.reply, self.am.cls(data), send_function=send, address=addr
+        ))
+        self.inflight.add(fut)
+        fut.add_done_callback(functools.partial(_answered, self.inflight))
+
+
+async def _async_recv(loop, sock):
+    # type: (asyncio.AbstractEventLoop, SuperSocket) -> Optional[Packet]
+    """Receive a packet from a SuperSocket without blocking the event loop"""
+    if WINDOWS or sock.nonblocking_socket:
+        return await loop.run_in_executor(None, sock.recv)
+    readable = loop.create_future()  # type: asyncio.Future[None]
+    fd = sock.fileno()
+
+    def _readable():
+        # type: () -> None
+        if not readable.done():
+            readable.set_result(None)
+
+    loop.add_reader(fd, _readable)
+    try:
+        await readable
+    finally:
+        loop.remove_reader(fd)
+    return sock.recv()
+
+
+def _answered(inflight, fut):
+    # type: (Set[asyncio.Future[Any]], asyncio.Future[Any]) -> None
+    inflight.discard(fut)
+    if not fut.cancelled() and fut.exception() is not None:
+        log_runtime.error("Failed to answer a request", exc_info=fut.exception())
@@ -12,7 +12,7 @@ import re
 import socket
 
 from scapy.config import conf
-from scapy.data import MTU, ARPHDR_ETHER, ARPHRD_TO_DLT
+from scapy.data import MTU, ARPHDR_ETHER, ARPHRD_TO_DLT, DLT_EN10MB
 from scapy.error import Scapy_Exception, warning
 from scapy.interfaces import network_name, resolve_iface, NetworkInterface
 from scapy.libs.structures import bpf_program
@@ -72,6 +72,10 @@ def compile_filter(filter_exp,  # type: str
     """Asks libpcap to parse the filter, then build the matching
     BPF bytecode.
 
+    When libpcap is not available, Scapy's own compiler is used instead
+    (see scapy.libs.bpf): it only supports a subset of the pcap-filter
+    syntax.
+
     :param iface: if provided, use the interface to compile
     :param linktype: if provided, use the linktype to compile
     """
@@ -84,12 +88,7 @@ def compile_filter(filter_exp,  # type: str
             pcap_close
         )
     except OSError:
-        raise ImportError(
-            "libpcap is not available. Cannot compile filter !"
-        )
-    from ctypes import create_string_buffer
-    bpf = bpf_program()
-    bpf_filter = create_string_buffer(filter_exp.encode("utf8"))
+        pcap_compile = None
     if not linktype:
         # Try to guess linktype to avoid root
         if not iface:
@@ -107,6 +106,15 @@ def compile_filter(filter_exp,  # type: str
             pass
         if not linktype and conf.use_bpf:
             linktype = ARPHDR_ETHER
+    if pcap_compile is None:
+        # libpcap is not available
+        from scapy.libs.bpf import compile_bpf
+        return compile_bpf(
+            filter_exp, linktype or DLT_EN10MB, snaplen=MTU
+        ).to_bpf_program()
+    from ctypes import create_string_buffer
+    bpf = bpf_program()
+    bpf_filter = create_string_buffer(filter_exp.encode("utf8"))
     if linktype is not None:
         ret = pcap_compile_nopcap(
             MTU, linktype, ctypes.byref(bpf), bpf_filter, 1, -1
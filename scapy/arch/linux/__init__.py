@@ -12,6 +12,7 @@ from fcntl import ioctl
 from select import select
 
 import ctypes
+import mmap
 import os
 import socket
 import struct
@@ -40,7 +41,13 @@ from scapy.interfaces import (
 )
 from scapy.libs.structures import sock_fprog
 from scapy.packet import Packet, Padding
-from scapy.supersocket import SuperSocket
+from scapy.supersocket import (
+    ETH_P_8021Q,
+    SuperSocket,
+    TP_STATUS_VLAN_TPID_VALID,
+    TP_STATUS_VLAN_VALID,
+)
+from scapy.utils import _pop_pending
 
 # re-export
 from scapy.arch.common import get_if_raw_addr, read_nameservers  # noqa: F401
@@ -55,6 +62,8 @@ from scapy.arch.linux.rtnetlink import (  # noqa: F401
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Iterator,
     List,
     NoReturn,
     Optional,
@@ -93,6 +102,13 @@ PACKET_DROP_MEMBERSHIP = 2
 PACKET_RECV_OUTPUT = 3
 PACKET_RX_RING = 5
 PACKET_STATISTICS = 6
+PACKET_VERSION = 10
+PACKET_TX_RING = 13
+PACKET_LOSS = 14
+PACKET_FANOUT = 18
+PACKET_FANOUT_HASH = 0
+PACKET_FANOUT_FLAG_UNIQUEID = 0x2000
+PACKET_FANOUT_FLAG_DEFRAG = 0x8000
 PACKET_MR_MULTICAST = 0
 PACKET_MR_PROMISC = 1
 PACKET_MR_ALLMULTI = 2
@@ -114,6 +130,14 @@ PACKET_AUXDATA = 8
 PACKET_FASTROUTE = 6  # Fastrouted frame
 # Unused, PACKET_FASTROUTE and PACKET_LOOPBACK are invisible to user space
 
+# From if_packet.h: memory mapped rings
+TPACKET_V2 = 1
+TPACKET_V3 = 2
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+TP_STATUS_AVAILABLE = 0
+TP_STATUS_SEND_REQUEST = 1
+
 
 # Utils
 
@@ -200,6 +224,221 @@ def _flush_fd(fd):
             break
 
 
+class RxRing(object):
+    """
+    A TPACKET_V3 receive ring (PACKET_RX_RING), mapped in memory.
+
+    The kernel copies the frames into the blocks of the ring, and hands a
+    block over once it is full, or after ``timeout`` milliseconds. Reading
+    frames from the ring does not cost any system call, and their
+    timestamps are read from the frame headers.
+
+    :param sock: the PF_PACKET socket
+    :param size: the size of the ring, in bytes
+    :param block_size: the size of the blocks. Must be a multiple of the
+                       page size, greater than the largest frame.
+    :param timeout: the time after which a block that is not full is handed
+                    over, in milliseconds
+    """
+    # tpacket_hdr_v1.block_status, num_pkts, offset_to_first_pkt
+    _block_hdr = struct.Struct("=III")
+    # tpacket3_hdr: tp_next_offset, tp_sec, tp_nsec, tp_snaplen, tp_len,
+    # tp_status, tp_mac, tp_net, tp_rxhash, tp_vlan_tci, tp_vlan_tpid
+    _frame_hdr = struct.Struct("=IIIIIIHHIIH")
+    # The sockaddr_ll follows the tpacket3_hdr: sll_pkttype is at offset 10
+    _pkttype_offset = 48 + 10
+
+    def __init__(self,
+                 sock,  # type: socket.socket
+                 size=1 << 22,  # type: int
+                 block_size=1 << 18,  # type: int
+                 timeout=10,  # type: int
+                 ):
+        # type: (...) -> None
+        frame_size = 1 << 11
+        self.block_size = block_size
+        self.block_nr = max(size // block_size, 2)
+        sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+        # struct tpacket_req3
+        req = struct.pack(
+            "IIIIIII",
+            block_size, self.block_nr,
+            frame_size, block_size // frame_size * self.block_nr,
+            timeout, 0, 0,
+        )
+        sock.setsockopt(SOL_PACKET, PACKET_RX_RING, req)
+        self.ring = mmap.mmap(sock.fileno(), block_size * self.block_nr,
+                              mmap.MAP_SHARED,
+                              mmap.PROT_READ | mmap.PROT_WRITE)
+        # The current block, the number of frames that are left to read in
+        # it, and the offset of the next one
+        self.block = 0
+        self.left = 0
+        self.offset = 0
+
+    def read(self, count):
+        # type: (int) -> List[Tuple[bytes, int, float]]
+        """Read at most ``count`` frames from the blocks that were handed
+        over, without waiting.
+
+        :return: a list of (data, packet type, timestamp)
+        """
+        ring = self.ring
+        frames = []  # type: List[Tuple[bytes, int, float]]
+        while len(frames) < count:
+            base = self.block * self.block_size
+            if not self.left:
+                status, self.left, first = self._block_hdr.unpack_from(
+                    ring, base + 8
+                )
+                if not status & TP_STATUS_USER:
+                    self.left = 0
+                    break
+                self.offset = base + first
+            if self.left:
+                off = self.offset
+                (next_off, sec, nsec, snaplen, _, status, mac, _, _,
+                 tci, tpid) = self._frame_hdr.unpack_from(ring, off)
+                pkt = ring[off + mac:off + mac + snaplen]
+                if tci or status & TP_STATUS_VLAN_VALID:
+                    # Insert VLAN tag
+                    if not status & TP_STATUS_VLAN_TPID_VALID:
+                        tpid = ETH_P_8021Q
+                    tag = struct.pack("!HH", tpid, tci)
+                    pkt = pkt[:12] + tag + pkt[12:]
+                frames.append(
+                    (pkt, ring[off + self._pkttype_offset], sec + nsec * 1e-9)
+                )
+                self.left -= 1
+                self.offset = off + next_off
+            if not self.left:
+                # Hand the block back to the kernel
+                struct.pack_into("=I", ring, base + 8, TP_STATUS_KERNEL)
+                self.block = (self.block + 1) % self.block_nr
+        return frames
+
+    def close(self):
+        # type: () -> None
+        self.ring.close()
+
+
+class TxRing(object):
+    """
+    A TPACKET_V2 transmit ring (PACKET_TX_RING), mapped in memory.
+
+    The frames are copied into the slots of the ring, then the kernel is
+    asked to send all of them at once, with a single system call. The ring
+    has its own PF_PACKET socket, which does not receive anything.
+
+    :param iface: the interface to send the frames on
+    :param size: the size of the ring, in bytes
+    :param frame_size: the size of the slots. Frames that do not fit are
+                       sent with ``fallback``.
+    :param fallback: the socket used to send the frames that are too big
+    """
+    # The frame follows the tpacket2_hdr
+    _data_offset = 32
+
+    def __init__(self,
+                 iface,  # type: str
+                 size=1 << 20,  # type: int
+                 frame_size=1 << 11,  # type: int
+                 fallback=None,  # type: Optional[socket.socket]
+                 ):
+        # type: (...) -> None
+        block_size = 1 << 16
+        block_nr = max(size // block_size, 1)
+        self.frame_size = frame_size
+        self.frame_nr = block_size // frame_size * block_nr
+        self.fallback = fallback
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+        try:
+            self.sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V2)
+            # Skip the malformed frames instead of blocking the ring
+            self.sock.setsockopt(SOL_PACKET, PACKET_LOSS, 1)
+            # struct tpacket_req
+            req = struct.pack("IIII", block_size, block_nr,
+                              frame_size, self.frame_nr)
+            self.sock.setsockopt(SOL_PACKET, PACKET_TX_RING, req)
+            self.sock.bind((iface, 0))
+            self.ring = mmap.mmap(self.sock.fileno(), block_size * block_nr,
+                                  mmap.MAP_SHARED,
+                                  mmap.PROT_READ | mmap.PROT_WRITE)
+        except Exception:
+            self.sock.close()
+            raise
+        # The next slot, and the number of frames waiting to be sent
+        self.frame = 0
+        self.pending = 0
+
+    def flush(self):
+        # type: () -> None
+        """Send the pending frames, and wait for them to be sent"""
+        if self.pending:
+            self.sock.send(b"")
+            self.pending = 0
+
+    def send(self, frames):
+        # type: (Iterable[bytes]) -> int
+        """Send frames. Returns the number of frames sent."""
+        ring = self.ring
+        max_len = self.frame_size - self._data_offset
+        n = 0
+        for sx in frames:
+            n += 1
+            if len(sx) > max_len:
+                self.flush()
+                if self.fallback is None:
+                    raise Scapy_Exception("Frame too big for the TX ring")
+                self.fallback.send(sx)
+                continue
+            off = self.frame * self.frame_size
+            data = off + self._data_offset
+            ring[data:data + len(sx)] = sx
+            # tp_len, then tp_status
+            struct.pack_into("=I", ring, off + 4, len(sx))
+            struct.pack_into("=I", ring, off, TP_STATUS_SEND_REQUEST)
+            self.frame = (self.frame + 1) % self.frame_nr
+            self.pending += 1
+            if self.pending == self.frame_nr:
+                self.flush()
+        self.flush()
+        return n
+
+    def close(self):
+        # type: () -> None
+        self.ring.close()
+        self.sock.close()
+
+
+def _join_fanout(sock, group):
+    # type: (socket.socket, Union[bool, int]) -> int
+    """Join a fanout group, or create a new one if group is True, and
+    return its id. The packets are spread among its sockets by a hash of
+    their flow (the same in both directions), after IP defragmentation."""
+    mode = PACKET_FANOUT_HASH | PACKET_FANOUT_FLAG_DEFRAG
+    if group is not True:
+        sock.setsockopt(SOL_PACKET, PACKET_FANOUT,
+                        struct.pack("=I", (group & 0xffff) | mode << 16))
+        return group & 0xffff
+    # Let the kernel pick an id that no other group uses
+    try:
+        sock.setsockopt(
+            SOL_PACKET, PACKET_FANOUT,
+            struct.pack("=I", (mode | PACKET_FANOUT_FLAG_UNIQUEID) << 16)
+        )
+    except OSError as ex:
+        if ex.errno != 22:
+            raise
+        # Before Linux 4.20, any id that we pick may be the one of the
+        # group of another process, that would share its packets with us
+        raise Scapy_Exception(
+            "Creating a fanout group needs PACKET_FANOUT_FLAG_UNIQUEID "
+            "(Linux >= 4.20)"
+        )
+    return sock.getsockopt(SOL_PACKET, PACKET_FANOUT) & 0xffff
+
+
 class L2Socket(SuperSocket):
     desc = "read/write packets at layer 2 using Linux PF_PACKET sockets"
 
@@ -210,6 +449,9 @@ class L2Socket(SuperSocket):
                  filter=None,  # type: Optional[Any]
                  nofilter=0,  # type: int
                  monitor=None,  # type: Optional[Any]
+                 rx_ring=False,  # type: Union[bool, int]
+                 tx_ring=False,  # type: Union[bool, int]
+                 fanout=None,  # type: Optional[Union[bool, int]]
                  ):
         # type: (...) -> None
         self.iface = network_name(iface or conf.iface)
@@ -233,6 +475,20 @@ class L2Socket(SuperSocket):
             set_promisc(self.ins, self.iface)
         self.ins.bind((self.iface, type))
         _flush_fd(self.ins.fileno())
+        self.rx_ring = None  # type: Optional[RxRing]
+        if rx_ring:
+            if rx_ring is True:
+                self.rx_ring = RxRing(self.ins)
+            else:
+                self.rx_ring = RxRing(self.ins, size=rx_ring)
+        # The id of the fanout group of the socket
+        self.fanout = None  # type: Optional[int]
+        if fanout is not None:
+            try:
+                self.fanout = _join_fanout(self.ins, fanout)
+            except Exception:
+                self.close()
+                raise
         self.ins.setsockopt(
             socket.SOL_SOCKET,
             socket.SO_RCVBUF,
@@ -257,6 +513,13 @@ class L2Socket(SuperSocket):
             )
         else:
             self.outs = None  # type: ignore
+        self.tx_ring = None  # type: Optional[TxRing]
+        if tx_ring and self.outs:
+            if tx_ring is True:
+                self.tx_ring = TxRing(self.iface, fallback=self.outs)
+            else:
+                self.tx_ring = TxRing(self.iface, size=tx_ring,
+                                      fallback=self.outs)
         sa_ll = self.ins.getsockname()
         if sa_ll[3] in conf.l2types:
             self.LL = conf.l2types.num2layer[sa_ll[3]]
@@ -278,11 +541,22 @@ class L2Socket(SuperSocket):
                 set_promisc(self.ins, self.iface, 0)
         except (AttributeError, OSError, ValueError):
             pass
+        if getattr(self, "rx_ring", None):
+            self.rx_ring.close()  # type: ignore
+        if getattr(self, "tx_ring", None):
+            self.tx_ring.close()  # type: ignore
         SuperSocket.close(self)
 
     def recv_raw(self, x=MTU):
         # type: (int) -> Tuple[Optional[Type[Packet]], Optional[bytes], Optional[float]]  # noqa: E501
         """Receives a packet, then returns a tuple containing (cls, pkt_data, time)"""  # noqa: E501
+        if self.rx_ring:
+            frames = self._recv_raw_many(1, x)
+            while not frames:
+                # Wait until a block is handed over
+                select([self.ins], [], [])
+                frames = self._recv_raw_many(1, x)
+            return self.LL, frames[0][0], frames[0][1]
         pkt, sa_ll, ts = self._recv_raw(self.ins, x)
         if self.outs and sa_ll[2] == socket.PACKET_OUTGOING:
             return None, None, None
@@ -290,6 +564,70 @@ class L2Socket(SuperSocket):
             ts = get_last_packet_timestamp(self.ins)
         return self.LL, pkt, ts
 
+    def _recv_raw_many(self, count, x=MTU):
+        # type: (int, int) -> List[Tuple[bytes, float]]
+        """Receives at most ``count`` packets, waiting for the first one
+        only, and returns a list of (pkt_data, time). Outgoing packets are
+        skipped unless this is a listen socket.
+
+        With a RX ring, this doesn't wait: the list is empty if no block
+        was handed over, and the socket must be selected again. recv()
+        waits for a frame instead."""
+        frames = []  # type: List[Tuple[bytes, float]]
+        if self.rx_ring:
+            for pkt, pkttype, ring_ts in self.rx_ring.read(count):
+                if self.outs and pkttype == socket.PACKET_OUTGOING:
+                    continue
+                frames.append((pkt[:x], ring_ts))
+            return frames
+        flags = 0
+        while len(frames) < count:
+            try:
+                pkt, sa_ll, ts = self._recv_raw(self.ins, x, flags)
+            except BlockingIOError:
+                break
+            # Only the first call may block
+            flags = socket.MSG_DONTWAIT
+            if self.outs and sa_ll[2] == socket.PACKET_OUTGOING:
+                continue
+            if ts is None:
+                ts = get_last_packet_timestamp(self.ins)
+            frames.append((pkt, ts))
+        return frames
+
+    def recv_many(self, count=64, x=None, **kwargs):
+        # type: (int, Optional[int], **Any) -> List[Packet]
+        """Receives the packets that are available, up to ``count``. They
+        are read from the RX ring if the socket has one, or using
+        non-blocking calls once the first one was received."""
+        pkts = _pop_pending(self, count)
+        if pkts:
+            return pkts
+        for pkt, ts in self._recv_raw_many(count, MTU if x is None else x):
+            p = self._dissect(self.LL, pkt, ts, **kwargs)
+            if p is not None:
+                pkts.append(p)
+        return pkts
+
+    def send_many(self, x):
+        # type: (Iterable[Union[Packet, bytes]]) -> int
+        """Sends several packets, through the TX ring if the socket has
+        one."""
+        if not self.tx_ring:
+            return SuperSocket.send_many(self, x)
+        return self.tx_ring.send(self._build_many(x))
+
+    @staticmethod
+    def _build_many(x):
+        # type: (Iterable[Union[Packet, bytes]]) -> Iterator[bytes]
+        for p in x:
+            if isinstance(p, (bytes, bytearray, memoryview)):
+                yield p
+            else:
+                sx = raw(p)
+                p.sent_time = time.time()
+                yield sx
+
     def send(self, x):
         # type: (Packet) -> int
         try:
@@ -322,6 +660,8 @@ class L3PacketSocket(L2Socket):
                  filter=None,  # type: Optional[Any]
                  nofilter=0,  # type: int
                  monitor=None,  # type: Optional[Any]
+                 rx_ring=False,  # type: Union[bool, int]
+                 tx_ring=False,  # type: Union[bool, int]
                  ):
         self.send_socks = {}
         super(L3PacketSocket, self).__init__(
@@ -331,21 +671,39 @@ class L3PacketSocket(L2Socket):
             filter=filter,
             nofilter=nofilter,
             monitor=monitor,
+            rx_ring=rx_ring,
+            tx_ring=tx_ring,
         )
         self.filter = filter
         self.send_socks = {network_name(self.iface): self}
 
     def recv(self, x=MTU, **kwargs):
         # type: (int, **Any) -> Optional[Packet]
+        # The pending packets are already at layer 3
+        pending = _pop_pending(self, 1)
+        if pending:
+            return pending[0]
         pkt = SuperSocket.recv(self, x, **kwargs)
         if pkt and self.lvl == 2:
             pkt.payload.time = pkt.time
             return pkt.payload
         return pkt
 
-    def send(self, x):
-        # type: (Packet) -> int
-        # Select the file descriptor to send the packet on.
+    def recv_many(self, count=64, x=None, **kwargs):
+        # type: (int, Optional[int], **Any) -> List[Packet]
+        pending = _pop_pending(self, count)
+        if pending:
+            return pending
+        pkts = super(L3PacketSocket, self).recv_many(count, x, **kwargs)
+        if self.lvl == 2:
+            for i, pkt in enumerate(pkts):
+                pkt.payload.time = pkt.time
+                pkts[i] = pkt.payload
+        return pkts
+
+    def _build(self, x):
+        # type: (Packet) -> Tuple[L3PacketSocket, bytes]
+        # Select the socket to send the packet on.
         iff = x.route()[0]
         if iff is None:
             iff = network_name(conf.iface)
@@ -358,7 +716,6 @@ class L3PacketSocket(L2Socket):
                 promisc=self.promisc,
             )
         sock = self.send_socks[iff]
-        fd = sock.outs
         if sock.lvl == 3:
             if not issubclass(sock.LL, type_x):
                 warning("Incompatible L3 types detected using %s instead of %s !",
@@ -368,6 +725,12 @@ class L3PacketSocket(L2Socket):
             sx = bytes(sock.LL() / x)
         else:
             sx = bytes(x)
+        return sock, sx
+
+    def send(self, x):
+        # type: (Packet) -> int
+        sock, sx = self._build(x)
+        fd = sock.outs
         # Now send.
         try:
             x.sent_time = time.time()
@@ -388,6 +751,31 @@ class L3PacketSocket(L2Socket):
             else:
                 raise
 
+    def send_many(self, x):
+        # type: (Iterable[Union[Packet, bytes]]) -> int
+        """Sends several packets. The ones that are routed through the
+        interface of this socket go through its TX ring, if it has one."""
+        if not self.tx_ring:
+            return SuperSocket.send_many(self, x)
+        n = 0
+        frames = []  # type: List[bytes]
+        for p in x:
+            sock, sx = self._build(p)  # type: ignore
+            if sock is not self:
+                # Keep the packets in order
+                n += self.tx_ring.send(frames)
+                frames = []
+                self.send(p)  # type: ignore
+                n += 1
+                continue
+            p.sent_time = time.time()  # type: ignore
+            frames.append(sx)
+            if len(frames) == self.tx_ring.frame_nr:
+                n += self.tx_ring.send(frames)
+                frames = []
+        n += self.tx_ring.send(frames)
+        return n
+
     @staticmethod
     def select(sockets, remain=None):
         # type: (List[SuperSocket], Optional[float]) -> List[SuperSocket]
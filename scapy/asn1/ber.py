@@ -13,7 +13,7 @@ Basic Encoding Rules (BER) for ASN.1
 
 from scapy.error import warning
 from scapy.compat import chb, orb, bytes_encode
-from scapy.utils import binrepr, inet_aton, inet_ntoa
+from scapy.utils import inet_aton, inet_ntoa
 from scapy.asn1.asn1 import (
     ASN1Tag,
     ASN1_BADTAG,
@@ -124,23 +124,27 @@ def BER_len_enc(ll, size=0):
     return chb(len(s) | 0x80) + s
 
 
-def BER_len_dec(s):
-    # type: (bytes) -> Tuple[int, bytes]
-    tmp_len = orb(s[0])
+def _BER_len_dec(s, i, end):
+    # type: (Union[bytes, memoryview], int, int) -> Tuple[int, int]
+    """BER_len_dec() on s[i:end], without slicing s: returns the length and
+    the offset of the bytes that follow it"""
+    tmp_len = s[i]
     if not tmp_len & 0x80:
-        return tmp_len, s[1:]
+        return tmp_len, i + 1
     tmp_len &= 0x7f
-    if len(s) <= tmp_len:
+    if end - i <= tmp_len:
         raise BER_Decoding_Error(
             "BER_len_dec: Got %i bytes while expecting %i" %
-            (len(s) - 1, tmp_len),
-            remaining=s
+            (end - i - 1, tmp_len),
+            remaining=bytes(s[i:end])
         )
-    ll = 0
-    for c in s[1:tmp_len + 1]:
-        ll <<= 8
-        ll |= orb(c)
-    return ll, s[tmp_len + 1:]
+    return int.from_bytes(s[i + 1:i + tmp_len + 1], "big"), i + tmp_len + 1
+
+
+def BER_len_dec(s):
+    # type: (bytes) -> Tuple[int, bytes]
+    ll, i = _BER_len_dec(s, 0, len(s))
+    return ll, s[i:]
 
 
 def BER_num_enc(ll, size=1):
@@ -155,21 +159,39 @@ def BER_num_enc(ll, size=1):
     return b"".join(chb(k) for k in x)
 
 
-def BER_num_dec(s, cls_id=0):
-    # type: (bytes, int) -> Tuple[int, bytes]
-    if len(s) == 0:
-        raise BER_Decoding_Error("BER_num_dec: got empty string", remaining=s)
+def _BER_num_dec(s, i, end, cls_id=0):
+    # type: (Union[bytes, memoryview], int, int, int) -> Tuple[int, int]
+    """BER_num_dec() on s[i:end], returning the offset of the next bytes"""
+    if i >= end:
+        raise BER_Decoding_Error("BER_num_dec: got empty string",
+                                 remaining=bytes(s[i:end]))
     x = cls_id
-    for i, c in enumerate(s):
-        c = orb(c)
+    for j in range(i, end):
+        c = s[j]
         x <<= 7
         x |= c & 0x7f
         if not c & 0x80:
-            break
-    if c & 0x80:
-        raise BER_Decoding_Error("BER_num_dec: unfinished number description",
-                                 remaining=s)
-    return x, s[i + 1:]
+            return x, j + 1
+    raise BER_Decoding_Error("BER_num_dec: unfinished number description",
+                             remaining=bytes(s[i:end]))
+
+
+def BER_num_dec(s, cls_id=0):
+    # type: (bytes, int) -> Tuple[int, bytes]
+    x, i = _BER_num_dec(s, 0, len(s), cls_id)
+    return x, s[i:]
+
+
+def _BER_id_dec(s, i, end):
+    # type: (Union[bytes, memoryview], int, int) -> Tuple[int, int]
+    """BER_id_dec() on s[i:end], returning the offset of the next bytes"""
+    x = s[i]
+    if x & 0x1f != 0x1f:
+        # low-tag-number
+        return x, i + 1
+    else:
+        # high-tag-number
+        return _BER_num_dec(s, i + 1, end, cls_id=x >> 5)
 
 
 def BER_id_dec(s):
@@ -190,13 +212,8 @@ def BER_id_dec(s):
     # encoded in scapy's tag in order to reuse it for packet building.
     # Note that tags thus may have to be hard-coded with their extended
     # information, e.g. a SEQUENCE from asn1.py has a direct tag 0x20|16.
-    x = orb(s[0])
-    if x & 0x1f != 0x1f:
-        # low-tag-number
-        return x, s[1:]
-    else:
-        # high-tag-number
-        return BER_num_dec(s[1:], cls_id=x >> 5)
+    x, i = _BER_id_dec(s, 0, len(s))
+    return x, s[i:]
 
 
 def BER_id_enc(n):
@@ -216,14 +233,16 @@ def BER_id_enc(n):
 # The functions below provide implicit and explicit tagging support.
 
 
-def BER_tagging_dec(s,  # type: bytes
-                    hidden_tag=None,  # type: Optional[int | ASN1Tag]
-                    implicit_tag=None,  # type: Optional[int]
-                    explicit_tag=None,  # type: Optional[int]
-                    safe=False,  # type: Optional[bool]
-                    _fname="",  # type: str
-                    ):
-    # type: (...) -> Tuple[Optional[int], bytes]
+def _BER_tagging_dec(s,  # type: bytes
+                     hidden_tag=None,  # type: Optional[int | ASN1Tag]
+                     implicit_tag=None,  # type: Optional[int]
+                     explicit_tag=None,  # type: Optional[int]
+                     safe=False,  # type: Optional[bool]
+                     _fname="",  # type: str
+                     ):
+    # type: (...) -> Tuple[Optional[int], bytes, Optional[int | ASN1Tag]]
+    """BER_tagging_dec() that doesn't copy s to put the hidden tag back in
+    front of it: that tag is returned instead, to be passed to the codec."""
     # We output the 'real_tag' if it is different from the (im|ex)plicit_tag.
     # 'hidden_tag' is the type tag that is implicited when 'implicit_tag' is used.
     real_tag = None
@@ -238,20 +257,41 @@ def BER_tagging_dec(s,  # type: bytes
                 if not safe and ber_id != implicit_tag:
                     raise BER_Decoding_Error(err_msg % (
                         ber_id, implicit_tag, _fname),
-                        remaining=s)
+                        remaining=bytes(s))
                 else:
                     real_tag = ber_id
-            s = chb(int(hidden_tag)) + s  # type: ignore
+            return real_tag, s, hidden_tag
         elif explicit_tag is not None:
             ber_id, s = BER_id_dec(s)
             if ber_id != explicit_tag:
                 if not safe:
                     raise BER_Decoding_Error(
                         err_msg % (ber_id, explicit_tag, _fname),
-                        remaining=s)
+                        remaining=bytes(s))
                 else:
                     real_tag = ber_id
             l, s = BER_len_dec(s)
+    return real_tag, s, None
+
+
+def BER_tagging_dec(s,  # type: bytes
+                    hidden_tag=None,  # type: Optional[int | ASN1Tag]
+                    implicit_tag=None,  # type: Optional[int]
+                    explicit_tag=None,  # type: Optional[int]
+                    safe=False,  # type: Optional[bool]
+                    _fname="",  # type: str
+                    ):
+    # type: (...) -> Tuple[Optional[int], bytes]
+    real_tag, s, hidden_tag = _BER_tagging_dec(
+        s,
+        hidden_tag=hidden_tag,
+        implicit_tag=implicit_tag,
+        explicit_tag=explicit_tag,
+        safe=safe,
+        _fname=_fname,
+    )
+    if hidden_tag is not None:
+        s = chb(int(hidden_tag)) + s
     return real_tag, s
 
 
@@ -301,95 +341,94 @@ class BERcodec_Object(Generic[_K], metaclass=BERcodec_metaclass):
         if not s:
             raise BER_Decoding_Error(
                 "%s: Got empty object while expecting tag %r" %
-                (cls.__name__, cls.tag), remaining=s
+                (cls.__name__, cls.tag), remaining=bytes(s)
             )
 
     @classmethod
-    def check_type(cls, s):
-        # type: (bytes) -> bytes
-        cls.check_string(s)
-        tag, remainder = BER_id_dec(s)
+    def check_type(cls, s, hidden_tag=None):
+        # type: (bytes, Optional[int | ASN1Tag]) -> bytes
+        if hidden_tag is not None:
+            # s follows an implicit tag, that stands for hidden_tag
+            tag, remainder = int(hidden_tag), s
+        else:
+            cls.check_string(s)
+            tag, remainder = BER_id_dec(s)
         if not isinstance(tag, int) or cls.tag != tag:
             raise BER_BadTag_Decoding_Error(
                 "%s: Got tag [%i/%#x] while expecting %r" %
-                (cls.__name__, tag, tag, cls.tag), remaining=s
+                (cls.__name__, tag, tag, cls.tag),
+                remaining=_BER_hidden_dec(s, hidden_tag)
             )
         return remainder
 
     @classmethod
-    def check_type_get_len(cls, s):
-        # type: (bytes) -> Tuple[int, bytes]
-        s2 = cls.check_type(s)
+    def check_type_get_len(cls, s, hidden_tag=None):
+        # type: (bytes, Optional[int | ASN1Tag]) -> Tuple[int, bytes]
+        s2 = cls.check_type(s, hidden_tag)
         if not s2:
             raise BER_Decoding_Error("%s: No bytes while expecting a length" %
-                                     cls.__name__, remaining=s)
+                                     cls.__name__,
+                                     remaining=_BER_hidden_dec(s, hidden_tag))
         return BER_len_dec(s2)
 
     @classmethod
-    def check_type_check_len(cls, s):
-        # type: (bytes) -> Tuple[int, bytes, bytes]
-        l, s3 = cls.check_type_get_len(s)
+    def check_type_check_len(cls, s, hidden_tag=None):
+        # type: (bytes, Optional[int | ASN1Tag]) -> Tuple[int, bytes, bytes]
+        l, s3 = cls.check_type_get_len(s, hidden_tag)
         if len(s3) < l:
             raise BER_Decoding_Error("%s: Got %i bytes while expecting %i" %
-                                     (cls.__name__, len(s3), l), remaining=s)
+                                     (cls.__name__, len(s3), l),
+                                     remaining=_BER_hidden_dec(s, hidden_tag))
         return l, s3[:l], s3[l:]
 
+    @classmethod
+    def dec_content(cls, s, safe=False):
+        # type: (memoryview, bool) -> ASN1_Object[_K]
+        """Decodes the content octets of a primitive value"""
+        return cls.asn1_object(bytes(s))  # type: ignore
+
     @classmethod
     def do_dec(cls,
                s,  # type: bytes
                context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False  # type: bool
+               safe=False,  # type: bool
+               hidden_tag=None,  # type: Optional[int | ASN1Tag]
                ):
         # type: (...) -> Tuple[ASN1_Object[Any], bytes]
-        if context is not None:
-            _context = context
-        else:
-            _context = cls.tag.context
-        cls.check_string(s)
-        p, remainder = BER_id_dec(s)
-        if p not in _context:
-            t = s
-            if len(t) > 18:
-                t = t[:15] + b"..."
-            raise BER_Decoding_Error("Unknown prefix [%02x] for [%r]" %
-                                     (p, t), remaining=s)
-        tag = _context[p]
-        codec = cast('Type[BERcodec_Object[_K]]',
-                     tag.get_codec(ASN1_Codecs.BER))
-        if codec == BERcodec_Object:
-            # Value type defined as Unknown
-            l, s = BER_num_dec(remainder)
-            return ASN1_BADTAG(s[:l]), s[l:]
-        return codec.dec(s, _context, safe)
+        obj, i = _BER_dec(cls, s, context, safe, False, hidden_tag)
+        return obj, s[i:]
 
     @classmethod
     def dec(cls,
             s,  # type: bytes
             context=None,  # type: Optional[Type[ASN1_Class]]
             safe=False,  # type: bool
+            hidden_tag=None,  # type: Optional[int | ASN1Tag]
             ):
         # type: (...) -> Tuple[Union[_ASN1_ERROR, ASN1_Object[_K]], bytes]
-        if not safe:
-            return cls.do_dec(s, context, safe)
-        try:
-            return cls.do_dec(s, context, safe)
-        except BER_BadTag_Decoding_Error as e:
-            o, remain = BERcodec_Object.dec(
-                e.remaining, context, safe
-            )  # type: Tuple[ASN1_Object[Any], bytes]
-            return ASN1_BADTAG(o), remain
-        except BER_Decoding_Error as e:
-            return ASN1_DECODING_ERROR(s, exc=e), b""
-        except ASN1_Error as e:
-            return ASN1_DECODING_ERROR(s, exc=e), b""
+        """
+        Decodes the value at the start of s, and returns it along with the
+        bytes that follow it (of the same type as s: passing a memoryview
+        avoids copying them).
+
+        :param context: the ASN1_Class used to look up the codecs of the tags
+        :param safe: return ASN1_DECODING_ERROR/ASN1_BADTAG objects instead
+            of raising exceptions
+        :param hidden_tag: s was implicitly tagged, and starts after that tag
+            (see _BER_tagging_dec). The value is decoded as if it had
+            hidden_tag instead.
+        """
+        obj, i = _BER_dec(cls, s, context, safe, True, hidden_tag)
+        return obj, s[i:]
 
     @classmethod
     def safedec(cls,
                 s,  # type: bytes
                 context=None,  # type: Optional[Type[ASN1_Class]]
+                hidden_tag=None,  # type: Optional[int | ASN1Tag]
                 ):
         # type: (...) -> Tuple[Union[_ASN1_ERROR, ASN1_Object[_K]], bytes]
-        return cls.dec(s, context, safe=True)
+        return cls.dec(s, context, safe=True, hidden_tag=hidden_tag)
 
     @classmethod
     def enc(cls, s, size_len=0):
@@ -406,6 +445,204 @@ class BERcodec_Object(Generic[_K], metaclass=BERcodec_metaclass):
 ASN1_Codecs.BER.register_stem(BERcodec_Object)
 
 
+#    [ BER decoding engine ]    #
+
+
+def _BER_hidden_dec(s, hidden_tag):
+    # type: (bytes, Optional[int | ASN1Tag]) -> bytes
+    """Returns s as BER_tagging_dec() would have rebuilt it"""
+    if hidden_tag is None:
+        return bytes(s)
+    return chb(int(hidden_tag)) + bytes(s)
+
+
+class _BER_Frame(object):
+    """A SEQUENCE or SET that _BER_dec() is decoding the elements of"""
+    __slots__ = ["codec", "context", "start", "end", "content_end",
+                 "value_end", "catch", "objs"]
+
+    def __init__(self,
+                 codec,  # type: Type[BERcodec_Object[Any]]
+                 context,  # type: Type[ASN1_Class]
+                 start,  # type: int
+                 end,  # type: int
+                 content,  # type: int
+                 length,  # type: int
+                 catch,  # type: int
+                 ):
+        # type: (...) -> None
+        self.codec = codec
+        self.context = context
+        # The value is in buf[start:value_end]. It was decoded from
+        # buf[start:end]: the elements can't go past content_end
+        self.start = start
+        self.end = end
+        self.value_end = content + length
+        self.content_end = min(self.value_end, end)
+        self.catch = catch
+        self.objs = []  # type: List[ASN1_Object[Any]]
+
+
+def _BER_unwind(err, buf, stack):
+    # type: (Exception, memoryview, List[Optional[_BER_Frame]]) -> None
+    """Completes an error that goes up through the SEQUENCEs being decoded,
+    as their decoders used to do"""
+    if not isinstance(err, BER_Decoding_Error):
+        return
+    for frame in reversed(stack):
+        if frame is None:
+            continue
+        err.remaining += bytes(buf[frame.content_end:frame.end])
+        if err.decoded is not None:
+            frame.objs.append(err.decoded)
+        err.decoded = frame.objs
+
+
+def _BER_dec(codec,  # type: Type[BERcodec_Object[Any]]
+             s,  # type: bytes
+             context=None,  # type: Optional[Type[ASN1_Class]]
+             safe=False,  # type: bool
+             wrap=True,  # type: bool
+             hidden_tag=None,  # type: Optional[int | ASN1Tag]
+             ):
+    # type: (...) -> Tuple[ASN1_Object[Any], int]
+    """
+    Decodes the value at the start of s with codec, and returns it with the
+    offset of the bytes that follow it. This is codec.dec() if wrap is set,
+    codec.do_dec() otherwise.
+
+    The value is read through a memoryview of s using offsets, and the
+    SEQUENCEs being decoded are kept on an explicit stack: neither the copies
+    of the remaining bytes nor the Python recursion grow with the depth.
+
+    With safe, the errors are caught where the BERcodec_Object.dec() (dispatch
+    on the tag) and codec.dec() calls of each value would catch them. 'catch'
+    tells which of those apply to the value being decoded: 2 for both, 1 for
+    codec.dec() only, 0 if none (or if safe is not set).
+    """
+    buf = memoryview(s)
+    stack = []  # type: List[Optional[_BER_Frame]]
+
+    def _s(a, b):
+        # type: (int, int) -> bytes
+        # buf[a:b], as the value's decoders received it
+        if a == 0 and hidden_tag is not None:
+            return chb(int(hidden_tag)) + bytes(buf[a:b])
+        return bytes(buf[a:b])
+
+    start, end = 0, len(buf)
+    catch = wrap + (codec is BERcodec_Object) if safe else 0
+    while True:
+        obj = None  # type: Optional[ASN1_Object[Any]]
+        pos = start
+        dispatched = codec is not BERcodec_Object
+        try:
+            if start == 0 and hidden_tag is not None:
+                tag, i = int(hidden_tag), start
+            else:
+                if start >= end:
+                    codec.check_string(b"")
+                tag, i = _BER_id_dec(buf, start, end)
+            if not dispatched:
+                # Find the codec of the tag
+                if context is None:
+                    context = codec.tag.context
+                if tag not in context:
+                    t = _s(start, end)
+                    if len(t) > 18:
+                        t = t[:15] + b"..."
+                    raise BER_Decoding_Error("Unknown prefix [%02x] for [%r]" %
+                                             (tag, t), remaining=_s(start, end))
+                codec = context[tag].get_codec(ASN1_Codecs.BER)
+                if codec is BERcodec_Object:
+                    # Value type defined as Unknown
+                    ll, i = _BER_num_dec(buf, i, end)
+                    pos = min(i + ll, end)
+                    obj = ASN1_BADTAG(bytes(buf[i:pos]))
+                dispatched = True
+            if obj is not None:
+                pass
+            elif codec.do_dec.__func__ is not _BER_do_dec:  # type: ignore
+                # A codec that still decodes its values itself
+                obj, rest = codec.do_dec(_s(start, end), context, safe)
+                pos = end - len(rest)
+            else:
+                if codec.tag != tag:
+                    raise BER_BadTag_Decoding_Error(
+                        "%s: Got tag [%i/%#x] while expecting %r" %
+                        (codec.__name__, tag, tag, codec.tag),
+                        remaining=_s(start, end)
+                    )
+                if i >= end:
+                    raise BER_Decoding_Error(
+                        "%s: No bytes while expecting a length" %
+                        codec.__name__, remaining=_s(start, end)
+                    )
+                ll, i = _BER_len_dec(buf, i, end)
+                if issubclass(codec, BERcodec_SEQUENCE):
+                    stack.append(_BER_Frame(
+                        codec,
+                        codec.tag.context if context is None else context,
+                        start, end, i, ll, catch,
+                    ))
+                    pos = i
+                else:
+                    if end - i < ll:
+                        raise BER_Decoding_Error(
+                            "%s: Got %i bytes while expecting %i" %
+                            (codec.__name__, end - i, ll),
+                            remaining=_s(start, end)
+                        )
+                    obj = codec.dec_content(buf[i:i + ll], safe)
+                    pos = i + ll
+        except ASN1_Error as e:
+            if catch < (1 if dispatched else 2):
+                _BER_unwind(e, buf, stack)
+                raise
+            if isinstance(e, BER_BadTag_Decoding_Error):
+                # Decode it according to its tag, and mark it as a BADTAG
+                stack.append(None)
+                codec, catch = BERcodec_Object, 2
+                continue
+            obj, pos = ASN1_DECODING_ERROR(_s(start, end), exc=e), end
+        # Pass the value to the SEQUENCEs it is in, until one of them has
+        # another element to decode
+        while stack:
+            frame = stack[-1]
+            if frame is None:
+                stack.pop()
+                obj = ASN1_BADTAG(cast(ASN1_Object[Any], obj))
+                continue
+            if obj is not None:
+                frame.objs.append(obj)
+            if pos < frame.content_end:
+                break
+            stack.pop()
+            try:
+                if frame.value_end > frame.end:
+                    raise BER_Decoding_Error(
+                        "Not enough bytes to decode sequence",
+                        decoded=frame.objs
+                    )
+                obj = frame.codec.asn1_object(frame.objs)
+                pos = frame.value_end
+            except ASN1_Error as e:
+                if not frame.catch:
+                    _BER_unwind(e, buf, stack)
+                    raise
+                obj = ASN1_DECODING_ERROR(_s(frame.start, frame.end), exc=e)
+                pos = frame.end
+        else:
+            return cast(ASN1_Object[Any], obj), pos
+        # Next element of the innermost SEQUENCE
+        codec, context = BERcodec_Object, frame.context
+        start, end = pos, frame.content_end
+        catch = 2 if safe else 0
+
+
+_BER_do_dec = BERcodec_Object.do_dec.__func__  # type: ignore
+
+
 ##########################
 #    BERcodec objects    #
 ##########################
@@ -433,21 +670,9 @@ class BERcodec_INTEGER(BERcodec_Object[int]):
         return b"".join(s)
 
     @classmethod
-    def do_dec(cls,
-               s,  # type: bytes
-               context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False,  # type: bool
-               ):
-        # type: (...) -> Tuple[ASN1_Object[int], bytes]
-        l, s, t = cls.check_type_check_len(s)
-        x = 0
-        if s:
-            if orb(s[0]) & 0x80:  # negative int
-                x = -1
-            for c in s:
-                x <<= 8
-                x |= orb(c)
-        return cls.asn1_object(x), t
+    def dec_content(cls, s, safe=False):
+        # type: (memoryview, bool) -> ASN1_Object[int]
+        return cls.asn1_object(int.from_bytes(s, "big", signed=True))
 
 
 class BERcodec_BOOLEAN(BERcodec_INTEGER):
@@ -458,30 +683,26 @@ class BERcodec_BIT_STRING(BERcodec_Object[str]):
     tag = ASN1_Class_UNIVERSAL.BIT_STRING
 
     @classmethod
-    def do_dec(cls,
-               s,  # type: bytes
-               context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False  # type: bool
-               ):
-        # type: (...) -> Tuple[ASN1_Object[str], bytes]
+    def dec_content(cls, s, safe=False):
+        # type: (memoryview, bool) -> ASN1_Object[str]
         # /!\ the unused_bits information is lost after this decoding
-        l, s, t = cls.check_type_check_len(s)
         if len(s) > 0:
-            unused_bits = orb(s[0])
+            unused_bits = s[0]
             if safe and unused_bits > 7:
                 raise BER_Decoding_Error(
                     "BERcodec_BIT_STRING: too many unused_bits advertised",
-                    remaining=s
+                    remaining=bytes(s)
                 )
-            fs = "".join(binrepr(orb(x)).zfill(8) for x in s[1:])
+            n = 8 * (len(s) - 1)
+            fs = format(int.from_bytes(s[1:], "big"), "0%ib" % n) if n else ""
             if unused_bits > 0:
                 fs = fs[:-unused_bits]
-            return cls.tag.asn1_object(fs), t
+            return cls.tag.asn1_object(fs)
         else:
             raise BER_Decoding_Error(
                 "BERcodec_BIT_STRING found no content "
                 "(not even unused_bits byte)",
-                remaining=s
+                remaining=bytes(s)
             )
 
     @classmethod
@@ -510,16 +731,6 @@ class BERcodec_STRING(BERcodec_Object[str]):
         # Be sure we are encoding bytes
         return chb(int(cls.tag)) + BER_len_enc(len(s), size=size_len) + s
 
-    @classmethod
-    def do_dec(cls,
-               s,  # type: bytes
-               context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False,  # type: bool
-               ):
-        # type: (...) -> Tuple[ASN1_Object[Any], bytes]
-        l, s, t = cls.check_type_check_len(s)
-        return cls.tag.asn1_object(s), t
-
 
 class BERcodec_NULL(BERcodec_INTEGER):
     tag = ASN1_Class_UNIVERSAL.NULL
@@ -551,24 +762,17 @@ class BERcodec_OID(BERcodec_Object[bytes]):
         return chb(int(cls.tag)) + BER_len_enc(len(s), size=size_len) + s
 
     @classmethod
-    def do_dec(cls,
-               s,  # type: bytes
-               context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False,  # type: bool
-               ):
-        # type: (...) -> Tuple[ASN1_Object[bytes], bytes]
-        l, s, t = cls.check_type_check_len(s)
+    def dec_content(cls, s, safe=False):
+        # type: (memoryview, bool) -> ASN1_Object[bytes]
         lst = []
-        while s:
-            l, s = BER_num_dec(s)
-            lst.append(l)
+        i = 0
+        while i < len(s):
+            x, i = _BER_num_dec(s, i, len(s))
+            lst.append(x)
         if (len(lst) > 0):
             lst.insert(0, lst[0] // 40)
             lst[1] %= 40
-        return (
-            cls.asn1_object(b".".join(str(k).encode('ascii') for k in lst)),
-            t,
-        )
+        return cls.asn1_object(b".".join(str(k).encode('ascii') for k in lst))
 
 
 class BERcodec_ENUMERATED(BERcodec_INTEGER):
@@ -624,6 +828,7 @@ class BERcodec_BMP_STRING(BERcodec_STRING):
 
 
 class BERcodec_SEQUENCE(BERcodec_Object[Union[bytes, List[BERcodec_Object[Any]]]]):  # noqa: E501
+    # The elements are decoded by _BER_dec(), without recursion
     tag = ASN1_Class_UNIVERSAL.SEQUENCE
 
     @classmethod
@@ -635,36 +840,6 @@ class BERcodec_SEQUENCE(BERcodec_Object[Union[bytes, List[BERcodec_Object[Any]]]
             ll = b"".join(x.enc(cls.codec) for x in _ll)
         return chb(int(cls.tag)) + BER_len_enc(len(ll), size=size_len) + ll
 
-    @classmethod
-    def do_dec(cls,
-               s,  # type: bytes
-               context=None,  # type: Optional[Type[ASN1_Class]]
-               safe=False  # type: bool
-               ):
-        # type: (...) -> Tuple[ASN1_Object[Union[bytes, List[Any]]], bytes]
-        if context is None:
-            context = cls.tag.context
-        ll, st = cls.check_type_get_len(s)  # we may have len(s) < ll
-        s, t = st[:ll], st[ll:]
-        obj = []
-        while s:
-            try:
-                o, remain = BERcodec_Object.dec(
-                    s, context, safe
-                )  # type: Tuple[ASN1_Object[Any], bytes]
-                s = remain
-            except BER_Decoding_Error as err:
-                err.remaining += t
-                if err.decoded is not None:
-                    obj.append(err.decoded)
-                err.decoded = obj
-                raise
-            obj.append(o)
-        if len(st) < ll:
-            raise BER_Decoding_Error("Not enough bytes to decode sequence",
-                                     decoded=obj)
-        return cls.asn1_object(obj), t
-
 
 class BERcodec_SET(BERcodec_SEQUENCE):
     tag = ASN1_Class_UNIVERSAL.SET
@@ -683,15 +858,14 @@ class BERcodec_IPADDRESS(BERcodec_STRING):
         return chb(int(cls.tag)) + BER_len_enc(len(s), size=size_len) + s
 
     @classmethod
-    def do_dec(cls, s, context=None, safe=False):
-        # type: (bytes, Optional[Any], bool) -> Tuple[ASN1_Object[str], bytes]
-        l, s, t = cls.check_type_check_len(s)
+    def dec_content(cls, s, safe=False):
+        # type: (memoryview, bool) -> ASN1_Object[str]
         try:
-            ipaddr_ascii = inet_ntoa(s)
+            ipaddr_ascii = inet_ntoa(bytes(s))
         except Exception:
             raise BER_Decoding_Error("IP address could not be decoded",
-                                     remaining=s)
-        return cls.asn1_object(ipaddr_ascii), t
+                                     remaining=bytes(s))
+        return cls.asn1_object(ipaddr_ascii)
 
 
 class BERcodec_COUNTER32(BERcodec_INTEGER):
@@ -29,6 +29,7 @@ from scapy.asn1.ber import (
     BER_id_dec,
     BER_tagging_dec,
     BER_tagging_enc,
+    _BER_tagging_dec,
 )
 from scapy.base_classes import BasePacket
 from scapy.compat import raw
@@ -141,12 +142,18 @@ class ASN1F_field(ASN1F_element, Generic[_I, _A]):
         Regarding other fields, we might need to know whether encoding went
         as expected or not. Noticeably, input methods from cert.py expect
         certain exceptions to be raised. Hence default flexible_tag is False.
+
+        s may be a memoryview (see ASN1_Packet.do_dissect), in which case the
+        remainder is one too.
         """
-        diff_tag, s = BER_tagging_dec(s, hidden_tag=self.ASN1_tag,
-                                      implicit_tag=self.implicit_tag,
-                                      explicit_tag=self.explicit_tag,
-                                      safe=self.flexible_tag,
-                                      _fname=self.name)
+        diff_tag, s, hidden_tag = _BER_tagging_dec(
+            s,
+            hidden_tag=self.ASN1_tag,
+            implicit_tag=self.implicit_tag,
+            explicit_tag=self.explicit_tag,
+            safe=self.flexible_tag,
+            _fname=self.name
+        )
         if diff_tag is not None:
             # this implies that flexible_tag was True
             if self.implicit_tag is not None:
@@ -155,9 +162,11 @@ class ASN1F_field(ASN1F_element, Generic[_I, _A]):
                 self.explicit_tag = diff_tag
         codec = self.ASN1_tag.get_codec(pkt.ASN1_codec)
         if self.flexible_tag:
-            return codec.safedec(s, context=self.context)  # type: ignore
+            return codec.safedec(s, context=self.context,  # type: ignore
+                                 hidden_tag=hidden_tag)
         else:
-            return codec.dec(s, context=self.context)  # type: ignore
+            return codec.dec(s, context=self.context,  # type: ignore
+                             hidden_tag=hidden_tag)
 
     def i2m(self, pkt, x):
         # type: (ASN1_Packet, Union[bytes, _I, _A]) -> bytes
@@ -188,16 +197,18 @@ class ASN1F_field(ASN1F_element, Generic[_I, _A]):
                        ):
         # type: (...) -> Tuple[ASN1_Packet, bytes]
         try:
-            c = cls(s, _underlayer=_underlayer)
+            c = cls(bytes(s), _underlayer=_underlayer)
         except ASN1F_badsequence:
-            c = packet.Raw(s, _underlayer=_underlayer)  # type: ignore
+            c = packet.Raw(bytes(s), _underlayer=_underlayer)  # type: ignore
         cpad = c.getlayer(packet.Raw)
-        s = b""
+        pad = b""
         if cpad is not None:
-            s = cpad.load
+            pad = cpad.load
             if cpad.underlayer:
                 del cpad.underlayer.payload
-        return c, s
+        if isinstance(s, memoryview):
+            return c, memoryview(pad)
+        return c, pad
 
     def build(self, pkt):
         # type: (ASN1_Packet) -> bytes
@@ -472,18 +483,21 @@ class ASN1F_SEQUENCE(ASN1F_field[List[Any], List[Any]]):
         Thus m2i returns an empty list (along with the proper remainder).
         It is discarded by dissect() and should not be missed elsewhere.
         """
-        diff_tag, s = BER_tagging_dec(s, hidden_tag=self.ASN1_tag,
-                                      implicit_tag=self.implicit_tag,
-                                      explicit_tag=self.explicit_tag,
-                                      safe=self.flexible_tag,
-                                      _fname=pkt.name)
+        diff_tag, s, hidden_tag = _BER_tagging_dec(
+            s,
+            hidden_tag=self.ASN1_tag,
+            implicit_tag=self.implicit_tag,
+            explicit_tag=self.explicit_tag,
+            safe=self.flexible_tag,
+            _fname=pkt.name
+        )
         if diff_tag is not None:
             if self.implicit_tag is not None:
                 self.implicit_tag = diff_tag
             elif self.explicit_tag is not None:
                 self.explicit_tag = diff_tag
         codec = self.ASN1_tag.get_codec(pkt.ASN1_codec)
-        i, s, remain = codec.check_type_check_len(s)
+        i, s, remain = codec.check_type_check_len(s, hidden_tag)
         if len(s) == 0:
             for obj in self.seq:
                 obj.set_val(pkt, None)
@@ -494,7 +508,8 @@ class ASN1F_SEQUENCE(ASN1F_field[List[Any], List[Any]]):
                 except ASN1F_badsequence:
                     break
             if len(s) > 0:
-                raise BER_Decoding_Error("unexpected remainder", remaining=s)
+                raise BER_Decoding_Error("unexpected remainder",
+                                         remaining=bytes(s))
         return [], remain
 
     def dissect(self, pkt, s):
@@ -570,24 +585,28 @@ class ASN1F_SEQUENCE_OF(ASN1F_field[List[_SEQ_T],
             s,  # type: bytes
             ):
         # type: (...) -> Tuple[List[Any], bytes]
-        diff_tag, s = BER_tagging_dec(s, hidden_tag=self.ASN1_tag,
-                                      implicit_tag=self.implicit_tag,
-                                      explicit_tag=self.explicit_tag,
-                                      safe=self.flexible_tag)
+        diff_tag, s, hidden_tag = _BER_tagging_dec(
+            s,
+            hidden_tag=self.ASN1_tag,
+            implicit_tag=self.implicit_tag,
+            explicit_tag=self.explicit_tag,
+            safe=self.flexible_tag
+        )
         if diff_tag is not None:
             if self.implicit_tag is not None:
                 self.implicit_tag = diff_tag
             elif self.explicit_tag is not None:
                 self.explicit_tag = diff_tag
         codec = self.ASN1_tag.get_codec(pkt.ASN1_codec)
-        i, s, remain = codec.check_type_check_len(s)
+        i, s, remain = codec.check_type_check_len(s, hidden_tag)
         lst = []
         while s:
             c, s = self._extract_packet(s, pkt)  # type: ignore
             if c:
                 lst.append(c)
         if len(s) > 0:
-            raise BER_Decoding_Error("unexpected remainder", remaining=s)
+            raise BER_Decoding_Error("unexpected remainder",
+                                     remaining=bytes(s))
         return lst, remain
 
     def build(self, pkt):
@@ -825,6 +844,7 @@ class ASN1F_PACKET(ASN1F_field['ASN1_Packet', Optional['ASN1_Packet']]):
         if not hasattr(cls, "ASN1_root"):
             # A normal Packet (!= ASN1)
             return self.extract_packet(cls, s, _underlayer=pkt)
+        view = isinstance(s, memoryview)
         diff_tag, s = BER_tagging_dec(s, hidden_tag=cls.ASN1_root.ASN1_tag,  # noqa: E501
                                       implicit_tag=self.implicit_tag,
                                       explicit_tag=self.explicit_tag,
@@ -835,6 +855,9 @@ class ASN1F_PACKET(ASN1F_field['ASN1_Packet', Optional['ASN1_Packet']]):
                 self.implicit_tag = diff_tag
             elif self.explicit_tag is not None:
                 self.explicit_tag = diff_tag
+        if view:
+            # s was rebuilt if implicitly tagged: keep passing a memoryview
+            s = memoryview(s)
         if not s:
             return None, s
         return self.extract_packet(cls, s, _underlayer=pkt)
@@ -905,7 +928,7 @@ class ASN1F_BIT_STRING_ENCAPS(ASN1F_BIT_STRING):
         # type: (ASN1_Packet, bytes) -> Tuple[Optional[ASN1_Packet], bytes]
         bit_string, remain = super(ASN1F_BIT_STRING_ENCAPS, self).m2i(pkt, s)
         if len(bit_string.val) % 8 != 0:
-            raise BER_Decoding_Error("wrong bit string", remaining=s)
+            raise BER_Decoding_Error("wrong bit string", remaining=bytes(s))
         if bit_string.val_readable:
             p, s = self.extract_packet(self.cls, bit_string.val_readable,
                                        _underlayer=pkt)
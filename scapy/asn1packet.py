@@ -52,4 +52,6 @@ class ASN1_Packet(Packet, metaclass=ASN1Packet_metaclass):
 
     def do_dissect(self, x):
         # type: (bytes) -> bytes
-        return self.ASN1_root.dissect(self, x)
+        # The fields pass each other memoryviews of x, not copies of the
+        # bytes that remain to be dissected
+        return bytes(self.ASN1_root.dissect(self, cast(bytes, memoryview(x))))
@@ -951,6 +951,9 @@ class Conf(ConfClass):
     )
     #: includes padding in disassembled packets
     padding = 1
+    #: when True, PcapReader and sniff() only dissect the payload of each
+    #: layer the first time it is accessed
+    lazy_dissection = False
     #: BPF filter for packets to ignore
     except_filter = ""
     #: bpf filter added to every sniffing socket to exclude traffic
@@ -976,6 +979,9 @@ class Conf(ConfClass):
     #: automatically load IPv6 routes on startup. Disable this if your
     #: routing table is too big.
     route6_autoload = True
+    #: maximum number of destinations whose route is cached by
+    #: conf.route and conf.route6
+    route_cache_size = 4096
     #: holds the Scapy IPv4 routing table and provides methods to
     #: manipulate it
     route = None  # type: 'scapy.route.Route'
@@ -1075,6 +1081,11 @@ class Conf(ConfClass):
         'x509',
         'zigbee'
     ]
+    #: import the layers of conf.load_layers when they are first used rather
+    #: than along with scapy.all. Must be set before importing scapy.all.
+    lazy_layers: bool = os.getenv(
+        "SCAPY_LAZY_LAYERS", ""
+    ).lower().startswith("y")
     #: a dict which can be used by contrib layers to store local
     #: configuration
     contribs = dict()  # type: Dict[str, Any]
@@ -5,29 +5,223 @@
 
 """
 All layers. Configurable with conf.load_layers.
+
+When conf.lazy_layers is set, the layers listed in scapy/libs/layers_index.py
+are only imported when one of their symbols is first accessed, or when a
+packet they bind to is dissected.
 """
 
 
 import builtins
+import functools
+import importlib
+import importlib.abc
+import importlib.machinery
 import logging
+import sys
 
 # We import conf from arch to make sure arch specific layers are populated
 from scapy.arch import conf
 from scapy.error import log_loading
 from scapy.main import load_layer
+from scapy.packet import Packet
+
+# Typing imports
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
 
 ignored = list(builtins.__dict__) + ["sys"]
 log = logging.getLogger("scapy.loading")
 
-__all__ = []
+__all__ = []  # type: List[str]
+
+# conf.lazy_layers: the layers that aren't loaded yet, the layer owning each
+# of their symbols and the layers waiting for the current imports to finish
+_lazy_layers = []  # type: List[str]
+_lazy_symbols = {}  # type: Dict[str, str]
+_lazy_extends = []  # type: List[str]
+_lazy_importing = 0
+
+
+def _publish_layer(name):
+    # type: (str) -> None
+    """Copies the symbols a layer owns in the index, including the ones it
+    adds to other modules"""
+    symbols = [("scapy.layers." + name, layers_index.SYMBOLS[name])]
+    symbols.extend(layers_index.INJECTED.get(name, {}).items())
+    for modname, names in symbols:
+        mod = sys.modules[modname]
+        for symbol in names.split():
+            if symbol in mod.__dict__:
+                globals()[symbol] = mod.__dict__[symbol]
+                __all__.append(symbol)
+
+
+def _sort_payload_guess(lower):
+    # type: (str) -> None
+    """Restores the order in which bindings are made to a class when all the
+    layers are loaded, as the first binding that matches wins"""
+    modname, clsname = lower.rsplit(".", 1)
+    cls = getattr(sys.modules.get(modname), clsname, None)
+    if cls is None or cls in conf.layers._backup_dict:
+        return
+    layers = []  # type: List[str]
+    ranks = {}  # type: Dict[str, int]
+    for layer, upper in layers_index.PAYLOAD_GUESS[lower]:
+        if layer not in layers:
+            layers.append(layer)
+        ranks[upper] = layers.index(layer)
+    guess = sorted(
+        cls.payload_guess,
+        key=lambda x: ranks.get(
+            "%s.%s" % (x[1].__module__, x[1].__name__),
+            len(layers)  # e.g. bind_layers() calls of the user
+        )
+    )
+    if any(x is not y for x, y in zip(guess, cls.payload_guess)):
+        cls.payload_guess = guess
+
+
+def _lazy_layer_loaded(name):
+    # type: (str) -> None
+    _lazy_layers.remove(name)
+    _publish_layer(name)
+    for lower, bindings in layers_index.PAYLOAD_GUESS.items():
+        if any(layer == name for layer, _ in bindings):
+            _sort_payload_guess(lower)
+    _lazy_extends.extend(layers_index.EXTENDS.get(name, []))
+    if not _lazy_layers:
+        sys.meta_path.remove(_lazy_finder)
+
+
+class _LazyLayerLoader(importlib.abc.Loader):
+    """Wraps the loader of a lazy layer, to finish loading it however it is
+    imported"""
+
+    def __init__(self, loader, name):
+        # type: (importlib.abc.Loader, str) -> None
+        self.loader = loader
+        self.name = name
+
+    def __getattr__(self, attr):
+        # type: (str) -> Any
+        return getattr(self.loader, attr)
+
+    def create_module(self, spec):
+        # type: (importlib.machinery.ModuleSpec) -> Any
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # type: (Any) -> None
+        global _lazy_importing
+        _lazy_importing += 1
+        try:
+            self.loader.exec_module(module)
+        finally:
+            _lazy_importing -= 1
+        _lazy_layer_loaded(self.name)
+        if not _lazy_importing:
+            _load_lazy_layers([])
+
+
+class _LazyLayerFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self,
+                  fullname,  # type: str
+                  path,  # type: Optional[Sequence[str]]
+                  target=None,  # type: Any
+                  ):
+        # type: (...) -> Optional[importlib.machinery.ModuleSpec]
+        if not fullname.startswith("scapy.layers.") or \
+                fullname[13:] not in _lazy_layers:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and spec.loader is not None:
+            spec.loader = _LazyLayerLoader(spec.loader, fullname[13:])
+        return spec
+
+
+_lazy_finder = _LazyLayerFinder()
+
+
+def _load_lazy_layers(layers=None):
+    # type: (Optional[Sequence[str]]) -> None
+    """Loads layers deferred by conf.lazy_layers (all of them by default)"""
+    for name in list(_lazy_layers if layers is None else layers):
+        if name not in _lazy_layers:
+            continue
+        log_loading.debug("Loading layer %s", name)
+        try:
+            importlib.import_module("scapy.layers." + name)
+        except Exception as e:
+            if name in _lazy_layers:
+                _lazy_layers.remove(name)
+            log.warning("can't import layer %s: %s", name, e)
+            continue
+        if name in _lazy_layers:
+            # Imported before scapy.layers.all
+            _lazy_layer_loaded(name)
+    if not _lazy_importing:
+        # The layers extending the ones we loaded may import them
+        while _lazy_extends:
+            _load_lazy_layers([_lazy_extends.pop(0)])
+
+
+def __getattr__(attr):
+    # type: (str) -> Any
+    layer = _lazy_symbols.get(attr)
+    if layer is not None:
+        _load_lazy_layers([layer])
+        if attr in globals():
+            return globals()[attr]
+    raise AttributeError("module %r has no attribute %r" % (__name__, attr))
+
+
+def _init_lazy_layers():
+    # type: () -> None
+    _lazy_layers.extend(x for x in conf.load_layers if x in layers_index.LAZY)
+    for layer in _lazy_layers:
+        for names in [layers_index.SYMBOLS[layer]] + list(
+                layers_index.INJECTED.get(layer, {}).values()):
+            _lazy_symbols.update((x, layer) for x in names.split())
+    # Dissecting a class loads the lazy layers binding to it
+    for lower, bindings in layers_index.PAYLOAD_GUESS.items():
+        layers = [x for x, _ in bindings if x in _lazy_layers]
+        if layers:
+            Packet.class_lazy_bindings[lower] = functools.partial(
+                _load_lazy_layers, layers
+            )
+    if _lazy_layers:
+        sys.meta_path.insert(0, _lazy_finder)
+
+
+if conf.lazy_layers:
+    from scapy.libs import layers_index
+    _init_lazy_layers()
 
 for _l in conf.load_layers:
+    if _l in _lazy_layers:
+        continue
     log_loading.debug("Loading layer %s", _l)
     try:
-        load_layer(_l, globals_dict=globals(), symb_list=__all__)
+        if conf.lazy_layers and _l in layers_index.SYMBOLS:
+            # Only copy the symbols that the layer would set last
+            importlib.import_module("scapy.layers." + _l)
+            _publish_layer(_l)
+        else:
+            load_layer(_l, globals_dict=globals(), symb_list=__all__)
     except Exception as e:
         log.warning("can't import layer %s: %s", _l, e)
 
+if conf.lazy_layers:
+    # The eager layers may have been imported in a different order
+    for _l in layers_index.PAYLOAD_GUESS:
+        _sort_payload_guess(_l)
+
 try:
     del _l
 except NameError:
@@ -14,10 +14,12 @@ This implements:
 
 import abc
 import collections
+import concurrent.futures
 import operator
 import itertools
 import socket
 import struct
+import threading
 import time
 import warnings
 
@@ -28,8 +30,8 @@ from scapy.arch import (
 )
 from scapy.ansmachine import AnsweringMachine
 from scapy.base_classes import Net, ScopedIP
-from scapy.config import conf
-from scapy.compat import orb, raw, chb, bytes_encode, plain_str
+from scapy.config import conf, CacheInstance
+from scapy.compat import orb, chb, bytes_encode, plain_str
 from scapy.error import log_runtime, warning, Scapy_Exception
 from scapy.packet import Packet, bind_layers, Raw
 from scapy.fields import (
@@ -48,6 +50,7 @@ from scapy.fields import (
     MACField,
     MultipleTypeField,
     PacketListField,
+    RawVal,
     ShortEnumField,
     ShortField,
     StrField,
@@ -70,6 +73,9 @@ from scapy.layers.inet6 import IPv6
 
 from typing import (
     Any,
+    Callable,
+    Dict,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -199,10 +205,19 @@ def dns_get_str(s, full=None, _ignore_compression=False):
 
 
 def _is_ptr(x):
-    return b"." not in x and (
-        (x and orb(x[-1]) == 0) or
-        (len(x) >= 2 and (orb(x[-2]) & 0xc0) == 0xc0)
-    )
+    """Whether x is an already encoded name, i.e. labels that end with a null
+    byte or with a pointer (as set by dns_compress())"""
+    i = 0
+    while i < len(x):
+        cur = orb(x[i])
+        if cur == 0:
+            return i == len(x) - 1
+        if cur & 0xc0 == 0xc0:
+            return i == len(x) - 2
+        if cur & 0xc0:
+            return False
+        i += cur + 1
+    return False
 
 
 def dns_encode(x, check_built=False):
@@ -235,84 +250,114 @@ def DNSgetstr(*args, **kwargs):
     return dns_get_str(*args, **kwargs)[:-1]
 
 
+# The types of DNSRR whose rdata is a name, that dns_compress() compresses
+_DNS_COMPRESSED_TYPES = [2, 3, 4, 5, 12, 15, 39, 47]
+
+
+def _dns_compress_name(name, names, offset):
+    """Compresses a name written at offset in the DNS message.
+
+    :param name: the name, as stored in a DNSStrField
+    :param names: a dict of the names (and suffixes of names) already
+                  written in the message, to their offsets. It is updated
+                  with the new ones
+    :param offset: the offset of the name in the message
+    :returns: the name, or its compressed form when one of its suffixes is
+              in names
+    """
+    labels = name.split(b".")
+    for i in range(max(1, len(labels) - 1)):
+        part = b".".join(labels[i:])
+        index = names.get(part)
+        if index is not None:
+            kept_string = dns_encode(name[:-len(part)], check_built=True)[:-1]
+            return kept_string + struct.pack("!H", 0xc000 | index)
+        if offset < 0x4000:
+            # Pointers are 14 bits long
+            names[part] = offset
+        offset += 1 + len(labels[i][:63])
+    return name
+
+
+def _dns_compress_rr(rr, names, offset):
+    """Compresses the names of a record (or question) of a DNS message, and
+    builds it.
+
+    The compressed names are set in the fields of the record, and its bytes
+    are stored in its raw_packet_cache, so that the DNS layer does not
+    build it again.
+
+    :param rr: the record
+    :param names: the dict of the names already written in the message,
+                  see _dns_compress_name()
+    :param offset: the offset of the record in the message
+    :returns: the length of the record
+    """
+    p = b""
+    compressed = False
+    rdlen = None
+    for fld in rr.fields_desc:
+        val = rr.getfieldval(fld.name)
+        if isinstance(val, RawVal):
+            p += bytes(val)
+            continue
+        if fld.name == "rdlen":
+            rdlen = len(p)
+        elif isinstance(fld, DNSStrField) or (
+                isinstance(fld, MultipleTypeField) and
+                rr.type in _DNS_COMPRESSED_TYPES and
+                isinstance(fld._find_fld_pkt(rr), DNSStrField)):
+            if val != b"." and not _is_ptr(val):
+                new_val = _dns_compress_name(val, names, offset + len(p))
+                if new_val is not val:
+                    rr.setfieldval(fld.name, new_val)
+                    val = new_val
+                    compressed = True
+        p = fld.addfield(rr, p, val)
+    if compressed:
+        try:
+            del rr.rdlen
+        except AttributeError:
+            pass
+        else:
+            # rdlen was built before its (compressed) rdata
+            if rdlen is not None:
+                fld = rr.get_field("rdlen")
+                q = fld.addfield(rr, b"", rr.rdlen)
+                p = p[:rdlen] + q + p[rdlen + len(q):]
+    if rr.post_transforms:
+        return len(rr)
+    p = rr.post_build(p, b"")
+    rr.raw_packet_cache = p
+    rr.raw_packet_cache_fields = {
+        fld.name: rr._raw_packet_cache_field_value(
+            fld, rr.getfieldval(fld.name), copy=True
+        )
+        for fld in rr.fields_desc
+        if fld.islist or fld.holds_packets or fld.ismutable
+    }
+    rr.explicit = 1
+    return len(p) + len(rr.payload)
+
+
 def dns_compress(pkt):
     """This function compresses a DNS packet according to compression rules.
+
+    The names are compressed in a single pass over the records, that also
+    builds them. The pointers are written in the fields of the records.
     """
     if DNS not in pkt:
         raise Scapy_Exception("Can only compress DNS layers")
     pkt = pkt.copy()
     dns_pkt = pkt.getlayer(DNS)
     dns_pkt.clear_cache()
-    build_pkt = raw(dns_pkt)
-
-    def field_gen(dns_pkt):
-        """Iterates through all DNS strings that can be compressed"""
-        for lay in [dns_pkt.qd, dns_pkt.an, dns_pkt.ns, dns_pkt.ar]:
-            if not lay:
-                continue
-            for current in lay:
-                for field in current.fields_desc:
-                    if isinstance(field, DNSStrField) or \
-                        (isinstance(field, MultipleTypeField) and
-                         current.type in [2, 3, 4, 5, 12, 15, 39, 47]):
-                        # Get the associated data and store it accordingly  # noqa: E501
-                        dat = current.getfieldval(field.name)
-                        yield current, field.name, dat
-
-    def possible_shortens(dat):
-        """Iterates through all possible compression parts in a DNS string"""
-        if dat == b".":  # we'd lose by compressing it
-            return
-        yield dat
-        for x in range(1, dat.count(b".")):
-            yield dat.split(b".", x)[x]
-    data = {}
-    for current, name, dat in field_gen(dns_pkt):
-        for part in possible_shortens(dat):
-            # Encode the data
-            encoded = dns_encode(part, check_built=True)
-            if part not in data:
-                # We have no occurrence of such data, let's store it as a
-                # possible pointer for future strings.
-                # We get the index of the encoded data
-                index = build_pkt.index(encoded)
-                # The following is used to build correctly the pointer
-                fb_index = ((index >> 8) | 0xc0)
-                sb_index = index - (256 * (fb_index - 0xc0))
-                pointer = chb(fb_index) + chb(sb_index)
-                data[part] = [(current, name, pointer, index + 1)]
-            else:
-                # This string already exists, let's mark the current field
-                # with it, so that it gets compressed
-                data[part].append((current, name))
-                _in = data[part][0][3]
-                build_pkt = build_pkt[:_in] + build_pkt[_in:].replace(
-                    encoded,
-                    b"\0\0",
-                    1
-                )
-                break
-    # Apply compression rules
-    for ck in data:
-        # compression_key is a DNS string
-        replacements = data[ck]
-        # replacements is the list of all tuples (layer, field name)
-        # where this string was found
-        replace_pointer = replacements.pop(0)[2]
-        # replace_pointer is the packed pointer that should replace
-        # those strings. Note that pop remove it from the list
-        for rep in replacements:
-            # setfieldval edits the value of the field in the layer
-            val = rep[0].getfieldval(rep[1])
-            assert val.endswith(ck)
-            kept_string = dns_encode(val[:-len(ck)], check_built=True)[:-1]
-            new_val = kept_string + replace_pointer
-            rep[0].setfieldval(rep[1], new_val)
-            try:
-                del rep[0].rdlen
-            except AttributeError:
-                pass
-    # End of the compression algorithm
+    names = {}
+    # The offsets are counted from the DNS header, without the length of
+    # DNS over TCP
+    offset = 12
+    for lay in [dns_pkt.qd, dns_pkt.an, dns_pkt.ns, dns_pkt.ar]:
+        for current in lay:
+            offset += _dns_compress_rr(current, names, offset)
     # Destroy the previous DNS layer if needed
     if not isinstance(pkt, DNS) and pkt.getlayer(DNS).underlayer:
         pkt.getlayer(DNS).underlayer.remove_payload()
@@ -1373,7 +1418,226 @@ bind_layers(TCP, DNS, sport=53)
 
 # Nameserver config
 conf.nameservers = read_nameservers()
-_dns_cache = conf.netcache.new_cache("dns_cache", 300)
+
+
+class DNSCache(CacheInstance):
+    """
+    A cache of DNS answers. Each entry expires after its own TTL, and the
+    cache holds at most ``maxcount`` entries and ``maxsize`` bytes: when
+    full, expired entries are removed first, then the oldest ones.
+
+    :param name: the name of the cache in conf.netcache
+    :param maxcount: the maximum number of entries
+    :param maxsize: the maximum total size of the entries, in bytes
+    :param timeout: the TTL of the entries set with cache[key] = value
+    """
+    __slots__ = ["maxcount", "maxsize", "size", "_ttl", "_size"]
+
+    def __init__(self, name="dns_cache", maxcount=1000, maxsize=1048576,
+                 timeout=300):
+        # type: (str, int, int, int) -> None
+        super(DNSCache, self).__init__(name=name, timeout=timeout)
+        self.maxcount = maxcount
+        self.maxsize = maxsize
+        self.size = 0
+        self._ttl = {}  # type: Dict[str, float]
+        self._size = {}  # type: Dict[str, int]
+
+    def flush(self):
+        # type: () -> None
+        super(DNSCache, self).flush()
+        self._ttl.clear()
+        self._size.clear()
+        self.size = 0
+
+    def __contains__(self, item):
+        # type: (Any) -> bool
+        if not dict.__contains__(self, item):
+            return False
+        return time.time() - self._timetable[item] < self._ttl[item]
+
+    def __setitem__(self, item, v):
+        # type: (str, Any) -> None
+        if item in self.__slots__:
+            return object.__setattr__(self, item, v)
+        self.set(item, v, self.timeout or 0, len(item))
+
+    def set(self, item, value, ttl, size):
+        # type: (str, Any, float, int) -> None
+        """
+        Store an entry for ``ttl`` seconds.
+
+        :param size: the size of the entry in bytes
+        """
+        if dict.__contains__(self, item):
+            self._remove(item)
+        super(DNSCache, self).__setitem__(item, value)
+        self._ttl[item] = ttl
+        self._size[item] = size
+        self.size += size
+        if len(self._ttl) > self.maxcount or self.size > self.maxsize:
+            for k in [k for k in dict.keys(self) if k not in self]:
+                self._remove(k)
+            keys = iter(list(dict.keys(self)))
+            while len(self._ttl) > self.maxcount or self.size > self.maxsize:
+                self._remove(next(keys))
+
+    def _remove(self, item):
+        # type: (str) -> None
+        dict.__delitem__(self, item)
+        del self._timetable[item]
+        del self._ttl[item]
+        self.size -= self._size.pop(item)
+
+    def update(self,
+               other,  # type: Any
+               **kwargs  # type: Any
+               ):
+        # type: (...) -> None
+        for key, value in other.iteritems():
+            if key not in self or self._timetable[key] < other._timetable[key]:
+                self.set(
+                    key,
+                    value,
+                    getattr(other, "_ttl", {}).get(key, self.timeout or 0),
+                    getattr(other, "_size", {}).get(key, len(key)),
+                )
+                self._timetable[key] = other._timetable[key]
+
+    def iterkeys(self):
+        # type: () -> Iterator[str]
+        return (k for k in list(dict.keys(self)) if k in self)
+
+    def iteritems(self):
+        # type: () -> Iterator[Tuple[str, Any]]
+        return ((k, dict.__getitem__(self, k)) for k in self.iterkeys())
+
+    def itervalues(self):
+        # type: () -> Iterator[Any]
+        return (v for _, v in self.iteritems())
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.keys())
+
+    def summary(self):
+        # type: () -> str
+        return "%s: %i valid items (%i bytes). Max %i items, %i bytes" % (
+            self.name, len(self), self.size, self.maxcount, self.maxsize
+        )
+
+    def copy(self):
+        # type: () -> DNSCache
+        c = DNSCache(self.name, self.maxcount, self.maxsize, self.timeout)
+        c.update(self)
+        return c
+
+
+_dns_cache = DNSCache("dns_cache")
+conf.netcache.add_cache(_dns_cache)
+
+# Idle sockets to the nameservers, by (nameserver, socket type)
+_dns_sockets = collections.defaultdict(list)  # type: Dict[Tuple[str, int], List[Any]]  # noqa: E501
+# Queries that are waiting for an answer, by (qname, qtype)
+_dns_inflight = {}  # type: Dict[Tuple[bytes, int], List[Any]]
+_dns_lock = threading.Lock()
+_DNS_MAX_IDLE_SOCKETS = 8
+
+
+def _dns_get_socket(nameserver, sock_type):
+    # type: (str, int) -> Tuple[Any, bool]
+    """Return an idle socket connected to a nameserver, or a new one, and
+    whether it was reused. UDP sockets are wrapped in a StreamSocket."""
+    with _dns_lock:
+        idle = _dns_sockets[(nameserver, sock_type)]
+        if idle:
+            return idle.pop(), True
+    family = socket.AF_INET6 if ":" in nameserver else socket.AF_INET
+    sock = socket.socket(family, sock_type)
+    try:
+        sock.connect((nameserver, 53))
+    except OSError:
+        sock.close()
+        raise
+    if sock_type == socket.SOCK_DGRAM:
+        return StreamSocket(sock, DNS), False
+    return sock, False
+
+
+def _dns_release_socket(nameserver, sock_type, sock):
+    # type: (str, int, Any) -> None
+    """Give a socket back to the pool of idle sockets"""
+    with _dns_lock:
+        idle = _dns_sockets[(nameserver, sock_type)]
+        if len(idle) < _DNS_MAX_IDLE_SOCKETS:
+            idle.append(sock)
+            return
+    sock.close()
+
+
+def _dns_recv_exact(sock, size):
+    # type: (socket.socket, int) -> bytes
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by the nameserver")
+        data += chunk
+    return data
+
+
+def _dns_tcp_sr1(sock, query, timeout):
+    # type: (socket.socket, DNS, float) -> DNS
+    """Send a DNS query over TCP and return its answer (RFC1035 sect 4.2.2)"""
+    data = bytes(query)
+    sock.settimeout(timeout)
+    sock.sendall(struct.pack("!H", len(data)) + data)
+    while True:
+        length = struct.unpack("!H", _dns_recv_exact(sock, 2))[0]
+        res = DNS(_dns_recv_exact(sock, length))
+        if res.id == query.id:
+            return res
+
+
+def _dns_query(qname, qtype, nameserver, **kwargs):
+    # type: (bytes, int, str, **Any) -> Optional[Packet]
+    """Send a query to a nameserver, over a pooled socket. A truncated
+    answer over UDP is queried again over TCP."""
+    query = DNS(qd=[DNSQR(qname=qname, qtype=qtype)], id=RandShort()._fix())
+    sock, reused = _dns_get_socket(nameserver, socket.SOCK_DGRAM)
+    try:
+        sock.ins.settimeout(kwargs["timeout"])
+        res = sock.sr1(query, **kwargs)
+    except BaseException:
+        sock.close()
+        raise
+    _dns_release_socket(nameserver, socket.SOCK_DGRAM, sock)
+    if res is None or not res[DNS].tc:
+        return res
+    while True:
+        sock, reused = _dns_get_socket(nameserver, socket.SOCK_STREAM)
+        try:
+            res = _dns_tcp_sr1(sock, query, kwargs["timeout"])
+        except OSError:
+            sock.close()
+            if reused:
+                # The nameserver may have closed an idle connection
+                continue
+            raise
+        _dns_release_socket(nameserver, socket.SOCK_STREAM, sock)
+        return res
+
+
+def _dns_cache_ttl(res, answers):
+    # type: (Packet, List[Packet]) -> int
+    """How long an answer can be cached (RFC1035 sect 7.4 and RFC2308 sect 5).
+    Negative answers without a SOA record are not cached."""
+    if answers:
+        return min(x.ttl for x in answers)
+    for x in res.ns:
+        if x.type == 6:  # SOA
+            return min(x.ttl, x.minimum)
+    return 0
 
 
 @conf.commands.register
@@ -1381,6 +1645,11 @@ def dns_resolve(qname, qtype="A", raw=False, verbose=1, timeout=3, **kwargs):
     """
     Perform a simple DNS resolution using conf.nameservers with caching
 
+    The answers, including negative ones, are cached for as long as their TTL
+    allows in conf.netcache.dns_cache. The sockets to the nameservers are kept
+    open across calls, and concurrent calls for the same query share a single
+    request.
+
     :param qname: the name to query
     :param qtype: the type to query (default A)
     :param raw: return the whole DNS packet (default False)
@@ -1397,59 +1666,69 @@ def dns_resolve(qname, qtype="A", raw=False, verbose=1, timeout=3, **kwargs):
         ([b"raw"] if raw else [])
     )
     result = _dns_cache.get(cache_ident)
-    if result:
+    if result is not None:
         return result
 
     kwargs.setdefault("timeout", timeout)
     kwargs.setdefault("verbose", 0)
-    res = None
-    for nameserver in conf.nameservers:
-        # Try all nameservers
+    # Only one request is sent for a query, that other callers wait for
+    with _dns_lock:
+        inflight = _dns_inflight.get((qname, qtype))
+        if inflight is None:
+            inflight = _dns_inflight[(qname, qtype)] = [threading.Event(), None]
+            owner = True
+        else:
+            owner = False
+    if owner:
+        res = None
         try:
-            # Spawn a UDP socket, connect to the nameserver on port 53
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(kwargs["timeout"])
-            sock.connect((nameserver, 53))
-            # Connected. Wrap it with DNS
-            sock = StreamSocket(sock, DNS)
-            # I/O
-            res = sock.sr1(
-                DNS(qd=[DNSQR(qname=qname, qtype=qtype)], id=RandShort()),
-                **kwargs,
-            )
-        except IOError as ex:
-            if verbose:
-                log_runtime.warning(str(ex))
-            continue
+            for nameserver in conf.nameservers:
+                # Try all nameservers
+                try:
+                    res = _dns_query(qname, qtype, nameserver, **kwargs)
+                except IOError as ex:
+                    if verbose:
+                        log_runtime.warning(str(ex))
+                    continue
+                if res:
+                    # We have a response ! Check for failure
+                    if res[DNS].rcode == 2:  # server failure
+                        res = None
+                        if verbose:
+                            log_runtime.info(
+                                "DNS: %s answered with failure for %s" % (
+                                    nameserver,
+                                    qname,
+                                )
+                            )
+                    else:
+                        break
         finally:
-            sock.close()
-        if res:
-            # We have a response ! Check for failure
-            if res[DNS].rcode == 2:  # server failure
-                res = None
-                if verbose:
-                    log_runtime.info(
-                        "DNS: %s answered with failure for %s" % (
-                            nameserver,
-                            qname,
-                        )
-                    )
-            else:
-                break
+            inflight[1] = res
+            with _dns_lock:
+                del _dns_inflight[(qname, qtype)]
+            inflight[0].set()
+    else:
+        inflight[0].wait()
+        res = inflight[1]
     if res is not None:
-        if raw:
-            # Raw
-            result = res
-        else:
-            # Find answers
-            result = [
-                x
-                for x in itertools.chain(res.an, res.ns, res.ar)
-                if x.type == qtype
-            ]
-        if result:
+        # Find answers
+        answers = [
+            x
+            for x in itertools.chain(res.an, res.ns, res.ar)
+            if x.type == qtype
+        ]
+        result = res if raw else answers
+        ttl = _dns_cache_ttl(res, answers)
+        if ttl > 0:
             # Cache it
-            _dns_cache[cache_ident] = result
+            with _dns_lock:
+                _dns_cache.set(
+                    cache_ident,
+                    result,
+                    ttl,
+                    len(res) if raw else sum(len(x) for x in answers),
+                )
         return result
     else:
         raise TimeoutError
@@ -1499,6 +1778,7 @@ class DNS_am(AnsweringMachine):
     function_name = "dnsd"
     filter = "udp port 53"
     cls = DNS  # We also use this automaton for llmnrd / mdnsd
+    _relay_pool = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
 
     def parse_options(self, joker=None,
                       match=None,
@@ -1511,7 +1791,8 @@ class DNS_am(AnsweringMachine):
                       src_ip=None,
                       src_ip6=None,
                       ttl=10,
-                      jokerarpa=False):
+                      jokerarpa=False,
+                      relay_workers=16):
         """
         Simple DNS answering machine.
 
@@ -1531,6 +1812,10 @@ class DNS_am(AnsweringMachine):
                       used as a response.
         :param jokerarpa: answer for .in-addr.arpa PTR requests. (Default: False)
         :param relay: relay unresolved domains to conf.nameservers (Default: False).
+                      The answers are cached as per their TTL (see dns_resolve).
+        :param relay_workers: the number of threads that answer the queries in
+                              relay mode, so that a slow nameserver does not
+                              block the other clients (Default: 16)
         :param send_error: send an error message when this server can't answer
                            (Default: False)
         :param srvmatch: a dictionary of {name: (port, target)} used for SRV
@@ -1638,6 +1923,57 @@ class DNS_am(AnsweringMachine):
         self.src_ip = src_ip
         self.src_ip6 = src_ip6
         self.ttl = ttl
+        self.relay_workers = relay_workers
+
+    def reply(self, pkt, send_function=None, address=None):
+        # type: (Packet, Optional[Callable[..., None]], Optional[Any]) -> None
+        if self._relay_pool is None:
+            super(DNS_am, self).reply(pkt, send_function, address)
+            return
+        # In relay mode, the answers may wait for a nameserver
+        self._relay_pool.submit(self._relay_reply, pkt, send_function, address)
+
+    def _relay_reply(self, pkt, send_function, address):
+        # type: (Packet, Optional[Callable[..., None]], Optional[Any]) -> None
+        try:
+            super(DNS_am, self).reply(pkt, send_function, address)
+        except Exception:
+            log_runtime.exception("Failed to answer %s", pkt.summary())
+
+    def _start_relay_pool(self):
+        # type: () -> None
+        if self.relay:
+            self._relay_pool = concurrent.futures.ThreadPoolExecutor(
+                self.relay_workers
+            )
+
+    def _stop_relay_pool(self):
+        # type: () -> None
+        if self._relay_pool is not None:
+            self._relay_pool.shutdown()
+            self._relay_pool = None
+
+    def sniff(self):
+        # type: () -> None
+        self._start_relay_pool()
+        try:
+            super(DNS_am, self).sniff()
+        finally:
+            self._stop_relay_pool()
+
+    def sniff_bg(self):
+        # type: () -> None
+        self._start_relay_pool()
+        super(DNS_am, self).sniff_bg()
+
+    def stop(self):
+        # type: () -> None
+        """Stop the answering machine started with bg=True, once the
+        pending queries are answered"""
+        sniffer = self.__dict__.get("sniffer")
+        if sniffer is not None and sniffer.running:
+            sniffer.stop()
+        self._stop_relay_pool()
 
     def is_request(self, req):
         from scapy.layers.inet6 import IPv6
@@ -13,7 +13,8 @@ import re
 import random
 import select
 import socket
-from collections import defaultdict
+from collections import Counter, OrderedDict
+import bisect
 
 from scapy.utils import checksum, do_graph, incremental_label, \
     linehexdump, strxor, whois, colgen
@@ -546,6 +547,8 @@ class IP(Packet, IPTools):
                    Emph(SourceIPField("src")),
                    Emph(DestIPField("dst", "127.0.0.1")),
                    PacketListField("options", [], IPOption, length_from=lambda p:p.ihl * 4 - 20)]  # noqa: E501
+    template_computed_fields = ("ihl", "len", "chksum")
+    template_checksum_field = ("chksum", "header", 0)
 
     def post_build(self, p, pay):
         ihl = self.ihl
@@ -567,6 +570,13 @@ class IP(Packet, IPTools):
             return s, b""
         return s[:tmp_len], s[tmp_len:]
 
+    def template_pseudo_header(self):
+        # The pseudo-header also holds the length, and the final
+        # destination of source routing options
+        if self.len is not None or self.options:
+            return None
+        return ("src", "dst")
+
     def route(self):
         dst = self.dst
         scope = None
@@ -747,6 +757,8 @@ class TCP(Packet):
                    XShortField("chksum", None),
                    ShortField("urgptr", 0),
                    TCPOptionsField("options", "")]
+    template_computed_fields = ("dataofs", "chksum")
+    template_checksum_field = ("chksum", "pseudo", 0)
 
     def post_build(self, p, pay):
         p += pay
@@ -775,6 +787,12 @@ class TCP(Packet):
         else:
             return self.payload.hashret()
 
+    def extra_matchkey(self):
+        # Answers and ICMP errors have the same ports
+        if conf.checkIPsrc:
+            return struct.pack("!HH", *sorted((self.sport, self.dport)))
+        return b""
+
     def answers(self, other):
         if not isinstance(other, TCP):
             return 0
@@ -821,6 +839,8 @@ class UDP(Packet):
                    ShortEnumField("dport", 53, UDP_SERVICES),
                    ShortField("len", None),
                    XShortField("chksum", None), ]
+    template_computed_fields = ("len", "chksum")
+    template_checksum_field = ("chksum", "pseudo", 0xFFFF)
 
     def post_build(self, p, pay):
         p += pay
@@ -1202,6 +1222,8 @@ class ICMP(Packet):
 
     # To handle extpad
     post_dissection = _ICMP_extpad_post_dissection
+    template_computed_fields = ("chksum",)
+    template_checksum_field = ("chksum", "payload", 0)
 
     def post_build(self, p, pay):
         p += pay
@@ -1434,21 +1456,153 @@ class BadFragments(ValueError):
         super(BadFragments, self).__init__(*args, **kwargs)
 
 
-def _defrag_iter_and_check_offsets(frags):
+class _DefragDatagram(object):
     """
-    Internal generator used in _defrag_ip_pkt
+    The fragments of a datagram being reassembled. The missing parts are
+    kept as a sorted list of holes, as described in RFC 815.
+    """
+    __slots__ = ["frags", "starts", "ends", "time", "nbytes", "bad", "last"]
+
+    def __init__(self, time):
+        # (offset, arrival index, packet) sorted by offset
+        self.frags = []
+        # The holes: [starts[i], ends[i]). The last one ends at None until
+        # the last fragment is received.
+        self.starts = [0]
+        self.ends = [None]
+        self.time = time
+        self.nbytes = 0
+        self.bad = False
+        self.last = False
+
+    def add(self, pkt, offset, length, more):
+        """Add a fragment. Return True if it fits in a hole."""
+        bisect.insort(self.frags, (offset, len(self.frags), pkt))
+        self.nbytes += length
+        if not more:
+            self.last = True
+        end = offset + length
+        i = bisect.bisect_right(self.starts, offset) - 1
+        if i < 0:
+            return False
+        start, hole_end = self.starts[i], self.ends[i]
+        if hole_end is not None and end > hole_end:
+            # Overlaps some already received data
+            return False
+        if not more:
+            if hole_end is not None:
+                # There is already data, or another end, after this one
+                return False
+            hole_end = end
+        starts, ends = [], []
+        if start < offset:
+            starts.append(start)
+            ends.append(offset)
+        if hole_end is None or end < hole_end:
+            starts.append(end)
+            ends.append(hole_end)
+        self.starts[i:i + 1] = starts
+        self.ends[i:i + 1] = ends
+        return True
+
+    def complete(self):
+        return not self.starts
+
+
+class DefragTable(object):
+    """
+    Reassembly table of fragmented datagrams, used by IPSession and
+    defrag(). Adding a fragment only looks up the holes of its datagram.
+
+    :param timeout: drop the datagrams that are not complete this amount of
+                    seconds after their first fragment (the RFC 791
+                    reassembly timer), based on the packets timestamps.
+                    None to never time out.
+    :param max_datagrams: the maximum number of datagrams being reassembled.
+                          When reached, the oldest ones are dropped.
+    :param max_bytes: the maximum number of bytes in the stored fragments.
+                      When reached, the oldest datagrams are dropped.
+
+    The number of dropped datagrams, per reason, is available in the
+    ``evictions`` counter: ``timeout``, ``max_datagrams``, ``max_bytes`` and
+    ``bad`` (overlapping fragments).
     """
-    offset = 0
-    for pkt, o, length in frags:
-        if offset != o:
-            if offset > o:
-                op = ">"
-            else:
-                op = "<"
-            warning("Fragment overlap (%i %s %i) on %r" % (offset, op, o, pkt))
-            raise BadFragments
-        offset += length
-        yield bytes(pkt[IP].payload)
+
+    def __init__(self, timeout=None, max_datagrams=None, max_bytes=None):
+        self.timeout = timeout
+        self.max_datagrams = max_datagrams
+        self.max_bytes = max_bytes
+        # Datagrams by uid, in the order of their first fragment
+        self.datagrams = OrderedDict()
+        self.nbytes = 0
+        self.evictions = Counter()
+
+    def __len__(self):
+        return len(self.datagrams)
+
+    def _drop(self, uid, reason):
+        datagram = self.datagrams.pop(uid)
+        self.nbytes -= datagram.nbytes
+        self.evictions[reason] += 1
+        return datagram
+
+    def expire(self, now):
+        """Drop the datagrams whose reassembly timer is over"""
+        if self.timeout is None:
+            return
+        limit = now - self.timeout
+        while self.datagrams:
+            uid, datagram = next(iter(self.datagrams.items()))
+            if datagram.time >= limit:
+                break
+            self._drop(uid, "timeout")
+
+    def add(self, uid, pkt, offset, length, more):
+        """
+        Add a fragment of the datagram identified by uid.
+
+        :param offset: the offset of the fragment data, in bytes
+        :param length: the length of the fragment data
+        :param more: False if this is the last fragment
+        :return: the list of the fragments, sorted by offset, when the
+                 datagram is complete. None otherwise.
+        :raises BadFragments: if the fragments overlap
+        """
+        now = float(pkt.time)
+        self.expire(now)
+        datagram = self.datagrams.get(uid, None)
+        if datagram is None:
+            datagram = self.datagrams[uid] = _DefragDatagram(now)
+        if not datagram.add(pkt, offset, length, more):
+            warning("Fragment overlap (offset %i) on %r" % (offset, pkt))
+            datagram.bad = True
+        self.nbytes += length
+        if datagram.bad and datagram.last:
+            frags = self._drop(uid, "bad").frags
+            raise BadFragments(frags=[x[2] for x in sorted(
+                frags, key=lambda x: x[1]
+            )])
+        if datagram.complete():
+            del self.datagrams[uid]
+            self.nbytes -= datagram.nbytes
+            return [x[2] for x in datagram.frags]
+        if self.max_bytes is not None:
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self.datagrams)), "max_bytes")
+        if self.max_datagrams is not None:
+            while len(self.datagrams) > self.max_datagrams:
+                self._drop(next(iter(self.datagrams)), "max_datagrams")
+        return None
+
+    def flush(self):
+        """Remove the incomplete datagrams, and return their fragments"""
+        frags = [
+            [x[2] for x in sorted(datagram.frags, key=lambda x: x[1])]
+            for datagram in self.datagrams.values()
+        ]
+        self.datagrams.clear()
+        self.nbytes = 0
+        return frags
 
 
 def _defrag_ip_pkt(pkt, frags):
@@ -1456,7 +1610,7 @@ def _defrag_ip_pkt(pkt, frags):
     Defragment a single IP packet.
 
     :param pkt: the new pkt
-    :param frags: a defaultdict(list) used for storage
+    :param frags: a DefragTable used for storage
     :return: a tuple (fragmented, defragmented_value)
     """
     ip = pkt[IP]
@@ -1467,19 +1621,11 @@ def _defrag_ip_pkt(pkt, frags):
             fraglen = len(ip.payload)
         else:
             fraglen = ip.len - (ip.ihl << 2)
-        # (pkt, frag offset, frag len)
-        frags[uid].append((pkt, ip.frag << 3, fraglen))
-        if not ip.flags.MF:  # no more fragments = last fragment
-            curfrags = sorted(frags[uid], key=lambda x: x[1])  # sort by offset
-            try:
-                data = b"".join(_defrag_iter_and_check_offsets(curfrags))
-            except ValueError:
-                # bad fragment
-                badfrags = frags[uid]
-                del frags[uid]
-                raise BadFragments(frags=badfrags)
+        curfrags = frags.add(uid, pkt, ip.frag << 3, fraglen, ip.flags.MF)
+        if curfrags is not None:
+            data = b"".join(bytes(x[IP].payload) for x in curfrags)
             # re-build initial packet without fragmentation
-            p = curfrags[0][0].copy()
+            p = curfrags[0].copy()
             pay_class = p[IP].payload.__class__
             p[IP].flags.MF = False
             p[IP].remove_payload()
@@ -1487,8 +1633,6 @@ def _defrag_ip_pkt(pkt, frags):
             p[IP].chksum = None
             # append defragmented payload
             p /= pay_class(data)
-            # cleanup
-            del frags[uid]
             return True, p
         return True, None
     return False, pkt
@@ -1499,7 +1643,7 @@ def _defrag_logic(plist, complete=False):
     Internal function used to defragment a list of packets.
     It contains the logic behind the defrag() and defragment() functions
     """
-    frags = defaultdict(list)
+    frags = DefragTable()
     final = []
     notfrag = []
     badfrag = []
@@ -1528,6 +1672,12 @@ def _defrag_logic(plist, complete=False):
                 final.append(defragmented_value)
             else:
                 notfrag.append(defragmented_value)
+    # Datagrams with missing fragments
+    for datagram in frags.flush():
+        if complete:
+            final.extend(datagram)
+        else:
+            badfrag.extend(datagram)
     # Return
     if complete:
         if hasattr(plist, "listname"):
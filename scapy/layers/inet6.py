@@ -321,6 +321,7 @@ class IPv6(_IPv6GuessPayload, Packet, IPTools):
                    ByteField("hlim", 64),
                    SourceIP6Field("src"),
                    DestIP6Field("dst", "::1")]
+    template_computed_fields = ("plen",)
 
     def route(self):
         """Used to select the L2 address"""
@@ -335,6 +336,9 @@ class IPv6(_IPv6GuessPayload, Packet, IPTools):
     def mysummary(self):
         return "%s > %s (%i)" % (self.src, self.dst, self.nh)
 
+    def template_pseudo_header(self):
+        return ("src", "dst")
+
     def post_build(self, p, pay):
         p += pay
         if self.plen is None:
@@ -1155,6 +1159,27 @@ class IPv6ExtHdrFragment(_IPv6ExtHdr):
             return super(IPv6ExtHdrFragment, self).guess_payload_class(p)
 
 
+def _defrag6_rebuild(first, fragmentable):
+    """
+    Rebuild an IPv6 packet from its first fragment and the reassembled
+    fragmentable part.
+    """
+    # Regenerate the unfragmentable part.
+    q = first.copy()
+    nh = q[IPv6ExtHdrFragment].nh
+    q[IPv6ExtHdrFragment].underlayer.nh = nh
+    q[IPv6ExtHdrFragment].underlayer.plen = len(fragmentable)
+    del q[IPv6ExtHdrFragment].underlayer.payload
+    q /= conf.raw_layer(load=fragmentable)
+    del q.plen
+
+    if q[IPv6].underlayer:
+        q[IPv6] = IPv6(raw(q[IPv6]))
+    else:
+        q = IPv6(raw(q))
+    return q
+
+
 def defragment6(packets):
     """
     Performs defragmentation of a list of IPv6 packets. Packets are reordered.
@@ -1174,17 +1199,7 @@ def defragment6(packets):
         warning("defragment6: some fragmented packets have been removed from list")  # noqa: E501
 
     # reorder fragments
-    res = []
-    while lst:
-        min_pos = 0
-        min_offset = lst[0][IPv6ExtHdrFragment].offset
-        for p in lst:
-            cur_offset = p[IPv6ExtHdrFragment].offset
-            if cur_offset < min_offset:
-                min_pos = 0
-                min_offset = cur_offset
-        res.append(lst[min_pos])
-        del lst[min_pos]
+    res = sorted(lst, key=lambda p: p[IPv6ExtHdrFragment].offset)
 
     # regenerate the fragmentable part
     fragmentable = b""
@@ -1196,20 +1211,34 @@ def defragment6(packets):
         fragmentable += b"X" * (offset - len(fragmentable))
         fragmentable += raw(q.payload)
 
-    # Regenerate the unfragmentable part.
-    q = res[0].copy()
-    nh = q[IPv6ExtHdrFragment].nh
-    q[IPv6ExtHdrFragment].underlayer.nh = nh
-    q[IPv6ExtHdrFragment].underlayer.plen = len(fragmentable)
-    del q[IPv6ExtHdrFragment].underlayer.payload
-    q /= conf.raw_layer(load=fragmentable)
-    del q.plen
+    return _defrag6_rebuild(res[0], fragmentable)
 
-    if q[IPv6].underlayer:
-        q[IPv6] = IPv6(raw(q[IPv6]))
-    else:
-        q = IPv6(raw(q))
-    return q
+
+def _defrag_ipv6_pkt(pkt, frags):
+    """
+    Defragment a single IPv6 packet, like _defrag_ip_pkt() in
+    scapy.layers.inet.
+
+    :param pkt: the new pkt
+    :param frags: a DefragTable used for storage
+    :return: a tuple (fragmented, defragmented_value)
+    """
+    q = pkt[IPv6ExtHdrFragment]
+    if q.offset == 0 and not q.m:
+        # Atomic fragment (RFC 6946)
+        return False, pkt
+    ip6 = q.underlayer
+    while ip6 is not None and not isinstance(ip6, IPv6):
+        ip6 = ip6.underlayer
+    uid = (q.id, ip6 and ip6.src, ip6 and ip6.dst)
+    data = raw(q.payload)
+    curfrags = frags.add(uid, pkt, 8 * q.offset, len(data), q.m)
+    if curfrags is not None:
+        fragmentable = b"".join(
+            raw(x[IPv6ExtHdrFragment].payload) for x in curfrags
+        )
+        return True, _defrag6_rebuild(curfrags[0], fragmentable)
+    return True, None
 
 
 def fragment6(pkt, fragSize):
@@ -1420,6 +1449,8 @@ icmp6types = {1: "Destination unreachable",
 class _ICMPv6(Packet):
     name = "ICMPv6 dummy class"
     overload_fields = {IPv6: {"nh": 58}}
+    template_computed_fields = ("cksum",)
+    template_checksum_field = ("cksum", "pseudo", 0)
 
     def post_build(self, p, pay):
         p += pay
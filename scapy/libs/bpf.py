@@ -0,0 +1,1287 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+"""
+A pcap-filter compiler and a classic BPF evaluator, in pure Python.
+
+They are used to filter packets when neither tcpdump nor libpcap is
+available::
+
+    >>> prog = compile_bpf("tcp dst port 80")
+    >>> prog(raw(Ether()/IP()/TCP(dport=80)))
+    262144
+    >>> prog(raw(Ether()/IP()/UDP(dport=80)))
+    0
+
+Only a subset of the pcap-filter syntax is supported: the ``ether``,
+``ip``, ``ip6``, ``arp``, ``rarp``, ``tcp``, ``udp``, ``sctp``, ``icmp``,
+``icmp6`` and ``igmp`` protocols, the ``host``, ``net``, ``port``,
+``portrange`` and ``proto`` primitives with their ``src``/``dst``
+qualifiers, ``vlan``, ``less``, ``greater``, ``broadcast``,
+``multicast``, and the ``proto[offset:size]`` relations.
+"""
+
+import re
+import socket
+import struct
+
+from scapy.data import (
+    DLT_EN10MB,
+    DLT_IPV4,
+    DLT_IPV6,
+    DLT_LINUX_SLL,
+    DLT_RAW,
+    DLT_RAW_ALT,
+    ETH_P_ARP,
+    ETH_P_IP,
+    ETH_P_IPV6,
+)
+from scapy.error import Scapy_Exception
+from scapy.libs.structures import bpf_insn, bpf_program
+from scapy.pton_ntop import inet_pton
+
+# Typing imports
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# From bpf.h: instruction classes
+BPF_LD = 0x00
+BPF_LDX = 0x01
+BPF_ST = 0x02
+BPF_STX = 0x03
+BPF_ALU = 0x04
+BPF_JMP = 0x05
+BPF_RET = 0x06
+BPF_MISC = 0x07
+# Sizes
+BPF_W = 0x00
+BPF_H = 0x08
+BPF_B = 0x10
+# Addressing modes
+BPF_IMM = 0x00
+BPF_ABS = 0x20
+BPF_IND = 0x40
+BPF_MEM = 0x60
+BPF_LEN = 0x80
+BPF_MSH = 0xa0
+# ALU operations
+BPF_ADD = 0x00
+BPF_SUB = 0x10
+BPF_MUL = 0x20
+BPF_DIV = 0x30
+BPF_OR = 0x40
+BPF_AND = 0x50
+BPF_LSH = 0x60
+BPF_RSH = 0x70
+BPF_NEG = 0x80
+BPF_MOD = 0x90
+BPF_XOR = 0xa0
+# Jumps
+BPF_JA = 0x00
+BPF_JEQ = 0x10
+BPF_JGT = 0x20
+BPF_JGE = 0x30
+BPF_JSET = 0x40
+# Sources
+BPF_K = 0x00
+BPF_X = 0x08
+BPF_A = 0x10
+# Miscellaneous
+BPF_TAX = 0x00
+BPF_TXA = 0x80
+
+BPF_MEMWORDS = 16
+BPF_MAXINSNS = 4096
+
+# The length returned by the compiled programs when a packet is accepted,
+# as libpcap does
+BPF_SNAPLEN = 262144
+
+ETH_P_RARP = 0x8035
+
+_SIZES = {1: BPF_B, 2: BPF_H, 4: BPF_W}
+
+
+class BPFCompileError(Scapy_Exception):
+    """The filter expression is invalid, or is not supported"""
+
+
+################
+#  Evaluation  #
+################
+
+_ALU_EXPR = {
+    BPF_ADD: "A = (A + %s) & 0xffffffff",
+    BPF_SUB: "A = (A - %s) & 0xffffffff",
+    BPF_MUL: "A = (A * %s) & 0xffffffff",
+    BPF_DIV: "A //= %s",
+    BPF_MOD: "A %%= %s",
+    BPF_OR: "A |= %s",
+    BPF_AND: "A &= %s",
+    BPF_XOR: "A ^= %s",
+    BPF_LSH: "A = (A << %s) & 0xffffffff",
+    BPF_RSH: "A >>= %s",
+}
+
+_JMP_EXPR = {
+    BPF_JEQ: "A == %s",
+    BPF_JGT: "A > %s",
+    BPF_JGE: "A >= %s",
+    BPF_JSET: "A & %s",
+}
+
+_LOAD_EXPR = {
+    BPF_W: "_W(d, %s)[0]",
+    BPF_H: "_H(d, %s)[0]",
+    BPF_B: "d[%s]",
+}
+
+
+class BPFProgram(object):
+    """A classic BPF program.
+
+    Calling it with the bytes of a frame returns the number of bytes to
+    accept, 0 meaning that the frame is rejected. Like in the kernel, a
+    load out of the frame, or a division by 0, rejects the frame.
+
+    The program is translated to a Python function when it is created.
+
+    :param insns: the (code, jt, jf, k) instructions
+    """
+
+    def __init__(self, insns):
+        # type: (Sequence[Tuple[int, int, int, int]]) -> None
+        self.insns = [(code, jt, jf, k & 0xffffffff)
+                      for code, jt, jf, k in insns]
+        self._check()
+        self._run = self._translate()
+
+    @classmethod
+    def from_bpf_program(cls, prog):
+        # type: (bpf_program) -> BPFProgram
+        """Build a program from a ctypes bpf_program, e.g. the result of
+        compile_filter()"""
+        return cls([(ins.code, ins.jt, ins.jf, ins.k)
+                    for ins in prog.bf_insns[:prog.bf_len]])
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.insns)
+
+    def __repr__(self):
+        # type: () -> str
+        return "<BPFProgram: %d instructions>" % len(self.insns)
+
+    def __call__(self, data, wirelen=None):
+        # type: (Union[bytes, bytearray, memoryview], Optional[int]) -> int
+        """Run the program on a frame.
+
+        :param data: the captured bytes of the frame
+        :param wirelen: its length on the wire (default: len(data))
+        """
+        return self._run(data, len(data) if wirelen is None else wirelen)
+
+    def dump(self):
+        # type: () -> str
+        """The instructions, in the format of ``tcpdump -dd``"""
+        return "\n".join("{ 0x%x, %d, %d, 0x%08x }," % ins
+                         for ins in self.insns)
+
+    def to_bpf_program(self):
+        # type: () -> bpf_program
+        """The program, as a ctypes bpf_program (e.g. for SO_ATTACH_FILTER)
+        """
+        insns = (bpf_insn * len(self.insns))(*(
+            bpf_insn(code, jt, jf, k - (1 << 32) if k & 0x80000000 else k)
+            for code, jt, jf, k in self.insns
+        ))
+        return bpf_program(len(self.insns), insns)
+
+    def _check(self):
+        # type: () -> None
+        """Validate the program, as the kernel does"""
+        if not 0 < len(self.insns) <= BPF_MAXINSNS:
+            raise Scapy_Exception("Invalid BPF program length")
+        for i, (code, jt, jf, k) in enumerate(self.insns):
+            cls = code & 0x07
+            if cls == BPF_JMP:
+                if code & 0xf0 == BPF_JA:
+                    targets = [k]
+                elif code & 0xf0 in _JMP_EXPR:
+                    targets = [jt, jf]
+                else:
+                    raise Scapy_Exception("Invalid BPF jump at %d" % i)
+                if any(i + 1 + off >= len(self.insns) for off in targets):
+                    raise Scapy_Exception("BPF jump out of range at %d" % i)
+            elif cls == BPF_ALU:
+                op = code & 0xf0
+                if op != BPF_NEG and op not in _ALU_EXPR:
+                    raise Scapy_Exception("Invalid BPF operation at %d" % i)
+                if op in (BPF_DIV, BPF_MOD) and not code & BPF_X and not k:
+                    raise Scapy_Exception("BPF division by 0 at %d" % i)
+            elif cls in (BPF_ST, BPF_STX) or \
+                    cls in (BPF_LD, BPF_LDX) and code & 0xe0 == BPF_MEM:
+                if k >= BPF_MEMWORDS:
+                    raise Scapy_Exception("Invalid BPF memory at %d" % i)
+        if self.insns[-1][0] & 0x07 != BPF_RET:
+            raise Scapy_Exception("A BPF program must end with a return")
+
+    def _statement(self, i):
+        # type: (int) -> List[str]
+        """The Python statements of an instruction"""
+        code, jt, jf, k = self.insns[i]
+        cls = code & 0x07
+        src = "X" if code & BPF_X else str(k)
+        if cls == BPF_LD:
+            mode = code & 0xe0
+            if mode == BPF_ABS:
+                return ["A = " + _LOAD_EXPR[code & 0x18] % k]
+            if mode == BPF_IND:
+                return ["A = " + _LOAD_EXPR[code & 0x18] % ("X + %d" % k)]
+            if mode == BPF_LEN:
+                return ["A = wirelen"]
+            if mode == BPF_MEM:
+                return ["A = m%d" % k]
+            if mode == BPF_IMM:
+                return ["A = %d" % k]
+        elif cls == BPF_LDX:
+            mode = code & 0xe0
+            if mode == BPF_MSH:
+                return ["X = (d[%d] & 0xf) << 2" % k]
+            if mode == BPF_LEN:
+                return ["X = wirelen"]
+            if mode == BPF_MEM:
+                return ["X = m%d" % k]
+            if mode == BPF_IMM:
+                return ["X = %d" % k]
+        elif cls == BPF_ST:
+            return ["m%d = A" % k]
+        elif cls == BPF_STX:
+            return ["m%d = X" % k]
+        elif cls == BPF_ALU:
+            if code & 0xf0 == BPF_NEG:
+                return ["A = -A & 0xffffffff"]
+            return [_ALU_EXPR[code & 0xf0] % src]
+        elif cls == BPF_JMP:
+            if code & 0xf0 == BPF_JA:
+                return ["pc = %d" % (i + 1 + k)]
+            return ["pc = %d if %s else %d" % (
+                i + 1 + jt, _JMP_EXPR[code & 0xf0] % src, i + 1 + jf
+            )]
+        elif cls == BPF_RET:
+            return ["return %s" % ("A" if code & 0x18 == BPF_A else k)]
+        elif cls == BPF_MISC:
+            return ["X = A" if code & 0xf8 == BPF_TAX else "A = X"]
+        raise Scapy_Exception("Invalid BPF instruction %#x at %d" % (code, i))
+
+    def _translate(self):
+        # type: () -> Callable[[Union[bytes, bytearray, memoryview], int], int]  # noqa: E501
+        """Translate the program to a Python function.
+
+        The jumps always go forward: each basic block is a test of the
+        program counter, in order.
+        """
+        leaders = {0}
+        for i, (code, jt, jf, k) in enumerate(self.insns):
+            if code & 0x07 == BPF_JMP:
+                if code & 0xf0 == BPF_JA:
+                    leaders.add(i + 1 + k)
+                else:
+                    leaders.update((i + 1 + jt, i + 1 + jf))
+            if code & 0x07 in (BPF_JMP, BPF_RET):
+                leaders.add(i + 1)
+        lines = [
+            "def run(d, wirelen):",
+            "    A = X = 0",
+            "    %s = 0" % " = ".join("m%d" % i for i in range(BPF_MEMWORDS)),
+            "    pc = 0",
+            "    try:",
+        ]
+        for i in range(len(self.insns)):
+            if i in leaders:
+                lines.append("        if pc == %d:" % i)
+            lines.extend("            " + stmt for stmt in self._statement(i))
+            code = self.insns[i][0]
+            if i + 1 in leaders and code & 0x07 not in (BPF_JMP, BPF_RET):
+                lines.append("            pc = %d" % (i + 1))
+        lines.extend([
+            "    except (IndexError, ZeroDivisionError, struct.error):",
+            "        pass",
+            "    return 0",
+        ])
+        namespace = {
+            "struct": struct,
+            "_H": struct.Struct("!H").unpack_from,
+            "_W": struct.Struct("!I").unpack_from,
+        }  # type: Dict[str, Any]
+        exec(compile("\n".join(lines), "<bpf>", "exec"), namespace)
+        return namespace["run"]  # type: ignore
+
+
+#############
+#  Parsing  #
+#############
+
+_OPERATORS = r"&&|\|\||<<|>>|<=|>=|==|!=|[()\[\]!<>=+*/%&|^:-]"
+_TOKEN = re.compile(_OPERATORS + r"|[\\\w.:]+(?:-[\w.:]+)*(?:/\d+)?")
+# In brackets, ":" separates the offset and the size
+_TOKEN_BRACKETS = re.compile(_OPERATORS + r"|[\w.]+(?:-[\w.]+)*")
+_SPACES = re.compile(r"\s*")
+
+_RELOPS = {">", "<", ">=", "<=", "=", "==", "!="}
+_ARITH_OPS = [
+    {"|"}, {"^"}, {"&"}, {"<<", ">>"}, {"+", "-"}, {"*", "/", "%"},
+]
+_ALU_OPS = {
+    "+": BPF_ADD, "-": BPF_SUB, "*": BPF_MUL, "/": BPF_DIV, "%": BPF_MOD,
+    "|": BPF_OR, "&": BPF_AND, "^": BPF_XOR, "<<": BPF_LSH, ">>": BPF_RSH,
+}
+
+_LINK_PROTOS = {
+    "ip": ETH_P_IP, "ip6": ETH_P_IPV6, "arp": ETH_P_ARP, "rarp": ETH_P_RARP,
+}
+_IP_PROTOS = {
+    "icmp": 1, "igmp": 2, "tcp": 6, "udp": 17, "icmp6": 58, "sctp": 132,
+}
+# The transport protocols that only exist over IPv4, or IPv6
+_IPV4_ONLY = {"icmp", "igmp"}
+_IPV6_ONLY = {"icmp6"}
+_PORT_PROTOS = ["tcp", "udp", "sctp"]
+_PROTOS = {"ether", "link"} | set(_LINK_PROTOS) | set(_IP_PROTOS)
+_DIRS = {"src", "dst"}
+_TYPES = {"host", "net", "port", "portrange", "proto"}
+_KEYWORDS = _PROTOS | _DIRS | _TYPES | {
+    "and", "or", "not", "less", "greater", "len", "vlan", "broadcast",
+    "multicast", "mask",
+}
+
+# The named constants of pcap-filter
+_CONSTANTS = {
+    "tcpflags": 13, "tcp-fin": 0x01, "tcp-syn": 0x02, "tcp-rst": 0x04,
+    "tcp-push": 0x08, "tcp-ack": 0x10, "tcp-urg": 0x20, "tcp-ece": 0x40,
+    "tcp-cwr": 0x80,
+    "icmptype": 0, "icmpcode": 1, "icmp-echoreply": 0, "icmp-unreach": 3,
+    "icmp-sourcequench": 4, "icmp-redirect": 5, "icmp-echo": 8,
+    "icmp-routeradvert": 9, "icmp-routersolicit": 10, "icmp-timxceed": 11,
+    "icmp-paramprob": 12, "icmp-tstamp": 13, "icmp-tstampreply": 14,
+    "icmp-ireq": 15, "icmp-ireqreply": 16, "icmp-maskreq": 17,
+    "icmp-maskreply": 18,
+    "icmp6type": 0, "icmp6code": 1, "icmp6-destinationunreach": 1,
+    "icmp6-packettoobig": 2, "icmp6-timeexceeded": 3,
+    "icmp6-parameterproblem": 4, "icmp6-echo": 128, "icmp6-echoreply": 129,
+    "icmp6-multicastlistenerquery": 130,
+    "icmp6-multicastlistenerreportv1": 131,
+    "icmp6-multicastlistenerdone": 132, "icmp6-routersolicit": 133,
+    "icmp6-routeradvert": 134, "icmp6-neighborsolicit": 135,
+    "icmp6-neighboradvert": 136, "icmp6-redirect": 137,
+}
+
+# The nodes of the parsed expressions are tuples:
+# - ("and", a, b), ("or", a, b), ("not", a), ("true",), ("false",)
+# - ("is", proto): e.g. "tcp"
+# - ("proto", proto, value): e.g. "ip proto 6"
+# - ("id", proto, dir, type, value, mask): e.g. "tcp src port 80"
+# - ("cast", proto, "broadcast" or "multicast")
+# - ("vlan", id)
+# - ("rel", op, lhs, rhs): e.g. "tcp[13] & 2 != 0", where the operands
+#   are ("num", n), ("len",), ("neg", e), ("load", proto, offset, size)
+#   or ("binop", op, lhs, rhs)
+_Node = Tuple[Any, ...]
+
+
+def _tokenize(expr):
+    # type: (str) -> List[str]
+    tokens = []  # type: List[str]
+    depth = pos = 0
+    while True:
+        pos = _SPACES.match(expr, pos).end()  # type: ignore
+        if pos == len(expr):
+            return tokens
+        match = (_TOKEN_BRACKETS if depth else _TOKEN).match(expr, pos)
+        if match is None:
+            raise BPFCompileError(
+                "Unexpected character %r in filter" % expr[pos]
+            )
+        tok = match.group()
+        depth += (tok == "[") - (tok == "]")
+        tokens.append(tok)
+        pos = match.end()
+
+
+def _parse_number(tok):
+    # type: (str) -> int
+    if tok in _CONSTANTS:
+        return _CONSTANTS[tok]
+    try:
+        if tok.lower().startswith("0x"):
+            return int(tok, 16)
+        if len(tok) > 1 and tok.startswith("0"):
+            return int(tok, 8)
+        return int(tok)
+    except ValueError:
+        raise BPFCompileError("Invalid number %r in filter" % tok)
+
+
+def _is_number(tok):
+    # type: (Optional[str]) -> bool
+    if tok is None:
+        return False
+    try:
+        _parse_number(tok)
+    except BPFCompileError:
+        return False
+    return True
+
+
+class _Parser(object):
+    """A recursive descent parser of pcap-filter expressions"""
+
+    def __init__(self, expr):
+        # type: (str) -> None
+        self.tokens = _tokenize(expr)
+        self.pos = 0
+        # The qualifiers of the last primitive, used by the ids that have
+        # none, e.g. in "port 80 or 443"
+        self.quals = None  # type: Optional[Tuple[Optional[str], ...]]
+
+    def peek(self, n=0):
+        # type: (int) -> Optional[str]
+        if self.pos + n < len(self.tokens):
+            return self.tokens[self.pos + n]
+        return None
+
+    def next(self):
+        # type: () -> str
+        tok = self.peek()
+        if tok is None:
+            raise BPFCompileError("Unexpected end of filter")
+        self.pos += 1
+        return tok
+
+    def accept(self, *toks):
+        # type: (*str) -> bool
+        if self.peek() in toks:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, tok):
+        # type: (str) -> None
+        if not self.accept(tok):
+            raise BPFCompileError(
+                "Expected %r in filter, got %r" % (tok, self.peek())
+            )
+
+    def parse(self):
+        # type: () -> _Node
+        if not self.tokens:
+            return ("true",)
+        node = self.expr()
+        if self.peek() is not None:
+            raise BPFCompileError("Unexpected %r in filter" % self.peek())
+        return node
+
+    def expr(self):
+        # type: () -> _Node
+        node = self.term()
+        while self.accept("or", "||"):
+            node = ("or", node, self.term())
+        return node
+
+    def term(self):
+        # type: () -> _Node
+        node = self.unary()
+        while self.accept("and", "&&"):
+            node = ("and", node, self.unary())
+        return node
+
+    def unary(self):
+        # type: () -> _Node
+        if self.accept("not", "!"):
+            return ("not", self.unary())
+        tok = self.peek()
+        if tok == "(":
+            # Either a boolean expression, or an arithmetic one
+            pos, quals = self.pos, self.quals
+            try:
+                self.pos += 1
+                node = self.expr()
+                self.expect(")")
+                if not self._is_operator(self.peek()):
+                    return node
+            except BPFCompileError:
+                pass
+            self.pos, self.quals = pos, quals
+            return self.relation()
+        if tok == "len" or tok in _PROTOS and self.peek(1) == "[" or \
+                _is_number(tok) and self._is_operator(self.peek(1)):
+            return self.relation()
+        return self.primitive()
+
+    @staticmethod
+    def _is_operator(tok):
+        # type: (Optional[str]) -> bool
+        return tok in _RELOPS or any(tok in ops for ops in _ARITH_OPS)
+
+    def primitive(self):
+        # type: () -> _Node
+        tok = self.peek()
+        if tok in ("less", "greater"):
+            self.pos += 1
+            return ("rel", "<=" if tok == "less" else ">=", ("len",),
+                    ("num", _parse_number(self.next())))
+        if tok == "vlan":
+            self.pos += 1
+            vid = None
+            if _is_number(self.peek()):
+                vid = _parse_number(self.next())
+            return ("vlan", vid)
+        if tok in ("broadcast", "multicast"):
+            self.pos += 1
+            return ("cast", "ether", tok)
+        proto = direction = typ = None
+        if tok in _PROTOS:
+            proto = self.next()
+        if self.peek() in _DIRS:
+            direction = self.next()
+            if self.peek() in ("or", "and") and \
+                    self.peek(1) in _DIRS - {direction}:
+                direction = "src %s dst" % self.next()
+                self.pos += 1
+        if self.peek() in _TYPES:
+            typ = self.next()
+        elif proto is not None and direction is None and \
+                self.peek() in ("broadcast", "multicast"):
+            return ("cast", proto, self.next())
+        if typ == "proto":
+            return ("proto", proto, self.next().lstrip("\\"))
+        tok = self.peek()
+        if direction is None and typ is None:
+            if proto is not None:
+                return ("is", proto)
+            if tok in _KEYWORDS:
+                raise BPFCompileError("Unexpected %r in filter" % tok)
+            if self.quals is not None:
+                proto, direction, typ = self.quals
+        value = self.next()
+        if value in _KEYWORDS or not value[0].isalnum() and value[0] != ":":
+            raise BPFCompileError("Unexpected %r in filter" % value)
+        mask = None
+        if typ == "net" and self.accept("mask"):
+            mask = self.next()
+        self.quals = (proto, direction, typ)
+        return ("id", proto, direction, typ, value, mask)
+
+    def relation(self):
+        # type: () -> _Node
+        lhs = self.arith()
+        op = self.next()
+        if op not in _RELOPS:
+            raise BPFCompileError("Unexpected %r in filter" % op)
+        return ("rel", op, lhs, self.arith())
+
+    def arith(self, level=0):
+        # type: (int) -> _Node
+        if level == len(_ARITH_OPS):
+            return self.operand()
+        node = self.arith(level + 1)
+        while self.peek() in _ARITH_OPS[level]:
+            op = self.next()
+            node = ("binop", op, node, self.arith(level + 1))
+        return node
+
+    def operand(self):
+        # type: () -> _Node
+        tok = self.next()
+        if tok == "(":
+            node = self.arith()
+            self.expect(")")
+            return node
+        if tok == "-":
+            return ("neg", self.operand())
+        if tok == "len":
+            return ("len",)
+        if tok in _PROTOS:
+            self.expect("[")
+            offset = self.arith()
+            size = 1
+            if self.accept(":"):
+                size = _parse_number(self.next())
+                if size not in _SIZES:
+                    raise BPFCompileError("Invalid load size %d" % size)
+            self.expect("]")
+            return ("load", tok, offset, size)
+        return ("num", _parse_number(tok))
+
+
+def _parse_mac(value):
+    # type: (str) -> Optional[bytes]
+    parts = re.split(r"[:.-]", value)
+    if len(parts) == 6 and all(re.match(r"^[0-9a-fA-F]{1,2}$", p)
+                               for p in parts):
+        return bytes(int(p, 16) for p in parts)
+    if len(parts) == 3 and all(re.match(r"^[0-9a-fA-F]{4}$", p)
+                               for p in parts):
+        return bytes.fromhex("".join(parts))
+    return None
+
+
+def _parse_addr(family, value):
+    # type: (socket.AddressFamily, str) -> Optional[int]
+    try:
+        return int.from_bytes(inet_pton(family, value), "big")
+    except (OSError, ValueError, Scapy_Exception):
+        return None
+
+
+###############
+#  Compiling  #
+###############
+
+class _Label(object):
+    """A position in the code, resolved when it is assembled"""
+    __slots__ = []  # type: List[str]
+
+
+class _Compiler(object):
+    """Compiles a parsed expression to BPF, for a link type"""
+
+    def __init__(self, linktype, snaplen):
+        # type: (int, int) -> None
+        self.linktype = linktype
+        self.snaplen = snaplen
+        # The offsets of the EtherType and of the network header, or the
+        # IP versions of a link type without an EtherType
+        self.off_type = None  # type: Optional[int]
+        self.raw = ()  # type: Tuple[int, ...]
+        if linktype == DLT_EN10MB:
+            self.off_type, self.off_nl = 12, 14
+        elif linktype == DLT_LINUX_SLL:
+            self.off_type, self.off_nl = 14, 16
+        elif linktype in (DLT_RAW, DLT_RAW_ALT):
+            self.off_nl, self.raw = 0, (4, 6)
+        elif linktype == DLT_IPV4:
+            self.off_nl, self.raw = 0, (4,)
+        elif linktype == DLT_IPV6:
+            self.off_nl, self.raw = 0, (6,)
+        else:
+            raise BPFCompileError("Unsupported link type %d" % linktype)
+        self.code = []  # type: List[Union[_Label, List[Any]]]
+        self.mem = 0
+
+    def compile(self, node):
+        # type: (_Node) -> BPFProgram
+        accept, reject = _Label(), _Label()
+        self.gen(node, accept, reject)
+        self.code.append(accept)
+        self.emit(BPF_RET | BPF_K, self.snaplen)
+        self.code.append(reject)
+        self.emit(BPF_RET | BPF_K, 0)
+        return BPFProgram(self.assemble())
+
+    def emit(self, code, k=0, jt=None, jf=None):
+        # type: (int, Any, Optional[_Label], Optional[_Label]) -> None
+        self.code.append([code, jt, jf, k])
+
+    def assemble(self):
+        # type: () -> List[Tuple[int, int, int, int]]
+        """Resolve the labels. The conditional jumps that go too far jump
+        to an unconditional jump instead."""
+        while True:
+            pos = {}  # type: Dict[_Label, int]
+            n = 0
+            for item in self.code:
+                if isinstance(item, _Label):
+                    pos[item] = n
+                else:
+                    n += 1
+            if n > BPF_MAXINSNS:
+                raise BPFCompileError("Filter expression is too long")
+            n = 0
+            for idx, item in enumerate(self.code):
+                if isinstance(item, _Label):
+                    continue
+                if item[0] & 0x07 == BPF_JMP and item[0] & 0xf0 != BPF_JA:
+                    far = next((j for j in (1, 2)
+                                if pos[item[j]] - n - 1 > 255), None)
+                    if far is not None:
+                        tramp = _Label()
+                        self.code[idx + 1:idx + 1] = [
+                            tramp, [BPF_JMP | BPF_JA, None, None, item[far]]
+                        ]
+                        item[far] = tramp
+                        break
+                n += 1
+            else:
+                break
+        insns = []  # type: List[Tuple[int, int, int, int]]
+        for item in self.code:
+            if isinstance(item, _Label):
+                continue
+            code, jt, jf, k = item
+            n = len(insns)
+            if code & 0x07 == BPF_JMP:
+                if code & 0xf0 == BPF_JA:
+                    k = pos[k] - n - 1
+                else:
+                    jt, jf = pos[jt] - n - 1, pos[jf] - n - 1
+            insns.append((code, jt or 0, jf or 0, k))
+        return insns
+
+    def gen(self, node, t, f):
+        # type: (_Node, _Label, _Label) -> None
+        """Emit the code of a condition, that jumps to t if it is true,
+        and to f otherwise"""
+        kind = node[0]
+        if kind == "true":
+            self.emit(BPF_JMP | BPF_JA, t)
+        elif kind == "false":
+            self.emit(BPF_JMP | BPF_JA, f)
+        elif kind in ("and", "or"):
+            label = _Label()
+            if kind == "and":
+                self.gen(node[1], label, f)
+            else:
+                self.gen(node[1], t, label)
+            self.code.append(label)
+            self.gen(node[2], t, f)
+        elif kind == "not":
+            self.gen(node[1], f, t)
+        elif kind == "cmp":
+            _, (off, size), op, value, mask = node
+            self.emit(BPF_LD | _SIZES[size] | BPF_ABS, off)
+            if mask is not None:
+                self.emit(BPF_ALU | BPF_AND | BPF_K, mask)
+            self.jump(op, BPF_K, value, t, f)
+        elif kind == "trans":
+            # A comparison in the transport header, after an IPv4 header
+            _, (off, size), op, value = node
+            self.emit(BPF_LDX | BPF_B | BPF_MSH, self.off_nl)
+            self.emit(BPF_LD | _SIZES[size] | BPF_IND, self.off_nl + off)
+            self.jump(op, BPF_K, value, t, f)
+        elif kind == "vlan":
+            self.gen(self.vlan(node[1]), t, f)
+            self.off_type += 4  # type: ignore
+            self.off_nl += 4
+        elif kind == "relcode":
+            self.relation(node[1], node[2], node[3], t, f)
+        else:
+            self.gen(self.lower(node), t, f)
+
+    def jump(self, op, src, value, t, f):
+        # type: (str, int, int, _Label, _Label) -> None
+        if op in ("=", "=="):
+            self.emit(BPF_JMP | BPF_JEQ | src, value, t, f)
+        elif op == "!=":
+            self.emit(BPF_JMP | BPF_JEQ | src, value, f, t)
+        elif op == ">":
+            self.emit(BPF_JMP | BPF_JGT | src, value, t, f)
+        elif op == ">=":
+            self.emit(BPF_JMP | BPF_JGE | src, value, t, f)
+        elif op == "<":
+            self.emit(BPF_JMP | BPF_JGE | src, value, f, t)
+        elif op == "<=":
+            self.emit(BPF_JMP | BPF_JGT | src, value, f, t)
+        else:
+            self.emit(BPF_JMP | BPF_JSET | src, value, t, f)
+
+    # Relations
+
+    def push(self):
+        # type: () -> int
+        if self.mem == BPF_MEMWORDS:
+            raise BPFCompileError("Filter expression is too complex")
+        self.mem += 1
+        return self.mem - 1
+
+    def relation(self, op, lhs, rhs, t, f):
+        # type: (str, _Node, _Node, _Label, _Label) -> None
+        self.arith(lhs)
+        if rhs[0] == "num":
+            self.jump(op, BPF_K, rhs[1] & 0xffffffff, t, f)
+            return
+        self.load_x(rhs)
+        self.jump(op, BPF_X, 0, t, f)
+
+    def load_x(self, node):
+        # type: (_Node) -> None
+        """Move the result of node to X, keeping A"""
+        mem = self.push()
+        self.emit(BPF_ST, mem)
+        self.arith(node)
+        self.emit(BPF_MISC | BPF_TAX)
+        self.emit(BPF_LD | BPF_MEM, mem)
+        self.mem -= 1
+
+    def arith(self, node):
+        # type: (_Node) -> None
+        """Emit the code that computes node in A"""
+        kind = node[0]
+        if kind == "num":
+            self.emit(BPF_LD | BPF_IMM, node[1] & 0xffffffff)
+        elif kind == "len":
+            self.emit(BPF_LD | BPF_W | BPF_LEN)
+        elif kind == "neg":
+            self.arith(node[1])
+            self.emit(BPF_ALU | BPF_NEG)
+        elif kind == "binop":
+            _, op, lhs, rhs = node
+            self.arith(lhs)
+            if rhs[0] == "num":
+                if op in ("/", "%") and not rhs[1]:
+                    raise BPFCompileError("Division by 0 in filter")
+                self.emit(BPF_ALU | _ALU_OPS[op] | BPF_K, rhs[1] & 0xffffffff)
+            else:
+                self.load_x(rhs)
+                self.emit(BPF_ALU | _ALU_OPS[op] | BPF_X)
+        else:
+            _, proto, offset, size = node
+            base, ind = self.load_base(proto)
+            if offset[0] == "num":
+                if ind:
+                    self.emit(BPF_LDX | BPF_B | BPF_MSH, self.off_nl)
+                    self.emit(BPF_LD | _SIZES[size] | BPF_IND,
+                              base + offset[1])
+                else:
+                    self.emit(BPF_LD | _SIZES[size] | BPF_ABS,
+                              base + offset[1])
+                return
+            self.arith(offset)
+            if ind:
+                self.emit(BPF_LDX | BPF_B | BPF_MSH, self.off_nl)
+                self.emit(BPF_ALU | BPF_ADD | BPF_X)
+            self.emit(BPF_MISC | BPF_TAX)
+            self.emit(BPF_LD | _SIZES[size] | BPF_IND, base)
+
+    def load_base(self, proto):
+        # type: (str) -> Tuple[int, bool]
+        """The offset of the header of proto, and whether it follows the
+        IPv4 header (and is indexed by X)"""
+        if proto in ("ether", "link"):
+            return 0, False
+        if proto in _LINK_PROTOS:
+            return self.off_nl, False
+        if proto == "icmp6":
+            return self.off_nl + 40, False
+        return self.off_nl, True
+
+    def load_guard(self, node):
+        # type: (_Node) -> List[_Node]
+        """The conditions under which the loads of node are valid"""
+        kind = node[0]
+        if kind == "binop":
+            return self.load_guard(node[2]) + self.load_guard(node[3])
+        if kind == "neg":
+            return self.load_guard(node[1])
+        if kind != "load":
+            return []
+        proto = node[1]
+        guard = self.load_guard(node[2])
+        if proto in _LINK_PROTOS:
+            guard.append(self.ethertype(_LINK_PROTOS[proto]))
+        elif proto == "icmp6":
+            guard.append(_and(self.ethertype(ETH_P_IPV6),
+                              self.cmp(self.off_nl + 6, 1, 58)))
+        elif proto in _IP_PROTOS:
+            guard.append(_and(self.ip_proto([_IP_PROTOS[proto]], 4),
+                              self.not_fragment()))
+        return guard
+
+    # Primitives
+
+    def lower(self, node):
+        # type: (_Node) -> _Node
+        """Translate a primitive to comparisons"""
+        kind = node[0]
+        if kind == "rel":
+            _, op, lhs, rhs = node
+            guard = self.load_guard(lhs) + self.load_guard(rhs)
+            return _and(*(guard + [("relcode", op, lhs, rhs)]))
+        if kind == "is":
+            proto = node[1]
+            if proto in _LINK_PROTOS:
+                return self.ethertype(_LINK_PROTOS[proto])
+            if proto in _IP_PROTOS:
+                return self.ip_proto([_IP_PROTOS[proto]],
+                                     *self.versions(proto))
+            raise BPFCompileError("%r is not a valid filter" % proto)
+        if kind == "proto":
+            return self.proto(node[1], node[2])
+        if kind == "cast":
+            return self.cast(node[1], node[2])
+        _, proto, direction, typ, value, mask = node
+        if typ in ("port", "portrange"):
+            return self.ports(proto, direction, typ, value)
+        if typ == "net":
+            return self.net(proto, direction, value, mask)
+        return self.host(proto, direction, value)
+
+    def cmp(self, off, size, value, op="==", mask=None):
+        # type: (int, int, int, str, Optional[int]) -> _Node
+        return ("cmp", (off, size), op, value, mask)
+
+    def ethertype(self, ethertype):
+        # type: (int) -> _Node
+        if self.off_type is not None:
+            return self.cmp(self.off_type, 2, ethertype)
+        version = {ETH_P_IP: 4, ETH_P_IPV6: 6}.get(ethertype)
+        if version not in self.raw:
+            return ("false",)
+        if len(self.raw) == 1:
+            return ("true",)
+        return self.cmp(0, 1, version << 4, mask=0xf0)
+
+    def versions(self, proto):
+        # type: (Optional[str]) -> Tuple[int, ...]
+        """The IP versions that proto may be carried by"""
+        if proto in _IPV4_ONLY or proto == "ip":
+            return (4,)
+        if proto in _IPV6_ONLY or proto == "ip6":
+            return (6,)
+        return (4, 6)
+
+    def ip_proto(self, protos, *versions):
+        # type: (List[int], *int) -> _Node
+        nl = self.off_nl
+        parts = []
+        if 4 in versions:
+            parts.append(_and(
+                self.ethertype(ETH_P_IP),
+                _or(*(self.cmp(nl + 9, 1, p) for p in protos))
+            ))
+        if 6 in versions:
+            # The protocol may follow a fragment header
+            parts.append(_and(
+                self.ethertype(ETH_P_IPV6),
+                _or(*(_or(self.cmp(nl + 6, 1, p),
+                          _and(self.cmp(nl + 6, 1, 44),
+                               self.cmp(nl + 40, 1, p)))
+                      for p in protos))
+            ))
+        return _or(*parts)
+
+    def not_fragment(self):
+        # type: () -> _Node
+        return ("not", self.cmp(self.off_nl + 6, 2, 0x1fff, "&"))
+
+    def proto(self, proto, value):
+        # type: (Optional[str], str) -> _Node
+        if proto in ("ether", "link"):
+            if value in _LINK_PROTOS:
+                return self.ethertype(_LINK_PROTOS[value])
+            return self.ethertype(_parse_number(value))
+        if proto not in (None, "ip", "ip6"):
+            raise BPFCompileError("'%s proto' is not supported" % proto)
+        if value in _IP_PROTOS:
+            num = _IP_PROTOS[value]
+        else:
+            num = _parse_number(value)
+        return self.ip_proto([num], *self.versions(proto))
+
+    def vlan(self, vid):
+        # type: (Optional[int]) -> _Node
+        if self.linktype != DLT_EN10MB:
+            raise BPFCompileError("'vlan' needs an Ethernet link type")
+        node = _or(*(self.cmp(self.off_type, 2, tpid)  # type: ignore
+                     for tpid in (0x8100, 0x88a8, 0x9100)))
+        if vid is not None:
+            node = _and(node, self.cmp(self.off_type + 2, 2,  # type: ignore
+                                       vid, mask=0xfff))
+        return node
+
+    def cast(self, proto, kind):
+        # type: (str, str) -> _Node
+        nl = self.off_nl
+        if proto in ("ether", "link"):
+            self.need_ether()
+            if kind == "multicast":
+                return self.cmp(0, 1, 1, "&")
+            return _and(self.cmp(2, 4, 0xffffffff), self.cmp(0, 2, 0xffff))
+        if kind == "multicast" and proto == "ip":
+            return _and(self.ethertype(ETH_P_IP),
+                        self.cmp(nl + 16, 1, 224, ">="))
+        if kind == "multicast" and proto == "ip6":
+            return _and(self.ethertype(ETH_P_IPV6),
+                        self.cmp(nl + 24, 1, 255))
+        raise BPFCompileError("'%s %s' is not supported" % (proto, kind))
+
+    def need_ether(self):
+        # type: () -> None
+        if self.linktype != DLT_EN10MB:
+            raise BPFCompileError("Ethernet addresses need an Ethernet "
+                                  "link type")
+
+    def direction(self, direction, src, dst):
+        # type: (Optional[str], _Node, _Node) -> _Node
+        if direction == "src":
+            return src
+        if direction == "dst":
+            return dst
+        if direction == "src and dst":
+            return _and(src, dst)
+        return _or(src, dst)
+
+    def host(self, proto, direction, value):
+        # type: (Optional[str], Optional[str], str) -> _Node
+        mac = _parse_mac(value)
+        if proto in ("ether", "link") or mac is not None and proto is None:
+            if mac is None:
+                raise BPFCompileError("Invalid MAC address %r" % value)
+            self.need_ether()
+            hi, lo = struct.unpack("!HI", mac)
+            return self.direction(
+                direction,
+                _and(self.cmp(8, 4, lo), self.cmp(6, 2, hi)),
+                _and(self.cmp(2, 4, lo), self.cmp(0, 2, hi)),
+            )
+        v4 = _parse_addr(socket.AF_INET, value)
+        v6 = _parse_addr(socket.AF_INET6, value)
+        if v4 is not None:
+            return self.net4(proto, direction, v4, 0xffffffff)
+        if v6 is not None:
+            return self.net6(proto, direction, v6, 128)
+        # A host name
+        try:
+            infos = socket.getaddrinfo(value, None)
+        except socket.error:
+            raise BPFCompileError("Unknown host %r" % value)
+        addrs = set()
+        for family, _, _, _, sockaddr in infos:
+            num = _parse_addr(family, str(sockaddr[0]))
+            if num is not None:
+                addrs.add((family, num))
+        nodes = []
+        for family, num in sorted(addrs):
+            if family == socket.AF_INET and proto not in _IPV6_ONLY | {"ip6"}:
+                nodes.append(self.net4(proto, direction, num, 0xffffffff))
+            elif family == socket.AF_INET6 and proto in (None, "ip6"):
+                nodes.append(self.net6(proto, direction, num, 128))
+        if not nodes:
+            raise BPFCompileError("Unknown host %r" % value)
+        return _or(*nodes)
+
+    def net(self, proto, direction, value, mask):
+        # type: (Optional[str], Optional[str], str, Optional[str]) -> _Node
+        addr, _, prefix = value.partition("/")
+        if ":" in addr:
+            net6 = _parse_addr(socket.AF_INET6, addr)
+            if net6 is None or mask is not None:
+                raise BPFCompileError("Invalid network %r" % value)
+            bits = int(prefix) if prefix else 128
+            if bits > 128 or net6 & ((1 << (128 - bits)) - 1):
+                raise BPFCompileError("Invalid network %r" % value)
+            return self.net6(proto, direction, net6, bits)
+        parts = addr.split(".")
+        if len(parts) > 4 or not all(p.isdigit() and int(p) < 256
+                                     for p in parts):
+            raise BPFCompileError("Invalid network %r" % value)
+        net4 = int.from_bytes(bytes(int(p) for p in parts), "big")
+        net4 <<= 8 * (4 - len(parts))
+        if mask is not None:
+            if prefix:
+                raise BPFCompileError("Invalid network %r" % value)
+            mask4 = _parse_addr(socket.AF_INET, mask)
+            if mask4 is None:
+                raise BPFCompileError("Invalid netmask %r" % mask)
+        else:
+            bits = int(prefix) if prefix else 8 * len(parts)
+            if bits > 32:
+                raise BPFCompileError("Invalid network %r" % value)
+            mask4 = (0xffffffff << (32 - bits)) & 0xffffffff
+        if net4 & ~mask4:
+            raise BPFCompileError("Non-network bits set in %r" % value)
+        return self.net4(proto, direction, net4, mask4)
+
+    def net4(self, proto, direction, addr, mask):
+        # type: (Optional[str], Optional[str], int, int) -> _Node
+        nl = self.off_nl
+        maskarg = None if mask == 0xffffffff else mask
+        parts = []
+        if proto in (None, "ip"):
+            parts.append(_and(self.ethertype(ETH_P_IP), self.direction(
+                direction,
+                self.cmp(nl + 12, 4, addr, mask=maskarg),
+                self.cmp(nl + 16, 4, addr, mask=maskarg),
+            )))
+        for name in ("arp", "rarp"):
+            if proto in (None, name):
+                # The sender and target protocol addresses
+                parts.append(_and(
+                    self.ethertype(_LINK_PROTOS[name]),
+                    self.direction(
+                        direction,
+                        self.cmp(nl + 14, 4, addr, mask=maskarg),
+                        self.cmp(nl + 24, 4, addr, mask=maskarg),
+                    )
+                ))
+        if not parts:
+            raise BPFCompileError("'%s host' is not supported" % proto)
+        return _or(*parts)
+
+    def net6(self, proto, direction, addr, bits):
+        # type: (Optional[str], Optional[str], int, int) -> _Node
+        if proto not in (None, "ip6"):
+            raise BPFCompileError("'%s host' is not supported" % proto)
+        nl = self.off_nl
+
+        def words(off):
+            # type: (int) -> _Node
+            nodes = []
+            for i in range(4):
+                nbits = min(max(bits - 32 * i, 0), 32)
+                if not nbits:
+                    break
+                mask = (0xffffffff << (32 - nbits)) & 0xffffffff
+                word = (addr >> (96 - 32 * i)) & 0xffffffff
+                nodes.append(self.cmp(off + 4 * i, 4, word,
+                                      mask=None if nbits == 32 else mask))
+            return _and(*nodes) if nodes else ("true",)
+        return _and(self.ethertype(ETH_P_IPV6),
+                    self.direction(direction, words(nl + 8), words(nl + 24)))
+
+    def ports(self, proto, direction, typ, value):
+        # type: (Optional[str], Optional[str], str, str) -> _Node
+        if proto in _PORT_PROTOS:
+            protos = [proto]
+        elif proto in (None, "ip", "ip6"):
+            protos = _PORT_PROTOS
+        else:
+            raise BPFCompileError("'%s port' is not supported" % proto)
+        if typ == "portrange":
+            lo, sep, hi = value.partition("-")
+            if not sep:
+                raise BPFCompileError("Invalid port range %r" % value)
+            low, high = sorted((self.port(lo, protos), self.port(hi, protos)))
+        else:
+            low = high = self.port(value, protos)
+        nl = self.off_nl
+        numbers = [_IP_PROTOS[p] for p in protos]
+
+        def match(node):
+            # type: (Callable[[int, str], _Node]) -> _Node
+            if low == high:
+                return node(low, "==")
+            return _and(node(low, ">="), node(high, "<="))
+
+        parts = []
+        versions = self.versions(proto)
+        if 4 in versions:
+            parts.append(_and(
+                self.ethertype(ETH_P_IP),
+                _or(*(self.cmp(nl + 9, 1, p) for p in numbers)),
+                self.not_fragment(),
+                self.direction(
+                    direction,
+                    match(lambda v, op: ("trans", (0, 2), op, v)),
+                    match(lambda v, op: ("trans", (2, 2), op, v)),
+                )
+            ))
+        if 6 in versions:
+            parts.append(_and(
+                self.ethertype(ETH_P_IPV6),
+                _or(*(self.cmp(nl + 6, 1, p) for p in numbers)),
+                self.direction(
+                    direction,
+                    match(lambda v, op: self.cmp(nl + 40, 2, v, op)),
+                    match(lambda v, op: self.cmp(nl + 42, 2, v, op)),
+                )
+            ))
+        return _or(*parts)
+
+    @staticmethod
+    def port(value, protos):
+        # type: (str, List[str]) -> int
+        if value.isdigit():
+            port = int(value)
+        else:
+            for proto in protos:
+                try:
+                    port = socket.getservbyname(value, proto)
+                    break
+                except (OSError, socket.error):
+                    pass
+            else:
+                raise BPFCompileError("Unknown port %r" % value)
+        if port > 0xffff:
+            raise BPFCompileError("Invalid port %r" % value)
+        return port
+
+
+def _and(*nodes):
+    # type: (*_Node) -> _Node
+    res = nodes[-1]
+    for node in reversed(nodes[:-1]):
+        res = ("and", node, res)
+    return res
+
+
+def _or(*nodes):
+    # type: (*_Node) -> _Node
+    res = nodes[-1]
+    for node in reversed(nodes[:-1]):
+        res = ("or", node, res)
+    return res
+
+
+class BPFFilter(object):
+    """A pcap-filter expression, compiled to BPF for each link type on
+    first use.
+
+    The expression is parsed when the filter is created: BPFCompileError
+    is raised if it is invalid, or not supported.
+
+    >>> flt = BPFFilter("udp port 53")
+    >>> flt.match(raw(Ether()/IP()/UDP()/DNS()))
+    True
+    """
+
+    def __init__(self, expr):
+        # type: (str) -> None
+        self.expr = expr
+        self.tree = _Parser(expr).parse()
+        self.programs = {}  # type: Dict[int, BPFProgram]
+
+    def __repr__(self):
+        # type: () -> str
+        return "<BPFFilter %r>" % self.expr
+
+    def __reduce__(self):
+        # type: () -> Tuple[Any, Tuple[str]]
+        return (BPFFilter, (self.expr,))
+
+    def program(self, linktype=DLT_EN10MB, snaplen=BPF_SNAPLEN):
+        # type: (int, int) -> BPFProgram
+        """The BPF program of the filter, for a link type"""
+        try:
+            return self.programs[linktype]
+        except KeyError:
+            pass
+        prog = _Compiler(linktype, snaplen).compile(self.tree)
+        if snaplen == BPF_SNAPLEN:
+            self.programs[linktype] = prog
+        return prog
+
+    def match(self, data, linktype=DLT_EN10MB, wirelen=None):
+        # type: (Union[bytes, bytearray, memoryview], int, Optional[int]) -> bool  # noqa: E501
+        """Whether the filter accepts a frame"""
+        return self.program(linktype)(data, wirelen) != 0
+
+
+def compile_bpf(expr, linktype=DLT_EN10MB, snaplen=BPF_SNAPLEN):
+    # type: (str, int, int) -> BPFProgram
+    """Compile a pcap-filter expression to a BPF program.
+
+    :param expr: the filter expression, e.g. "tcp port 80"
+    :param linktype: the DLT_* link type of the frames
+    :param snaplen: the value returned when a frame is accepted
+    """
+    return BPFFilter(expr).program(linktype, snaplen)
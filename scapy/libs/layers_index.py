@@ -0,0 +1,1154 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+"""
+Index of the default layers, used by conf.lazy_layers.
+
+DO NOT EDIT: generated by scapy/tools/generate_layers_index.py
+"""
+
+# Layers which can be loaded on demand, in conf.load_layers order
+LAZY = [
+    'dcerpc',
+    'dhcp',
+    'dhcp6',
+    'dns',
+    'eap',
+    'gprs',
+    'gssapi',
+    'hsrp',
+    'ipsec',
+    'ir',
+    'isakmp',
+    'kerberos',
+    'l2tp',
+    'ldap',
+    'llmnr',
+    'mgcp',
+    'mobileip',
+    'netbios',
+    'netflow',
+    'ntlm',
+    'ntp',
+    'pptp',
+    'radius',
+    'rip',
+    'rtp',
+    'sctp',
+    'sixlowpan',
+    'skinny',
+    'smb',
+    'smb2',
+    'smbclient',
+    'smbserver',
+    'snmp',
+    'spnego',
+    'tftp',
+    'vrrp',
+    'vxlan',
+    'x509',
+    'zigbee',
+]
+
+# Layers to load when another one is loaded
+EXTENDS = {
+    'dcerpc': ['smbclient', 'smbserver'],
+    'gssapi': ['kerberos', 'ntlm', 'spnego'],
+}
+
+# Symbols exported by each layer (whitespace-separated)
+SYMBOLS = {
+    'bluetooth': (
+        "ATT_Error_Response ATT_Exchange_MTU_Request "
+        "ATT_Exchange_MTU_Response ATT_Execute_Write_Request "
+        "ATT_Execute_Write_Response ATT_Find_By_Type_Value_Request "
+        "ATT_Find_By_Type_Value_Response ATT_Find_Information_Request "
+        "ATT_Find_Information_Response ATT_Handle ATT_Handle_UUID128 "
+        "ATT_Handle_Value_Indication ATT_Handle_Value_Notification "
+        "ATT_Handle_Variable ATT_Hdr ATT_Prepare_Write_Request "
+        "ATT_Prepare_Write_Response ATT_Read_Blob_Request "
+        "ATT_Read_Blob_Response ATT_Read_By_Group_Type_Request "
+        "ATT_Read_By_Group_Type_Response ATT_Read_By_Type_Request "
+        "ATT_Read_By_Type_Request_128bit ATT_Read_By_Type_Response "
+        "ATT_Read_Multiple_Request ATT_Read_Multiple_Response "
+        "ATT_Read_Request ATT_Read_Response ATT_Write_Command "
+        "ATT_Write_Request ATT_Write_Response BitEnumField BitField "
+        "BluetoothCommandError BluetoothHCISocket BluetoothL2CAPSocket "
+        "BluetoothMonitorSocket BluetoothRFCommSocket BluetoothSocketError "
+        "BluetoothUserSocket ByteEnumField ByteField DLT_BLUETOOTH_HCI_H4 "
+        "DLT_BLUETOOTH_HCI_H4_WITH_PHDR DLT_BLUETOOTH_LINUX_MONITOR "
+        "EIR_AdvertisingInterval EIR_Appearance EIR_ClassOfDevice "
+        "EIR_CompleteList128BitServiceUUIDs EIR_CompleteList16BitServiceUUIDs "
+        "EIR_CompleteList32BitServiceUUIDs EIR_CompleteLocalName "
+        "EIR_Device_ID EIR_Element EIR_Flags EIR_Hdr "
+        "EIR_IncompleteList128BitServiceUUIDs "
+        "EIR_IncompleteList16BitServiceUUIDs "
+        "EIR_IncompleteList32BitServiceUUIDs EIR_LEBluetoothDeviceAddress "
+        "EIR_Manufacturer_Specific_Data EIR_PeripheralConnectionIntervalRange "
+        "EIR_PublicTargetAddress EIR_Raw EIR_SecureSimplePairingHashC192 "
+        "EIR_SecureSimplePairingRandomizerR192 EIR_SecurityManagerOOBFlags "
+        "EIR_ServiceData128BitUUID EIR_ServiceData16BitUUID "
+        "EIR_ServiceData32BitUUID EIR_ServiceSolicitation128BitUUID "
+        "EIR_ServiceSolicitation16BitUUID EIR_ShortenedLocalName "
+        "EIR_TX_Power_Level EIR_URI FieldLenField FieldListField FlagsField "
+        "HCI_ACL_Hdr HCI_CHANNEL_CONTROL HCI_CHANNEL_LOGGING "
+        "HCI_CHANNEL_MONITOR HCI_CHANNEL_RAW HCI_CHANNEL_USER "
+        "HCI_Cmd_Accept_Connection_Request HCI_Cmd_Authentication_Requested "
+        "HCI_Cmd_Change_Connection_Link_Key "
+        "HCI_Cmd_Change_Connection_Packet_Type "
+        "HCI_Cmd_Complete_LE_Read_White_List_Size "
+        "HCI_Cmd_Complete_Read_BD_Addr "
+        "HCI_Cmd_Complete_Read_Local_Extended_Features "
+        "HCI_Cmd_Complete_Read_Local_Name "
+        "HCI_Cmd_Complete_Read_Local_Version_Information "
+        "HCI_Cmd_Create_Connection HCI_Cmd_Create_Connection_Cancel "
+        "HCI_Cmd_Disconnect HCI_Cmd_Exit_Peiodic_Inquiry_Mode "
+        "HCI_Cmd_Hold_Mode HCI_Cmd_IO_Capability_Request_Reply "
+        "HCI_Cmd_Inquiry HCI_Cmd_Inquiry_Cancel "
+        "HCI_Cmd_LE_Add_Device_To_Filter_Accept_List "
+        "HCI_Cmd_LE_Clear_Filter_Accept_List HCI_Cmd_LE_Connection_Update "
+        "HCI_Cmd_LE_Create_Connection HCI_Cmd_LE_Create_Connection_Cancel "
+        "HCI_Cmd_LE_Enable_Encryption "
+        "HCI_Cmd_LE_Long_Term_Key_Request_Negative_Reply "
+        "HCI_Cmd_LE_Long_Term_Key_Request_Reply "
+        "HCI_Cmd_LE_Read_Buffer_Size_V1 HCI_Cmd_LE_Read_Buffer_Size_V2 "
+        "HCI_Cmd_LE_Read_Filter_Accept_List_Size "
+        "HCI_Cmd_LE_Read_Local_Supported_Features "
+        "HCI_Cmd_LE_Read_Remote_Features "
+        "HCI_Cmd_LE_Remove_Device_From_Filter_Accept_List "
+        "HCI_Cmd_LE_Set_Advertise_Enable HCI_Cmd_LE_Set_Advertising_Data "
+        "HCI_Cmd_LE_Set_Advertising_Parameters HCI_Cmd_LE_Set_Random_Address "
+        "HCI_Cmd_LE_Set_Scan_Enable HCI_Cmd_LE_Set_Scan_Parameters "
+        "HCI_Cmd_LE_Set_Scan_Response_Data "
+        "HCI_Cmd_Link_Key_Request_Negative_Reply "
+        "HCI_Cmd_Link_Key_Request_Reply HCI_Cmd_Link_Key_Selection "
+        "HCI_Cmd_PIN_Code_Request_Negative_Reply "
+        "HCI_Cmd_PIN_Code_Request_Reply HCI_Cmd_Periodic_Inquiry_Mode "
+        "HCI_Cmd_Read_BD_Addr HCI_Cmd_Read_LE_Host_Support "
+        "HCI_Cmd_Read_Link_Quality HCI_Cmd_Read_Local_Extended_Features "
+        "HCI_Cmd_Read_Local_Name HCI_Cmd_Read_Local_Version_Information "
+        "HCI_Cmd_Read_Loopback_Mode HCI_Cmd_Read_RSSI "
+        "HCI_Cmd_Read_Remote_Extended_Features "
+        "HCI_Cmd_Read_Remote_Supported_Features "
+        "HCI_Cmd_Reject_Connection_Response HCI_Cmd_Remote_Name_Request "
+        "HCI_Cmd_Remote_Name_Request_Cancel "
+        "HCI_Cmd_Remote_OOB_Data_Request_Negative_Reply "
+        "HCI_Cmd_Remote_OOB_Data_Request_Reply HCI_Cmd_Reset "
+        "HCI_Cmd_Set_Connection_Encryption HCI_Cmd_Set_Event_Filter "
+        "HCI_Cmd_Set_Event_Mask "
+        "HCI_Cmd_User_Confirmation_Request_Negative_Reply "
+        "HCI_Cmd_User_Confirmation_Request_Reply "
+        "HCI_Cmd_User_Passkey_Request_Negative_Reply "
+        "HCI_Cmd_User_Passkey_Request_Reply "
+        "HCI_Cmd_Write_Connect_Accept_Timeout "
+        "HCI_Cmd_Write_Extended_Inquiry_Response "
+        "HCI_Cmd_Write_LE_Host_Support HCI_Cmd_Write_Local_Name "
+        "HCI_Cmd_Write_Loopback_Mode HCI_Command_Hdr HCI_DEV_NONE "
+        "HCI_Event_Command_Complete HCI_Event_Command_Status "
+        "HCI_Event_Connection_Complete HCI_Event_Disconnection_Complete "
+        "HCI_Event_Encryption_Change HCI_Event_Extended_Inquiry_Result "
+        "HCI_Event_Hdr HCI_Event_IO_Capability_Response "
+        "HCI_Event_Inquiry_Complete HCI_Event_Inquiry_Result "
+        "HCI_Event_Inquiry_Result_With_Rssi HCI_Event_LE_Meta "
+        "HCI_Event_Link_Key_Request HCI_Event_Number_Of_Completed_Packets "
+        "HCI_Event_Read_Remote_Extended_Features_Complete "
+        "HCI_Event_Read_Remote_Supported_Features_Complete "
+        "HCI_Event_Read_Remote_Version_Information_Complete "
+        "HCI_Event_Remote_Name_Request_Complete HCI_Extended_Inquiry_Response "
+        "HCI_Hdr HCI_LE_Meta_Advertising_Report "
+        "HCI_LE_Meta_Advertising_Reports HCI_LE_Meta_Connection_Complete "
+        "HCI_LE_Meta_Connection_Update_Complete "
+        "HCI_LE_Meta_Long_Term_Key_Request HCI_Mon_Hdr HCI_Mon_Index_Info "
+        "HCI_Mon_New_Index HCI_Mon_Pcap_Hdr HCI_Mon_System_Note HCI_PHDR_Hdr "
+        "IntField L2CAP_CmdHdr L2CAP_CmdRej L2CAP_ConfReq L2CAP_ConfResp "
+        "L2CAP_ConnReq L2CAP_ConnResp "
+        "L2CAP_Connection_Parameter_Update_Request "
+        "L2CAP_Connection_Parameter_Update_Response "
+        "L2CAP_Create_Channel_Request L2CAP_Create_Channel_Response "
+        "L2CAP_Credit_Based_Connection_Request "
+        "L2CAP_Credit_Based_Connection_Response "
+        "L2CAP_Credit_Based_Reconfigure_Request "
+        "L2CAP_Credit_Based_Reconfigure_Response L2CAP_DisconnReq "
+        "L2CAP_DisconnResp L2CAP_EchoReq L2CAP_EchoResp "
+        "L2CAP_Flow_Control_Credit_Ind L2CAP_Hdr L2CAP_InfoReq L2CAP_InfoResp "
+        "L2CAP_LE_Credit_Based_Connection_Request "
+        "L2CAP_LE_Credit_Based_Connection_Response "
+        "L2CAP_Move_Channel_Confirmation_Request "
+        "L2CAP_Move_Channel_Confirmation_Response L2CAP_Move_Channel_Request "
+        "L2CAP_Move_Channel_Response LEIntField LEMACField LEShortEnumField "
+        "LEShortField LenField LowEnergyBeaconHelper MultipleTypeField "
+        "NBytesField PacketListField PadField SM_Confirm SM_DHKey_Check "
+        "SM_Encryption_Information SM_Failed SM_Hdr "
+        "SM_Identity_Address_Information SM_Identity_Information "
+        "SM_Master_Identification SM_Pairing_Request SM_Pairing_Response "
+        "SM_Public_Key SM_Random SM_Signing_Information ShortField "
+        "SignedByteField StrField StrFixedLenField StrLenField StrNullField "
+        "UUIDField XBitField XByteField XLE3BytesField XLEIntField "
+        "XLELongField XLEShortField XStrLenField bind_layers ctypes select "
+        "sizeof sndrcv sockaddr_hci srbt srbt1"
+    ),
+    'bluetooth4LE': (
+        "BDAddrField BTLE BTLEChanMapField BTLEFeatureField BTLEPhysField "
+        "BTLE_ADV BTLE_ADV_DIRECT_IND BTLE_ADV_IND BTLE_ADV_NONCONN_IND "
+        "BTLE_ADV_SCAN_IND BTLE_BTLE_CTRL_opcode BTLE_CONNECT_REQ BTLE_CTRL "
+        "BTLE_Corp_IDs BTLE_DATA BTLE_EMPTY_PDU BTLE_PPI BTLE_RF "
+        "BTLE_SCAN_REQ BTLE_SCAN_RSP BTLE_Versions DLT_BLUETOOTH_LE_LL "
+        "DLT_BLUETOOTH_LE_LL_WITH_PHDR Field LEBitEnumField LEBitField "
+        "LL_CHANNEL_MAP_IND LL_CHANNEL_REPORTING_IND LL_CHANNEL_STATUS_IND "
+        "LL_CIS_IND LL_CIS_REQ LL_CIS_RSP LL_CIS_TERMINATE_IND "
+        "LL_CLOCK_ACCURACY_REQ LL_CLOCK_ACCURACY_RSP LL_CONNECTION_PARAM_REQ "
+        "LL_CONNECTION_PARAM_RSP LL_CONNECTION_UPDATE_IND LL_CTE_REQ "
+        "LL_CTE_RSP LL_ENC_REQ LL_ENC_RSP LL_FEATURE_REQ LL_FEATURE_RSP "
+        "LL_LENGTH_REQ LL_LENGTH_RSP LL_MIN_USED_CHANNELS_IND "
+        "LL_PAUSE_ENC_REQ LL_PAUSE_ENC_RSP LL_PERIODIC_SYNC_IND LL_PHY_REQ "
+        "LL_PHY_RSP LL_PHY_UPDATE_IND LL_PING_REQ LL_PING_RSP "
+        "LL_POWER_CHANGE_IND LL_POWER_CONTROL_REQ LL_POWER_CONTROL_RSP "
+        "LL_REJECT_EXT_IND LL_REJECT_IND LL_SLAVE_FEATURE_REQ "
+        "LL_START_ENC_REQ LL_START_ENC_RSP LL_SUBRATE_IND LL_SUBRATE_REQ "
+        "LL_TERMINATE_IND LL_UNKNOWN_RSP LL_VERSION_IND MACField PPI_BTLE "
+        "X3BytesField XIntField XShortField mac2str str2mac"
+    ),
+    'dcerpc': (
+        "COM_INTERFACES ComInterface CommonAuthVerifier DCERPC_Transport "
+        "DCE_C_AUTHN_LEVEL DCE_RPC_INTERFACES DCE_RPC_INTERFACES_NAMES "
+        "DCE_RPC_INTERFACES_NAMES_rev DCE_RPC_TRANSFER_SYNTAXES DCE_RPC_TYPE "
+        "DceRpc DceRpc4 DceRpc4Payload DceRpc5 DceRpc5AbstractSyntax "
+        "DceRpc5AlterContext DceRpc5AlterContextResp DceRpc5Auth3 DceRpc5Bind "
+        "DceRpc5BindAck DceRpc5BindNak DceRpc5Context DceRpc5Fault "
+        "DceRpc5PortAny DceRpc5Request DceRpc5Response DceRpc5Result "
+        "DceRpc5TransferSyntax DceRpc5Version DceRpcInterface DceRpcOp "
+        "DceRpcSecVT DceRpcSecVTBitmask DceRpcSecVTCommand DceRpcSecVTHeader2 "
+        "DceRpcSecVTPcontext DceRpcSession DceRpcSocket DefaultSession EField "
+        "EPacket EPacketField EPacketListField GSS_S_COMPLETE IntEnum "
+        "LEIntEnumField NDRAlign NDRByteField NDRConfFieldListField "
+        "NDRConfPacketListField NDRConfStrLenField NDRConfStrLenFieldUtf16 "
+        "NDRConfVarFieldListField NDRConfVarPacketListField "
+        "NDRConfVarStrLenField NDRConfVarStrLenFieldUtf16 "
+        "NDRConfVarStrNullField NDRConfVarStrNullFieldUtf16 "
+        "NDRConformantArray NDRConformantString NDRConstructedType "
+        "NDRContextHandle NDRFieldListField NDRFullPointerField "
+        "NDRIEEEDoubleField NDRIEEEFloatField NDRInt3264EnumField "
+        "NDRInt3264Field NDRIntEnumField NDRIntField NDRLongField NDRPacket "
+        "NDRPacketField NDRPointer NDRRecursiveField NDRRefEmbPointerField "
+        "NDRSerialization1Header NDRSerialization1PrivateHeader "
+        "NDRSerializeType1PacketField NDRSerializeType1PacketLenField "
+        "NDRSerializeType1PacketListField NDRShortField NDRSignedByteField "
+        "NDRSignedInt3264Field NDRSignedIntField NDRSignedLongField "
+        "NDRSignedShortField NDRUnion NDRUnionField NDRVarPacketListField "
+        "NDRVarStrLenField NDRVarStrLenFieldUtf16 NDRVaryingArray "
+        "NL_AUTH_MESSAGE NL_AUTH_SIGNATURE Packet_metaclass RPC_C_AUTHN "
+        "RPC_C_AUTHN_LEVEL StrNullFieldUtf16 StreamSocket UUID UUIDEnumField "
+        "collections find_dcerpc_interface ndr_deserialize1 ndr_serialize1 "
+        "partial register_com_interface register_dcerpc_interface"
+    ),
+    'dhcp': (
+        "BOOTP BOOTP_am ClasslessFieldListField ClasslessStaticRoutesField "
+        "DHCP DHCPOptions DHCPOptionsField DHCPRevOptions DHCPTypes DHCP_am "
+        "RandByte RandClasslessStaticRoutesField RandDHCPOptions RandNumExpo "
+        "StrEnumField atol dhcp_request dhcpmagic itom ltoa sane"
+    ),
+    'dhcp6': (
+        "All_DHCP_Relay_Agents_and_Servers All_DHCP_Servers Color DHCP6 "
+        "DHCP6ClientIAID DHCP6ClientIA_NA DHCP6ClientIA_TA "
+        "DHCP6ClientUnicastAddr DHCP6CurrentTransactionID "
+        "DHCP6NTPSubOptMCAddr DHCP6NTPSubOptSrvAddr DHCP6NTPSubOptSrvFQDN "
+        "DHCP6OptAuth DHCP6OptBCMCSDomains DHCP6OptBCMCSServers "
+        "DHCP6OptBootFileUrl DHCP6OptCaptivePortal DHCP6OptClientArchType "
+        "DHCP6OptClientFQDN DHCP6OptClientId DHCP6OptClientLinkLayerAddr "
+        "DHCP6OptClientNetworkInterId DHCP6OptDNSDomains DHCP6OptDNSServers "
+        "DHCP6OptERPDomain DHCP6OptElapsedTime DHCP6OptGeoConf "
+        "DHCP6OptGeoConfElement DHCP6OptIAAddress DHCP6OptIAPrefix "
+        "DHCP6OptIA_NA DHCP6OptIA_PD DHCP6OptIA_TA DHCP6OptIfaceId "
+        "DHCP6OptInfoRefreshTime DHCP6OptLQClientLink DHCP6OptMudUrl "
+        "DHCP6OptNISDomain DHCP6OptNISPDomain DHCP6OptNISPServers "
+        "DHCP6OptNISServers DHCP6OptNTPServer DHCP6OptNewPOSIXTimeZone "
+        "DHCP6OptNewTZDBTimeZone DHCP6OptOptReq DHCP6OptPanaAuthAgent "
+        "DHCP6OptPref DHCP6OptRapidCommit DHCP6OptReconfAccept "
+        "DHCP6OptReconfMsg DHCP6OptRelayAgentERO DHCP6OptRelayMsg "
+        "DHCP6OptRelaySuppliedOpt DHCP6OptRemoteID DHCP6OptSIPDomains "
+        "DHCP6OptSIPServers DHCP6OptSNTPServers DHCP6OptServerId "
+        "DHCP6OptServerUnicast DHCP6OptStatusCode DHCP6OptSubscriberID "
+        "DHCP6OptUnknown DHCP6OptUserClass DHCP6OptVSS DHCP6OptVendorClass "
+        "DHCP6OptVendorSpecificInfo DHCP6PrefVal DHCP6RelayAgentUnicastAddr "
+        "DHCP6RelayHopCount DHCP6ServerDUID DHCP6ServerUnicastAddr "
+        "DHCP6_Advertise DHCP6_Confirm DHCP6_Decline DHCP6_InfoRequest "
+        "DHCP6_Rebind DHCP6_Reconf DHCP6_RelayForward DHCP6_RelayReply "
+        "DHCP6_Release DHCP6_Renew DHCP6_Reply DHCP6_Request DHCP6_Solicit "
+        "DHCPv6_am DUID_EN DUID_LL DUID_LLT DUID_UUID EPOCH "
+        "IANA_ENTERPRISE_NUMBERS IRT_DEFAULT IRT_MINIMUM T1 T2 "
+        "USER_CLASS_DATA UTCTimeField VENDOR_CLASS_DATA "
+        "VENDOR_SPECIFIC_OPTION dhcp6_cls_by_type dhcp6opts dhcp6opts_by_code "
+        "dhcp6statuscodes dhcp6types duid_cls duidhwtypes duidtypes get_cls "
+        "send"
+    ),
+    'dns': (
+        "CacheInstance ClientSubnetv4 ClientSubnetv6 DNS DNSCache "
+        "DNSCompressedPacket DNSQR DNSRR DNSRRDLV DNSRRDNSKEY DNSRRDS "
+        "DNSRRHINFO DNSRRHTTPS DNSRRMX DNSRRNAPTR DNSRRNSEC DNSRRNSEC3 "
+        "DNSRRNSEC3PARAM DNSRROPT DNSRRRSIG DNSRRSOA DNSRRSRV DNSRRSVCB "
+        "DNSRRTSIG DNSRR_DISPATCHER DNSSDResult DNSStrField DNSTextField "
+        "DNS_am DNSgetstr EDNS0COOKIE EDNS0ClientSubnet EDNS0DAU EDNS0DHU "
+        "EDNS0ExtendedDNSError EDNS0N3U EDNS0OPT_DISPATCHER EDNS0OWN EDNS0TLV "
+        "I RRlist2bitmap RRlistField RawVal ScopedIP SvcParam TimeSignedField "
+        "bitmap2RRlist dns_compress dns_encode dns_get_str dns_resolve "
+        "dnsclasses dnsqtypes dnssd dnssecalgotypes dnssecdigesttypes "
+        "dnssecnsec3algotypes dnstypes dyndns_add dyndns_del edns0types "
+        "extended_dns_error_codes get_if_addr6 mDNS_am operator "
+        "read_nameservers svc_param_keys tsig_algo_sizes"
+    ),
+    'dot11': (
+        "AKMSuite BSSTerminationDuration BitMultiEnumField Cipher "
+        "ConditionalField DLT_IEEE802_11 DLT_IEEE802_11_RADIO "
+        "DLT_PRISM_HEADER Dot11 Dot11ATIM Dot11Ack Dot11Action Dot11AssoReq "
+        "Dot11AssoResp Dot11Auth Dot11BSSTMRequest Dot11BSSTMResponse "
+        "Dot11Beacon Dot11CCMP Dot11CSA Dot11Deauth Dot11Disas Dot11Elt "
+        "Dot11EltCSA Dot11EltCountry Dot11EltCountryConstraintTriplet "
+        "Dot11EltDSSSet Dot11EltERP Dot11EltHTCapabilities "
+        "Dot11EltMicrosoftWPA Dot11EltOBSS Dot11EltRSN Dot11EltRates "
+        "Dot11EltVHTOperation Dot11EltVendorSpecific Dot11Encrypted Dot11FCS "
+        "Dot11PacketList Dot11ProbeReq Dot11ProbeResp Dot11QoS Dot11ReassoReq "
+        "Dot11ReassoResp Dot11S1GBeacon Dot11SpectrumManagement Dot11TKIP "
+        "Dot11VHTOperationInfo Dot11WEP Dot11WNM ETHER_ANY FCSField "
+        "LEFieldLenField LELongField LESignedIntField MayEnd NeighborReport "
+        "OUIField PMKIDListPacket PacketField PrismHeader RSNCipherSuite "
+        "RadioTap RadioTapExtendedPresenceMask RadioTapTLV ReversePadField "
+        "ScalingField SubelemTLV WiFi_am XStrFixedLenField algorithms "
+        "bind_top_down btm_request_mode btm_status_code capability_list crc32 "
+        "crypto_validator decrepit_algorithms default_backend reason_code "
+        "status_code"
+    ),
+    'dot15d4': (
+        "DLT_IEEE802_15_4_NOFCS DLT_IEEE802_15_4_WITHFCS Dot15d4 Dot15d4Ack "
+        "Dot15d4AuxSecurityHeader Dot15d4Beacon Dot15d4Cmd Dot15d4CmdAssocReq "
+        "Dot15d4CmdAssocResp Dot15d4CmdCoordRealign "
+        "Dot15d4CmdCoordRealignPage Dot15d4CmdDisassociation Dot15d4CmdGTSReq "
+        "Dot15d4Data Dot15d4FCS Emph dot15d4AddressField "
+        "util_srcpanid_present"
+    ),
+    'eap': (
+        "EAP EAPOL EAPOL_KEY EAP_FAST EAP_MD5 EAP_PEAP EAP_TLS EAP_TTLS LEAP "
+        "MACsecSCI MKABasicParamSet MKADistributedCAKParamSet "
+        "MKADistributedSAKParamSet MKAICVSet MKALivePeerListParamSet MKAPDU "
+        "MKAParamSet MKAParamSetPacketListField MKAPeerListTuple "
+        "MKAPotentialPeerListParamSet MKASAKUseParamSet XStrField eap_codes "
+        "eap_types eapol_types eapol_versions"
+    ),
+    'gprs': (
+        "GPRS StrStopField"
+    ),
+    'gssapi': (
+        "ASN1F_GSSAPI_APPLICATION ASN1F_OID ASN1F_PACKET ASN1F_SEQUENCE "
+        "ASN1_Class_GSSAPI ASN1_GSSAPI_APPLICATION ASN1_Packet "
+        "BERcodec_GSSAPI_APPLICATION GSSAPI_BLOB GSSAPI_BLOB_SIGNATURE "
+        "GSS_C_CALLING_ERROR_OFFSET GSS_C_FLAGS GSS_C_ROUTINE_ERROR_OFFSET "
+        "GSS_C_SUPPLEMENTARY_OFFSET GSS_S_BAD_BINDINGS GSS_S_BAD_MECH "
+        "GSS_S_BAD_MIC GSS_S_BAD_NAME GSS_S_BAD_NAMETYPE GSS_S_BAD_QOP "
+        "GSS_S_BAD_SIG GSS_S_BAD_STATUS GSS_S_CALL_BAD_STRUCTURE "
+        "GSS_S_CALL_INACCESSIBLE_READ GSS_S_CALL_INACCESSIBLE_WRITE "
+        "GSS_S_CONTEXT_EXPIRED GSS_S_CONTINUE_NEEDED "
+        "GSS_S_CREDENTIALS_EXPIRED GSS_S_DEFECTIVE_CREDENTIAL "
+        "GSS_S_DEFECTIVE_TOKEN GSS_S_DUPLICATE_ELEMENT GSS_S_DUPLICATE_TOKEN "
+        "GSS_S_FAILURE GSS_S_GAP_TOKEN GSS_S_NAME_NOT_MN GSS_S_NO_CONTEXT "
+        "GSS_S_NO_CRED GSS_S_OLD_TOKEN GSS_S_UNAUTHORIZED GSS_S_UNAVAILABLE "
+        "GSS_S_UNSEQ_TOKEN GssBufferDesc GssChannelBindings IntFlag SSP "
+        "dataclass"
+    ),
+    'hsrp': (
+        "HSRP HSRPmd5"
+    ),
+    'inet': (
+        "ATMT Automaton BadFragments Counter DLT_IPV4 DLT_RAW DLT_RAW_ALT "
+        "DefragTable DestField DestIPField ETH_P_ALL ETH_P_IP Gen ICMP "
+        "ICMPEcho_am ICMPExtension_Header ICMPExtension_InterfaceInformation "
+        "ICMPExtension_Object ICMPTimeStampField ICMPerror IP IP6Field "
+        "IPField IPID_count IPOption IPOption_Address_Extension IPOption_EOL "
+        "IPOption_LSRR IPOption_MTU_Probe IPOption_MTU_Reply IPOption_NOP "
+        "IPOption_RR IPOption_Router_Alert IPOption_SDBM IPOption_SSRR "
+        "IPOption_Security IPOption_Stream_Id IPOption_Timestamp "
+        "IPOption_Traceroute IPTools IP_PROTOS IPerror MultiEnumField "
+        "OrderedDict RandInt RandNum RandShort RandTCPOptions ShortEnumField "
+        "SndRcvList SourceIPField TCP TCPAOValue TCPOptions TCPOptionsField "
+        "TCP_SERVICES TCP_client TCPerror TracerouteResult TrailerField UDP "
+        "UDP_SERVICES UDPerror VolatileValue bind_bottom_up bisect "
+        "calc_tcp_md5_hash checksum colgen connect_from_ip defrag defragment "
+        "fragleak fragleak2 fragment get_tcpao icmp_id_seq_types icmpcodes "
+        "icmptypes in4_chksum in4_pseudoheader incremental_label "
+        "inet_register_l3 linehexdump overlap_frag report_ports scapy "
+        "sign_tcp_md5 sr sr1 tcp_pseudoheader traceroute traceroute_map whois"
+    ),
+    'inet6': (
+        "AS_resolver6 AS_resolver_riswhois DLT_IPV6 DestIP6Field "
+        "DomainNameListField ETH_P_IPV6 HAO HBHOptUnknown ICMPv6DestUnreach "
+        "ICMPv6EchoReply ICMPv6EchoRequest ICMPv6HAADReply ICMPv6HAADRequest "
+        "ICMPv6MLDMultAddrRec ICMPv6MLDone ICMPv6MLQuery ICMPv6MLQuery2 "
+        "ICMPv6MLReport ICMPv6MLReport2 ICMPv6MPAdv ICMPv6MPSol "
+        "ICMPv6MRD_Advertisement ICMPv6MRD_Solicitation ICMPv6MRD_Termination "
+        "ICMPv6NDOptAdvInterval ICMPv6NDOptCaptivePortal ICMPv6NDOptDNSSL "
+        "ICMPv6NDOptDataField ICMPv6NDOptDstLLAddr ICMPv6NDOptEFA "
+        "ICMPv6NDOptHAInfo ICMPv6NDOptIPAddr ICMPv6NDOptLLA ICMPv6NDOptMAP "
+        "ICMPv6NDOptMTU ICMPv6NDOptNewRtrPrefix ICMPv6NDOptPREF64 "
+        "ICMPv6NDOptPrefixInfo ICMPv6NDOptRDNSS ICMPv6NDOptRedirectedHdr "
+        "ICMPv6NDOptRouteInfo ICMPv6NDOptShortcutLimit ICMPv6NDOptSrcAddrList "
+        "ICMPv6NDOptSrcLLAddr ICMPv6NDOptTgtAddrList ICMPv6NDOptUnknown "
+        "ICMPv6ND_INDAdv ICMPv6ND_INDSol ICMPv6ND_NA ICMPv6ND_NS ICMPv6ND_RA "
+        "ICMPv6ND_RS ICMPv6ND_Redirect ICMPv6NIQueryIPv4 ICMPv6NIQueryIPv6 "
+        "ICMPv6NIQueryNOOP ICMPv6NIQueryName ICMPv6NIReplyIPv4 "
+        "ICMPv6NIReplyIPv6 ICMPv6NIReplyNOOP ICMPv6NIReplyName "
+        "ICMPv6NIReplyRefuse ICMPv6NIReplyUnknown ICMPv6PacketTooBig "
+        "ICMPv6ParamProblem ICMPv6RPL ICMPv6TimeExceeded ICMPv6Unknown "
+        "IP6ListField IPerror6 IPv46 IPv6 IPv6ExtHdrDestOpt "
+        "IPv6ExtHdrFragment IPv6ExtHdrHopByHop IPv6ExtHdrRouting "
+        "IPv6ExtHdrSegmentRouting IPv6ExtHdrSegmentRoutingTLV "
+        "IPv6ExtHdrSegmentRoutingTLVEgressNode "
+        "IPv6ExtHdrSegmentRoutingTLVHMAC "
+        "IPv6ExtHdrSegmentRoutingTLVIngressNode "
+        "IPv6ExtHdrSegmentRoutingTLVPad1 IPv6ExtHdrSegmentRoutingTLVPadN "
+        "IPv6inIP Jumbo L3RawSocket L3RawSocket6 LifetimeField LongField "
+        "MIP6MH_BA MIP6MH_BE MIP6MH_BRR MIP6MH_BU MIP6MH_CoT MIP6MH_CoTI "
+        "MIP6MH_Generic MIP6MH_HoT MIP6MH_HoTI MIP6OptAltCoA MIP6OptBRAdvice "
+        "MIP6OptBindingAuthData MIP6OptCGAParams MIP6OptCGAParamsReq "
+        "MIP6OptCareOfTest MIP6OptCareOfTestInit MIP6OptHomeKeygenToken "
+        "MIP6OptLLAddr MIP6OptMNID MIP6OptMobNetPrefix MIP6OptMsgAuth "
+        "MIP6OptNonceIndices MIP6OptReplayProtection MIP6OptSignature "
+        "MIP6OptUnknown NDP_Attack_DAD_DoS_via_NA NDP_Attack_DAD_DoS_via_NS "
+        "NDP_Attack_Fake_Router NDP_Attack_Kill_Default_Router "
+        "NDP_Attack_NA_Spoofing NDP_Attack_NS_Spoofing NIQueryCodeField "
+        "NIQueryDataField NIReplyDataField NTPTimestampField NonceField "
+        "PacketLenField Pad1 PadN PseudoIPv6 Raw RouterAlert RplOption "
+        "SourceIP6Field TracerouteResult6 TruncPktLenField bastatus "
+        "computeNIGroupAddr defragment6 dnsrepr2names fragment6 get_if_hwaddr "
+        "getmacbyip6 gmtime icmp6_niqtypes icmp6ndopts icmp6ndoptscls "
+        "icmp6ndraprefs icmp6types icmp6typescls icmp6typesminhdrlen "
+        "in6_chksum in6_pseudoheader inet6_register_l3 ipv6nh ipv6nhcls md5 "
+        "mhtypes moboptcls names2dnsrepr neighsol rplcodes srp1 strftime "
+        "traceroute6"
+    ),
+    'ipsec': (
+        "AH AUTH_ALGOS AuthAlgo CMAC CRYPT_ALGOS CryptAlgo ESP HMAC "
+        "IMMUTABLE_IPV4_OPTIONS IPSecIntegrityError InvalidTag NAT_KEEPALIVE "
+        "NON_ESP SecurityAssociation aead gcd hashes modes "
+        "split_for_transport zero_mutable_fields"
+    ),
+    'ir': (
+        "IrLAPCommand IrLAPHead IrLMP"
+    ),
+    'isakmp': (
+        "IPSECAttributeTypes IPSECTransformNum ISAKMP ISAKMPAttributeTypes "
+        "ISAKMPTransformNum ISAKMPTransformSetField ISAKMP_VENDOR_IDS "
+        "ISAKMP_doi ISAKMP_exchange_type ISAKMP_payload ISAKMP_payload_Delete "
+        "ISAKMP_payload_Hash ISAKMP_payload_ID ISAKMP_payload_KE "
+        "ISAKMP_payload_Nonce ISAKMP_payload_Notify ISAKMP_payload_Proposal "
+        "ISAKMP_payload_SA ISAKMP_payload_Transform ISAKMP_payload_VendorID "
+        "ISAKMP_payload_type ISAKMP_protos NotifyMessageType "
+        "PROTO_GIGABEAM_RADIO PROTO_IPCOMP PROTO_IPSEC_AH PROTO_IPSEC_ESP "
+        "PROTO_ISAKMP RandString StrLenEnumField ikescan"
+    ),
+    'kerberos': (
+        "ADMANDATORYFORKDC AD_AND_OR AD_IF_RELEVANT AD_KDCIssued "
+        "ASN1F_BOOLEAN ASN1F_CHOICE ASN1F_FLAGS ASN1F_GENERALIZED_TIME "
+        "ASN1F_GENERAL_STRING ASN1F_INTEGER ASN1F_SEQUENCE_OF ASN1F_STRING "
+        "ASN1F_STRING_PacketField ASN1F_enum_INTEGER ASN1F_optional "
+        "ASN1_Class_KRB AuthorizationData AuthorizationDataItem "
+        "ChangePasswdData Checksum DHRepInfo ETYPE_INFO ETYPE_INFO2 "
+        "ETYPE_INFO_ENTRY ETYPE_INFO_ENTRY2 EncAPRepPart EncASRepPart "
+        "EncKDCRepPart EncKeyPack EncKrbCredPart EncKrbPrivPart EncTGSRepPart "
+        "EncTicketPart EncryptedData EncryptionKey "
+        "ExternalPrincipalIdentifier HostAddress HostAddresses IAKERB_HEADER "
+        "Int32 KDC_PROXY_MESSAGE KERB_AD_LOGIN_ALIAS "
+        "KERB_AD_RESTRICTION_ENTRY KERB_AUTH_DATA_AP_OPTIONS "
+        "KERB_AUTH_DATA_CLIENT_TARGET KERB_DMSA_KEY_PACKAGE KERB_ERROR_DATA "
+        "KERB_EXT_ERROR KERB_KEY_LIST_REP KERB_KEY_LIST_REQ "
+        "KERB_SUPERSEDED_BY_USER KPASSWD_REP KPASSWD_REQ KPASSWD_RESULTS "
+        "KPasswdRepData KRB_AP_REP KRB_AP_REQ KRB_AS_REP KRB_AS_REQ "
+        "KRB_Authenticator KRB_AuthenticatorChecksum KRB_CRED KRB_ERROR "
+        "KRB_FINISHED KRB_GSSAPI_Token KRB_GSS_Delete_sec_context_RFC1964 "
+        "KRB_GSS_EXT KRB_GSS_MIC KRB_GSS_MIC_RFC1964 KRB_GSS_Wrap "
+        "KRB_GSS_Wrap_RFC1964 KRB_InnerToken KRB_KDC_REP KRB_KDC_REQ "
+        "KRB_KDC_REQ_BODY KRB_MSG_TYPES KRB_PRIV KRB_TGS_REP KRB_TGS_REQ "
+        "KRB_TGT_REP KRB_TGT_REQ KRB_Ticket KdcProxySocket Kerberos "
+        "KerberosClient KerberosFlags KerberosSSP KerberosString "
+        "KerberosTCPHeader KerberosTime Kpasswd KpasswdTCPHeader KrbCredInfo "
+        "KrbFastArmor KrbFastArmoredRep KrbFastArmoredReq KrbFastFinished "
+        "KrbFastReq KrbFastResponse LSAP_TOKEN_INFO_INTEGRITY LastReqItem "
+        "MethodData Microseconds PADATA PA_AUTHENTICATION_SET "
+        "PA_AUTHENTICATION_SET_ELEM PA_ENC_TS_ENC PA_FOR_USER "
+        "PA_FX_FAST_REPLY PA_FX_FAST_REQUEST PA_PAC_OPTIONS PA_PAC_REQUEST "
+        "PA_PK_AS_REP PA_PK_AS_REQ PA_S4U_X509_USER PA_SUPPORTED_ENCTYPES "
+        "PrincipalName Realm S4UUserID StrFieldUtf16 StrFixedLenEnumField "
+        "TransitedEncoding UInt32 deque kpasswd krb_as_and_tgs krb_as_req "
+        "krb_get_salt krb_tgs_req namedtuple strrot"
+    ),
+    'l2': (
+        "ARP ARPHDR_ETHER ARPHDR_LOOPBACK ARPHDR_METRICOM ARP_am ARPingResult "
+        "BCDFloatField COOKED_LINUX_PACKET_TYPES CookedLinux CookedLinuxV2 "
+        "DLT_ETHERNET_MPACKET DLT_LINUX_IRDA DLT_LINUX_SLL DLT_LINUX_SLL2 "
+        "DLT_LOOP DLT_NULL DestMACField Dot1AD Dot1AH Dot1Q Dot3 "
+        "ETHER_BROADCAST ETHER_TYPES ETH_P_ARP ETH_P_MACSEC Ether GRE "
+        "GRE_PPTP GRErouting HARDWARE_TYPES IntEnumField LLC LOOPBACK_TYPES "
+        "LoIntEnumField Loopback LoopbackOpenBSD MPacketPreamble Neighbor "
+        "QueryAnswer SNAP STP ScapyNoDstMacException SourceMACField "
+        "ThreeBytesField XShortEnumField arp_mitm arpcachepoison arping "
+        "arpleak consts etherleak getmacbyip hexdump hexstr in4_getnsmac "
+        "in4_ismaddr is_promisc itertools l2_register_l3 l2_register_l3_arp "
+        "promiscping srp srploop valid_mac valid_net valid_net6"
+    ),
+    'l2tp': (
+        "L2TP"
+    ),
+    'ldap': (
+        "ASN1F_ENUMERATED ASN1F_LDAP_Authentication_krbv42DSA "
+        "ASN1F_LDAP_Authentication_krbv42LDAP "
+        "ASN1F_LDAP_Authentication_sicilyNegotiate "
+        "ASN1F_LDAP_Authentication_sicilyPackageDiscovery "
+        "ASN1F_LDAP_Authentication_sicilyResponse "
+        "ASN1F_LDAP_Authentication_simple ASN1F_NULL ASN1F_SET_OF "
+        "ASN1F_badsequence ASN1_Class_LDAP ASN1_Class_LDAP_Authentication "
+        "ASN1_Class_LDAP_Filter AttributeType AttributeValue "
+        "AttributeValueAssertion BERcodec_LDAP_Authentication_krbv42DSA "
+        "BERcodec_LDAP_Authentication_krbv42LDAP "
+        "BERcodec_LDAP_Authentication_sicilyNegotiate "
+        "BERcodec_LDAP_Authentication_sicilyPackageDiscovery "
+        "BERcodec_LDAP_Authentication_sicilyResponse "
+        "BERcodec_LDAP_Authentication_simple CLDAP Enum LDAP LDAPDN LDAPOID "
+        "LDAPReferral LDAPResult LDAPString LDAP_AbandonRequest "
+        "LDAP_AddRequest LDAP_AddResponse LDAP_Attribute LDAP_AttributeValue "
+        "LDAP_Authentication_SaslCredentials LDAP_Authentication_krbv42DSA "
+        "LDAP_Authentication_krbv42LDAP LDAP_Authentication_sicilyNegotiate "
+        "LDAP_Authentication_sicilyPackageDiscovery "
+        "LDAP_Authentication_sicilyResponse LDAP_Authentication_simple "
+        "LDAP_BIND_MECHS LDAP_BindRequest LDAP_BindResponse "
+        "LDAP_CONTROL_ACCESS_RIGHTS LDAP_Client LDAP_Control "
+        "LDAP_DS_ACCESS_RIGHTS LDAP_DelRequest LDAP_DelResponse "
+        "LDAP_Exception LDAP_ExtendedResponse LDAP_Filter LDAP_FilterAnd "
+        "LDAP_FilterApproxMatch LDAP_FilterEqual LDAP_FilterExtensibleMatch "
+        "LDAP_FilterGreaterOrEqual LDAP_FilterLessOrEqual LDAP_FilterNot "
+        "LDAP_FilterOr LDAP_FilterPresent LDAP_ModifyDNRequest "
+        "LDAP_ModifyDNResponse LDAP_ModifyRequest LDAP_ModifyRequestChange "
+        "LDAP_ModifyResponse LDAP_PROPERTY_SET LDAP_PartialAttribute "
+        "LDAP_SASL_Buffer LDAP_SASL_GSSAPI_SsfCap LDAP_SearchRequest "
+        "LDAP_SearchRequestAttribute LDAP_SearchResponseEntry "
+        "LDAP_SearchResponseReference LDAP_SearchResponseResultDone "
+        "LDAP_SubstringFilter LDAP_SubstringFilterAny "
+        "LDAP_SubstringFilterFinal LDAP_SubstringFilterInitial "
+        "LDAP_SubstringFilterStr LDAP_UnbindRequest "
+        "LDAP_realSearchControlValue LDAP_serverSDFlagsControl LdapPing_am "
+        "RelativeLDAPDN SSLStreamSocket SimpleSocket URI dclocator ssl string "
+        "uuid"
+    ),
+    'llmnr': (
+        "LLMNRQuery LLMNRResponse LLMNR_am"
+    ),
+    'lltd': (
+        "LLTD LLTDAttribute LLTDAttribute80211MaxRate "
+        "LLTDAttribute80211PhysicalMedium LLTDAttributeCharacteristics "
+        "LLTDAttributeDeviceUUID LLTDAttributeEOP LLTDAttributeHostID "
+        "LLTDAttributeIPv4Address LLTDAttributeIPv6Address "
+        "LLTDAttributeLargeTLV LLTDAttributeLinkSpeed "
+        "LLTDAttributeMachineName LLTDAttributePerformanceCounterFrequency "
+        "LLTDAttributePhysicalMedium LLTDAttributeQOSCharacteristics "
+        "LLTDAttributeSeesList LLTDDiscover LLTDEmit LLTDEmiteeDesc LLTDHello "
+        "LLTDQueryLargeTlv LLTDQueryLargeTlvResp LLTDQueryResp LLTDRecveeDesc "
+        "LargeTlvBuilder Padding SPECIFIC_CLASSES StrLenFieldUtf16 array"
+    ),
+    'mgcp': (
+        "MGCP"
+    ),
+    'mobileip': (
+        "MobileIP MobileIPRRP MobileIPRRQ MobileIPTunnelData"
+    ),
+    'netbios': (
+        "NBNSHeader NBNSNodeStatusRequest NBNSNodeStatusResponse "
+        "NBNSNodeStatusResponseService NBNSQueryRequest NBNSQueryResponse "
+        "NBNSRegistrationRequest NBNSWackResponse NBNS_ADD_ENTRY NBNS_am "
+        "NBTDatagram NBTSession NetBIOSNameField NetBIOS_DS"
+    ),
+    'netflow': (
+        "GetNetflowRecordV9 IPSession N9SecondsIntField N9UTCTimeField "
+        "NTOP_BASE NetflowDataflowsetV9 NetflowFlowsetV9 NetflowHeader "
+        "NetflowHeaderV1 NetflowHeaderV10 NetflowHeaderV5 NetflowHeaderV9 "
+        "NetflowOptionsFlowset10 NetflowOptionsFlowsetOptionV9 "
+        "NetflowOptionsFlowsetScopeV9 NetflowOptionsFlowsetV9 "
+        "NetflowOptionsRecordOptionV9 NetflowOptionsRecordScopeV9 "
+        "NetflowRecordV1 NetflowRecordV5 NetflowRecordV9 NetflowSession "
+        "NetflowTemplateFieldV9 NetflowTemplateV9 "
+        "NetflowV910TemplateFieldTypes NetflowV910TemplateFields "
+        "ScopeFieldTypes SecondsIntField ShortOrInt dataclasses "
+        "ipfix_defragment netflowv9_defragment port"
+    ),
+    'ntlm': (
+        "ASN1F_PRINTABLE_STRING AV_PAIR HMAC_MD5 HTTP_ntlm_negotiate Hash_MD4 "
+        "Hash_MD5 Hmac_MD5 LEThreeBytesField LM_RESPONSE LMv2_RESPONSE MAC "
+        "MD4le NEGOEX_EXCHANGE_NTLM NEGOEX_EXCHANGE_NTLM_ITEM NTLMSSP "
+        "NTLMSSP_MESSAGE_SIGNATURE NTLM_AUTHENTICATE NTLM_AUTHENTICATE_V2 "
+        "NTLM_CHALLENGE NTLM_Header NTLM_NEGOTIATE NTLM_RESPONSE "
+        "NTLMv2_CLIENT_CHALLENGE NTLMv2_ComputeSessionBaseKey NTLMv2_RESPONSE "
+        "NTOWFv2 RC4 RC4Init RC4K SEAL SEALKEY SIGN SIGNKEY Single_Host_Data "
+        "StringBuffer UNSEAL bytes_base64 copy"
+    ),
+    'ntp': (
+        "FixedPointField NTP NTPAuthenticator NTPClockStatusPacket "
+        "NTPConfPeer NTPConfRestrict NTPConfTrap NTPConfUnpeer NTPControl "
+        "NTPControlDataPacketLenField NTPControlStatusField "
+        "NTPErrorStatusPacket NTPExtPacketListField NTPExtension "
+        "NTPExtensions NTPHeader NTPInfoAuth NTPInfoControl NTPInfoIOStats "
+        "NTPInfoIfStatsIPv4 NTPInfoIfStatsIPv6 NTPInfoKernel NTPInfoLoop "
+        "NTPInfoMemStats NTPInfoMonitor1 NTPInfoPeer NTPInfoPeerList "
+        "NTPInfoPeerStats NTPInfoPeerSummary NTPInfoSys NTPInfoSysStats "
+        "NTPInfoTimerStats NTPPeerStatusDataPacket NTPPeerStatusPacket "
+        "NTPPrivate NTPPrivatePktTail NTPPrivateReqPacket "
+        "NTPPrivateReqPacketListField NTPPrivateRespPacketListField "
+        "NTPStatusPacket NTPSystemStatusPacket TimeStampField lhex"
+    ),
+    'ppi': (
+        "DLT_PPI PPI PPI_Element PPI_Hdr PPI_TYPES"
+    ),
+    'ppp': (
+        "DIR_PPP DLT_PPP DLT_PPP_ETHER DLT_PPP_SERIAL DLT_PPP_WITH_DIR "
+        "EnumField HDLC PPP PPP_CHAP PPP_CHAP_ChallengeResponse PPP_ECP "
+        "PPP_ECP_Option PPP_ECP_Option_OUI PPP_IPCP PPP_IPCP_Option "
+        "PPP_IPCP_Option_DNS1 PPP_IPCP_Option_DNS2 PPP_IPCP_Option_IPAddress "
+        "PPP_IPCP_Option_NBNS1 PPP_IPCP_Option_NBNS2 PPP_LCP "
+        "PPP_LCP_ACCM_Option PPP_LCP_Auth_Protocol_Option "
+        "PPP_LCP_Callback_Option PPP_LCP_Code_Reject PPP_LCP_Configure "
+        "PPP_LCP_Discard_Request PPP_LCP_Echo PPP_LCP_MRU_Option "
+        "PPP_LCP_Magic_Number_Option PPP_LCP_Option PPP_LCP_Protocol_Reject "
+        "PPP_LCP_Quality_Protocol_Option PPP_LCP_Terminate PPP_PAP "
+        "PPP_PAP_Request PPP_PAP_Response PPPoE PPPoED PPPoED_Tags PPPoETag "
+        "adjust_auth_len"
+    ),
+    'pptp': (
+        "PPTP PPTPCallClearRequest PPTPCallDisconnectNotify PPTPEchoReply "
+        "PPTPEchoRequest PPTPIncomingCallConnected PPTPIncomingCallReply "
+        "PPTPIncomingCallRequest PPTPOutgoingCallReply "
+        "PPTPOutgoingCallRequest PPTPSetLinkInfo "
+        "PPTPStartControlConnectionReply PPTPStartControlConnectionRequest "
+        "PPTPStopControlConnectionReply PPTPStopControlConnectionRequest "
+        "PPTPWANErrorNotify"
+    ),
+    'radius': (
+        "Cipher_DES_ECB Hash_SHA MS_CHAP2_ChallengeHash "
+        "MS_CHAP2_ChallengeResponse MS_CHAP2_GenerateAuthenticatorResponse "
+        "MS_CHAP2_GenerateNTResponse MS_CHAP2_Response MS_CHAP2_Success "
+        "MS_CHAP_Domain MS_CHAP_Error Radius RadiusAttr_ARAP_Security "
+        "RadiusAttr_Acct_Authentic RadiusAttr_Acct_Delay_Time "
+        "RadiusAttr_Acct_Input_Gigawords RadiusAttr_Acct_Input_Octets "
+        "RadiusAttr_Acct_Input_Packets RadiusAttr_Acct_Interim_Interval "
+        "RadiusAttr_Acct_Link_Count RadiusAttr_Acct_Output_Gigawords "
+        "RadiusAttr_Acct_Output_Octets RadiusAttr_Acct_Output_Packets "
+        "RadiusAttr_Acct_Session_Time RadiusAttr_Acct_Status_Type "
+        "RadiusAttr_Acct_Terminate_Cause RadiusAttr_Acct_Tunnel_Packets_Lost "
+        "RadiusAttr_EAP_Message RadiusAttr_Egress_VLANID "
+        "RadiusAttr_Framed_AppleTalk_Link RadiusAttr_Framed_AppleTalk_Network "
+        "RadiusAttr_Framed_IPX_Network RadiusAttr_Framed_IP_Address "
+        "RadiusAttr_Framed_IP_Netmask RadiusAttr_Framed_MTU "
+        "RadiusAttr_Framed_Protocol RadiusAttr_Idle_Timeout "
+        "RadiusAttr_Login_IP_Host RadiusAttr_Login_TCP_Port "
+        "RadiusAttr_Management_Privilege_Level "
+        "RadiusAttr_Message_Authenticator RadiusAttr_Mobility_Domain_Id "
+        "RadiusAttr_NAS_IP_Address RadiusAttr_NAS_Port "
+        "RadiusAttr_NAS_Port_Type RadiusAttr_PMIP6_Home_DHCP4_Server_Address "
+        "RadiusAttr_PMIP6_Home_IPv4_Gateway "
+        "RadiusAttr_PMIP6_Home_LMA_IPv4_Address "
+        "RadiusAttr_PMIP6_Visited_DHCP4_Server_Address "
+        "RadiusAttr_PMIP6_Visited_IPv4_Gateway "
+        "RadiusAttr_PMIP6_Visited_LMA_IPv4_Address RadiusAttr_Password_Retry "
+        "RadiusAttr_Port_Limit RadiusAttr_Preauth_Timeout "
+        "RadiusAttr_Service_Type RadiusAttr_Session_Timeout RadiusAttr_State "
+        "RadiusAttr_Tunnel_Preference RadiusAttr_User_Name "
+        "RadiusAttr_User_Password RadiusAttr_Vendor_Specific "
+        "RadiusAttr_WLAN_AKM_Suite RadiusAttr_WLAN_Group_Cipher "
+        "RadiusAttr_WLAN_Group_Mgmt_Cipher RadiusAttr_WLAN_Pairwise_Cipher "
+        "RadiusAttr_WLAN_RF_Band RadiusAttr_WLAN_Reason_Code "
+        "RadiusAttr_WLAN_Venue_Info RadiusAttribute RadiusAuthType Radius_am "
+        "enum hashlib hmac prepare_packed_data"
+    ),
+    'rip': (
+        "RIP RIPAuth RIPEntry"
+    ),
+    'rtp': (
+        "BitFieldLenField RTP RTPExtension"
+    ),
+    'sctp': (
+        "ChunkParamField GapAckField IPPROTO_SCTP SCTP SCTPChunkAbort "
+        "SCTPChunkAddressConf SCTPChunkAddressConfAck SCTPChunkAuthentication "
+        "SCTPChunkCookieAck SCTPChunkCookieEcho SCTPChunkData SCTPChunkError "
+        "SCTPChunkForwardTSN SCTPChunkHeartbeatAck SCTPChunkHeartbeatReq "
+        "SCTPChunkIData SCTPChunkIForwardTSN SCTPChunkInit SCTPChunkInitAck "
+        "SCTPChunkPad SCTPChunkParamAdaptationLayer SCTPChunkParamAddIPAddr "
+        "SCTPChunkParamAddIncomingStreamReq "
+        "SCTPChunkParamAddOutgoingStreamReq SCTPChunkParamChunkList "
+        "SCTPChunkParamCookiePreservative SCTPChunkParamDelIPAddr "
+        "SCTPChunkParamECNCapable SCTPChunkParamErrorIndication "
+        "SCTPChunkParamFwdTSN SCTPChunkParamHeartbeatInfo "
+        "SCTPChunkParamHostname SCTPChunkParamIPv4Addr SCTPChunkParamIPv6Addr "
+        "SCTPChunkParamInSSNResetReq SCTPChunkParamOutSSNResetReq "
+        "SCTPChunkParamRandom SCTPChunkParamReConfigRes "
+        "SCTPChunkParamRequestedHMACFunctions SCTPChunkParamSSNTSNResetReq "
+        "SCTPChunkParamSetPrimaryAddr SCTPChunkParamStateCookie "
+        "SCTPChunkParamSuccessIndication SCTPChunkParamSupportedAddrTypes "
+        "SCTPChunkParamSupportedExtensions SCTPChunkParamUnrocognizedParam "
+        "SCTPChunkReConfig SCTPChunkSACK SCTPChunkShutdown "
+        "SCTPChunkShutdownAck SCTPChunkShutdownComplete SCTPForwardSkip "
+        "SCTPIForwardSkip SCTP_PAYLOAD_PROTOCOL_INDENTIFIERS SCTP_SERVICES "
+        "SCTPerror crc32c crc32c_table hmactypes resultcode "
+        "sctpchunkparamtypes sctpchunkparamtypescls sctpchunktypes "
+        "sctpchunktypescls"
+    ),
+    'sixlowpan': (
+        "BitLenField BitScalingField IP6FieldLenField IPHC_DEFAULT_FL "
+        "IPHC_DEFAULT_TF IPHC_DEFAULT_VERSION LINK_LOCAL_PREFIX "
+        "LoWPANBroadcast LoWPANFragmentationFirst "
+        "LoWPANFragmentationSubsequent LoWPANMesh LoWPANUncompressedIPv6 "
+        "LoWPAN_HC1 LoWPAN_HC2_UDP LoWPAN_IPHC LoWPAN_NHC LoWPAN_NHC_Hdr "
+        "LoWPAN_NHC_IPv6Ext LoWPAN_NHC_UDP MAX_SIZE SixLoWPAN SixLoWPAN_ESC "
+        "XLongField dest_addr_size sixlowpan_defragment sixlowpan_fragment "
+        "source_addr_size"
+    ),
+    'skinny': (
+        "Skinny skinny_messages"
+    ),
+    'smb': (
+        "BRWS BRWS_BecomeBackup BRWS_HostAnnouncement "
+        "BRWS_LocalMasterAnnouncement DcSockAddr NETLOGON "
+        "NETLOGON_LOGON_QUERY NETLOGON_SAM_LOGON_REQUEST "
+        "NETLOGON_SAM_LOGON_RESPONSE NETLOGON_SAM_LOGON_RESPONSE_EX "
+        "NETLOGON_SAM_LOGON_RESPONSE_NT40 SMBMailslot_Write "
+        "SMBNegotiate_Request SMBNegotiate_Response_Extended_Security "
+        "SMBNegotiate_Response_NoSecurity SMBNegotiate_Response_Security "
+        "SMBSession_Null SMBSession_Setup_AndX_Request "
+        "SMBSession_Setup_AndX_Request_Extended_Security "
+        "SMBSession_Setup_AndX_Response "
+        "SMBSession_Setup_AndX_Response_Extended_Security "
+        "SMBTransaction_Request SMBTransaction_Response SMBTree_Connect_AndX "
+        "SMB_COM SMB_Dialect SMB_Header STATUS_ERREF"
+    ),
+    'smb2': (
+        "CLAIM_SECURITY_ATTRIBUTE_RELATIVE_V1 DFS_REFERRAL "
+        "DFS_REFERRAL_ENTRY0 DFS_REFERRAL_ENTRY1 DFS_REFERRAL_V3 "
+        "DFS_REFERRAL_V4 DirectTCP FILE_BOTH_DIR_INFORMATION "
+        "FILE_FULL_DIR_INFORMATION FILE_GET_QUOTA_INFORMATION "
+        "FILE_ID_BOTH_DIR_INFORMATION FILE_NAME_INFORMATION "
+        "FILE_NOTIFY_INFORMATION FileAccessInformation "
+        "FileAlignmentInformation FileAllInformation "
+        "FileAlternateNameInformation FileAttributes FileBasicInformation "
+        "FileBothDirectoryInformation FileEaInformation "
+        "FileFsAttributeInformation FileFsSizeInformation "
+        "FileFsVolumeInformation FileFullDirectoryInformation "
+        "FileIdBothDirectoryInformation FileInformationClasses "
+        "FileInternalInformation FileModeInformation "
+        "FileNetworkOpenInformation FilePositionInformation "
+        "FileRenameInformation FileStandardInformation FileStreamInformation "
+        "FlagValue MOVE_DST_IPADDR NETWORK_INTERFACE_INFO REPARSE_TAGS "
+        "SECURITY_DESCRIPTOR SMB2_ACCESS_FLAGS_DIRECTORY "
+        "SMB2_ACCESS_FLAGS_FILE SMB2_ADDITIONAL_INFORMATION SMB2_CAPABILITIES "
+        "SMB2_COM SMB2_COMPRESSION_ALGORITHMS SMB2_CREATE_ALLOCATION_SIZE "
+        "SMB2_CREATE_APP_INSTANCE_ID SMB2_CREATE_APP_INSTANCE_VERSION "
+        "SMB2_CREATE_DURABLE_HANDLE_RECONNECT "
+        "SMB2_CREATE_DURABLE_HANDLE_RECONNECT_V2 "
+        "SMB2_CREATE_DURABLE_HANDLE_REQUEST "
+        "SMB2_CREATE_DURABLE_HANDLE_REQUEST_V2 "
+        "SMB2_CREATE_DURABLE_HANDLE_RESPONSE "
+        "SMB2_CREATE_DURABLE_HANDLE_RESPONSE_V2 "
+        "SMB2_CREATE_QUERY_MAXIMAL_ACCESS_REQUEST "
+        "SMB2_CREATE_QUERY_MAXIMAL_ACCESS_RESPONSE "
+        "SMB2_CREATE_QUERY_ON_DISK_ID SMB2_CREATE_REQUEST_LEASE "
+        "SMB2_CREATE_REQUEST_LEASE_V2 SMB2_CREATE_RESPONSE_LEASE "
+        "SMB2_CREATE_RESPONSE_LEASE_V2 SMB2_CREATE_TIMEWARP_TOKEN "
+        "SMB2_Cancel_Request SMB2_Change_Notify_Request "
+        "SMB2_Change_Notify_Response SMB2_Close_Request SMB2_Close_Response "
+        "SMB2_Compression_Capabilities SMB2_Compression_Transform_Header "
+        "SMB2_Create_Context SMB2_Create_Request SMB2_Create_Response "
+        "SMB2_ENCRYPTION_CIPHERS SMB2_Echo_Request SMB2_Echo_Response "
+        "SMB2_Encryption_Capabilities SMB2_Error_ContextResponse "
+        "SMB2_Error_Response SMB2_Error_Share_Redirect_Context_Response "
+        "SMB2_FILEID SMB2_HASH_ALGORITHMS SMB2_Header SMB2_INFO_TYPE "
+        "SMB2_IOCTL_Network_Interface_Info SMB2_IOCTL_OFFLOAD_READ_Request "
+        "SMB2_IOCTL_OFFLOAD_READ_Response SMB2_IOCTL_REQ_GET_DFS_Referral "
+        "SMB2_IOCTL_RESP_GET_DFS_Referral SMB2_IOCTL_Request "
+        "SMB2_IOCTL_Response SMB2_IOCTL_Validate_Negotiate_Info_Request "
+        "SMB2_IOCTL_Validate_Negotiate_Info_Response "
+        "SMB2_NEGOTIATE_CONTEXT_TYPES SMB2_Negotiate_Context "
+        "SMB2_Negotiate_Protocol_Request SMB2_Negotiate_Protocol_Response "
+        "SMB2_Netname_Negotiate_Context_ID SMB2_OPLOCK_LEVELS "
+        "SMB2_Preauth_Integrity_Capabilities SMB2_Query_Directory_Request "
+        "SMB2_Query_Directory_Response SMB2_Query_Info_Request "
+        "SMB2_Query_Info_Response SMB2_Query_Quota_Info "
+        "SMB2_RDMA_Transform_Capabilities SMB2_Read_Request "
+        "SMB2_Read_Response SMB2_SECURITY_MODE SMB2_SIGNING_ALGORITHMS "
+        "SMB2_Session_Logoff_Request SMB2_Session_Logoff_Response "
+        "SMB2_Session_Setup_Request SMB2_Session_Setup_Response "
+        "SMB2_Set_Info_Request SMB2_Set_Info_Response "
+        "SMB2_Signing_Capabilities SMB2_Transform_Header "
+        "SMB2_Transport_Capabilities SMB2_Tree_Connect_Request "
+        "SMB2_Tree_Connect_Response SMB2_Tree_Disconnect_Request "
+        "SMB2_Tree_Disconnect_Response SMB2_Write_Request SMB2_Write_Response "
+        "SMB2computePreauthIntegrityHashValue SMBSession SMBStreamSocket "
+        "SMB_DIALECTS SOCKADDR_STORAGE SP800108_KDFCTR SRVSVC_SHARE_TYPES "
+        "STORAGE_OFFLOAD_TOKEN WELL_KNOWN_SIDS WINNT_ACCESS_ALLOWED_ACE "
+        "WINNT_ACCESS_ALLOWED_CALLBACK_ACE "
+        "WINNT_ACCESS_ALLOWED_CALLBACK_OBJECT_ACE "
+        "WINNT_ACCESS_ALLOWED_OBJECT_ACE WINNT_ACCESS_DENIED_ACE "
+        "WINNT_ACCESS_DENIED_CALLBACK_ACE "
+        "WINNT_ACCESS_DENIED_CALLBACK_OBJECT_ACE "
+        "WINNT_ACCESS_DENIED_OBJECT_ACE WINNT_ACE_FLAGS WINNT_ACE_HEADER "
+        "WINNT_ACL WINNT_APPLICATION_DATA "
+        "WINNT_APPLICATION_DATA_LITERAL_TOKEN WINNT_SID "
+        "WINNT_SID_IDENTIFIER_AUTHORITY WINNT_SYSTEM_AUDIT_ACE "
+        "WINNT_SYSTEM_AUDIT_CALLBACK_ACE "
+        "WINNT_SYSTEM_AUDIT_CALLBACK_OBJECT_ACE WINNT_SYSTEM_AUDIT_OBJECT_ACE "
+        "WINNT_SYSTEM_MANDATORY_LABEL_ACE WINNT_SYSTEM_RESOURCE_ATTRIBUTE_ACE "
+        "WINNT_SYSTEM_SCOPED_POLICY_ID_ACE YesNoByteField"
+    ),
+    'smbclient': (
+        "CLIUtil LPSHARE_ENUM_STRUCT NetrShareEnum_Request "
+        "NetrShareEnum_Response RandUUID SHARE_INFO_1_CONTAINER SMB_Client "
+        "SMB_RPC_SOCKET SMB_SOCKET human_size io pathlib smbclient valid_ip "
+        "valid_ip6"
+    ),
+    'smbserver': (
+        "DCERPC_Server LPSERVER_INFO_101 LPSHARE_INFO_1 LPWKSTA_INFO_100 "
+        "NetrServerGetInfo_Request NetrServerGetInfo_Response "
+        "NetrShareGetInfo_Request NetrShareGetInfo_Response "
+        "NetrWkstaGetInfo_Request NetrWkstaGetInfo_Response SMBShare "
+        "SMB_DCERPC_Server SMB_Server log_interactive smbserver"
+    ),
+    'snmp': (
+        "ASN1F_IPADDRESS ASN1F_SNMP_PDU_BULK ASN1F_SNMP_PDU_GET "
+        "ASN1F_SNMP_PDU_INFORM ASN1F_SNMP_PDU_NEXT ASN1F_SNMP_PDU_RESPONSE "
+        "ASN1F_SNMP_PDU_SET ASN1F_SNMP_PDU_TRAPv1 ASN1F_SNMP_PDU_TRAPv2 "
+        "ASN1F_TIME_TICKS ASN1F_field ASN1_Class_SNMP ASN1_SNMP_PDU_BULK "
+        "ASN1_SNMP_PDU_GET ASN1_SNMP_PDU_INFORM ASN1_SNMP_PDU_NEXT "
+        "ASN1_SNMP_PDU_RESPONSE ASN1_SNMP_PDU_SET ASN1_SNMP_PDU_TRAPv1 "
+        "ASN1_SNMP_PDU_TRAPv2 BERcodec_SNMP_PDU_BULK BERcodec_SNMP_PDU_GET "
+        "BERcodec_SNMP_PDU_INFORM BERcodec_SNMP_PDU_NEXT "
+        "BERcodec_SNMP_PDU_RESPONSE BERcodec_SNMP_PDU_SET "
+        "BERcodec_SNMP_PDU_TRAPv1 BERcodec_SNMP_PDU_TRAPv2 IntAutoTime SNMP "
+        "SNMP_error SNMP_trap_types SNMPbulk SNMPget SNMPinform SNMPnext "
+        "SNMPresponse SNMPset SNMPtrapv1 SNMPtrapv2 SNMPvarbind snmpwalk"
+    ),
+    'spnego': (
+        "LELongEnumField NEGOEX_BYTE_VECTOR NEGOEX_CHECKSUM "
+        "NEGOEX_EXCHANGE_MESSAGE NEGOEX_EXTENSION_VECTOR "
+        "NEGOEX_MESSAGE_HEADER NEGOEX_NEGO_MESSAGE NEGOEX_VERIFY_MESSAGE "
+        "SPNEGOSSP SPNEGO_MechListMIC SPNEGO_MechType SPNEGO_MechTypes "
+        "SPNEGO_Token SPNEGO_negHints SPNEGO_negToken SPNEGO_negTokenInit "
+        "SPNEGO_negTokenResp mechListMIC"
+    ),
+    'tftp': (
+        "TFTP TFTP_ACK TFTP_DATA TFTP_ERROR TFTP_Error_Codes TFTP_OACK "
+        "TFTP_Option TFTP_Options TFTP_RRQ TFTP_RRQ_server TFTP_WRQ "
+        "TFTP_WRQ_server TFTP_operations TFTP_read TFTP_write split_bottom_up"
+    ),
+    'vrrp': (
+        "IPPROTO_VRRP VRRP VRRPv3"
+    ),
+    'vxlan': (
+        "VXLAN"
+    ),
+    'x509': (
+        "ASN1F_BIT_STRING ASN1F_BIT_STRING_ENCAPS ASN1F_BMP_STRING "
+        "ASN1F_EXT_SEQUENCE ASN1F_IA5_STRING ASN1F_ISO646_STRING "
+        "ASN1F_OCSP_BasicResponse ASN1F_T61_STRING ASN1F_UNIVERSAL_STRING "
+        "ASN1F_UTC_TIME ASN1F_UTF8_STRING ASN1F_X509_CRL ASN1F_X509_Cert "
+        "ASN1F_X509_DirectoryString ASN1F_X509_SubjectPublicKeyInfo "
+        "ASN1F_X509_otherName ASN1P_INTEGER ASN1P_OID ASN1P_PRIVSEQ "
+        "AlgorithmIdentifier ECCurve ECDSAPrivateKey ECDSAPrivateKey_OpenSSL "
+        "ECDSAPublicKey ECDSASignature ECFieldID ECParameters "
+        "ECSpecifiedDomain EdDSAPrivateKey EdDSAPublicKey OCSP_ByKey "
+        "OCSP_ByName OCSP_CertID OCSP_CertStatus OCSP_GoodInfo "
+        "OCSP_ResponderID OCSP_Response OCSP_ResponseBytes OCSP_ResponseData "
+        "OCSP_RevokedInfo OCSP_SingleResponse OCSP_UnknownInfo "
+        "RSAOtherPrimeInfo RSAPrivateKey RSAPrivateKey_OpenSSL RSAPublicKey "
+        "X509_AccessDescription X509_AlgorithmIdentifier X509_Attribute "
+        "X509_AttributeTypeAndValue X509_AttributeValue X509_CRL X509_Cert "
+        "X509_DNSName X509_DirectoryName X509_EDIPartyName "
+        "X509_ExtAuthInfoAccess X509_ExtAuthorityKeyIdentifier "
+        "X509_ExtBasicConstraints X509_ExtCRLDistributionPoints "
+        "X509_ExtCRLNumber X509_ExtCertificateIssuer "
+        "X509_ExtCertificatePolicies X509_ExtCertificateTemplateName "
+        "X509_ExtComment X509_ExtDeltaCRLIndicator X509_ExtDistributionPoint "
+        "X509_ExtDistributionPointName X509_ExtExtendedKeyUsage "
+        "X509_ExtFreshestCRL X509_ExtFullName X509_ExtGeneralSubtree "
+        "X509_ExtInhibitAnyPolicy X509_ExtInvalidityDate "
+        "X509_ExtIssuerAltName X509_ExtIssuingDistributionPoint "
+        "X509_ExtKeyUsage X509_ExtNameConstraints "
+        "X509_ExtNameRelativeToCRLIssuer X509_ExtNetscapeCertType "
+        "X509_ExtNoticeReference X509_ExtOidNTDSCaSecurity "
+        "X509_ExtPolicyConstraints X509_ExtPolicyInformation "
+        "X509_ExtPolicyMappings X509_ExtPolicyQualifierInfo "
+        "X509_ExtPrivateKeyUsagePeriod X509_ExtQcStatement "
+        "X509_ExtQcStatements X509_ExtReasonCode X509_ExtSubjInfoAccess "
+        "X509_ExtSubjectAltName X509_ExtSubjectDirectoryAttributes "
+        "X509_ExtSubjectKeyIdentifier X509_ExtUserNotice X509_Extension "
+        "X509_Extensions X509_GeneralName X509_IPAddress X509_OtherName "
+        "X509_PolicyMapping X509_RDN X509_RFC822Name X509_RegisteredID "
+        "X509_RevokedCertificate X509_SubjectPublicKeyInfo X509_TBSCertList "
+        "X509_TBSCertificate X509_URI X509_Validity X509_X400Address ZuluTime"
+    ),
+    'zigbee': (
+        "LinkStatusEntry ZCLAttributeReport ZCLConfigureReportingRecord "
+        "ZCLConfigureReportingResponseRecord ZCLGeneralConfigureReporting "
+        "ZCLGeneralConfigureReportingResponse ZCLGeneralDefaultResponse "
+        "ZCLGeneralReadAttributes ZCLGeneralReadAttributesResponse "
+        "ZCLGeneralReportAttributes ZCLGeneralWriteAttributes "
+        "ZCLGeneralWriteAttributesResponse ZCLIASZoneZoneEnrollRequest "
+        "ZCLIASZoneZoneEnrollResponse ZCLIASZoneZoneStatusChangeNotification "
+        "ZCLMeteringGetProfile ZCLPriceGetCurrentPrice "
+        "ZCLPriceGetScheduledPrices ZCLPricePublishPrice "
+        "ZCLReadAttributeStatusRecord ZCLWriteAttributeRecord "
+        "ZCLWriteAttributeStatusRecord ZDPActiveEPReq ZDPDeviceAnnce ZEP1 "
+        "ZEP2 ZigBeeBeacon ZigbeeAppCommandPayload ZigbeeAppDataPayload "
+        "ZigbeeAppDataPayloadStub ZigbeeClusterLibrary ZigbeeDeviceProfile "
+        "ZigbeeNWK ZigbeeNWKCommandPayload ZigbeeNWKStub ZigbeeSecurityHeader "
+        "util_mic_len"
+    ),
+}
+
+# Symbols added by each layer to modules imported by scapy.all
+INJECTED = {
+    'dhcp': {
+        'scapy.ansmachine': (
+            "bootpd dhcpd"
+        ),
+    },
+    'dhcp6': {
+        'scapy.ansmachine': (
+            "dhcp6d"
+        ),
+    },
+    'dns': {
+        'scapy.ansmachine': (
+            "dnsd mdnsd"
+        ),
+    },
+    'ldap': {
+        'scapy.ansmachine': (
+            "ldappingd"
+        ),
+    },
+    'llmnr': {
+        'scapy.ansmachine': (
+            "llmnrd"
+        ),
+    },
+    'netbios': {
+        'scapy.ansmachine': (
+            "nbnsd"
+        ),
+    },
+    'radius': {
+        'scapy.ansmachine': (
+            "radiusd"
+        ),
+    },
+}
+
+# Final payload_guess of the classes that lazy layers bind to,
+# as (layer, upper class) in order
+PAYLOAD_GUESS = {
+    'scapy.layers.inet.IP': [
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet', 'scapy.layers.inet.ICMP'),
+        ('inet', 'scapy.layers.inet.TCP'),
+        ('inet', 'scapy.layers.inet.UDP'),
+        ('inet', 'scapy.layers.l2.GRE'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+        ('ipsec', 'scapy.layers.ipsec.AH'),
+        ('ipsec', 'scapy.layers.ipsec.ESP'),
+        ('sctp', 'scapy.layers.sctp.SCTP'),
+        ('vrrp', 'scapy.layers.vrrp.VRRP'),
+        ('vrrp', 'scapy.layers.vrrp.VRRPv3'),
+    ],
+    'scapy.layers.inet.IPerror': [
+        ('inet', 'scapy.layers.inet.IPerror'),
+        ('inet', 'scapy.layers.inet.ICMPerror'),
+        ('inet', 'scapy.layers.inet.TCPerror'),
+        ('inet', 'scapy.layers.inet.UDPerror'),
+        ('sctp', 'scapy.layers.sctp.SCTPerror'),
+    ],
+    'scapy.layers.inet.TCP': [
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('netbios', 'scapy.layers.netbios.NBTSession'),
+        ('netbios', 'scapy.layers.netbios.NBTSession'),
+        ('netbios', 'scapy.layers.netbios.NBTSession'),
+        ('netbios', 'scapy.layers.netbios.NBTSession'),
+        ('netbios', 'scapy.layers.netbios.NBTSession'),
+        ('kerberos', 'scapy.layers.kerberos.KerberosTCPHeader'),
+        ('kerberos', 'scapy.layers.kerberos.KerberosTCPHeader'),
+        ('kerberos', 'scapy.layers.kerberos.KpasswdTCPHeader'),
+        ('kerberos', 'scapy.layers.kerberos.KpasswdTCPHeader'),
+        ('dcerpc', 'scapy.layers.dcerpc.DceRpc'),
+        ('dcerpc', 'scapy.layers.dcerpc.DceRpc'),
+        ('ldap', 'scapy.layers.ldap.LDAP'),
+        ('ldap', 'scapy.layers.ldap.LDAP'),
+        ('ldap', 'scapy.layers.ldap.LDAP'),
+        ('ldap', 'scapy.layers.ldap.LDAP'),
+        ('ldap', 'scapy.layers.ldap.LDAP'),
+        ('pptp', 'scapy.layers.pptp.PPTP'),
+        ('pptp', 'scapy.layers.pptp.PPTP'),
+        ('skinny', 'scapy.layers.skinny.Skinny'),
+        ('skinny', 'scapy.layers.skinny.Skinny'),
+        ('skinny', 'scapy.layers.skinny.Skinny'),
+    ],
+    'scapy.layers.inet.UDP': [
+        ('inet', 'scapy.layers.l2.GRE'),
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('dns', 'scapy.layers.dns.DNS'),
+        ('netbios', 'scapy.layers.netbios.NBNSHeader'),
+        ('netbios', 'scapy.layers.netbios.NBNSHeader'),
+        ('netbios', 'scapy.layers.netbios.NBTDatagram'),
+        ('netbios', 'scapy.layers.netbios.NBTDatagram'),
+        ('kerberos', 'scapy.layers.kerberos.Kerberos'),
+        ('kerberos', 'scapy.layers.kerberos.Kerberos'),
+        ('kerberos', 'scapy.layers.kerberos.Kerberos'),
+        ('kerberos', 'scapy.layers.kerberos.Kpasswd'),
+        ('kerberos', 'scapy.layers.kerberos.Kpasswd'),
+        ('dhcp', 'scapy.layers.dhcp.BOOTP'),
+        ('dhcp', 'scapy.layers.dhcp.BOOTP'),
+        ('dhcp', 'scapy.layers.dhcp.BOOTP'),
+        ('dhcp6', 'scapy.layers.dhcp6._dhcp6_dispatcher'),
+        ('dhcp6', 'scapy.layers.dhcp6._dhcp6_dispatcher'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('hsrp', 'scapy.layers.hsrp.HSRP'),
+        ('ipsec', 'scapy.layers.ipsec.ESP'),
+        ('ipsec', 'scapy.layers.ipsec.ESP'),
+        ('isakmp', 'scapy.layers.isakmp.ISAKMP'),
+        ('isakmp', 'scapy.layers.isakmp.ISAKMP'),
+        ('l2tp', 'scapy.layers.l2tp.L2TP'),
+        ('l2tp', 'scapy.layers.l2tp.L2TP'),
+        ('l2tp', 'scapy.layers.l2tp.L2TP'),
+        ('ldap', 'scapy.layers.ldap.CLDAP'),
+        ('ldap', 'scapy.layers.ldap.CLDAP'),
+        ('ldap', 'scapy.layers.ldap.CLDAP'),
+        ('llmnr', 'scapy.layers.llmnr._LLMNR'),
+        ('llmnr', 'scapy.layers.llmnr._LLMNR'),
+        ('llmnr', 'scapy.layers.llmnr._LLMNR'),
+        ('mgcp', 'scapy.layers.mgcp.MGCP'),
+        ('mgcp', 'scapy.layers.mgcp.MGCP'),
+        ('mgcp', 'scapy.layers.mgcp.MGCP'),
+        ('mobileip', 'scapy.layers.mobileip.MobileIP'),
+        ('mobileip', 'scapy.layers.mobileip.MobileIP'),
+        ('mobileip', 'scapy.layers.mobileip.MobileIP'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('netflow', 'scapy.layers.netflow.NetflowHeader'),
+        ('ntp', 'scapy.layers.ntp.NTP'),
+        ('ntp', 'scapy.layers.ntp.NTP'),
+        ('ntp', 'scapy.layers.ntp.NTP'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('radius', 'scapy.layers.radius.Radius'),
+        ('rip', 'scapy.layers.rip.RIP'),
+        ('rip', 'scapy.layers.rip.RIP'),
+        ('rip', 'scapy.layers.rip.RIP'),
+        ('snmp', 'scapy.layers.snmp.SNMP'),
+        ('snmp', 'scapy.layers.snmp.SNMP'),
+        ('snmp', 'scapy.layers.snmp.SNMP'),
+        ('snmp', 'scapy.layers.snmp.SNMP'),
+        ('snmp', 'scapy.layers.snmp.SNMP'),
+        ('tftp', 'scapy.layers.tftp.TFTP'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('vxlan', 'scapy.layers.vxlan.VXLAN'),
+        ('zigbee', 'scapy.layers.zigbee.ZEP2'),
+        ('zigbee', 'scapy.layers.zigbee.ZEP2'),
+        ('zigbee', 'scapy.layers.zigbee.ZEP2'),
+    ],
+    'scapy.layers.inet6.IPerror6': [
+        ('inet6', 'scapy.layers.inet.TCPerror'),
+        ('inet6', 'scapy.layers.inet.UDPerror'),
+        ('sctp', 'scapy.layers.sctp.SCTPerror'),
+    ],
+    'scapy.layers.inet6.IPv6': [
+        ('inet6', 'scapy.layers.inet.TCP'),
+        ('inet6', 'scapy.layers.inet.UDP'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+        ('inet6', 'scapy.layers.inet.IP'),
+        ('inet6', 'scapy.layers.l2.GRE'),
+        ('ipsec', 'scapy.layers.ipsec.AH'),
+        ('ipsec', 'scapy.layers.ipsec.ESP'),
+        ('sctp', 'scapy.layers.sctp.SCTP'),
+        ('vrrp', 'scapy.layers.vrrp.VRRPv3'),
+    ],
+    'scapy.layers.l2.CookedLinux': [
+        ('l2', 'scapy.layers.l2.LLC'),
+        ('l2', 'scapy.layers.l2.Dot1Q'),
+        ('l2', 'scapy.layers.l2.Dot1AD'),
+        ('l2', 'scapy.layers.l2.Dot1AH'),
+        ('l2', 'scapy.layers.l2.Ether'),
+        ('l2', 'scapy.layers.l2.ARP'),
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+        ('eap', 'scapy.layers.eap.EAPOL'),
+        ('ir', 'scapy.layers.ir.IrLAPHead'),
+        ('ppp', 'scapy.layers.ppp.PPPoED'),
+        ('ppp', 'scapy.layers.ppp.PPPoE'),
+    ],
+    'scapy.layers.l2.Dot1Q': [
+        ('l2', 'scapy.layers.l2.Dot1AD'),
+        ('l2', 'scapy.layers.l2.Dot1AH'),
+        ('bluetooth4LE', 'scapy.contrib.ethercat.EtherCat'),
+    ],
+    'scapy.layers.l2.Ether': [
+        ('l2', 'scapy.layers.l2.LLC'),
+        ('l2', 'scapy.layers.l2.LLC'),
+        ('l2', 'scapy.layers.l2.Dot1Q'),
+        ('l2', 'scapy.layers.l2.Dot1AD'),
+        ('l2', 'scapy.layers.l2.Dot1AH'),
+        ('l2', 'scapy.layers.l2.Ether'),
+        ('l2', 'scapy.layers.l2.ARP'),
+        ('bluetooth4LE', 'scapy.contrib.ethercat.EtherCat'),
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+        ('eap', 'scapy.layers.eap.EAPOL'),
+        ('ppp', 'scapy.layers.ppp.PPPoED'),
+        ('ppp', 'scapy.layers.ppp.PPPoE'),
+        ('ppp', 'scapy.layers.ppp.PPP_IPCP'),
+        ('ppp', 'scapy.layers.ppp.PPP_ECP'),
+        ('lltd', 'scapy.layers.lltd.LLTD'),
+        ('sixlowpan', 'scapy.layers.sixlowpan.SixLoWPAN'),
+    ],
+    'scapy.layers.l2.Loopback': [
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+    ],
+    'scapy.layers.l2.SNAP': [
+        ('l2', 'scapy.layers.l2.Dot1Q'),
+        ('l2', 'scapy.layers.l2.Dot1AD'),
+        ('l2', 'scapy.layers.l2.Dot1AH'),
+        ('l2', 'scapy.layers.l2.Ether'),
+        ('l2', 'scapy.layers.l2.ARP'),
+        ('l2', 'scapy.layers.l2.STP'),
+        ('inet', 'scapy.layers.inet.IP'),
+        ('inet6', 'scapy.layers.inet6.IPv6'),
+        ('eap', 'scapy.layers.eap.EAPOL'),
+    ],
+}
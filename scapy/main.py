@@ -413,9 +413,15 @@ def _scapy_prestart_builtins():
 def _scapy_builtins():
     # type: () -> Dict[str, Any]
     """Load Scapy and return all builtins"""
+    scapy_all = importlib.import_module(".all", "scapy")
+    # With conf.lazy_layers, the interactive shell still gets all the layers
+    layers_all = importlib.import_module(".layers.all", "scapy")
+    layers_all._load_lazy_layers()
+    res = {k: layers_all.__dict__[k] for k in layers_all.__all__}
+    res.update(scapy_all.__dict__)
     return {
         k: v
-        for k, v in importlib.import_module(".all", "scapy").__dict__.copy().items()
+        for k, v in res.items()
         if _validate_local(k)
     }
 
@@ -14,9 +14,11 @@ Provides:
 """
 
 from collections import defaultdict
+from decimal import Decimal
 
 import json
 import re
+import struct
 import time
 import itertools
 import copy
@@ -39,6 +41,8 @@ from scapy.fields import (
     PacketListField,
     RawVal,
     StrField,
+    _BitField,
+    _FieldContainer,
 )
 from scapy.config import conf, _version_checker
 from scapy.compat import raw, orb, bytes_encode
@@ -79,19 +83,297 @@ except ImportError:
 _T = TypeVar("_T", Dict[str, Any], Optional[Dict[str, Any]])
 
 
+def _field_error(ex, f):
+    # type: (Exception, AnyField) -> None
+    """Prefixes the message of an exception raised while building f"""
+    try:
+        ex.args = (
+            "While dissecting field '%s': " % f.name + ex.args[0],
+        ) + ex.args[1:]
+    except (AttributeError, IndexError):
+        pass
+
+
+class _FixedLayout(object):
+    """
+    A run of consecutive fixed-size fields (Field and BitField instances
+    that don't override getfield() / addfield()), dissected and built with
+    a single precompiled struct.Struct call.
+
+    This is only used internally by the Packet dissection plans.
+    """
+    __slots__ = ["fields", "layout", "struct", "sz"]
+
+    # struct codes that unpack to a single value. Repeat counts are only
+    # allowed for strings.
+    _FMT = re.compile(r"^(\d*s|[cbB?hHiIlLqQefd])$")
+    _BITS_FMT = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+    def __init__(self,
+                 fields,  # type: List[AnyField]
+                 layout,  # type: List[Tuple[Field[Any, Any], int, Optional[int], int, bool]]  # noqa: E501
+                 fmt,  # type: str
+                 ):
+        # type: (...) -> None
+        self.fields = fields
+        self.layout = layout
+        self.struct = struct.Struct(fmt)
+        self.sz = self.struct.size
+
+    @classmethod
+    def _prefix(cls, f):
+        # type: (AnyField) -> Optional[str]
+        """
+        Returns the struct byte order of a field that can be part of a
+        fixed layout, "" for a (big endian) BitField, or None.
+        Emph() fields must be unwrapped first.
+        """
+        if not isinstance(f, Field):
+            return None
+        ftype = type(f)
+        if ftype.getfield is Field.getfield and \
+                ftype.addfield is Field.addfield:
+            if f.fmt[0] in "!<>=" and cls._FMT.match(f.fmt[1:]):
+                return "!" if f.fmt[0] == ">" else f.fmt[0]
+        elif ftype.getfield is BitField.getfield and \
+                ftype.addfield is BitField.addfield:
+            if not f.rev and 0 < f.size <= 64:  # type: ignore
+                return ""
+        return None
+
+    @classmethod
+    def _bits_left(cls, f, left):
+        # type: (AnyField, Optional[int]) -> Optional[int]
+        """
+        Returns the number of bits between the end of f and the next
+        byte boundary where a run can start, when f is not part of a run
+        and starts `left` bits before a byte boundary. None if unknown.
+        """
+        if left is None:
+            return None
+        if isinstance(f, _BitField):
+            if f.rev and not left:
+                # The bytes of the whole group are reversed
+                return max((-f.size) % 8, f.tot_size * 8 - f.size)
+            if left >= f.size:
+                return left - f.size
+            return (left - f.size) % 8
+        if isinstance(f, MultipleTypeField):
+            lefts = set(cls._bits_left(fld, left) for fld, *_ in f.flds)
+            lefts.add(cls._bits_left(f.dflt, left))
+        elif isinstance(f, ConditionalField):
+            lefts = {left, cls._bits_left(f.fld, left)}
+        elif isinstance(f, _FieldContainer):
+            lefts = {cls._bits_left(f.fld, left)}
+        else:
+            # Other fields are assumed to be aligned
+            lefts = {None if left else 0}
+        return lefts.pop() if len(lefts) == 1 else None
+
+    @classmethod
+    def split(cls, flist):
+        # type: (Sequence[AnyField]) -> List[Union[AnyField, _FixedLayout]]
+        """
+        Group the maximal runs of fixed-size fields of a fields_desc list.
+        Other fields, and runs of a single field, are returned as is.
+        A run never starts inside a group of bits that isn't part of it.
+        """
+        result = []  # type: List[Union[AnyField, _FixedLayout]]
+        run = []  # type: List[AnyField]
+        layout = []  # type: List[Tuple[Field[Any, Any], int, Optional[int], int, bool]]  # noqa: E501
+        codes = []  # type: List[str]
+        order = [""]
+        bits = []  # type: List[Tuple[AnyField, Field[Any, Any]]]
+        # Bits until the next byte boundary, outside of the runs
+        left = 0  # type: Optional[int]
+
+        def tracked(f):
+            # type: (AnyField) -> bool
+            return bool(f.islist or f.holds_packets or f.ismutable)
+
+        def close():
+            # type: () -> None
+            if len(run) > 1:
+                result.append(cls(run[:], layout[:], order[0] + "".join(codes)))
+            else:
+                result.extend(run)
+            result.extend(b for b, _ in bits)
+            del run[:], layout[:], codes[:], bits[:]
+            order[0] = ""
+
+        for f in flist:
+            fld = f.fld if isinstance(f, Emph) else f
+            prefix = cls._prefix(fld)
+            if left != 0 or prefix is None or (bits and prefix):
+                # Not part of a run, or breaks an unfinished bit group
+                if bits:
+                    left = -sum(b.size for _, b in bits) % 8  # type: ignore
+                close()
+                result.append(f)
+                left = cls._bits_left(fld, left)
+                continue
+            if order[0] and order[0] != (prefix or "!"):
+                close()
+            order[0] = prefix or "!"
+            if prefix:
+                run.append(f)
+                layout.append((fld, len(codes), None, 0, tracked(fld)))
+                codes.append(fld.fmt[1:])
+                continue
+            # BitField
+            bits.append((f, fld))
+            total = sum(b.size for _, b in bits)  # type: ignore
+            if total % 8:
+                continue
+            if total not in cls._BITS_FMT:
+                close()
+                continue
+            shift = total
+            for b, bfld in bits:
+                shift -= bfld.size  # type: ignore
+                layout.append((
+                    bfld, len(codes), shift, (1 << bfld.size) - 1,  # type: ignore  # noqa: E501
+                    tracked(bfld)
+                ))
+                run.append(b)
+            codes.append(cls._BITS_FMT[total])
+            del bits[:]
+        close()
+        return result
+
+    def getfields(self, pkt, s):
+        # type: (Packet, bytes) -> bytes
+        """
+        Dissect all the fields of the run into pkt, and return the rest
+        of the string
+        """
+        vals = self.struct.unpack_from(s)
+        # Set by Packet.do_dissect() before the fields are dissected
+        cache_fields = cast(Dict[str, Any], pkt.raw_packet_cache_fields)
+        for f, idx, shift, mask, tracked in self.layout:
+            fval = vals[idx]
+            if shift is not None:
+                fval = (fval >> shift) & mask
+            fval = f.m2i(pkt, fval)
+            if tracked and fval is not None:
+                cache_fields[f.name] = \
+                    pkt._raw_packet_cache_field_value(f, fval, copy=True)
+            pkt.fields[f.name] = fval
+        return s[self.sz:]
+
+    def addfields(self, pkt, s):
+        # type: (Packet, bytes) -> Optional[bytes]
+        """
+        Build all the fields of the run, or return None if it must be
+        done field by field (RawVal, values that struct can't pack,
+        unfinished bits...)
+        """
+        if isinstance(s, tuple):
+            return None
+        vals = []  # type: List[Any]
+        v = 0
+        for f, idx, shift, mask, _ in self.layout:
+            val = pkt.getfieldval(f.name)
+            if isinstance(val, RawVal):
+                return None
+            try:
+                if shift is None:
+                    vals.append(f.i2m(pkt, val))
+                    continue
+                v <<= f.size  # type: ignore
+                v |= int(f.i2m(pkt, val) & mask)
+            except Exception as ex:
+                _field_error(ex, f)
+                raise ex
+            if not shift:
+                vals.append(v)
+                v = 0
+        try:
+            return s + self.struct.pack(*vals)
+        except struct.error:
+            # Let the field that fails report the error
+            return None
+
+
+class _PayloadGuessIndex(object):
+    """
+    Index of a payload_guess list, as filled by bind_bottom_up(), used by
+    Packet.guess_payload_class().
+
+    The bindings are grouped by the names of the fields they check, and
+    each group is a dict from the fields values to the first matching
+    binding. Bindings on other types of values are checked in order.
+    """
+    __slots__ = ["payload_guess", "groups", "others"]
+
+    # Types for which a dict lookup behaves like ==
+    _TYPES = (int, bool, str, bytes)
+
+    def __init__(self,
+                 payload_guess,  # type: List[Tuple[Dict[str, Any], Type[Packet]]]  # noqa: E501
+                 ):
+        # type: (...) -> None
+        self.payload_guess = payload_guess
+        self.groups = {}  # type: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], Tuple[int, Type[Packet]]]]  # noqa: E501
+        self.others = []  # type: List[Tuple[int, Dict[str, Any], Type[Packet]]]
+        for i, (fval, cls) in enumerate(payload_guess):
+            if fval and all(type(v) in self._TYPES for v in fval.values()):
+                names = tuple(sorted(fval))
+                self.groups.setdefault(names, {}).setdefault(
+                    tuple(fval[k] for k in names), (i, cls)
+                )
+            else:
+                self.others.append((i, fval, cls))
+
+    def guess(self, pkt):
+        # type: (Packet) -> Optional[Type[Packet]]
+        """Return the first class of payload_guess matching pkt, or None"""
+        best = None  # type: Optional[Tuple[int, Type[Packet]]]
+        for names, values in self.groups.items():
+            try:
+                key = tuple(pkt.getfieldval(k) for k in names)
+            except AttributeError:
+                continue
+            if any(type(v) not in self._TYPES for v in key):
+                return self.guess_slow(pkt)
+            match = values.get(key)
+            if match is not None and (best is None or match[0] < best[0]):
+                best = match
+        for i, fval, cls in self.others:
+            if best is not None and i > best[0]:
+                break
+            try:
+                if all(v == pkt.getfieldval(k) for k, v in fval.items()):
+                    return cls
+            except AttributeError:
+                pass
+        return None if best is None else best[1]
+
+    def guess_slow(self, pkt):
+        # type: (Packet) -> Optional[Type[Packet]]
+        """Same as guess() but checks all the bindings in order"""
+        for fval, cls in self.payload_guess:
+            try:
+                if all(v == pkt.getfieldval(k) for k, v in fval.items()):
+                    return cls
+            except AttributeError:
+                pass
+        return None
+
+
 class Packet(
     BasePacket,
     _CanvasDumpExtended,
     metaclass=Packet_metaclass
 ):
     __slots__ = [
-        "time", "sent_time", "name",
+        "_time", "_time_ns", "_time_prec", "sent_time", "name",
         "default_fields", "fields", "fieldtype",
         "overload_fields", "overloaded_fields",
         "packetfields",
         "original", "explicit", "raw_packet_cache",
         "raw_packet_cache_fields", "_pkt", "post_transforms",
-        "stop_dissection_after",
+        "stop_dissection_after", "lazy_dissection", "_lazy_payload",
         # then payload, underlayer and parent
         "payload", "underlayer", "parent",
         "name",
@@ -117,6 +399,16 @@ class Packet(
     class_default_fields = {}  # type: Dict[Type[Packet], Dict[str, Any]]
     class_default_fields_ref = {}  # type: Dict[Type[Packet], List[str]]
     class_fieldtype = {}  # type: Dict[Type[Packet], Dict[str, AnyField]]  # noqa: E501
+    class_dissect_plan = {}  # type: Dict[Type[Packet], List[Tuple[Any, bool, bool, bool]]]  # noqa: E501
+    class_payload_guess_index = {}  # type: Dict[Type[Packet], _PayloadGuessIndex]  # noqa: E501
+    # conf.lazy_layers: "module.Class" -> loads the layers binding to it
+    class_lazy_bindings = {}  # type: Dict[str, Callable[[], None]]
+    # DEV: describe post_build() for PacketTemplate. template_computed_fields
+    # are the fields it sets when they are None, template_checksum_field is
+    # (field, coverage, value used instead of 0) where coverage is
+    # "header", "payload" or "pseudo" (payload and pseudo-header)
+    template_computed_fields = None  # type: Optional[Tuple[str, ...]]
+    template_checksum_field = None  # type: Optional[Tuple[str, str, int]]
 
     @classmethod
     def from_hexcap(cls):
@@ -152,10 +444,13 @@ class Packet(
                  _underlayer=None,  # type: Optional[Packet]
                  _parent=None,  # type: Optional[Packet]
                  stop_dissection_after=None,  # type: Optional[Type[Packet]]
+                 lazy_dissection=False,  # type: bool
                  **fields  # type: Any
                  ):
         # type: (...) -> None
-        self.time = time.time()  # type: Union[EDecimal, float]
+        self._time = time.time()  # type: Union[EDecimal, float, None]
+        self._time_ns = None  # type: Optional[int]
+        self._time_prec = 9
         self.sent_time = None  # type: Union[EDecimal, float, None]
         self.name = (self.__class__.__name__
                      if self._name is None else
@@ -182,6 +477,8 @@ class Packet(
         self.comment = None  # type: Optional[bytes]
         self.process_information = None  # type: Optional[Dict[str, Any]]
         self.stop_dissection_after = stop_dissection_after
+        self.lazy_dissection = lazy_dissection
+        self._lazy_payload = None  # type: Optional[List[Any]]
         if _pkt:
             self.dissect(_pkt)
             if not _internal:
@@ -214,6 +511,45 @@ class Packet(
         else:
             self.post_transforms = [post_transform]
 
+    @property
+    def time(self):
+        # type: () -> Union[EDecimal, float]
+        """The time of the packet, in seconds since the epoch. When only
+        time_ns is known, it is computed on first access, with _time_prec
+        decimals (e.g. 6 for packets read from a microsecond pcap)."""
+        if self._time is None:
+            prec = self._time_prec
+            self._time = EDecimal(
+                Decimal(cast(int, self._time_ns) // 10 ** (9 - prec)).scaleb(-prec)
+            )
+        return self._time
+
+    @time.setter
+    def time(self, value):
+        # type: (Union[EDecimal, float]) -> None
+        self._time = value
+        self._time_ns = None
+
+    @property
+    def time_ns(self):
+        # type: () -> int
+        """The time of the packet, as an integer number of nanoseconds
+        since the epoch. Readers and writers use it to keep timestamps
+        exact."""
+        if self._time_ns is None:
+            self._time_ns = int(
+                (Decimal(cast(float, self._time)) * 1000000000)
+                .to_integral_value()
+            )
+        return self._time_ns
+
+    @time_ns.setter
+    def time_ns(self, value):
+        # type: (int) -> None
+        self._time_ns = value
+        self._time = None
+        self._time_prec = 9
+
     _PickleType = Tuple[
         Union[EDecimal, float],
         Optional[Union[EDecimal, float, None]],
@@ -354,11 +690,47 @@ class Packet(
         # Last to avoid racing issues
         Packet.class_default_fields[cls_name] = class_default_fields
 
+    def prepare_dissect_plan(self, flist):
+        # type: (Sequence[AnyField]) -> List[Tuple[Any, bool, bool, bool]]
+        """
+        Prepare the cached dissection plan of the fields_desc list.
+
+        Each entry is a tuple (field, conditional, tracked, may_end) where:
+
+        - field: a field, or a run of fixed-size fields (_FixedLayout)
+        - conditional: the field is a ConditionalField, and is skipped when
+          its condition does not match
+        - tracked: the field holds a mutable value that needs to be stored
+          in raw_packet_cache_fields
+        - may_end: the dissection can stop after this field if no bytes
+          are left
+        """
+        plan = []  # type: List[Tuple[Any, bool, bool, bool]]
+        for f in _FixedLayout.split(flist):
+            if isinstance(f, _FixedLayout):
+                plan.append((f, False, False, False))
+                continue
+            conditional = isinstance(f, ConditionalField)
+            plan.append((
+                f,
+                conditional,
+                bool(f.islist or f.holds_packets or f.ismutable),
+                isinstance(f, MayEnd) or (
+                    conditional and isinstance(f.fld, MayEnd)  # type: ignore
+                ),
+            ))
+        Packet.class_dissect_plan[self.__class__] = plan
+        return plan
+
     def dissection_done(self, pkt):
         # type: (Packet) -> None
         """DEV: will be called after a dissection is completed"""
         self.post_dissection(pkt)
-        self.payload.dissection_done(pkt)
+        if self._lazy_payload is not None:
+            # Will be called once the payload is dissected
+            self._lazy_payload[4] = pkt
+        else:
+            self.payload.dissection_done(pkt)
 
     def post_dissection(self, pkt):
         # type: (Packet) -> None
@@ -391,6 +763,10 @@ class Packet(
 
     def remove_payload(self):
         # type: () -> None
+        if self._lazy_payload is not None:
+            # No need to dissect a payload that is removed
+            self._lazy_payload = None
+            self.payload = NoPayload()
         self.payload.remove_underlayer(self)
         self.payload = NoPayload()
         self.overloaded_fields = {}
@@ -434,7 +810,9 @@ class Packet(
         clone.post_transforms = self.post_transforms[:]
         clone.payload = self.payload.copy()
         clone.payload.add_underlayer(clone)
-        clone.time = self.time
+        clone._time = self._time
+        clone._time_ns = self._time_ns
+        clone._time_prec = self._time_prec
         clone.comment = self.comment
         clone.direction = self.direction
         clone.sniffed_on = self.sniffed_on
@@ -476,6 +854,10 @@ class Packet(
 
     def __getattr__(self, attr):
         # type: (str) -> Any
+        if attr == "payload" and self._lazy_payload is not None:
+            # The payload is only dissected when first accessed
+            self.do_dissect_lazy_payload()
+            return self.payload
         try:
             fld, v = self.getfield_and_val(attr)
         except ValueError:
@@ -508,7 +890,9 @@ class Packet(
 
     def __setattr__(self, attr, val):
         # type: (str, Any) -> None
-        if attr in self.__all_slots__:
+        if attr in self.__all_slots__ or attr in ("time", "time_ns"):
+            # time and time_ns are properties over the _time and _time_ns
+            # slots
             return object.__setattr__(self, attr, val)
         try:
             return self.setfieldval(attr, val)
@@ -708,23 +1092,30 @@ class Packet(
                     break
             if self.raw_packet_cache is not None:
                 return self.raw_packet_cache
+        plan = Packet.class_dissect_plan.get(self.__class__, None)
+        if plan is None:
+            plan = self.prepare_dissect_plan(self.fields_desc)
         p = b""
-        for f in self.fields_desc:
-            val = self.getfieldval(f.name)
-            if isinstance(val, RawVal):
-                p += bytes(val)
+        for entry, _, _, _ in plan:
+            if isinstance(entry, _FixedLayout):
+                q = entry.addfields(self, p)
+                if q is not None:
+                    p = q
+                    continue
+                # Build field by field
+                flist = entry.fields
             else:
-                try:
-                    p = f.addfield(self, p, val)
-                except Exception as ex:
+                flist = [entry]
+            for f in flist:
+                val = self.getfieldval(f.name)
+                if isinstance(val, RawVal):
+                    p += bytes(val)
+                else:
                     try:
-                        ex.args = (
-                            "While dissecting field '%s': " % f.name +
-                            ex.args[0],
-                        ) + ex.args[1:]
-                    except (AttributeError, IndexError):
-                        pass
-                    raise ex
+                        p = f.addfield(self, p, val)
+                    except Exception as ex:
+                        _field_error(ex, f)
+                        raise ex
         return p
 
     def do_build_payload(self):
@@ -1018,21 +1409,36 @@ class Packet(
         # type: (bytes) -> bytes
         _raw = s
         self.raw_packet_cache_fields = {}
-        for f in self.fields_desc:
+        plan = Packet.class_dissect_plan.get(self.__class__, None)
+        if plan is None:
+            plan = self.prepare_dissect_plan(self.fields_desc)
+        for f, conditional, tracked, may_end in plan:
+            if isinstance(f, _FixedLayout):
+                if not isinstance(s, tuple) and len(s) >= f.sz:
+                    s = f.getfields(self, s)
+                    continue
+                # Not enough data: dissect field by field
+                for fld in f.fields:
+                    s, fval = fld.getfield(self, s)
+                    if (fld.islist or fld.holds_packets or fld.ismutable) \
+                            and fval is not None:
+                        self.raw_packet_cache_fields[fld.name] = \
+                            self._raw_packet_cache_field_value(fld, fval,
+                                                               copy=True)
+                    self.fields[fld.name] = fval
+                continue
             s, fval = f.getfield(self, s)
             # Skip unused ConditionalField
-            if isinstance(f, ConditionalField) and fval is None:
+            if conditional and fval is None:
                 continue
             # We need to track fields with mutable values to discard
             # .raw_packet_cache when needed.
-            if (f.islist or f.holds_packets or f.ismutable) and fval is not None:
+            if tracked and fval is not None:
                 self.raw_packet_cache_fields[f.name] = \
                     self._raw_packet_cache_field_value(f, fval, copy=True)
             self.fields[f.name] = fval
             # Nothing left to dissect
-            if not s and (isinstance(f, MayEnd) or
-                          (fval is not None and isinstance(f, ConditionalField) and
-                           isinstance(f.fld, MayEnd))):
+            if not s and may_end:
                 break
         self.raw_packet_cache = _raw[:-len(s)] if s else _raw
         self.explicit = 1
@@ -1055,27 +1461,87 @@ class Packet(
                 self.add_payload(p)
                 return
             cls = self.guess_payload_class(s)
-            try:
-                p = cls(
-                    s,
-                    stop_dissection_after=self.stop_dissection_after,
-                    _internal=1,
-                    _underlayer=self,
-                )
-            except KeyboardInterrupt:
-                raise
-            except Exception:
-                if conf.debug_dissector:
-                    if issubtype(cls, Packet):
-                        log_runtime.error("%s dissector failed", cls.__name__)
-                    else:
-                        log_runtime.error("%s.guess_payload_class() returned "
-                                          "[%s]",
-                                          self.__class__.__name__, repr(cls))
-                    if cls is not None:
-                        raise
-                p = conf.raw_layer(s, _internal=1, _underlayer=self)
-            self.add_payload(p)
+            self.add_payload(self._dissect_payload_as(cls, s))
+
+    def _dissect_payload_as(self, cls, s):
+        # type: (Type[Packet], bytes) -> Packet
+        """
+        Dissect the layer's payload using the guessed class, or
+        conf.raw_layer if that fails.
+        """
+        try:
+            return cls(
+                s,
+                stop_dissection_after=self.stop_dissection_after,
+                lazy_dissection=self.lazy_dissection,
+                _internal=1,
+                _underlayer=self,
+            )
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            if conf.debug_dissector:
+                if issubtype(cls, Packet):
+                    log_runtime.error("%s dissector failed", cls.__name__)
+                else:
+                    log_runtime.error("%s.guess_payload_class() returned "
+                                      "[%s]",
+                                      self.__class__.__name__, repr(cls))
+                if cls is not None:
+                    raise
+            return conf.raw_layer(s, _internal=1, _underlayer=self)
+
+    def defer_dissect_payload(self, s, pad):
+        # type: (bytes, Optional[bytes]) -> bool
+        """
+        Store the layer's payload (and padding) to dissect it the first
+        time it is accessed. This is used in lazy dissection mode.
+
+        :param s: the raw payload
+        :param pad: the raw padding
+        :return: False if the payload must be dissected right away
+        """
+        if not s or \
+                type(self).do_dissect_payload is not Packet.do_dissect_payload or \
+                type(self).dissection_done is not Packet.dissection_done:
+            return False
+        stop = bool(
+            self.stop_dissection_after and
+            isinstance(self, self.stop_dissection_after)
+        )
+        # Guess now, as the fields of this layer might be changed
+        # before the payload is accessed.
+        cls = None if stop else self.guess_payload_class(s)
+        pads = [pad] if pad and conf.padding else []
+        # [payload, stop dissection, payload class, paddings,
+        #  dissection_done() packet]
+        self._lazy_payload = [s, stop, cls, pads, None]
+        object.__delattr__(self, "payload")
+        return True
+
+    def do_dissect_lazy_payload(self):
+        # type: () -> None
+        """
+        Perform the dissection of a payload stored by
+        defer_dissect_payload()
+        """
+        s, stop, cls, pads, pkt = cast(List[Any], self._lazy_payload)
+        self._lazy_payload = None
+        self.payload = NoPayload()
+        if stop:
+            # stop dissection here
+            p = conf.raw_layer(s, _internal=1, _underlayer=self)
+        else:
+            p = self._dissect_payload_as(cls, s)
+        self.add_payload(p)
+        if pads and p._lazy_payload is not None:
+            # The paddings go after the payload's own padding
+            p._lazy_payload[3].extend(pads)
+        else:
+            for pad in pads:
+                self.add_payload(conf.padding_layer(pad))
+        if pkt is not None:
+            p.dissection_done(pkt)
 
     def dissect(self, s):
         # type: (bytes) -> None
@@ -1086,6 +1552,8 @@ class Packet(
         s = self.post_dissect(s)
 
         payl, pad = self.extract_padding(s)
+        if self.lazy_dissection and self.defer_dissect_payload(payl, pad):
+            return
         self.do_dissect_payload(payl)
         if pad and conf.padding:
             self.add_payload(conf.padding_layer(pad))
@@ -1100,13 +1568,21 @@ class Packet(
         :return: the payload class
         """
         for t in self.aliastypes:
-            for fval, cls in t.payload_guess:
-                try:
-                    if all(v == self.getfieldval(k)
-                           for k, v in fval.items()):
-                        return cls  # type: ignore
-                except AttributeError:
-                    pass
+            # The index is rebuilt each time payload_guess is replaced
+            # (bind_bottom_up, split_bottom_up, conf.layers.filter...)
+            index = Packet.class_payload_guess_index.get(t, None)
+            if index is None or index.payload_guess is not t.payload_guess:
+                if Packet.class_lazy_bindings:
+                    load = Packet.class_lazy_bindings.pop(
+                        "%s.%s" % (t.__module__, t.__name__), None
+                    )
+                    if load is not None:
+                        load()
+                index = _PayloadGuessIndex(t.payload_guess)
+                Packet.class_payload_guess_index[t] = index
+            cls = index.guess(self)
+            if cls is not None:
+                return cls
         return self.default_payload_class(payload)
 
     def default_payload_class(self, payload):
@@ -1138,7 +1614,9 @@ class Packet(
         pkt.fields = kargs
         pkt.default_fields = self.copy_fields_dict(self.default_fields)
         pkt.overloaded_fields = self.overloaded_fields.copy()
-        pkt.time = self.time
+        pkt._time = self._time
+        pkt._time_ns = self._time_ns
+        pkt._time_prec = self._time_prec
         pkt.underlayer = self.underlayer
         pkt.parent = self.parent
         pkt.post_transforms = self.post_transforms
@@ -1251,6 +1729,23 @@ class Packet(
         and its answer."""
         return self.payload.hashret()
 
+    def matchkey(self):
+        # type: () -> bytes
+        """Returns a string that has the same value for a request and its
+        answer, like hashret(), but that tells more requests apart. It is
+        made of hashret() and of the extra_matchkey() of each layer."""
+        key = self.hashret()
+        for layer in self.iterpayloads():
+            key += layer.extra_matchkey()
+        return key
+
+    def extra_matchkey(self):
+        # type: () -> bytes
+        """DEV: returns what this layer adds to hashret() in matchkey().
+        It must have the same value in a request and in all its answers
+        (including ICMP errors)."""
+        return b""
+
     def answers(self, other):
         # type: (Packet) -> int
         """DEV: true if self is an answer from other"""
@@ -1404,6 +1899,15 @@ values.
         # type: () -> Tuple[Optional[str], Optional[str], Optional[str]]
         return self.payload.route()
 
+    def template_pseudo_header(self):
+        # type: () -> Optional[Tuple[str, str]]
+        """
+        DEV: returns the names of the fields of this layer that are
+        used in the pseudo-header of the checksum of its payload, or
+        None. Used by PacketTemplate.
+        """
+        return None
+
     def fragment(self, *args, **kargs):
         # type: (*Any, **Any) -> List[Packet]
         return self.payload.fragment(*args, **kargs)
@@ -2025,6 +2529,448 @@ conf.padding_layer = Padding
 if conf.default_l2 is None:
     conf.default_l2 = Raw
 
+
+######################
+#  Packet templates  #
+######################
+
+
+def _sum16(buf, lo, hi):
+    # type: (bytearray, int, int) -> int
+    """Sum of the big endian 16-bit words of buf[lo:hi], zero padded"""
+    n = hi - lo
+    s = sum(struct.unpack_from("!%dH" % (n >> 1), buf, lo))  # type: int
+    if n & 1:
+        s += buf[hi - 1] << 8
+    return s
+
+
+def _template_field(pkt, fld, val):
+    # type: (Packet, AnyField, Any) -> Optional[Tuple[Field[Any, Any], Any]]
+    """Returns the fixed-size field (or big endian bit field) that builds
+    fld in pkt, and its value, or None"""
+    while True:
+        if isinstance(fld, Emph):
+            fld = fld.fld
+        elif isinstance(fld, ConditionalField):
+            if not fld._evalcond(pkt):
+                return None
+            fld = fld.fld
+        elif isinstance(fld, MultipleTypeField):
+            fld, val = fld._find_fld_pkt_val(pkt, val)
+        else:
+            break
+    if isinstance(fld, Field) and (
+            type(fld).addfield is Field.addfield or
+            type(fld).addfield is BitField.addfield and
+            not fld.rev  # type: ignore
+    ):
+        return fld, val
+    return None
+
+
+def _template_layout(pkt):
+    # type: (Packet) -> List[Any]
+    """The conditions and field choices that define the layout of pkt"""
+    layout = []  # type: List[Any]
+    for fld in pkt.fields_desc:
+        if isinstance(fld, ConditionalField):
+            layout.append(fld._evalcond(pkt))
+        elif isinstance(fld, MultipleTypeField):
+            layout.append(fld._find_fld_pkt_val(
+                pkt, pkt.getfieldval(fld.name)
+            )[0])
+    return layout
+
+
+class PacketTemplate(object):
+    """
+    Iterates through the packets generated by a Packet, like iter(pkt),
+    but only builds the first one. For the next ones, the bytes of the
+    fields that vary are patched in place, and the checksums computed
+    by post_build() are updated incrementally (RFC 1624). The generated
+    packets hold their bytes in raw_packet_cache.
+
+    Only fixed-size fields can vary, and the layers that override
+    post_build() must describe it with template_computed_fields and
+    template_checksum_field. Other packets are iterated as usual.
+
+    send(), sr() and srflood() use it to expand generator packets::
+
+        >>> pkts = list(PacketTemplate(IP(dst="192.0.2.0/24")/TCP()))
+    """
+    __slots__ = ["pkt"]
+
+    def __init__(self, pkt):
+        # type: (Packet) -> None
+        self.pkt = pkt
+
+    @staticmethod
+    def _product(gens):
+        # type: (List[Gen[Any]]) -> Iterator[List[Any]]
+        """Nested loops over gens, the first one being the outermost,
+        like Packet.__iter__()"""
+        vals = [None] * len(gens)  # type: List[Any]
+        last = len(gens) - 1
+
+        def loop(i):
+            # type: (int) -> Iterator[List[Any]]
+            for v in gens[i]:
+                vals[i] = v
+                if i == last:
+                    yield vals
+                else:
+                    for x in loop(i + 1):
+                        yield x
+        return loop(0)
+
+    @staticmethod
+    def _stamp(proto, attrs, payload, fields):
+        # type: (Packet, List[Tuple[str, Any]], Optional[Packet], Dict[str, Any]) -> Packet  # noqa: E501
+        """A copy of proto (made by clone_with()) with other fields and
+        payload, that shares its default values. attrs are the slots
+        that proto has set."""
+        pkt = object.__new__(type(proto))
+        for attr, val in attrs:
+            object.__setattr__(pkt, attr, val)
+        pkt.fields = fields
+        pkt.overloaded_fields = proto.overloaded_fields.copy()
+        if payload is not None:
+            pkt.add_payload(payload)
+        return pkt
+
+    def _analyze(self):
+        # type: () -> Optional[Tuple[List[Packet], List[Dict[str, Any]], List[Gen[Any]], List[Tuple[int, str]]]]  # noqa: E501
+        """Returns the layers, their constant fields, the generators of
+        the varying fields and their (layer index, name), or None if the
+        packet cannot be used as a template"""
+        layers = []  # type: List[Packet]
+        lay = self.pkt
+        while not isinstance(lay, NoPayload):
+            cls = type(lay)
+            if lay.post_transforms or isinstance(lay, conf.padding_layer) or \
+                    cls.do_build is not Packet.do_build or \
+                    cls.self_build is not Packet.self_build or \
+                    cls.build_padding is not Packet.build_padding or \
+                    cls.build_done is not Packet.build_done:
+                return None
+            owner = next(c for c in cls.__mro__ if "post_build" in c.__dict__)
+            if owner is not Packet and \
+                    "template_computed_fields" not in owner.__dict__:
+                return None
+            layers.append(lay)
+            lay = lay.payload
+        consts = []  # type: List[Dict[str, Any]]
+        gens = []  # type: List[Gen[Any]]
+        slots = []  # type: List[Tuple[int, str]]
+        size = 1
+        for i, lay in enumerate(layers):
+            if lay.explicit or lay.raw_packet_cache is not None:
+                todo = []  # type: List[str]
+                const = dict(lay.fields)
+                for name, val in const.items():
+                    if isinstance(val, VolatileValue):
+                        gens.append(SetGen(val))
+                        slots.append((i, name))
+                    elif isinstance(val, Gen):
+                        return None
+            else:
+                todo = [k for (k, v) in itertools.chain(
+                    lay.default_fields.items(), lay.overloaded_fields.items()
+                ) if isinstance(v, VolatileValue)] + list(lay.fields)
+                if len(set(todo)) != len(todo):
+                    return None
+                const = {}
+            # Packet.__iter__() pops the fields from the end of todo
+            for name in reversed(todo):
+                elt = lay.getfieldval(name)
+                if not isinstance(elt, Gen):
+                    if lay.get_field(name).islist:
+                        elt = SetGen([elt])
+                    else:
+                        elt = SetGen(elt)
+                if isinstance(elt, SetGen) and any(
+                        isinstance(v, types.GeneratorType) for v in elt.values
+                ):
+                    return None
+                first = list(itertools.islice(elt, 2))
+                if not first:
+                    return None
+                if len(first) == 1 and \
+                        not isinstance(first[0], VolatileValue):
+                    const[name] = first[0]
+                    continue
+                gens.append(elt)
+                slots.append((i, name))
+                size *= len(first)
+            consts.append(const)
+        if size < 2:
+            # A single packet
+            return None
+        return layers, consts, gens, slots
+
+    def _compile(self):
+        # type: () -> Optional[Tuple[Packet, Packet, Iterator[List[Any]], Callable[[List[Any]], List[Dict[str, Any]]], Callable[[List[Dict[str, Any]]], Packet]]]  # noqa: E501
+        """Builds the first packet, locates the fields to patch, and
+        checks the second packet against a regular build.
+
+        Returns the first two packets, the iterator of the next
+        combinations, and the functions that get the fields of a
+        combination and generate its packet, or None if the packet cannot
+        be used as a template.
+        """
+        analysis = self._analyze()
+        if analysis is None:
+            return None
+        layers, consts, gens, slots = analysis
+        combinations = self._product(gens)
+
+        def fields_of(vals):
+            # type: (List[Any]) -> List[Dict[str, Any]]
+            fields = [const.copy() for const in consts]
+            for (i, name), val in zip(slots, vals):
+                if isinstance(val, VolatileValue):
+                    val = val._fix()
+                fields[i][name] = val
+            return fields
+
+        # The mutable fields, checked before using raw_packet_cache
+        tracked = [
+            [fld for fld in lay.fields_desc
+             if fld.islist or fld.holds_packets or fld.ismutable]
+            for lay in layers
+        ]
+
+        # Copying a clone is faster than Packet.clone_with()
+        fields = fields_of(next(combinations))
+        protos = []  # type: List[Optional[Tuple[Packet, List[Tuple[str, Any]]]]]  # noqa: E501
+        for lay, flds in zip(layers, fields):
+            proto = lay.clone_with(**flds)
+            if type(lay).__init__ not in (Packet.__init__, Raw.__init__) or \
+                    proto.__dict__:
+                protos.append(None)
+                continue
+            attrs = []
+            for attr in proto.__all_slots__:
+                try:
+                    attrs.append((attr, object.__getattribute__(proto, attr)))
+                except AttributeError:
+                    pass
+            protos.append((proto, attrs))
+
+        def chain(fields, headers=None):
+            # type: (List[Dict[str, Any]], Optional[List[bytes]]) -> Packet
+            payload = None  # type: Optional[Packet]
+            for i in range(len(layers) - 1, -1, -1):
+                proto = protos[i]
+                if proto is None:
+                    pkt = layers[i].clone_with(
+                        payload=payload, **fields[i]
+                    )  # type: Packet
+                else:
+                    pkt = self._stamp(proto[0], proto[1], payload, fields[i])
+                if headers is not None:
+                    pkt.raw_packet_cache = headers[i]
+                    cached = pkt.raw_packet_cache_fields = {}
+                    for fld in tracked[i]:
+                        val = pkt.getfieldval(fld.name)
+                        if val is not None:
+                            cached[fld.name] = pkt._raw_packet_cache_field_value(
+                                fld, val, copy=True
+                            )
+                payload = pkt
+            return cast(Packet, payload)
+
+        # Build the first packet, and locate the fields of each layer, in
+        # bits
+        tpl = chain([flds.copy() for flds in fields])
+        work = list(tpl.iterpayloads())
+        buf = bytearray(raw(tpl))
+        lens = [len(lay.do_build()) for lay in work] + [0]
+        starts = [lens[0] - n for n in lens]
+        spans = list(zip(starts, starts[1:]))
+        offsets = []  # type: List[Dict[str, Tuple[int, int]]]
+        for lay, start in zip(work, starts):
+            offs = {}  # type: Dict[str, Tuple[int, int]]
+            p = b""  # type: Any
+            for fld in lay.fields_desc:
+                val = lay.getfieldval(fld.name)
+                beg = 8 * len(p) if isinstance(p, bytes) else \
+                    8 * len(p[0]) + p[1]
+                if isinstance(val, RawVal):
+                    if not isinstance(p, bytes):
+                        break
+                    p += bytes(val)
+                else:
+                    p = fld.addfield(lay, p, val)
+                end = 8 * len(p) if isinstance(p, bytes) else \
+                    8 * len(p[0]) + p[1]
+                offs[fld.name] = (8 * start + beg, 8 * start + end)
+            offsets.append(offs)
+
+        # The varying fields, and the fields that are computed from
+        # other fields when None (e.g. the source address), as (layer,
+        # name, field, start, end, bit shift, varying, value)
+        patches = []  # type: List[Tuple[int, str, Field[Any, Any], int, int, Optional[int], bool, Any]]  # noqa: E501
+
+        def locate(i, name, val, varying):
+            # type: (int, str, Any, bool) -> bool
+            res = _template_field(work[i], work[i].get_field(name), val)
+            pos = offsets[i].get(name)
+            if res is None or pos is None:
+                return False
+            fld, val = res
+            if type(fld).addfield is BitField.addfield:
+                if pos[1] - pos[0] != fld.size:  # type: ignore
+                    return False
+                beg, end = pos[0] // 8, (pos[1] + 7) // 8
+                shift = 8 * end - pos[1]  # type: Optional[int]
+            else:
+                if pos[0] % 8 or pos[1] - pos[0] != 8 * fld.sz:
+                    return False
+                beg, end, shift = pos[0] // 8, pos[1] // 8, None
+            patches.append((i, name, fld, beg, end, shift, varying, val))
+            return True
+
+        for i, name in slots:
+            if not locate(i, name, fields[i][name], True):
+                return None
+        for i, lay in enumerate(work):
+            skip = set(lay.template_computed_fields or ())
+            skip.update(name for j, name in slots if j == i)
+            for fld in lay.fields_desc:
+                if fld.name in skip or lay.getfieldval(fld.name) is not None:
+                    continue
+                pos = offsets[i].get(fld.name)
+                if pos is not None and pos[0] == pos[1]:
+                    # Not built
+                    continue
+                if not locate(i, fld.name, None, False):
+                    return None
+
+        # The checksums, from the innermost one, and the ranges of bytes
+        # they cover
+        cksums = []  # type: List[Tuple[int, int, List[Tuple[int, int]]]]
+        for i in range(len(work) - 1, -1, -1):
+            lay = work[i]
+            if lay.template_checksum_field is None:
+                continue
+            name, coverage, zero = lay.template_checksum_field
+            if lay.getfieldval(name) is not None:
+                continue
+            pos = offsets[i].get(name)
+            if pos is None or pos[0] % 16 or pos[1] - pos[0] != 16:
+                return None
+            if coverage == "header":
+                ranges = [spans[i]]
+            else:
+                ranges = [(starts[i], lens[0])]
+            if coverage == "pseudo":
+                names = work[i - 1].template_pseudo_header() if i else None
+                if names is None:
+                    return None
+                for name in names:
+                    if name not in offsets[i - 1]:
+                        return None
+                    beg, end = offsets[i - 1][name]
+                    ranges.append((beg // 8, end // 8))
+            cksums.append((pos[0] // 8, zero, ranges))
+
+        def covering(beg, end, own=-1):
+            # type: (int, int, int) -> List[Tuple[int, int, int]]
+            """The (checksum, start, end) ranges of 16-bit words that hold
+            buf[beg:end]"""
+            res = []
+            for c, (_, _, ranges) in enumerate(cksums):
+                if c == own:
+                    continue
+                for s, e in ranges:
+                    lo, hi = max(beg, s), min(end, e)
+                    if lo < hi:
+                        lo -= (lo - s) & 1
+                        hi = min(hi + ((hi - s) & 1), e)
+                        res.append((c, lo, hi))
+            return res
+
+        pcovers = [covering(p[3], p[4]) for p in patches]
+        ccovers = [covering(pos, pos + 2, c)
+                   for c, (pos, _, _) in enumerate(cksums)]
+        sums = [~struct.unpack_from("!H", buf, pos)[0] & 0xffff
+                for pos, _, _ in cksums]
+        layouts = [
+            (i, _template_layout(lay)) for i, lay in enumerate(work)
+            if any(isinstance(fld, (ConditionalField, MultipleTypeField))
+                   for fld in lay.fields_desc)
+        ]
+
+        def patch(beg, data, covers):
+            # type: (int, bytes, List[Tuple[int, int, int]]) -> None
+            end = beg + len(data)
+            if buf[beg:end] == data:
+                return
+            for c, lo, hi in covers:
+                sums[c] -= _sum16(buf, lo, hi)
+            buf[beg:end] = data
+            for c, lo, hi in covers:
+                sums[c] += _sum16(buf, lo, hi)
+
+        def generate(fields):
+            # type: (List[Dict[str, Any]]) -> Packet
+            for i, name in slots:
+                work[i].fields[name] = fields[i][name]
+            for i, layout in layouts:
+                if _template_layout(work[i]) != layout:
+                    return chain(fields)
+            for (i, name, fld, beg, end, shift, varying, val), covers in \
+                    zip(patches, pcovers):
+                if varying:
+                    val = fields[i][name]
+                if shift is not None:
+                    mask = ((1 << fld.size) - 1) << shift  # type: ignore
+                    cur = int.from_bytes(buf[beg:end], "big") & ~mask
+                    val = cur | (fld.i2m(work[i], val) << shift) & mask
+                    data = val.to_bytes(end - beg, "big")
+                elif isinstance(val, RawVal):
+                    data = bytes(val)
+                else:
+                    data = fld.addfield(work[i], b"", val)
+                if len(data) != end - beg:
+                    return chain(fields)
+                patch(beg, data, covers)
+            exact = True
+            for c, (pos, zero, _) in enumerate(cksums):
+                # A sum of 0 is ambiguous: it is either made of zeros
+                # only or a multiple of 0xffff
+                exact = exact and sums[c] % 0xffff != 0
+                ck = ~(sums[c] % 0xffff or 0xffff) & 0xffff
+                patch(pos, struct.pack("!H", ck or zero), ccovers[c])
+            if not exact:
+                return chain(fields)
+            return chain(fields, [bytes(buf[s:e]) for s, e in spans])
+
+        first = chain(fields, [bytes(buf[s:e]) for s, e in spans])
+        if raw(first) != bytes(buf):
+            return None
+        fields = fields_of(next(combinations))
+        second = generate(fields)
+        if raw(second) != raw(chain(fields)):
+            return None
+        return first, second, combinations, fields_of, generate
+
+    def __iter__(self):
+        # type: () -> Iterator[Packet]
+        compiled = self._compile()
+        if compiled is None:
+            for pkt in self.pkt:
+                yield pkt
+            return
+        first, second, combinations, fields_of, generate = compiled
+        yield first
+        yield second
+        for vals in combinations:
+            yield generate(fields_of(vals))
+
+
 #################
 #  Bind layers  #
 #################
@@ -8,7 +8,10 @@ PacketList: holds several packets and allows to do operations on them.
 """
 
 
+import array
 import os
+import socket
+import struct
 from collections import defaultdict
 from typing import Sequence, NamedTuple
 
@@ -21,7 +24,8 @@ from scapy.base_classes import (
     _CanvasDumpExtended,
 )
 from scapy.utils import do_graph, hexdump, make_table, make_lined_table, \
-    make_tex_table, issubtype
+    make_tex_table, issubtype, str2mac
+from scapy.pton_ntop import inet_ntop
 from functools import reduce
 
 # typings
@@ -31,6 +35,7 @@ from typing import (
     DefaultDict,
     Dict,
     Generic,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -39,6 +44,7 @@ from typing import (
     TypeVar,
     Union,
     TYPE_CHECKING,
+    cast,
 )
 from scapy.packet import Packet
 
@@ -168,13 +174,19 @@ class _PacketList(Generic[_Inner], metaclass=PacketList_metaclass):
     def __getitem__(self, item):
         # type: (Any) -> Any
         if issubtype(item, BasePacket):
-            return self.__class__([x for x in self.res if item in self._elt2pkt(x)],  # noqa: E501
-                                  name="%s from %s" % (item.__name__, self.listname))  # noqa: E501
+            return self._take([i for i, x in enumerate(self.res)
+                               if item in self._elt2pkt(x)],
+                              name="%s from %s" % (item.__name__, self.listname))  # noqa: E501
         if isinstance(item, slice):
             return self.__class__(self.res.__getitem__(item),
                                   name="mod %s" % self.listname)
         return self.res.__getitem__(item)
 
+    def _take(self, indices, **kargs):
+        # type: (List[int], **Any) -> _PacketList[_Inner]
+        """Returns a new packet list, made of the elements at indices"""
+        return self.__class__([self.res[i] for i in indices], **kargs)
+
     _T = TypeVar('_T', 'SndRcvList', 'PacketList')
 
     # Hinting hack: type self
@@ -244,8 +256,8 @@ class _PacketList(Generic[_Inner], metaclass=PacketList_metaclass):
         function has to take a packet as the only argument and return
         a boolean value.
         """
-        return self.__class__([x for x in self.res if func(*x)],
-                              name="filtered %s" % self.listname)
+        return self._take([i for i, x in enumerate(self.res) if func(*x)],
+                          name="filtered %s" % self.listname)
 
     def make_table(self, *args, **kargs):
         # type: (Any, Any) -> Optional[str]
@@ -647,13 +659,14 @@ class _PacketList(Generic[_Inner], metaclass=PacketList_metaclass):
                         return p.sprintf("Ethernet type=%04xr,Ether.type%")
                 return "Other"
             session_extractor = _session_extractor
-        sessions = defaultdict(self.__class__)  # type: DefaultDict[str, _PacketList[_Inner]]  # noqa: E501
-        for p in self.res:
+        sessions = defaultdict(list)  # type: DefaultDict[str, List[int]]
+        for i, p in enumerate(self.res):
             sess = session_extractor(
                 self._elt2pkt(p)
             )
-            sessions[sess].append(p)
-        return dict(sessions)
+            sessions[sess].append(i)
+        return {sess: self._take(indices)
+                for sess, indices in sessions.items()}
 
     def replace(self, *args, **kargs):
         # type: (Any, Any) -> PacketList
@@ -779,6 +792,204 @@ class PacketList(_PacketList[Packet],
         return SndRcvList(sr), PacketList(remain)
 
 
+class _CompactStore(object):
+    """The packets of a CompactPacketList: their bytes are stored in a
+    single buffer, along with arrays of their offsets, timestamps (in
+    nanoseconds), wirelen and class. It behaves as a read-only list of
+    packets, dissected when they are accessed.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.data = bytearray()
+        self.offsets = array.array("Q", [0])
+        self.times = array.array("q")
+        self.wirelens = array.array("q")
+        self.cls_ids = array.array("H")
+        self.classes = []  # type: List[Type[Packet]]
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.times)
+
+    def _cls_id(self, cls):
+        # type: (Type[Packet]) -> int
+        try:
+            return self.classes.index(cls)
+        except ValueError:
+            self.classes.append(cls)
+            return len(self.classes) - 1
+
+    def add(self,
+            data,  # type: Union[bytes, memoryview]
+            cls,  # type: Type[Packet]
+            time_ns,  # type: int
+            wirelen=None,  # type: Optional[int]
+            ):
+        # type: (...) -> None
+        """Stores a packet from its bytes, without dissecting it"""
+        self.data += data
+        self.offsets.append(len(self.data))
+        self.times.append(time_ns)
+        self.wirelens.append(-1 if wirelen is None else wirelen)
+        self.cls_ids.append(self._cls_id(cls))
+
+    def append(self, pkt):
+        # type: (Packet) -> None
+        self.add(bytes(pkt), pkt.__class__, pkt.time_ns, pkt.wirelen)
+
+    def extend(self, pkts):
+        # type: (Iterable[Packet]) -> None
+        for pkt in pkts:
+            self.append(pkt)
+
+    def _dissect(self, i):
+        # type: (int) -> Packet
+        cls = self.classes[self.cls_ids[i]]
+        s = bytes(self.data[self.offsets[i]:self.offsets[i + 1]])
+        try:
+            p = cls(s)  # type: Packet
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            if conf.debug_dissector:
+                raise
+            p = conf.raw_layer(s)
+        p.time_ns = self.times[i]
+        if self.wirelens[i] >= 0:
+            p.wirelen = self.wirelens[i]
+        return p
+
+    def __getitem__(self, item):
+        # type: (Union[int, slice]) -> Any
+        if isinstance(item, slice):
+            return self.take(range(*item.indices(len(self))))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("list index out of range")
+        return self._dissect(item)
+
+    def __iter__(self):
+        # type: () -> Iterator[Packet]
+        for i in range(len(self)):
+            yield self._dissect(i)
+
+    def take(self, indices):
+        # type: (Union[range, List[int]]) -> _CompactStore
+        """Returns a new store, made of the packets at indices"""
+        res = _CompactStore()
+        res.classes = self.classes[:]
+        if isinstance(indices, range) and indices.step == 1:
+            # Contiguous packets: copy everything at once
+            a, b = indices.start, max(indices.start, indices.stop)
+            start = self.offsets[a]
+            res.data = self.data[start:self.offsets[b]]
+            res.offsets = array.array(
+                "Q", (o - start for o in self.offsets[a:b + 1])
+            )
+            res.times = self.times[a:b]
+            res.wirelens = self.wirelens[a:b]
+            res.cls_ids = self.cls_ids[a:b]
+            return res
+        for i in indices:
+            res.data += self.data[self.offsets[i]:self.offsets[i + 1]]
+            res.offsets.append(len(res.data))
+            res.times.append(self.times[i])
+            res.wirelens.append(self.wirelens[i])
+            res.cls_ids.append(self.cls_ids[i])
+        return res
+
+    def __add__(self, other):
+        # type: (Union[_CompactStore, List[Packet]]) -> _CompactStore
+        if not isinstance(other, _CompactStore):
+            store = _CompactStore()
+            store.extend(other)
+            other = store
+        res = self.take(range(len(self)))
+        shift = len(res.data)
+        res.data += other.data
+        res.offsets.extend(o + shift for o in other.offsets[1:])
+        res.times.extend(other.times)
+        res.wirelens.extend(other.wirelens)
+        ids = [res._cls_id(cls) for cls in other.classes]
+        if ids == list(range(len(ids))):
+            res.cls_ids.extend(other.cls_ids)
+        else:
+            res.cls_ids.extend(ids[i] for i in other.cls_ids)
+        return res
+
+    def __radd__(self, other):
+        # type: (List[Packet]) -> List[Packet]
+        return other + list(self)
+
+
+class CompactPacketList(PacketList):
+    """A PacketList that stores the bytes of its packets in a single
+    buffer, and only dissects them when they are accessed. This uses a
+    fraction of the memory of a PacketList, for large captures.
+
+    The packets are dissected again each time they are accessed: the
+    changes made to them are not kept. Only their time and wirelen are
+    stored with their bytes.
+    """
+    __slots__ = []  # type: List[str]
+
+    def __init__(self,
+                 res=None,  # type: Optional[Union[_CompactStore, _PacketList[Packet], List[Packet]]]  # noqa: E501
+                 name="PacketList",  # type: str
+                 stats=None  # type: Optional[List[Type[Packet]]]
+                 ):
+        # type: (...) -> None
+        if isinstance(res, CompactPacketList):
+            res = res.res
+        if not isinstance(res, _CompactStore):
+            store = _CompactStore()
+            if res is not None:
+                store.extend(res)
+            res = store
+        super(CompactPacketList, self).__init__(
+            res, name, stats  # type: ignore
+        )
+
+    def _take(self, indices, **kargs):
+        # type: (List[int], **Any) -> CompactPacketList
+        return self.__class__(
+            self.res.take(indices),  # type: ignore
+            **kargs
+        )
+
+    def sr(self, multi=False, lookahead=None):
+        # type: (bool, Optional[int]) -> Tuple[SndRcvList, PacketList]
+        return PacketList(list(self.res)).sr(multi=multi,
+                                             lookahead=lookahead)
+
+    def to_columns(self, fields, as_numpy=True):
+        # type: (List[str], bool) -> Dict[str, Any]
+        """Extracts fields from all the packets, as NumPy arrays.
+
+        The fields of the Ether, Dot1Q, IP, IPv6, TCP and UDP headers are
+        read from the bytes of the packets, without dissecting them (only
+        the outermost headers are looked at: tunnels are not decoded).
+        Packets that cannot be read that way, and other fields, require
+        a dissection.
+
+        :param fields: a list of "layer.field" (e.g. "IP.src"), or "time"
+        :param as_numpy: if False, return lists instead of arrays
+        :returns: a dict of masked arrays (or lists, with None values)
+                  where the packets that do not have the layer are masked
+        """
+        store = self.res  # type: Any
+        records = (
+            (store.data[store.offsets[i]:store.offsets[i + 1]],
+             store.classes[store.cls_ids[i]],
+             store.times[i],
+             store.wirelens[i])
+            for i in range(len(store))
+        )
+        return _records_to_columns(records, fields, as_numpy=as_numpy)
+
+
 _PacketIterable = Union[
     Sequence[Packet],
     Packet,
@@ -807,3 +1018,223 @@ class SndRcvList(_PacketList[QueryAnswer],
     def _elt2sum(self, elt):
         # type: (QueryAnswer) -> str
         return "%s ==> %s" % (elt[0].summary(), elt[1].summary())
+
+
+###############
+#   Columns   #
+###############
+
+# The header fields that are read from the raw bytes of the packets:
+# (layer, field) -> (offset in the layer, struct format, shift, mask, kind)
+_COLUMN_FIELDS = {
+    ("Ether", "dst"): (0, "6s", 0, 0, "mac"),
+    ("Ether", "src"): (6, "6s", 0, 0, "mac"),
+    ("Ether", "type"): (12, "!H", 0, 0xffff, "int"),
+    ("Dot1Q", "prio"): (0, "!H", 13, 0x7, "int"),
+    ("Dot1Q", "dei"): (0, "!H", 12, 0x1, "int"),
+    ("Dot1Q", "vlan"): (0, "!H", 0, 0xfff, "int"),
+    ("Dot1Q", "type"): (2, "!H", 0, 0xffff, "int"),
+    ("IP", "version"): (0, "B", 4, 0xf, "int"),
+    ("IP", "ihl"): (0, "B", 0, 0xf, "int"),
+    ("IP", "tos"): (1, "B", 0, 0xff, "int"),
+    ("IP", "len"): (2, "!H", 0, 0xffff, "int"),
+    ("IP", "id"): (4, "!H", 0, 0xffff, "int"),
+    ("IP", "flags"): (6, "!H", 13, 0x7, "int"),
+    ("IP", "frag"): (6, "!H", 0, 0x1fff, "int"),
+    ("IP", "ttl"): (8, "B", 0, 0xff, "int"),
+    ("IP", "proto"): (9, "B", 0, 0xff, "int"),
+    ("IP", "chksum"): (10, "!H", 0, 0xffff, "int"),
+    ("IP", "src"): (12, "4s", 0, 0, "ip"),
+    ("IP", "dst"): (16, "4s", 0, 0, "ip"),
+    ("IPv6", "version"): (0, "!I", 28, 0xf, "int"),
+    ("IPv6", "tc"): (0, "!I", 20, 0xff, "int"),
+    ("IPv6", "fl"): (0, "!I", 0, 0xfffff, "int"),
+    ("IPv6", "plen"): (4, "!H", 0, 0xffff, "int"),
+    ("IPv6", "nh"): (6, "B", 0, 0xff, "int"),
+    ("IPv6", "hlim"): (7, "B", 0, 0xff, "int"),
+    ("IPv6", "src"): (8, "16s", 0, 0, "ip6"),
+    ("IPv6", "dst"): (24, "16s", 0, 0, "ip6"),
+    ("TCP", "sport"): (0, "!H", 0, 0xffff, "int"),
+    ("TCP", "dport"): (2, "!H", 0, 0xffff, "int"),
+    ("TCP", "seq"): (4, "!I", 0, 0xffffffff, "int"),
+    ("TCP", "ack"): (8, "!I", 0, 0xffffffff, "int"),
+    ("TCP", "dataofs"): (12, "B", 4, 0xf, "int"),
+    ("TCP", "flags"): (12, "!H", 0, 0x1ff, "int"),
+    ("TCP", "window"): (14, "!H", 0, 0xffff, "int"),
+    ("TCP", "chksum"): (16, "!H", 0, 0xffff, "int"),
+    ("TCP", "urgptr"): (18, "!H", 0, 0xffff, "int"),
+    ("UDP", "sport"): (0, "!H", 0, 0xffff, "int"),
+    ("UDP", "dport"): (2, "!H", 0, 0xffff, "int"),
+    ("UDP", "len"): (4, "!H", 0, 0xffff, "int"),
+    ("UDP", "chksum"): (6, "!H", 0, 0xffff, "int"),
+}  # type: Dict[Tuple[str, str], Tuple[int, str, int, int, str]]
+
+# IP protocols that are not followed by a TCP or UDP header: ICMP, IGMP,
+# ESP, ICMPv6, IPv6 No Next Header, OSPF, VRRP and SCTP
+_COLUMN_TERMINAL_PROTOS = {1, 2, 50, 58, 59, 89, 112, 132}
+
+
+def _locate_layers(data, cls):
+    # type: (Union[bytes, memoryview], Type[Packet]) -> Optional[Tuple[Dict[str, int], bool]]  # noqa: E501
+    """Finds the offsets of the Ether, Dot1Q, IP, IPv6, TCP and UDP
+    headers of a packet, without dissecting it.
+
+    Returns None if the packet must be dissected, or the offsets and
+    whether the headers after the last one found cannot hold one of
+    those layers.
+    """
+    offsets = {}  # type: Dict[str, int]
+    name = cls.__name__
+    off = 0
+    if name == "Ether":
+        if len(data) < 14:
+            return None
+        offsets["Ether"] = 0
+        etype, = struct.unpack_from("!H", data, 12)
+        off = 14
+        if etype == 0x8100:
+            if len(data) < 18:
+                return None
+            offsets["Dot1Q"] = 14
+            etype, = struct.unpack_from("!H", data, 16)
+            off = 18
+            if etype <= 1500:
+                # LLC
+                return offsets, True
+        if etype == 0x0800:
+            name = "IP"
+        elif etype == 0x86dd:
+            name = "IPv6"
+        elif etype <= 1500 or etype in [0x8100, 0x88a8]:
+            # 802.3 or stacked VLANs
+            return None
+        else:
+            return offsets, False
+    elif name == "IPv46":
+        if not data:
+            return None
+        name = "IP" if data[0] >> 4 == 4 else "IPv6"
+    if name == "IP":
+        if len(data) < off + 20 or data[off] >> 4 != 4 or data[off] & 15 < 5:
+            return None
+        offsets["IP"] = off
+        if struct.unpack_from("!H", data, off + 6)[0] & 0x1fff:
+            # Fragment: the payload is not dissected
+            return offsets, True
+        proto = data[off + 9]
+        off += (data[off] & 15) * 4
+    elif name == "IPv6":
+        if len(data) < off + 40 or data[off] >> 4 != 6:
+            return None
+        offsets["IPv6"] = off
+        proto = data[off + 6]
+        off += 40
+    else:
+        return None
+    if proto == 6:
+        if len(data) < off + 20:
+            return None
+        offsets["TCP"] = off
+    elif proto == 17:
+        if len(data) < off + 8:
+            return None
+        offsets["UDP"] = off
+    elif proto not in _COLUMN_TERMINAL_PROTOS:
+        return offsets, False
+    return offsets, True
+
+
+def _records_to_columns(
+        records,  # type: Iterator[Tuple[Union[bytes, memoryview], Type[Packet], int, Optional[int]]]  # noqa: E501
+        fields,  # type: List[str]
+        as_numpy=True,  # type: bool
+):
+    # type: (...) -> Dict[str, Any]
+    """Extracts fields from packets, given as (bytes, class, time in ns,
+    wirelen) records. See CompactPacketList.to_columns()."""
+    if as_numpy:
+        import numpy
+    # (layer, field, offset, struct, shift, mask, kind), or None for the time
+    specs = []  # type: List[Optional[Tuple[str, str, int, Optional[struct.Struct], int, int, str]]]  # noqa: E501
+    fast = True
+    for fld in fields:
+        if fld == "time":
+            specs.append(None)
+            continue
+        layer, _, name = fld.partition(".")
+        try:
+            offset, fmt, shift, mask, kind = _COLUMN_FIELDS[(layer, name)]
+        except KeyError:
+            fast = False
+            specs.append((layer, name, 0, None, 0, 0, "obj"))
+        else:
+            specs.append((layer, name, offset, struct.Struct(fmt), shift,
+                          mask, kind))
+    layers = {spec[0] for spec in specs if spec is not None}
+    columns = [[] for _ in fields]  # type: List[List[Any]]
+    for data, cls, time_ns, _ in records:
+        located = _locate_layers(data, cls) if fast else None
+        if located is not None:
+            offsets, complete = located
+            if not complete and not layers.issubset(offsets):
+                located = None
+        if located is None:
+            # Dissect the packet
+            s = bytes(data)
+            try:
+                pkt = cls(s)  # type: Packet
+            except Exception:
+                if conf.debug_dissector:
+                    raise
+                pkt = conf.raw_layer(s)
+            for spec, col in zip(specs, columns):
+                if spec is None:
+                    col.append(time_ns / 1e9)
+                    continue
+                lay = pkt.getlayer(spec[0])
+                val = None if lay is None else lay.getfieldval(spec[1])
+                if val is not None and spec[6] == "int":
+                    val = int(val)
+                col.append(val)
+            continue
+        for spec, col in zip(specs, columns):
+            if spec is None:
+                col.append(time_ns / 1e9)
+                continue
+            layer, _, offset, st, shift, mask, kind = spec
+            if layer not in offsets:
+                col.append(None)
+                continue
+            # Only the fields dissected with a struct are extracted here
+            val = cast(struct.Struct, st).unpack_from(
+                data, offsets[layer] + offset
+            )[0]
+            if kind == "int":
+                col.append((val >> shift) & mask)
+            elif kind == "ip":
+                col.append(inet_ntop(socket.AF_INET, val))
+            elif kind == "ip6":
+                col.append(inet_ntop(socket.AF_INET6, val))
+            else:
+                col.append(str2mac(val))
+    if not as_numpy:
+        return dict(zip(fields, columns))
+    res = {}  # type: Dict[str, Any]
+    for fld, spec, col in zip(fields, specs, columns):
+        if spec is None:
+            res[fld] = numpy.array(col, dtype=numpy.float64)
+            continue
+        kind = spec[6]
+        missing = [val is None for val in col]
+        if kind == "int":
+            dtype = {1: numpy.uint8, 2: numpy.uint16, 4: numpy.uint32}[
+                spec[3].size  # type: ignore
+            ]
+            col = [0 if val is None else val for val in col]
+        elif kind == "obj":
+            dtype = object
+        else:
+            dtype = str
+            col = ["" if val is None else val for val in col]
+        res[fld] = numpy.ma.masked_array(col, mask=missing, dtype=dtype)
+    return res
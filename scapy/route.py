@@ -12,39 +12,190 @@ from scapy.compat import plain_str
 from scapy.config import conf
 from scapy.error import Scapy_Exception, warning
 from scapy.interfaces import resolve_iface
-from scapy.utils import atol, ltoa, itom, pretty_list
+from scapy.utils import atol, ltoa, itom, pretty_list, LRUDict
 
 from typing import (
     Any,
     Dict,
+    Iterator,
     List,
     Optional,
     Tuple,
+    TypeVar,
     Union,
+    cast,
 )
 
+_T = TypeVar("_T")
+
 
 ##############################
 #  Routing/Interfaces stuff  #
 ##############################
 
+class _RouteList(List[_T]):
+    """
+    The routes of a Route or Route6 table. Its version is increased each
+    time the list is changed in place, so that the _LPMTable built from it
+    is known to be outdated.
+    """
+    # A class attribute, as unpickling fills the list before setting its
+    # instance attributes
+    version = 0
+
+
+def _route_list_mutator(name):
+    # type: (str) -> Any
+    method = getattr(list, name)
+
+    def mutator(self, *args, **kwargs):
+        # type: (_RouteList[Any], *Any, **Any) -> Any
+        self.version += 1
+        return method(self, *args, **kwargs)
+    mutator.__name__ = name
+    return mutator
+
+
+for _name in ["__setitem__", "__delitem__", "__iadd__", "__imul__", "append",
+              "extend", "insert", "pop", "remove", "clear", "sort", "reverse"]:
+    setattr(_RouteList, _name, _route_list_mutator(_name))
+del _name
+
+
+class _LPMTable(object):
+    """
+    Longest prefix match table, used by Route and Route6.
+
+    The routes are grouped by netmask, then by network, so that a lookup
+    costs one dict lookup per distinct netmask (at most 33 for IPv4, 129
+    for IPv6), whatever the number of routes. Netmasks are integers, and
+    are checked from the greatest, i.e. the longest prefix, to the lowest.
+    Networks must be given with their host bits cleared, or never match.
+    Each route is stored with its order in the routing table, so that
+    ties can be resolved like in the table.
+
+    Routes can also be indexed by another key (e.g. their source address),
+    in the ``addrs`` dict.
+    """
+    __slots__ = ["masks", "nets", "addrs", "routes", "version", "size"]
+
+    def __init__(self, routes=None):
+        # type: (Optional[_RouteList[Any]]) -> None
+        self.masks = []  # type: List[int]
+        self.nets = {}  # type: Dict[int, Dict[int, List[Tuple[int, Any]]]]
+        self.addrs = {}  # type: Dict[Any, List[Tuple[int, Any]]]
+        # The table this index was built from, its version and size
+        self.routes = routes
+        self.version = -1 if routes is None else routes.version
+        self.size = 0
+
+    def outdated(self, routes):
+        # type: (List[Any]) -> bool
+        """Tell whether the routes were replaced or changed since the index
+        was built, or last updated with synced()"""
+        return self.routes is not routes or \
+            self.version != cast(_RouteList[Any], routes).version
+
+    def synced(self, routes):
+        # type: (List[Any]) -> None
+        """Mark the index as up to date with routes, after it was updated
+        along with them"""
+        self.routes = cast(_RouteList[Any], routes)
+        self.version = self.routes.version
+
+    def add(self, net, mask, order, route, addr=None):
+        # type: (int, int, int, Any, Any) -> None
+        nets = self.nets.get(mask)
+        if nets is None:
+            nets = self.nets[mask] = {}
+            self.masks.append(mask)
+            self.masks.sort(reverse=True)
+        nets.setdefault(net, []).append((order, route))
+        if addr is not None:
+            self.addrs.setdefault(addr, []).append((order, route))
+        self.size += 1
+
+    @staticmethod
+    def _remove(entries, route):
+        # type: (List[Tuple[int, Any]], Any) -> None
+        # Entries are sorted by order: remove the first occurrence
+        for i, (_, r) in enumerate(entries):
+            if r == route:
+                del entries[i]
+                return
+
+    def remove(self, net, mask, route, addr=None):
+        # type: (int, int, Any, Any) -> None
+        """Remove the first occurrence of a route"""
+        nets = self.nets[mask]
+        entries = nets[net]
+        self._remove(entries, route)
+        self.size -= 1
+        if not entries:
+            del nets[net]
+            if not nets:
+                del self.nets[mask]
+                self.masks.remove(mask)
+        if addr is not None:
+            entries = self.addrs[addr]
+            self._remove(entries, route)
+            if not entries:
+                del self.addrs[addr]
+
+    def lookup(self, addr):
+        # type: (int) -> Iterator[Tuple[int, List[Tuple[int, Any]]]]
+        """Yield (netmask, routes) for the networks containing addr, from
+        the longest prefix to the shortest."""
+        for mask in self.masks:
+            entries = self.nets[mask].get(addr & mask)
+            if entries is not None:
+                yield mask, entries
+
+
 class Route:
     def __init__(self):
         # type: () -> None
-        self.routes = []  # type: List[Tuple[int, int, str, str, str, int]]
+        self.routes = _RouteList()  # type: List[Tuple[int, int, str, str, str, int]]
         self.invalidate_cache()
         if conf.route_autoload:
             self.resync()
 
     def invalidate_cache(self):
         # type: () -> None
-        self.cache = {}  # type: Dict[Tuple[str, Optional[str]], Tuple[str, str, str]]
+        self.cache = LRUDict(conf.route_cache_size)  # type: Dict[Tuple[str, Optional[str]], Tuple[str, str, str]]  # noqa: E501
+        # The index is rebuilt on next lookup
+        self._lpm = _LPMTable()
+        self._lpm_order = 0
+
+    def _get_lpm(self):
+        # type: () -> _LPMTable
+        """Return the index of self.routes, rebuilt (and the cache
+        cleared) if the table was changed without add()/delt()/ifdel()."""
+        lpm = self._lpm
+        if not isinstance(self.routes, _RouteList):
+            # Replaced by a list
+            self.routes = _RouteList(self.routes)
+        if lpm.outdated(self.routes):
+            self.cache.clear()
+            lpm = self._lpm = _LPMTable(self.routes)
+            for order, route in enumerate(self.routes):
+                lpm.add(route[0] & route[1], route[1], order, route,
+                        self._lpm_addr(route))
+            self._lpm_order = len(self.routes)
+        return lpm
+
+    @staticmethod
+    def _lpm_addr(route):
+        # type: (Tuple[int, int, str, str, str, int]) -> Optional[int]
+        # Index the routes by output IP, that goes through the loopback.
+        # Some interfaces may not currently be connected.
+        return atol(route[4]) if route[4] else None
 
     def resync(self):
         # type: () -> None
         from scapy.arch import read_routes
         self.invalidate_cache()
-        self.routes = read_routes()
+        self.routes = _RouteList(read_routes())
 
     def __repr__(self):
         # type: () -> str
@@ -110,8 +261,17 @@ class Route:
         - `ip route add 192.168.1.0/24 via 192.168.0.254 metric 1`::
             >>> conf.route.add(net="192.168.1.0/24", gw="192.168.0.254", metric=1)
         """
-        self.invalidate_cache()
-        self.routes.append(self.make_route(*args, **kargs))
+        self._add_route(self.make_route(*args, **kargs))
+
+    def _add_route(self, route):
+        # type: (Tuple[int, int, str, str, str, int]) -> None
+        lpm = self._get_lpm()
+        self.cache.clear()
+        self.routes.append(route)
+        lpm.add(route[0] & route[1], route[1], self._lpm_order, route,
+                self._lpm_addr(route))
+        lpm.synced(self.routes)
+        self._lpm_order += 1
 
     def delt(self, *args, **kargs):
         # type: (*Any, **Any) -> None
@@ -120,13 +280,17 @@ class Route:
 
         Same syntax as add()
         """
-        self.invalidate_cache()
+        lpm = self._get_lpm()
+        self.cache.clear()
         route = self.make_route(*args, **kargs)
         try:
             i = self.routes.index(route)
             del self.routes[i]
         except ValueError:
             raise ValueError("No matching route found!")
+        lpm.remove(route[0] & route[1], route[1], route,
+                   self._lpm_addr(route))
+        lpm.synced(self.routes)
 
     def ifchange(self, iff, addr):
         # type: (str, str) -> None
@@ -148,22 +312,24 @@ class Route:
 
     def ifdel(self, iff):
         # type: (str) -> None
-        self.invalidate_cache()
+        lpm = self._get_lpm()
+        self.cache.clear()
         new_routes = []
         for rt in self.routes:
             if iff == rt[3]:
+                lpm.remove(rt[0] & rt[1], rt[1], rt, self._lpm_addr(rt))
                 continue
             new_routes.append(rt)
-        self.routes = new_routes
+        self.routes = _RouteList(new_routes)
+        lpm.synced(self.routes)
 
     def ifadd(self, iff, addr):
         # type: (str, str) -> None
-        self.invalidate_cache()
         the_addr, the_msk_b = (addr.split("/") + ["32"])[:2]
         the_msk = itom(int(the_msk_b))
         the_rawaddr = atol(the_addr)
         the_net = the_rawaddr & the_msk
-        self.routes.append((the_net, the_msk, '0.0.0.0', iff, the_addr, 1))
+        self._add_route((the_net, the_msk, '0.0.0.0', iff, the_addr, 1))
 
     def route(self, dst=None, dev=None, verbose=conf.verb, _internal=False):
         # type: (Optional[str], Optional[str], int, bool) -> Tuple[str, str, str]
@@ -184,8 +350,11 @@ class Route:
                 dst = plain_str(dst)
             except UnicodeDecodeError:
                 raise TypeError("Unknown IP address input (bytes)")
-        if (dst, dev) in self.cache:
-            return self.cache[(dst, dev)]
+        # Checked first, as it clears the cache if the table was changed
+        lpm = self._get_lpm()
+        ret = self.cache.get((dst, dev))
+        if ret is not None:
+            return ret
         # Transform "192.168.*.1-5" to one IP of the set
         _dst = dst.split("/")[0].replace("*", "0")
         while True:
@@ -196,30 +365,31 @@ class Route:
             _dst = _dst[:idx] + _dst[idx + m:]
 
         atol_dst = atol(_dst)
-        paths = []
-        for d, m, gw, i, a, me in self.routes:
-            if not a:  # some interfaces may not currently be connected
-                continue
-            if dev is not None and i != dev:
-                continue
-            aa = atol(a)
-            if aa == atol_dst:
-                paths.append(
-                    (0xffffffff, 1, (conf.loopback_name, a, "0.0.0.0"))  # noqa: E501
-                )
-            if (atol_dst & m) == (d & m):
-                paths.append((m, me, (i, a, gw)))
+        # Destinations that are one of our addresses go through the
+        # loopback, as if there was a /32 route with a metric of 1
+        paths = [
+            (1, order, 0, (conf.loopback_name, rt[4], "0.0.0.0"))
+            for order, rt in lpm.addrs.get(atol_dst, [])
+            if dev is None or rt[3] == dev
+        ]  # type: List[Tuple[int, int, int, Tuple[str, str, str]]]
+        # Choose the more specific route, i.e. with the greatest netmask
+        for m, entries in lpm.lookup(atol_dst):
+            if paths and m != 0xffffffff:
+                break
+            for order, (d, m, gw, i, a, me) in entries:
+                # some interfaces may not currently be connected
+                if a and (dev is None or i == dev):
+                    paths.append((me, order, 1, (i, a, gw)))
+            if paths:
+                break
 
         if not paths:
             if verbose:
                 warning("No route found for IPv4 destination %s "
                         "(no default route?)", dst)
             return (dev or conf.loopback_name, "0.0.0.0", "0.0.0.0")
-        # Choose the more specific route
-        # Sort by greatest netmask and use metrics as a tie-breaker
-        paths.sort(key=lambda x: (-x[0], x[1]))
-        # Return interface
-        ret = paths[0][2]
+        # Use metrics as a tie-breaker, then the order of the routes
+        ret = min(paths)[3]
         # Check if source is 0.0.0.0. This is a 'via' route with no src.
         if ret[1] == "0.0.0.0" and not _internal:
             # Then get the source from route(gw)
@@ -17,13 +17,14 @@ import socket
 from scapy.config import conf
 from scapy.interfaces import resolve_iface, NetworkInterface
 from scapy.utils6 import in6_ptop, in6_cidr2mask, in6_and, \
-    in6_islladdr, in6_ismlladdr, in6_isincluded, in6_isgladdr, \
+    in6_islladdr, in6_ismlladdr, in6_isgladdr, \
     in6_isaddr6to4, in6_ismaddr, construct_source_candidate_set, \
     get_source_addr_from_candidate_set
 from scapy.arch import read_routes6, in6_getifaddr
 from scapy.pton_ntop import inet_pton, inet_ntop
 from scapy.error import warning, log_loading
-from scapy.utils import pretty_list
+from scapy.route import _LPMTable, _RouteList
+from scapy.utils import pretty_list, LRUDict
 
 from typing import (
     Any,
@@ -40,7 +41,7 @@ class Route6:
 
     def __init__(self):
         # type: () -> None
-        self.routes = []  # type: List[Tuple[str, int, str, str, List[str], int]]  # noqa: E501
+        self.routes = _RouteList()  # type: List[Tuple[str, int, str, str, List[str], int]]  # noqa: E501
         self.ipv6_ifaces = set()  # type: Set[Union[str, NetworkInterface]]
         self.invalidate_cache()
         if conf.route6_autoload:
@@ -48,7 +49,49 @@ class Route6:
 
     def invalidate_cache(self):
         # type: () -> None
-        self.cache = {}  # type: Dict[str, Tuple[str, str, str]]
+        self.cache = LRUDict(conf.route_cache_size)  # type: Dict[str, Tuple[str, str, str]]  # noqa: E501
+        # The index is rebuilt on next lookup
+        self._lpm = _LPMTable()
+        self._lpm_order = 0
+
+    def _get_lpm(self):
+        # type: () -> _LPMTable
+        """Return the index of self.routes, rebuilt (and the cache
+        cleared) if the table was changed without add()/delt()/ifdel()."""
+        lpm = self._lpm
+        if not isinstance(self.routes, _RouteList):
+            # Replaced by a list
+            self.routes = _RouteList(self.routes)
+        if lpm.outdated(self.routes):
+            self.cache.clear()
+            lpm = self._lpm = _LPMTable(self.routes)
+            for order, route in enumerate(self.routes):
+                net, mask, key = self._lpm_key(route)
+                lpm.add(net, mask, order, route, key)
+            self._lpm_order = len(self.routes)
+        return lpm
+
+    @staticmethod
+    def _lpm_key(route):
+        # type: (Tuple[str, int, str, str, List[str], int]) -> Tuple[int, int, Optional[str]]  # noqa: E501
+        """Return the network, netmask and additional key of a route.
+        Like in in6_isincluded(), prefixes with host bits never match."""
+        net = int.from_bytes(inet_pton(socket.AF_INET6, route[0]), "big")
+        mask = (1 << 128) - (1 << (128 - route[1]))
+        # Link-local routes are also used for link-local multicast
+        if in6_islladdr(route[0]) and route[4] and in6_islladdr(route[4][0]):
+            return net, mask, "lladdr"
+        return net, mask, None
+
+    def _add_route(self, route):
+        # type: (Tuple[str, int, str, str, List[str], int]) -> None
+        lpm = self._get_lpm()
+        self.cache.clear()
+        self.routes.append(route)
+        net, mask, key = self._lpm_key(route)
+        lpm.add(net, mask, self._lpm_order, route, key)
+        lpm.synced(self.routes)
+        self._lpm_order += 1
 
     def flush(self):
         # type: () -> None
@@ -61,7 +104,7 @@ class Route6:
         # TODO : At the moment, resync will drop existing Teredo routes
         #        if any. Change that ...
         self.invalidate_cache()
-        self.routes = read_routes6()
+        self.routes = _RouteList(read_routes6())
         self.ipv6_ifaces = set()
         for route in self.routes:
             self.ipv6_ifaces.add(route[3])
@@ -119,8 +162,7 @@ class Route6:
         add(dst="2001:db8:cafe:f000::/56", gw="2001:db8:cafe::1")
         add(dst="2001:db8:cafe:f000::/64", gw="2001:db8:cafe::1", dev="eth0")
         """
-        self.invalidate_cache()
-        self.routes.append(self.make_route(*args, **kargs))
+        self._add_route(self.make_route(*args, **kargs))
 
     def remove_ipv6_iface(self, iface):
         # type: (str) -> None
@@ -156,10 +198,14 @@ class Route6:
         elif len(to_del) > 1:
             warning("Found more than one match. Aborting.")
         else:
+            lpm = self._get_lpm()
             i = self.routes.index(to_del[0])
-            self.invalidate_cache()
+            self.cache.clear()
             self.remove_ipv6_iface(self.routes[i][3])
-            del self.routes[i]
+            route = self.routes.pop(i)
+            net, mask, key = self._lpm_key(route)
+            lpm.remove(net, mask, route, key)
+            lpm.synced(self.routes)
 
     def ifchange(self, iff, addr):
         # type: (str, str) -> None
@@ -187,12 +233,17 @@ class Route6:
     def ifdel(self, iff):
         # type: (str) -> None
         """ removes all route entries that uses 'iff' interface. """
+        lpm = self._get_lpm()
         new_routes = []
         for rt in self.routes:
             if rt[3] != iff:
                 new_routes.append(rt)
-        self.invalidate_cache()
-        self.routes = new_routes
+            else:
+                net, mask, key = self._lpm_key(rt)
+                lpm.remove(net, mask, rt, key)
+        self.cache.clear()
+        self.routes = _RouteList(new_routes)
+        lpm.synced(self.routes)
         self.remove_ipv6_iface(iff)
 
     def ifadd(self, iff, addr):
@@ -215,8 +266,7 @@ class Route6:
         naddr = inet_pton(socket.AF_INET6, addr)
         nmask = in6_cidr2mask(plen)
         prefix = inet_ntop(socket.AF_INET6, in6_and(nmask, naddr))
-        self.invalidate_cache()
-        self.routes.append((prefix, plen, '::', iff, [addr], 1))
+        self._add_route((prefix, plen, '::', iff, [addr], 1))
         self.ipv6_ifaces.add(iff)
 
     def route(self, dst="", dev=None, verbose=conf.verb):
@@ -256,22 +306,32 @@ class Route6:
         k = dst
         if dev is not None:
             k = dst + "%%" + dev
-        if k in self.cache:
-            return self.cache[k]
-
-        paths = []  # type: List[Tuple[int, int, Tuple[str, List[str], str]]]
+        # Checked first, as it clears the cache if the table was changed
+        lpm = self._get_lpm()
+        res_cache = self.cache.get(k)
+        if res_cache is not None:
+            return res_cache
 
         # TODO : review all kinds of addresses (scope and *cast) to see
         #        if we are able to cope with everything possible. I'm convinced
         #        it's not the case.
         # -- arnaud
-        for p, plen, gw, iface, cset, me in self.routes:
-            if dev is not None and iface != dev:
-                continue
-            if in6_isincluded(dst, p, plen):
-                paths.append((plen, me, (iface, cset, gw)))
-            elif (in6_ismlladdr(dst) and in6_islladdr(p) and in6_islladdr(cset[0])):  # noqa: E501
-                paths.append((plen, me, (iface, cset, gw)))
+        matches = {}  # type: Dict[int, Tuple[str, int, str, str, List[str], int]]
+        if in6_ismlladdr(dst):
+            matches.update(lpm.addrs.get("lladdr", []))
+        # Only the longest prefixes are useful
+        dst_int = int.from_bytes(inet_pton(socket.AF_INET6, dst), "big")
+        for _, entries in lpm.lookup(dst_int):
+            entries = [x for x in entries if dev is None or x[1][3] == dev]
+            if entries:
+                matches.update(entries)
+                break
+
+        paths = [
+            (plen, me, (iface, cset, gw))
+            for _, (p, plen, gw, iface, cset, me) in sorted(matches.items())
+            if dev is None or iface == dev
+        ]  # type: List[Tuple[int, int, Tuple[str, List[str], str]]]
 
         if not paths:
             if dst == "::1":
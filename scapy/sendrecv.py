@@ -7,29 +7,37 @@
 Functions to send and receive packets.
 """
 
+import collections
+import copy
 import itertools
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import os
+import queue
 import re
+import shutil
 import socket
 import subprocess
 import time
+import types
 import warnings
 
 from scapy.compat import plain_str
 from scapy.data import ETH_P_ALL
 from scapy.config import conf
+from scapy.consts import LINUX
 from scapy.error import warning
 from scapy.interfaces import (
     network_name,
     resolve_iface,
     NetworkInterface,
 )
-from scapy.packet import Packet
+from scapy.packet import Packet, PacketTemplate
 from scapy.pton_ntop import inet_pton
 from scapy.utils import get_temp_file, tcpdump, wrpcap, \
-    ContextManagerSubprocess, PcapReader, EDecimal
+    ContextManagerSubprocess, PcapReader, RawPcapReader, EDecimal, \
+    dissect_pcaps, _bpf_filter, _open_pcap_filtered
 from scapy.plist import (
+    CompactPacketList,
     PacketList,
     QueryAnswer,
     SndRcvList,
@@ -37,13 +45,15 @@ from scapy.plist import (
 from scapy.error import log_runtime, log_interactive, Scapy_Exception
 from scapy.base_classes import Gen, SetGen
 from scapy.sessions import DefaultSession
-from scapy.supersocket import SuperSocket, IterSocket
+from scapy.supersocket import SuperSocket, IterSocket, _iter_linktypes
 
 # Typing imports
 from typing import (
     Any,
     Callable,
+    Deque,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -69,6 +79,7 @@ class debug:
     sent = PacketList([], "Sent")
     match = SndRcvList([], "Matched")
     crashed_on = None  # type: Optional[Tuple[Type[Packet], bytes]]
+    match_stats = {}  # type: Dict[str, int]
 
 
 ####################
@@ -97,12 +108,148 @@ _DOC_SNDRCV_PARAMS = """
     :param chainEX: if True, exceptions during send will be forwarded
     :param stop_filter: Python function applied to each packet to determine if
         we have to stop the capture after this packet.
+    :param batch_size: if greater than 1 and inter is 0, the packets are sent
+        by batches of this size, using the socket's send_many()
+    :param match_timeout: if set, how long (in s) each packet can be
+        answered after it was sent. Later answers are not matched.
+    :param match_index: the class of the index of the sent packets,
+        MatchIndex by default
+    :param match_keep_expired: if False, the packets that were not answered
+        within match_timeout are not returned as unanswered (nor sent again
+        by retry), which saves memory on large scans
     """
 
 
 _GlobSessionType = Union[Type[DefaultSession], DefaultSession]
 
 
+class MatchIndex(object):
+    """
+    The sent packets that wait for an answer, indexed by matchkey().
+
+    Each key holds the packets in the order they were sent, in a dict,
+    so that answered packets are removed in constant time. With a
+    timeout, the packets that were not answered in time are moved out
+    of the index (they are returned by remaining()).
+
+    Subclasses can change the key with the key() method.
+
+    :param timeout: how long (in s) a sent packet can be answered
+    :param keep_expired: if False, the packets that expired are only
+        counted, and are not returned by remaining(). This bounds the
+        memory used by long scans, whose unanswered packets are not
+        needed.
+    """
+    def __init__(self, timeout=None, keep_expired=True):
+        # type: (Optional[float], bool) -> None
+        self.timeout = timeout
+        self.keep_expired = keep_expired
+        self.buckets = {}  # type: Dict[bytes, Dict[int, Packet]]
+        # The (deadline, key, number) of the packets, in sending order
+        self.deadlines = collections.deque()  # type: Deque[Tuple[float, bytes, int]]  # noqa: E501
+        self.expired = []  # type: List[Tuple[int, Packet]]
+        self.nexpired = 0
+        self.lock = Lock()
+        self.count = 0
+        self.collisions = 0
+        self.max_bucket = 0
+        self.checks = 0
+
+    def key(self, pkt):
+        # type: (Packet) -> bytes
+        return pkt.matchkey()
+
+    def add(self, pkt):
+        # type: (Packet) -> None
+        """Adds a sent packet"""
+        key = self.key(pkt)
+        with self.lock:
+            self._expire()
+            bucket = self.buckets.setdefault(key, {})
+            if bucket:
+                self.collisions += 1
+            bucket[self.count] = pkt
+            self.max_bucket = max(self.max_bucket, len(bucket))
+            if self.timeout is not None:
+                self.deadlines.append(
+                    (time.monotonic() + self.timeout, key, self.count)
+                )
+            self.count += 1
+
+    def match(self, r, remove=True):
+        # type: (Packet, bool) -> Optional[Packet]
+        """Returns the first sent packet that r answers, or None. If remove
+        is True, this packet is removed from the index."""
+        key = self.key(r)
+        with self.lock:
+            self._expire()
+            bucket = self.buckets.get(key)
+            if not bucket:
+                return None
+            for i, sentpkt in bucket.items():
+                self.checks += 1
+                if r.answers(sentpkt):
+                    if remove:
+                        del bucket[i]
+                        if not bucket:
+                            del self.buckets[key]
+                    return sentpkt
+        return None
+
+    def _expire(self):
+        # type: () -> None
+        now = time.monotonic()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, key, i = self.deadlines.popleft()
+            bucket = self.buckets.get(key)
+            if bucket is not None and i in bucket:
+                pkt = bucket.pop(i)
+                if self.keep_expired:
+                    self.expired.append((i, pkt))
+                self.nexpired += 1
+                if not bucket:
+                    del self.buckets[key]
+
+    def last_deadline(self):
+        # type: () -> Optional[float]
+        """Returns the time (as time.monotonic()) at which all the packets
+        added so far will have expired, or None without a timeout"""
+        if self.timeout is None:
+            return None
+        with self.lock:
+            if not self.deadlines:
+                return time.monotonic()
+            return self.deadlines[-1][0]
+
+    def remaining(self):
+        # type: () -> List[Packet]
+        """Returns the packets that were not removed, in sending order"""
+        with self.lock:
+            self._expire()
+            res = list(self.expired)
+            for bucket in self.buckets.values():
+                res.extend(bucket.items())
+        res.sort(key=lambda x: x[0])
+        return [p for _, p in res]
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        """Returns statistics on the index: the number of packets that
+        were added, that collided with a previous packet on the same key,
+        and that expired, the largest number of packets with the same
+        key, the current number of keys and the number of answers()
+        calls."""
+        with self.lock:
+            return {
+                "sent": self.count,
+                "collisions": self.collisions,
+                "expired": self.nexpired,
+                "max_bucket": self.max_bucket,
+                "keys": len(self.buckets),
+                "checks": self.checks,
+            }
+
+
 class SndRcvHandler(object):
     """
     Util to send/receive packets, used by sr*().
@@ -131,7 +278,11 @@ class SndRcvHandler(object):
                  threaded=True,  # type: bool
                  session=None,  # type: Optional[_GlobSessionType]
                  chainEX=False,  # type: bool
-                 stop_filter=None  # type: Optional[Callable[[Packet], bool]]
+                 stop_filter=None,  # type: Optional[Callable[[Packet], bool]]
+                 batch_size=1,  # type: int
+                 match_timeout=None,  # type: Optional[float]
+                 match_index=MatchIndex,  # type: Type[MatchIndex]
+                 match_keep_expired=True,  # type: bool
                  ):
         # type: (...) -> None
         # Instantiate all arguments
@@ -158,10 +309,14 @@ class SndRcvHandler(object):
         self.noans = 0
         self._flood = _flood
         self.threaded = threaded
+        self.batch_size = batch_size
+        self.match_timeout = match_timeout
+        self.match_index = match_index
+        self.match_keep_expired = match_keep_expired
         self.breakout = Event()
         # Instantiate packet holders
         if prebuild and not self._flood:
-            self.tobesent = list(pkt)  # type: _PacketIterable
+            self.tobesent = list(_iter_packets(pkt))  # type: _PacketIterable
         else:
             self.tobesent = pkt
 
@@ -175,7 +330,10 @@ class SndRcvHandler(object):
 
         while retry >= 0:
             self.breakout.clear()
-            self.hsent = {}  # type: Dict[bytes, List[Packet]]
+            self.index = self.match_index(
+                timeout=self.match_timeout,
+                keep_expired=self.match_keep_expired,
+            )
 
             if threaded or self._flood:
                 # Send packets in thread.
@@ -209,13 +367,9 @@ class SndRcvHandler(object):
                     if self.chainCC:
                         raise
 
+            remain = self.index.remaining()
             if multi:
-                remain = [
-                    p for p in itertools.chain(*self.hsent.values())
-                    if not hasattr(p, '_answered')
-                ]
-            else:
-                remain = list(itertools.chain(*self.hsent.values()))
+                remain = [p for p in remain if not hasattr(p, '_answered')]
 
             if autostop and len(remain) > 0 and \
                len(remain) != len(self.tobesent):
@@ -226,9 +380,11 @@ class SndRcvHandler(object):
                 break
             retry -= 1
 
+        self.match_stats = self.index.stats()
         if conf.debug_match:
             debug.sent = PacketList(remain[:], "Sent")
             debug.match = SndRcvList(self.ans[:])
+            debug.match_stats = self.match_stats
 
         # Clean the ans list to delete the field _answered
         if multi:
@@ -253,8 +409,10 @@ class SndRcvHandler(object):
         return self.ans_result, self.unans_result
 
     def _stop_sniffer_if_done(self) -> None:
-        """Close the sniffer if all expected answers have been received"""
-        if self._send_done and self.noans >= self.notans and not self.multi:
+        """Close the sniffer if all expected answers have been received, or
+        have expired"""
+        if self._send_done and not self.multi and \
+                self.noans + self.index.nexpired >= self.notans:
             if self.sniffer and self.sniffer.running:
                 self.sniffer.stop(join=False)
 
@@ -266,17 +424,27 @@ class SndRcvHandler(object):
         try:
             if self.verbose:
                 os.write(1, b"Begin emission\n")
-            for p in self.tobesent:
-                # Populate the dictionary of _sndrcv_rcv
-                # _sndrcv_rcv won't miss the answer of a packet that
-                # has not been sent
-                self.hsent.setdefault(p.hashret(), []).append(p)
-                # Send packet
-                self.pks.send(p)
-                time.sleep(self.inter)
-                if self.breakout.is_set():
-                    break
-                i += 1
+            if self.batch_size > 1 and not self.inter:
+                for batch in _batches(_iter_packets(self.tobesent),
+                                      self.batch_size):
+                    for p in batch:
+                        self.index.add(p)
+                    _send_many(self.pks, batch)
+                    if self.breakout.is_set():
+                        break
+                    i += len(batch)
+            else:
+                for p in _iter_packets(self.tobesent):
+                    # Populate the dictionary of _sndrcv_rcv
+                    # _sndrcv_rcv won't miss the answer of a packet that
+                    # has not been sent
+                    self.index.add(p)
+                    # Send packet
+                    self.pks.send(p)
+                    time.sleep(self.inter)
+                    if self.breakout.is_set():
+                        break
+                    i += 1
             if self.verbose:
                 os.write(1, b"\nFinished sending %i packets\n" % i)
         except SystemExit:
@@ -299,10 +467,23 @@ class SndRcvHandler(object):
             self._send_done = True
         self._stop_sniffer_if_done()
         # In threaded mode, timeout
-        if self.threaded and self.timeout is not None and not self.breakout.is_set():
-            self.breakout.wait(timeout=self.timeout)
-            if self.sniffer and self.sniffer.running:
-                self.sniffer.stop()
+        if self.threaded and not self.breakout.is_set():
+            timeout = self._answers_timeout()
+            if timeout is not None:
+                self.breakout.wait(timeout=timeout)
+                if self.sniffer and self.sniffer.running:
+                    self.sniffer.stop()
+
+    def _answers_timeout(self):
+        # type: () -> Optional[float]
+        """How long to wait for the answers once all the packets were sent:
+        the timeout, unless all the sent packets expire before"""
+        timeout = self.timeout  # type: Optional[float]
+        last = self.index.last_deadline()
+        if last is not None:
+            left = max(0., last - time.monotonic())
+            timeout = left if timeout is None else min(timeout, left)
+        return timeout
 
     def _process_packet(self, r):
         # type: (Packet) -> None
@@ -310,23 +491,18 @@ class SndRcvHandler(object):
         if r is None:
             return
         ok = False
-        h = r.hashret()
-        if h in self.hsent:
-            hlst = self.hsent[h]
-            for i, sentpkt in enumerate(hlst):
-                if r.answers(sentpkt):
-                    self.ans.append(QueryAnswer(sentpkt, r))
-                    if self.verbose > 1:
-                        os.write(1, b"*")
-                    ok = True
-                    if not self.multi:
-                        del hlst[i]
-                        self.noans += 1
-                    else:
-                        if not hasattr(sentpkt, '_answered'):
-                            self.noans += 1
-                        sentpkt._answered = 1
-                    break
+        sentpkt = self.index.match(r, remove=not self.multi)
+        if sentpkt is not None:
+            self.ans.append(QueryAnswer(sentpkt, r))
+            if self.verbose > 1:
+                os.write(1, b"*")
+            ok = True
+            if not self.multi:
+                self.noans += 1
+            else:
+                if not hasattr(sentpkt, '_answered'):
+                    self.noans += 1
+                sentpkt._answered = 1
         self._stop_sniffer_if_done()
         if not ok:
             if self.verbose > 1:
@@ -337,13 +513,22 @@ class SndRcvHandler(object):
 
     def _sndrcv_rcv(self, callback):
         # type: (Callable[[], None]) -> None
-        """Function used to receive packets and check their hashret"""
+        """Function used to receive packets and match them"""
         # This is blocking.
         self.sniffer = None  # type: Optional[AsyncSniffer]
         self.sniffer = AsyncSniffer()
+        timeout = self.timeout  # type: Optional[float]
+        if self.threaded and not self._flood:
+            # _sndrcv_snd() stops the sniffer
+            timeout = None
+        elif not self._flood and self.match_timeout is not None:
+            # The packets were all sent when the timeout starts: they have
+            # all expired after match_timeout
+            timeout = self.match_timeout if timeout is None else \
+                min(timeout, self.match_timeout)
         self.sniffer._run(
             prn=self._process_packet,
-            timeout=None if self.threaded and not self._flood else self.timeout,
+            timeout=timeout,
             store=False,
             opened_socket=self.rcv_pks,
             session=self.session,
@@ -363,6 +548,95 @@ def sndrcv(*args, **kwargs):
     return sndrcver.results()
 
 
+def _batches(x, size):
+    # type: (Iterable[Packet], int) -> Iterator[List[Packet]]
+    """Split an iterable of packets in lists of at most size packets"""
+    it = iter(x)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+# The objects that are sent as they are
+_RAW_FRAMES = (bytes, bytearray, memoryview)
+
+
+def _is_raw_reader(x):
+    # type: (Any) -> bool
+    """True if x is a RawPcapReader or RawPcapNgReader, whose packets are
+    sent without being dissected"""
+    return isinstance(x, RawPcapReader) and not isinstance(x, PcapReader)
+
+
+def _iter_packets(x):
+    # type: (_PacketIterable) -> Iterator[Packet]
+    """Iterate over the packets to send, generating the packets of a
+    Packet from a template when possible"""
+    if isinstance(x, Packet):
+        return iter(PacketTemplate(x))
+    if _is_raw_reader(x):
+        return (s for s, _ in cast(RawPcapReader, x).iter_frames())  # type: ignore  # noqa: E501
+    return iter(x)
+
+
+def _rewind_at(reader):
+    # type: (RawPcapReader) -> Callable[[], None]
+    """Return a function that moves reader back to its current record,
+    so that its packets can be sent several times"""
+    f = reader.f
+    if not f.seekable():
+        raise Scapy_Exception(
+            "%s is not seekable: its packets can only be sent once !" %
+            reader.filename
+        )
+    pos, state = f.tell(), reader._get_state()
+
+    def rewind():
+        # type: () -> None
+        f.seek(pos)
+        reader._set_state(state)
+    return rewind
+
+
+def _iter_timed(x):
+    # type: (_PacketIterable) -> Iterator[Tuple[Packet, Optional[float]]]
+    """Iterate over the packets to send and their time, or None for raw
+    bytes without a timestamp"""
+    if _is_raw_reader(x):
+        for s, time_ns in cast(RawPcapReader, x).iter_frames():
+            yield s, None if time_ns is None else time_ns / 1e9  # type: ignore  # noqa: E501
+        return
+    for p in _iter_packets(x):
+        yield p, None if isinstance(p, _RAW_FRAMES) else float(p.time)
+
+
+def _send_many(s, pkts):
+    # type: (SuperSocket, List[Packet]) -> None
+    """Send packets with send_many(), or one by one on objects that only
+    emulate send()"""
+    if hasattr(s, "send_many"):
+        s.send_many(pkts)
+    else:
+        for p in pkts:
+            s.send(p)
+
+
+def _pace(start, n, size, pps, mbps):
+    # type: (float, int, int, Optional[float], Optional[float]) -> None
+    """Sleep until n packets, of size bytes in total, may have been sent
+    since start at the pps and mbps rates"""
+    delay = 0.
+    if pps:
+        delay = n / pps
+    if mbps:
+        delay = max(delay, size * 8 / (mbps * 1e6))
+    delay += start - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
 def __gen_send(s,  # type: SuperSocket
                x,  # type: _PacketIterable
                inter=0,  # type: int
@@ -371,6 +645,10 @@ def __gen_send(s,  # type: SuperSocket
                verbose=None,  # type: Optional[int]
                realtime=False,  # type: bool
                return_packets=False,  # type: bool
+               batch_size=64,  # type: int
+               pps=None,  # type: Optional[float]
+               mbps=None,  # type: Optional[float]
+               _stats=None,  # type: Optional[Dict[str, int]]
                *args,  # type: Any
                **kargs  # type: Any
                ):
@@ -379,11 +657,13 @@ def __gen_send(s,  # type: SuperSocket
     An internal function used by send/sendp to actually send the packets,
     implement the send logic...
 
-    It will take care of iterating through the different packets
+    It will take care of iterating through the different packets. When
+    _stats is a dict, the number of packets and bytes sent are stored in
+    its "packets" and "bytes" keys.
     """
     if isinstance(x, str):
         x = conf.raw_layer(load=x)
-    if not isinstance(x, Gen):
+    if not isinstance(x, Gen) and not _is_raw_reader(x):
         x = SetGen(x)
     if verbose is None:
         verbose = conf.verb
@@ -392,27 +672,82 @@ def __gen_send(s,  # type: SuperSocket
         loop = -count
     elif not loop:
         loop = -1
+    rewind = None  # type: Optional[Callable[[], None]]
+    if loop != -1 and _is_raw_reader(x):
+        # A reader is consumed by each pass
+        rewind = _rewind_at(cast(RawPcapReader, x))
     sent_packets = PacketList() if return_packets else None
     p = None
+    # The size is only computed when needed, as it builds the packets again
+    count_bytes = bool(mbps) or _stats is not None
+    size = 0
+    start = time.monotonic()
+    if not inter and not realtime and batch_size > 1:
+        # Send by batches, using send_many()
+        if pps:
+            # Don't send bursts of more than ~10ms
+            batch_size = max(1, min(batch_size, int(pps / 100)))
+
+        def _loop():
+            # type: () -> Iterator[Packet]
+            i = loop
+            while i:
+                if rewind is not None:
+                    rewind()
+                for pkt in _iter_packets(x):
+                    yield pkt
+                if i < 0:
+                    i += 1
+        try:
+            for batch in _batches(_loop(), batch_size):
+                _send_many(s, batch)
+                p = batch[-1]
+                if sent_packets is not None:
+                    sent_packets.extend(batch)
+                n += len(batch)
+                if count_bytes:
+                    size += sum(len(pkt) for pkt in batch)
+                if verbose:
+                    os.write(1, b"." * len(batch))
+                if pps or mbps:
+                    _pace(start, n, size, pps, mbps)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            try:
+                cast(Packet, x).sent_time = cast(Packet, p).sent_time
+            except AttributeError:
+                pass
+            if _stats is not None:
+                _stats.update(packets=n, bytes=size)
+        if verbose:
+            print("\nSent %i packets." % n)
+        return sent_packets
     try:
         while loop:
             dt0 = None
-            for p in x:
-                if realtime:
+            if rewind is not None:
+                rewind()
+            for p, pt in _iter_timed(x):
+                if realtime and pt is not None:
                     ct = time.time()
                     if dt0:
-                        st = dt0 + float(p.time) - ct
+                        st = dt0 + pt - ct
                         if st > 0:
                             time.sleep(st)
                     else:
-                        dt0 = ct - float(p.time)
+                        dt0 = ct - pt
                 s.send(p)
                 if sent_packets is not None:
                     sent_packets.append(p)
                 n += 1
+                if count_bytes:
+                    size += len(p)
                 if verbose:
                     os.write(1, b".")
                 time.sleep(inter)
+                if pps or mbps:
+                    _pace(start, n, size, pps, mbps)
             if loop < 0:
                 loop += 1
     except KeyboardInterrupt:
@@ -422,6 +757,8 @@ def __gen_send(s,  # type: SuperSocket
             cast(Packet, x).sent_time = cast(Packet, p).sent_time
         except AttributeError:
             pass
+        if _stats is not None:
+            _stats.update(packets=n, bytes=size)
     if verbose:
         print("\nSent %i packets." % n)
     return sent_packets
@@ -437,6 +774,10 @@ def _send(x,  # type: _PacketIterable
           realtime=False,  # type: bool
           return_packets=False,  # type: bool
           socket=None,  # type: Optional[SuperSocket]
+          batch_size=64,  # type: int
+          pps=None,  # type: Optional[float]
+          mbps=None,  # type: Optional[float]
+          _stats=None,  # type: Optional[Dict[str, int]]
           **kargs  # type: Any
           ):
     # type: (...) -> Optional[PacketList]
@@ -446,7 +787,9 @@ def _send(x,  # type: _PacketIterable
     socket = socket or _func(iface)(iface=iface, **kargs)
     results = __gen_send(socket, x, inter=inter, loop=loop,
                          count=count, verbose=verbose,
-                         realtime=realtime, return_packets=return_packets)
+                         realtime=realtime, return_packets=return_packets,
+                         batch_size=batch_size, pps=pps, mbps=mbps,
+                         _stats=_stats)
     if need_closing:
         socket.close()
     return results
@@ -472,6 +815,12 @@ def send(x,  # type: _PacketIterable
     :param return_packets: return the sent packets
     :param socket: the socket to use (default is conf.L3socket(kargs))
     :param monitor: (not on linux) send in monitor mode
+    :param batch_size: when inter and realtime are not set, the packets are
+        sent by batches of this size (default 64)
+    :param pps: maximum rate, in packets per second
+    :param mbps: maximum rate, in MBits per second
+    :param tx_ring: (linux only) send the batches through a memory mapped
+        TX ring, of the given size in bytes, or True for the default size
     :returns: None
     """
     if "iface" in kargs:
@@ -502,16 +851,25 @@ def sendp(x,  # type: _PacketIterable
     """
     Send packets at layer 2
 
-    :param x: the packets
+    :param x: the packets. Raw frames (bytes, bytearray or memoryview
+        objects, or a RawPcapReader) are sent as they are, without being
+        dissected nor built
     :param inter: time (in s) between two packets (default 0)
     :param loop: send packet indefinitely (default 0)
     :param count: number of packets to send (default None=1)
     :param verbose: verbose mode (default None=conf.verb)
-    :param realtime: check that a packet was sent before sending the next one
+    :param realtime: send the packets at the pace given by their time (or
+        by the timestamps of a RawPcapReader)
     :param return_packets: return the sent packets
     :param socket: the socket to use (default is conf.L3socket(kargs))
     :param iface: the interface to send the packets on
     :param monitor: (not on linux) send in monitor mode
+    :param batch_size: when inter and realtime are not set, the packets are
+        sent by batches of this size (default 64)
+    :param pps: maximum rate, in packets per second
+    :param mbps: maximum rate, in MBits per second
+    :param tx_ring: (linux only) send the batches through a memory mapped
+        TX ring, of the given size in bytes, or True for the default size
     :returns: None
     """
     if iface is None and iface_hint is not None and socket is None:
@@ -536,10 +894,14 @@ def sendpfast(x: _PacketIterable,
               iface: Optional[_GlobInterfaceType] = None,
               replay_args: Optional[List[str]] = None,
               parse_results: bool = False,
+              use_tcpreplay: Optional[bool] = None,
               ):
     # type: (...) -> Optional[Dict[str, Any]]
     """Send packets at layer 2 using tcpreplay for performance
 
+    When tcpreplay is not available, the packets are sent by batches with
+    sendp(), through a TX ring on Linux.
+
     :param pps:  packets per second
     :param mbps: MBits per second
     :param realtime: use packet's timestamp, bending time with real-time value
@@ -551,10 +913,40 @@ def sendpfast(x: _PacketIterable,
     :param replay_args: List of additional tcpreplay args (List[str])
     :param parse_results: Return a dictionary of information
         outputted by tcpreplay (default=False)
+    :param use_tcpreplay: use tcpreplay (True), or Scapy (False). By
+        default, tcpreplay is used if it is installed.
     :returns: stdout, stderr, command used
     """
     if iface is None:
         iface = conf.iface
+    if use_tcpreplay is None:
+        use_tcpreplay = shutil.which(conf.prog.tcpreplay) is not None
+    if not use_tcpreplay:
+        if count:
+            assert not loop, "Can't use loop and count at the same time in sendpfast"
+        kargs = {}  # type: Dict[str, Any]
+        if LINUX and not conf.use_pcap:
+            kargs["tx_ring"] = True
+        stats = {}  # type: Dict[str, int]
+        if parse_results:
+            # Count the packets rather than keeping them
+            kargs["_stats"] = stats
+        start = time.monotonic()
+        sendp(x, iface=iface, pps=pps, mbps=mbps, realtime=bool(realtime),
+              count=count, loop=loop, verbose=False, **kargs)
+        duration = time.monotonic() - start
+        if not parse_results:
+            return None
+        nb, size = stats["packets"], stats["bytes"]
+        return {
+            "packets": nb,
+            "bytes": size,
+            "time": duration,
+            "pps": nb / duration if duration else 0.,
+            "bps": size * 8 / duration if duration else 0.,
+            "mbps": size * 8 / duration / 1e6 if duration else 0.,
+            "command": "sendp",
+        }
     argv = [conf.prog.tcpreplay, "--intf1=%s" % network_name(iface)]
     if pps is not None:
         argv.append("--pps=%f" % pps)
@@ -897,7 +1289,7 @@ class _FloodGenerator(object):
             j = 0
             if self.maxretries and i >= self.maxretries:
                 return
-            for p in self.tobesent:
+            for p in _iter_packets(self.tobesent):
                 if self.stopevent.is_set():
                     return
                 j += 1
@@ -926,17 +1318,22 @@ def sndrcvflood(pks,  # type: SuperSocket
                 maxretries=None,  # type: Optional[int]
                 verbose=None,  # type: Optional[int]
                 chainCC=False,  # type: bool
-                timeout=None  # type: Optional[int]
+                timeout=None,  # type: Optional[int]
+                batch_size=64,  # type: int
                 ):
     # type: (...) -> Tuple[SndRcvList, PacketList]
-    """sndrcv equivalent for flooding."""
+    """sndrcv equivalent for flooding.
+
+    The packets are sent by batches of batch_size packets, unless inter
+    is set.
+    """
 
     flood_gen = _FloodGenerator(pkt, maxretries)
     return sndrcv(
         pks, flood_gen,
         inter=inter, verbose=verbose,
         chainCC=chainCC, timeout=timeout,
-        _flood=flood_gen
+        _flood=flood_gen, batch_size=batch_size,
     )
 
 
@@ -1108,6 +1505,23 @@ class AsyncSniffer(object):
         monitor: use monitor mode. May not be available on all OS
         started_callback: called as soon as the sniffer starts sniffing
                           (default: None).
+        lazy: only dissect the payload of each layer the first time it is
+              accessed (default: conf.lazy_dissection). The dissected
+              packets are identical.
+        shards: (Linux only) sniff with this number of sockets, in a
+                PACKET_FANOUT group that spreads the packets by flow. Each
+                socket is read by its own thread, with its own session.
+                The packets are then handled (prn, store...) in order of
+                arrival. Works on a single interface, and needs
+                Linux >= 4.20.
+        workers: dissect the offline files in this number of processes
+                 (see dissect_pcaps()). lfilter and prn are called in the
+                 workers, and must be picklable. The results of prn are
+                 displayed, and the packets are stored in a
+                 CompactPacketList. session and stop_filter are not
+                 supported.
+        ordered: with workers, if False, handle the packets as soon as
+                 they are dissected, instead of in the order of the files
 
     The iface, offline and opened_socket parameters can be either an
     element, a list of elements, or a dict object mapping an element to a
@@ -1174,16 +1588,44 @@ class AsyncSniffer(object):
              prn=None,  # type: Optional[Callable[[Packet], Any]]
              lfilter=None,  # type: Optional[Callable[[Packet], bool]]
              L2socket=None,  # type: Optional[Type[SuperSocket]]
-             timeout=None,  # type: Optional[int]
-             opened_socket=None,  # type: Optional[SuperSocket]
+             timeout=None,  # type: Optional[float]
+             opened_socket=None,  # type: Optional[Union[SuperSocket, List[SuperSocket], Dict[SuperSocket, _GlobInterfaceType]]]  # noqa: E501
              stop_filter=None,  # type: Optional[Callable[[Packet], bool]]
              iface=None,  # type: Optional[_GlobInterfaceType]
              started_callback=None,  # type: Optional[Callable[[], Any]]
              session=None,  # type: Optional[_GlobSessionType]
              chainCC=False,  # type: bool
+             lazy=None,  # type: Optional[bool]
+             shards=0,  # type: int
+             workers=None,  # type: Optional[int]
+             ordered=True,  # type: bool
              **karg  # type: Any
              ):
         # type: (...) -> None
+        if workers:
+            if offline is None or opened_socket is not None or \
+                    iface is not None:
+                raise ValueError("workers can only be used with offline")
+            if session is not None or stop_filter is not None:
+                raise ValueError("workers cannot be used with session or "
+                                 "stop_filter")
+            self._run_workers(
+                offline, workers, ordered=ordered, count=count, store=store,
+                prn=prn, lfilter=lfilter, started_callback=started_callback,
+                chainCC=chainCC, filter=karg.get("filter")
+            )
+            return
+        if shards:
+            if opened_socket is not None or offline is not None:
+                raise ValueError("shards cannot be used with opened_socket "
+                                 "or offline")
+            self._run_sharded(
+                shards, count=count, store=store, prn=prn, lfilter=lfilter,
+                L2socket=L2socket, timeout=timeout, stop_filter=stop_filter,
+                iface=iface, started_callback=started_callback,
+                session=session, chainCC=chainCC, lazy=lazy, **karg
+            )
+            return
         self.running = True
         self.count = 0
         lst = []
@@ -1192,6 +1634,10 @@ class AsyncSniffer(object):
         if not isinstance(session, DefaultSession):
             session = session or DefaultSession
             session = session()
+        if lazy is None:
+            lazy = conf.lazy_dissection
+        if lazy:
+            session.lazy_dissection = True
         # sniff_sockets follows: {socket: label}
         sniff_sockets = {}  # type: Dict[SuperSocket, _GlobInterfaceType]
         if opened_socket is not None:
@@ -1210,50 +1656,43 @@ class AsyncSniffer(object):
         if offline is not None:
             flt = karg.get('filter')
 
+            def _reader(src):
+                # type: (Any) -> SuperSocket
+                # Scapy's own BPF compiler is used when it supports the
+                # filter, instead of tcpdump
+                return _open_pcap_filtered(src, flt, quiet=quiet)  # type: ignore
+
             if isinstance(offline, str):
                 # Single file
                 offline = [offline]
             if isinstance(offline, list) and \
                     all(isinstance(elt, str) for elt in offline):
                 # List of files
-                sniff_sockets.update((PcapReader(  # type: ignore
-                    fname if flt is None else
-                    tcpdump(fname,
-                            args=["-w", "-"],
-                            flt=flt,
-                            getfd=True,
-                            quiet=quiet)
-                ), fname) for fname in offline)
+                sniff_sockets.update((_reader(fname), fname)
+                                     for fname in offline)
             elif isinstance(offline, dict):
                 # Dict of files
-                sniff_sockets.update((PcapReader(  # type: ignore
-                    fname if flt is None else
-                    tcpdump(fname,
-                            args=["-w", "-"],
-                            flt=flt,
-                            getfd=True,
-                            quiet=quiet)
-                ), label) for fname, label in offline.items())
+                sniff_sockets.update((_reader(fname), label)
+                                     for fname, label in offline.items())
             elif isinstance(offline, (Packet, PacketList, list)):
                 # Iterables (list of packets, PacketList..)
-                offline = IterSocket(offline)
-                sniff_sockets[offline if flt is None else PcapReader(
-                    tcpdump(offline,
-                            args=["-w", "-"],
-                            flt=flt,
-                            getfd=True,
-                            quiet=quiet)
-                )] = offline
+                bpf = None if flt is None else \
+                    _bpf_filter(flt, _iter_linktypes(offline))
+                if flt is None or bpf is not None:
+                    offline = IterSocket(offline, filter=bpf)
+                    sniff_sockets[offline] = offline
+                else:
+                    offline = IterSocket(offline)
+                    sniff_sockets[PcapReader(tcpdump(  # type: ignore
+                        offline,
+                        args=["-w", "-"],
+                        flt=flt,
+                        getfd=True,
+                        quiet=quiet
+                    ))] = offline
             else:
                 # Other (file descriptors...)
-                sniff_sockets[PcapReader(  # type: ignore
-                    offline if flt is None else
-                    tcpdump(offline,
-                            args=["-w", "-"],
-                            flt=flt,
-                            getfd=True,
-                            quiet=quiet)
-                )] = offline
+                sniff_sockets[_reader(offline)] = offline
         if not sniff_sockets or iface is not None:
             # The _RL2 function resolves the L2socket of an iface
             _RL2 = lambda i: L2socket or resolve_iface(i).l2listen()  # type: Callable[[_GlobInterfaceType], Callable[..., SuperSocket]]  # noqa: E501
@@ -1319,7 +1758,11 @@ class AsyncSniffer(object):
                     remain = stoptime - time.monotonic()
                     if remain <= 0:
                         break
-                sockets = select_func(list(sniff_sockets.keys()), remain)
+                # Packets left by a previous sniff() on the same sockets
+                sockets = [s for s in sniff_sockets
+                           if getattr(s, "_pending", None)]
+                if not sockets:
+                    sockets = select_func(list(sniff_sockets.keys()), remain)
                 dead_sockets = []
                 for s in sockets:
                     if s is close_pipe:  # type: ignore
@@ -1345,6 +1788,9 @@ class AsyncSniffer(object):
                             if (stop_filter and stop_filter(p)) or \
                                     (0 < count <= self.count):
                                 self.continue_sniff = False
+                                # Keep the rest of the batch in the socket
+                                if isinstance(packets, types.GeneratorType):
+                                    packets.close()
                                 break
                     except EOFError:
                         # End of stream
@@ -1386,6 +1832,194 @@ class AsyncSniffer(object):
             close_pipe.close()
         self.results = PacketList(lst, "Sniffed")
 
+    def _run_workers(self,
+                     offline,  # type: Union[str, List[str], Dict[str, Any]]
+                     workers,  # type: int
+                     ordered=True,  # type: bool
+                     count=0,  # type: int
+                     store=True,  # type: bool
+                     prn=None,  # type: Optional[Callable[[Packet], Any]]
+                     lfilter=None,  # type: Optional[Callable[[Packet], bool]]
+                     started_callback=None,  # type: Optional[Callable[[], Any]]  # noqa: E501
+                     chainCC=False,  # type: bool
+                     filter=None,  # type: Optional[str]
+                     ):
+        # type: (...) -> None
+        """Dissect offline files in a pool of processes"""
+        if isinstance(offline, str):
+            offline = [offline]
+        if not all(isinstance(fname, str) for fname in offline):
+            raise ValueError("workers can only be used with file names")
+        self.running = True
+        self.count = 0
+        lst = CompactPacketList(name="Sniffed")
+        results = dissect_pcaps(list(offline), prn=prn, lfilter=lfilter,
+                                workers=workers, ordered=ordered,
+                                store=store, flt=filter)
+
+        def stop_cb():
+            # type: () -> None
+            self.continue_sniff = False
+        self.stop_cb = stop_cb
+
+        try:
+            if started_callback:
+                started_callback()
+            self.continue_sniff = True
+            for result, record in results:
+                self.count += 1
+                if record is not None:
+                    lst.res.add(*record)  # type: ignore
+                if result is not None:
+                    print(result)
+                if not self.continue_sniff or 0 < count <= self.count:
+                    break
+        except KeyboardInterrupt:
+            if chainCC:
+                raise
+        finally:
+            results.close()  # type: ignore
+        self.running = False
+        self.results = lst
+
+    def _run_sharded(self,
+                     shards,  # type: int
+                     count=0,  # type: int
+                     store=True,  # type: bool
+                     prn=None,  # type: Optional[Callable[[Packet], Any]]
+                     lfilter=None,  # type: Optional[Callable[[Packet], bool]]
+                     L2socket=None,  # type: Optional[Type[SuperSocket]]
+                     timeout=None,  # type: Optional[float]
+                     stop_filter=None,  # type: Optional[Callable[[Packet], bool]]  # noqa: E501
+                     iface=None,  # type: Optional[_GlobInterfaceType]
+                     started_callback=None,  # type: Optional[Callable[[], Any]]  # noqa: E501
+                     session=None,  # type: Optional[_GlobSessionType]
+                     chainCC=False,  # type: bool
+                     lazy=None,  # type: Optional[bool]
+                     **karg  # type: Any
+                     ):
+        # type: (...) -> None
+        """Sniff with several sockets of a PACKET_FANOUT group. Each one is
+        read by a sub-sniffer, in its own thread, that dissects the
+        packets and passes them to its own session. The packets that they
+        return are put in a queue, and handled here."""
+        if not LINUX:
+            raise Scapy_Exception("shards are only supported on Linux")
+        if isinstance(iface, (list, dict)):
+            raise ValueError("shards can only be used on a single interface")
+        self.running = True
+        self.count = 0
+        lst = []
+        iface = iface or conf.iface
+        L2socket = L2socket or resolve_iface(iface).l2listen()
+        sockets = []  # type: List[SuperSocket]
+        try:
+            # The first socket creates a new fanout group, that the others
+            # join
+            sockets.append(L2socket(type=ETH_P_ALL, iface=iface,
+                                    fanout=True, **karg))
+            group = getattr(sockets[0], "fanout")
+            for _ in range(shards - 1):
+                sockets.append(L2socket(type=ETH_P_ALL, iface=iface,
+                                        fanout=group, **karg))
+        except Exception:
+            for sock in sockets:
+                sock.close()
+            self.running = False
+            raise
+        # The sniffed packets, and None when a sub-sniffer ends
+        results = queue.Queue()  # type: queue.Queue[Optional[Packet]]
+        sniffers = []  # type: List[AsyncSniffer]
+        threads = []  # type: List[Thread]
+        started = []  # type: List[Event]
+
+        def _run_shard(sniffer, sock, session, started):
+            # type: (AsyncSniffer, SuperSocket, Optional[_GlobSessionType], Event) -> None  # noqa: E501
+            try:
+                sniffer._run(opened_socket={sock: iface}, store=False,
+                             prn=results.put, lfilter=lfilter,
+                             session=session, lazy=lazy,
+                             started_callback=started.set)
+            except Exception as ex:
+                sniffer.exception = ex
+            finally:
+                started.set()
+                results.put(None)
+
+        for sock in sockets:
+            if isinstance(session, DefaultSession):
+                # Each shard has its own session
+                shard_session = copy.deepcopy(session)  # type: Optional[_GlobSessionType]  # noqa: E501
+            else:
+                shard_session = session
+            sniffer = AsyncSniffer()
+            sniffers.append(sniffer)
+            started.append(Event())
+            threads.append(Thread(target=_run_shard,
+                                  args=(sniffer, sock, shard_session,
+                                        started[-1]),
+                                  name="AsyncSniffer-shard"))
+            threads[-1].daemon = True
+            threads[-1].start()
+        for event in started:
+            event.wait()
+
+        def stop_cb():
+            # type: () -> None
+            self.continue_sniff = False
+            results.put(None)
+        self.stop_cb = stop_cb
+
+        try:
+            if started_callback:
+                started_callback()
+            self.continue_sniff = True
+
+            # Start timeout
+            if timeout is not None:
+                stoptime = time.monotonic() + timeout
+            remain = None
+            running = shards
+
+            while running and self.continue_sniff:
+                if timeout is not None:
+                    remain = stoptime - time.monotonic()
+                    if remain <= 0:
+                        break
+                try:
+                    p = results.get(timeout=remain)
+                except queue.Empty:
+                    break
+                if p is None:
+                    running -= 1
+                    continue
+                self.count += 1
+                if store:
+                    lst.append(p)
+                if prn:
+                    result = prn(p)
+                    if result is not None:
+                        print(result)
+                if (stop_filter and stop_filter(p)) or \
+                        (0 < count <= self.count):
+                    break
+        except KeyboardInterrupt:
+            if chainCC:
+                raise
+        finally:
+            for sniffer in sniffers:
+                if sniffer.running:
+                    sniffer.stop_cb()
+            for thread in threads:
+                thread.join()
+            for sock in sockets:
+                sock.close()
+        self.running = False
+        for sniffer in sniffers:
+            if sniffer.exception is not None:
+                warning("Shard failed with '%s'" % sniffer.exception)
+        self.results = PacketList(lst, "Sniffed")
+
     def start(self):
         # type: () -> None
         """Starts AsyncSniffer in async mode"""
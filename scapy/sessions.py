@@ -6,7 +6,8 @@
 Sessions: decode flow of packets when sniffing
 """
 
-from collections import defaultdict
+from collections import Counter, OrderedDict
+import bisect
 import socket
 import struct
 
@@ -19,7 +20,6 @@ from scapy.pton_ntop import inet_pton
 from typing import (
     Any,
     Callable,
-    DefaultDict,
     Dict,
     Iterator,
     List,
@@ -34,9 +34,31 @@ if TYPE_CHECKING:
     from scapy.supersocket import SuperSocket
 
 
+def _recv_many(sock: 'SuperSocket', **kwargs: Any) -> List[Packet]:
+    """Receive the available packets from a SuperSocket, or from an object
+    that only emulates recv()"""
+    if hasattr(sock, "recv_many"):
+        return sock.recv_many(**kwargs)
+    pkt = sock.recv(**kwargs)
+    if pkt is None:
+        return []
+    return [pkt]
+
+
+def _keep_pending(sock: 'SuperSocket', pkts: List[Packet]) -> None:
+    """Keep the packets from _recv_many() that were not used because
+    sniff() stopped: the next recv() or recv_many() calls on sock return
+    them first"""
+    if pkts:
+        sock._pending = pkts + (sock._pending or [])
+
+
 class DefaultSession(object):
     """Default session: no stream decoding"""
 
+    #: set by sniff() to only dissect the payloads when they are accessed
+    lazy_dissection = False
+
     def __init__(self, supersession: Optional[Self] = None):
         if supersession and not isinstance(supersession, DefaultSession):
             supersession = supersession()
@@ -55,33 +77,74 @@ class DefaultSession(object):
         """
         Will be called by sniff() to ask for a packet
         """
-        pkt = sock.recv()
-        if not pkt:
-            return
-        pkt = self.process(pkt)
-        if pkt:
-            yield pkt
+        if self.lazy_dissection:
+            pkts = _recv_many(sock, lazy_dissection=True)
+        else:
+            pkts = _recv_many(sock)
+        used = 0
+        try:
+            for pkt in pkts:
+                used += 1
+                if not pkt:
+                    continue
+                result = self.process(pkt)
+                if result:
+                    yield result
+        finally:
+            _keep_pending(sock, pkts[used:])
 
 
 class IPSession(DefaultSession):
-    """Defragment IP packets 'on-the-flow'.
+    """Defragment IP and IPv6 packets 'on-the-flow'.
 
     Usage:
     >>> sniff(session=IPSession)
+
+    :param frag_timeout: drop the datagrams that are still incomplete this
+                         amount of seconds after their first fragment,
+                         based on the packets timestamps. None to never
+                         time out.
+    :param max_frag_datagrams: the maximum number of datagrams being
+                               reassembled. None for no limit.
+    :param max_frag_bytes: the maximum number of bytes stored in fragments.
+                           None for no limit.
+
+    The number of dropped datagrams is available in
+    ``fragments.evictions``: see :class:`~scapy.layers.inet.DefragTable`.
     """
 
-    def __init__(self, *args, **kwargs):
-        # type: (*Any, **Any) -> None
+    def __init__(self,
+                 *args,  # type: Any
+                 frag_timeout=30,  # type: Optional[float]
+                 max_frag_datagrams=4096,  # type: Optional[int]
+                 max_frag_bytes=4 * 1024 * 1024,  # type: Optional[int]
+                 **kwargs  # type: Any
+                 ):
+        # type: (...) -> None
+        from scapy.layers.inet import DefragTable
         DefaultSession.__init__(self, *args, **kwargs)
-        self.fragments = defaultdict(list)  # type: DefaultDict[Tuple[Any, ...], List[Packet]]  # noqa: E501
+        self.fragments = DefragTable(
+            timeout=frag_timeout,
+            max_datagrams=max_frag_datagrams,
+            max_bytes=max_frag_bytes,
+        )
 
     def process(self, packet: Packet) -> Optional[Packet]:
-        from scapy.layers.inet import IP, _defrag_ip_pkt
+        from scapy.layers.inet import BadFragments, IP, _defrag_ip_pkt
+        from scapy.layers.inet6 import IPv6ExtHdrFragment, _defrag_ipv6_pkt
         if not packet:
             return None
-        if IP not in packet:
-            return packet
-        return _defrag_ip_pkt(packet, self.fragments)[1]  # type: ignore
+        try:
+            if IP in packet:
+                return _defrag_ip_pkt(packet, self.fragments)[1]  # type: ignore
+            if IPv6ExtHdrFragment in packet:
+                return _defrag_ipv6_pkt(  # type: ignore
+                    packet, self.fragments
+                )[1]
+        except BadFragments:
+            # Counted in self.fragments.evictions
+            return None
+        return packet
 
 
 class StringBuffer(object):
@@ -92,53 +155,130 @@ class StringBuffer(object):
     (relatively to the first sequence number) the index of the data contained
     in the fragment.
 
-    If a TCP fragment is missed, this class will fill the missing space with
-    zeros.
+    The data is stored as a sorted list of non-overlapping segments, so that
+    the missing parts (holes) are known: see :meth:`gaps` and :meth:`full`.
+    When the buffer is converted to bytes, the holes are filled with zeros.
     """
 
     def __init__(self):
         # type: () -> None
-        self.content = bytearray(b"")
-        self.content_len = 0
-        self.noff = 0  # negative offset
-        self.incomplete = []  # type: List[Tuple[int, int]]
+        # All offsets are internal: 'origin' is the offset of seq=1 and
+        # 'start' the offset of the first byte of the buffer.
+        self.origin = 0
+        self.start = 0
+        self.end = 0
+        # Sorted list of segments, and of their starting offsets
+        self.segments = []  # type: List[bytearray]
+        self.offsets = []  # type: List[int]
+
+    @property
+    def content_len(self):
+        # type: () -> int
+        return self.end - self.start
+
+    @property
+    def noff(self):
+        # type: () -> int
+        """Negative offset of the buffer, relatively to seq=1"""
+        return self.start - self.origin
+
+    @property
+    def content(self):
+        # type: () -> bytearray
+        return bytearray(bytes(self))
 
     def append(self, data: bytes, seq: Optional[int] = None) -> None:
+        """Store data at a sequence number (or at the end of the buffer).
+        Data already present at this place is overwritten."""
         if not data:
             return
-        data_len = len(data)
         if seq is None:
-            seq = self.content_len
-        seq = seq - 1 - self.noff
-        if seq < 0:
-            # Data is located before the start of the current buffer
-            # (e.g. the first fragment was missing)
-            self.content = bytearray(b"\x00" * (-seq)) + self.content
-            self.content_len += (-seq)
-            self.noff += seq
-            seq = 0
-        if seq + data_len > self.content_len:
-            # Data is located after the end of the current buffer
-            self.content += b"\x00" * (seq - self.content_len + data_len)
-            # As data was missing, mark it.
-            # self.incomplete.append((self.content_len, seq))
-            self.content_len = seq + data_len
-            assert len(self.content) == self.content_len
-        # XXX removes empty space marker.
-        # for ifrag in self.incomplete:
-        #     if [???]:
-        #         self.incomplete.remove([???])
-        memoryview(self.content)[seq:seq + data_len] = data
+            off = self.end
+        else:
+            off = self.origin + seq - 1
+        end = off + len(data)
+        # Data might be located before the start of the current buffer
+        # (e.g. the first fragment was missing)
+        self.start = min(self.start, off)
+        self.end = max(self.end, end)
+        segments, offsets = self.segments, self.offsets
+        # Fast path: in-order data
+        if segments and offsets[-1] + len(segments[-1]) == off:
+            segments[-1] += data
+            return
+        # The segments overlapping or touching [off, end] are i...j-1
+        i = bisect.bisect_right(offsets, off) - 1
+        if i < 0 or offsets[i] + len(segments[i]) < off:
+            i += 1
+        j = bisect.bisect_right(offsets, end)
+        if i == j:
+            # New segment
+            segments.insert(i, bytearray(data))
+            offsets.insert(i, off)
+            return
+        seg_off, last = offsets[j - 1], segments[j - 1]
+        if i == j - 1 and seg_off <= off and end <= seg_off + len(last):
+            # Overwrite inside a segment
+            memoryview(last)[off - seg_off:end - seg_off] = data
+            return
+        # Merge the segments: keep what's before and after the data
+        if offsets[i] < off:
+            buf = segments[i]
+            del buf[off - offsets[i]:]
+            buf += data
+        else:
+            buf = bytearray(data)
+            offsets[i] = off
+        if seg_off + len(last) > end:
+            buf += memoryview(last)[end - seg_off:]
+        segments[i:j] = [buf]
+        offsets[i + 1:j] = []
 
     def shiftleft(self, i: int) -> None:
-        self.content = self.content[i:]
-        self.content_len -= i
+        """Drop the first i bytes of the buffer. The sequence numbers are
+        now relative to the new start of the buffer."""
+        self.origin += i
+        self.start += i
+        self.end = max(self.end, self.start)
+        segments, offsets = self.segments, self.offsets
+        k = 0
+        while k < len(segments) and \
+                offsets[k] + len(segments[k]) <= self.start:
+            k += 1
+        if k:
+            del segments[:k]
+            del offsets[:k]
+        if offsets and offsets[0] < self.start:
+            # Deleting the beginning of a bytearray doesn't copy it
+            del segments[0][:self.start - offsets[0]]
+            offsets[0] = self.start
+
+    def gaps(self):
+        # type: () -> List[Tuple[int, int]]
+        """Return the list of the missing (start, end) parts of the buffer,
+        relatively to its beginning."""
+        gaps = []
+        cur = self.start
+        for off, seg in zip(self.offsets, self.segments):
+            if off > cur:
+                gaps.append((cur - self.start, off - self.start))
+            cur = off + len(seg)
+        if self.end > cur:
+            gaps.append((cur - self.start, self.end - self.start))
+        return gaps
+
+    def prefix_len(self):
+        # type: () -> int
+        """Return the length of the contiguous data at the beginning of the
+        buffer, before the first hole."""
+        if self.offsets and self.offsets[0] == self.start:
+            return len(self.segments[0])
+        return 0
 
     def full(self):
         # type: () -> bool
-        # Should only be true when all missing data was filled up,
-        # (or there never was missing data)
-        return bool(self)
+        # Only true when there is data and no missing part
+        return bool(self) and self.prefix_len() == self.content_len
 
     def clear(self):
         # type: () -> None
@@ -155,7 +295,13 @@ class StringBuffer(object):
 
     def __bytes__(self):
         # type: () -> bytes
-        return bytes(self.content)
+        if len(self.segments) == 1 and self.prefix_len() == self.content_len:
+            return bytes(self.segments[0])
+        res = bytearray(self.content_len)
+        view = memoryview(res)
+        for off, seg in zip(self.offsets, self.segments):
+            view[off - self.start:off - self.start + len(seg)] = seg
+        return bytes(res)
 
     def __str__(self):
         # type: () -> str
@@ -208,25 +354,59 @@ class TCPSession(IPSession):
     :param app: Whether the socket is on application layer = has no TCP
                 layer. This is identical to StreamSocket so only use this if your
                 underlying source of data isn't a socket.socket.
+    :param max_flows: the maximum number of TCP flows (and of bidirectional
+                      TCP sessions) to keep track of. When reached, the least
+                      recently used one is dropped. None for no limit.
+    :param max_flow_bytes: the maximum number of bytes buffered for a single
+                           flow. A flow that goes above it is dropped.
+                           None for no limit.
+    :param max_total_bytes: the maximum number of bytes buffered for all the
+                            flows. When reached, the least recently used flows
+                            are dropped. None for no limit.
+    :param flow_timeout: drop the flows and sessions that didn't receive any
+                         packet for this amount of seconds, based on the
+                         packets timestamps. None to never time out.
+
+    The number of dropped flows, per reason, is available in the
+    ``evictions`` counter: ``timeout``, ``max_flows``, ``max_flow_bytes``,
+    ``max_total_bytes``.
     """
 
-    def __init__(self, app=False, *args, **kwargs):
-        # type: (bool, *Any, **Any) -> None
+    def __init__(self,
+                 app=False,  # type: bool
+                 *args,  # type: Any
+                 max_flows=65536,  # type: Optional[int]
+                 max_flow_bytes=None,  # type: Optional[int]
+                 max_total_bytes=None,  # type: Optional[int]
+                 flow_timeout=None,  # type: Optional[float]
+                 **kwargs  # type: Any
+                 ):
+        # type: (...) -> None
         super(TCPSession, self).__init__(*args, **kwargs)
         self.app = app
+        self.max_flows = max_flows
+        self.max_flow_bytes = max_flow_bytes
+        self.max_total_bytes = max_total_bytes
+        self.flow_timeout = flow_timeout
+        self.evictions = Counter()  # type: Dict[str, int]
         if app:
             self.data = StringBuffer()
             self.metadata = {}  # type: Dict[str, Any]
             self.session = {}  # type: Dict[str, Any]
         else:
             # The StringBuffer() is used to build a global
-            # string from fragments and their seq nulber
-            self.tcp_frags = defaultdict(
-                lambda: (StringBuffer(), {})
-            )  # type: DefaultDict[bytes, Tuple[StringBuffer, Dict[str, Any]]]
-            self.tcp_sessions = defaultdict(
-                dict
-            )  # type: DefaultDict[bytes, Dict[str, Any]]
+            # string from fragments and their seq nulber.
+            # Both dicts are kept in least recently used order.
+            self.tcp_frags = OrderedDict(
+            )  # type: OrderedDict[bytes, Tuple[StringBuffer, Dict[str, Any]]]
+            self.tcp_sessions = OrderedDict(
+            )  # type: OrderedDict[bytes, Dict[str, Any]]
+            # Timestamp of the last packet of each flow / session
+            self.tcp_frags_time = {}  # type: Dict[bytes, float]
+            self.tcp_sessions_time = {}  # type: Dict[bytes, float]
+            # Number of bytes buffered in each flow, and in total
+            self.tcp_frags_bytes = {}  # type: Dict[bytes, int]
+            self.tcp_bytes = 0
         # Setup stopping dissection condition
         from scapy.layers.inet import TCP
         self.stop_dissection_after = TCP
@@ -247,6 +427,70 @@ class TCPSession(IPSession):
             # Uni-directional
             return src + dst + struct.pack("!HH", pkt.dport, pkt.sport)
 
+    def _get_flow(self,
+                  ident: bytes,
+                  now: float) -> Tuple[StringBuffer, Dict[str, Any]]:
+        """Return the buffer and metadata of a flow, and mark it as used."""
+        try:
+            flow = self.tcp_frags[ident]
+            self.tcp_frags.move_to_end(ident)
+        except KeyError:
+            flow = self.tcp_frags[ident] = (StringBuffer(), {})
+            self.tcp_frags_bytes[ident] = 0
+        self.tcp_frags_time[ident] = now
+        return flow
+
+    def _get_session(self, ident: bytes, now: float) -> Dict[str, Any]:
+        """Return the bidirectional session dict, and mark it as used."""
+        try:
+            tcp_session = self.tcp_sessions[ident]
+            self.tcp_sessions.move_to_end(ident)
+        except KeyError:
+            tcp_session = self.tcp_sessions[ident] = {}
+        self.tcp_sessions_time[ident] = now
+        return tcp_session
+
+    def _drop_flow(self, ident: bytes, reason: Optional[str] = None) -> None:
+        """Forget a flow. If a reason is given, count it as an eviction."""
+        del self.tcp_frags[ident]
+        del self.tcp_frags_time[ident]
+        self.tcp_bytes -= self.tcp_frags_bytes.pop(ident)
+        if reason:
+            self.evictions[reason] += 1
+
+    def _update_flow_bytes(self, ident: bytes, data: StringBuffer) -> None:
+        """Account for the current size of a flow buffer."""
+        size = len(data)
+        self.tcp_bytes += size - self.tcp_frags_bytes[ident]
+        self.tcp_frags_bytes[ident] = size
+
+    def _evict(self, now: float) -> None:
+        """Drop the flows and sessions that are idle or above the limits."""
+        # Both dicts are in least recently used order. Packets timestamps
+        # are mostly increasing, so the idle ones are at the beginning.
+        if self.flow_timeout is not None:
+            limit = now - self.flow_timeout
+            while self.tcp_frags:
+                ident = next(iter(self.tcp_frags))
+                if self.tcp_frags_time[ident] >= limit:
+                    break
+                self._drop_flow(ident, "timeout")
+            while self.tcp_sessions:
+                ident = next(iter(self.tcp_sessions))
+                if self.tcp_sessions_time[ident] >= limit:
+                    break
+                del self.tcp_sessions[ident]
+                del self.tcp_sessions_time[ident]
+        if self.max_total_bytes is not None:
+            while self.tcp_bytes > self.max_total_bytes:
+                self._drop_flow(next(iter(self.tcp_frags)), "max_total_bytes")
+        if self.max_flows is not None:
+            while len(self.tcp_frags) > self.max_flows:
+                self._drop_flow(next(iter(self.tcp_frags)), "max_flows")
+            while len(self.tcp_sessions) > self.max_flows:
+                ident, _ = self.tcp_sessions.popitem(last=False)
+                del self.tcp_sessions_time[ident]
+
     def _strip_padding(self, pkt: Packet) -> Optional[bytes]:
         """Strip the packet of any padding, and return the padding.
         """
@@ -269,6 +513,13 @@ class TCPSession(IPSession):
         if self.app:
             # Special mode: Application layer. Use on top of TCP
             self.data.append(bytes(pkt))
+            if self.max_flow_bytes is not None and \
+                    len(self.data) > self.max_flow_bytes:
+                # Give up on the current data
+                self.data.clear()
+                self.metadata.clear()
+                self.evictions["max_flow_bytes"] += 1
+                return None
             if cls is None and not isinstance(pkt, bytes):
                 cls = pkt.__class__
             if "tcp_reassemble" in self.metadata:
@@ -312,9 +563,14 @@ class TCPSession(IPSession):
         pay = pkt[TCP].payload
         new_data = pay.original
         # Match packets by a unique TCP identifier
+        now = float(pkt.time)
         ident = self._get_ident(pkt)
-        data, metadata = self.tcp_frags[ident]
-        tcp_session = self.tcp_sessions[self._get_ident(pkt, True)]
+        data, metadata = self._get_flow(ident, now)
+        tcp_session = self._get_session(self._get_ident(pkt, True), now)
+        self._evict(now)
+        if ident not in self.tcp_frags:
+            # The new flow was dropped straight away
+            return pkt
         # Handle TCP sequence numbers
         seq = pkt[TCP].seq
         if "seq" not in metadata:
@@ -340,6 +596,16 @@ class TCPSession(IPSession):
             seq = seq - relative_seq
             # Add the data to the buffer
             data.append(new_data, seq)
+            self._update_flow_bytes(ident, data)
+            if self.max_flow_bytes is not None and \
+                    len(data) > self.max_flow_bytes:
+                self._drop_flow(ident, "max_flow_bytes")
+                return None
+            if self.max_total_bytes is not None and \
+                    self.tcp_bytes > self.max_total_bytes:
+                self._evict(now)
+                if ident not in self.tcp_frags:
+                    return None
 
         # Check TCP FIN or TCP RESET
         if pkt[TCP].flags.F or pkt[TCP].flags.R:
@@ -352,12 +618,13 @@ class TCPSession(IPSession):
         # allow the parser to inspect TCP PSH flag
         if pkt[TCP].flags.P:
             metadata["tcp_psh"] = True
-        # XXX TODO: check that no empty space is missing in the buffer.
-        # XXX Currently, if a TCP fragment was missing, we won't notice it.
-        if data.full():
+        # Only reassemble when no TCP fragment is missing, or when the stream
+        # is ending. The missing parts are then listed in tcp_gaps.
+        if data.full() or (data and metadata.get("tcp_end")):
             # Reassemble using all previous packets
             metadata["original"] = pkt
             metadata["ident"] = ident
+            metadata["tcp_gaps"] = data.gaps()
             packet = tcp_reassemble(
                 bytes(data),
                 metadata,
@@ -376,6 +643,7 @@ class TCPSession(IPSession):
                 full_length = data.content_len - len(padding)
                 metadata["relative_seq"] = relative_seq + full_length
                 data.shiftleft(full_length)
+                metadata["tcp_gaps"] = data.gaps()
                 # There might be a sub-payload hidden in the padding
                 sub_packet = tcp_reassemble(
                     bytes(data),
@@ -390,7 +658,10 @@ class TCPSession(IPSession):
             else:
                 # No padding (data) left. Clear
                 data.clear()
-                del self.tcp_frags[ident]
+            if data:
+                self._update_flow_bytes(ident, data)
+            else:
+                self._drop_flow(ident)
             # Minimum next seq
             metadata["next_seq"] = pkt[TCP].seq + len(new_data)
             # Skip full-padding
@@ -411,17 +682,26 @@ class TCPSession(IPSession):
         """
         Will be called by sniff() to ask for a packet
         """
-        pkt = sock.recv(stop_dissection_after=self.stop_dissection_after)
-        # Now handle TCP reassembly
-        if self.app:
-            while pkt is not None:
-                pkt = self.process(pkt)
-                if pkt:
-                    yield pkt
-                    # keep calling process as there might be more
-                    pkt = b""  # type: ignore
-        else:
-            pkt = self.process(pkt)  # type: ignore
-            if pkt:
-                yield pkt
+        pkts = _recv_many(sock,
+                          stop_dissection_after=self.stop_dissection_after,
+                          lazy_dissection=self.lazy_dissection)
+        used = 0
+        try:
+            for received in pkts:
+                used += 1
+                # Now handle TCP reassembly
+                pkt = received  # type: Optional[Packet]
+                if self.app:
+                    while pkt is not None:
+                        pkt = self.process(pkt)
+                        if pkt:
+                            yield pkt
+                            # keep calling process as there might be more
+                            pkt = b""  # type: ignore
+                else:
+                    pkt = self.process(received)
+                    if pkt:
+                        yield pkt
+        finally:
+            _keep_pending(sock, pkts[used:])
         return None
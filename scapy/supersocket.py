@@ -18,6 +18,7 @@ from scapy.config import conf
 from scapy.consts import DARWIN, WINDOWS
 from scapy.data import (
     MTU,
+    DLT_EN10MB,
     ETH_P_IP,
     ETH_P_IPV6,
     SOL_PACKET,
@@ -26,24 +27,28 @@ from scapy.data import (
 from scapy.compat import raw
 from scapy.error import warning, log_runtime
 from scapy.interfaces import network_name
+from scapy.libs.bpf import BPFFilter
 from scapy.packet import Packet, NoPayload
 from scapy.plist import (
     PacketList,
     SndRcvList,
     _PacketIterable,
 )
-from scapy.utils import PcapReader, tcpdump
+from scapy.utils import PcapReader, tcpdump, _pop_pending
 
 # Typing imports
 from scapy.interfaces import _GlobInterfaceType
 from typing import (
     Any,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
+    Set,
     Tuple,
     Type,
+    Union,
     cast,
 )
 
@@ -86,6 +91,8 @@ class SuperSocket(metaclass=_SuperSocket_metaclass):
     closed = False  # type: bool
     nonblocking_socket = False  # type: bool
     auxdata_available = False   # type: bool
+    # Packets returned by recv_many() that sniff() did not use
+    _pending = None  # type: Optional[List[Packet]]
 
     def __init__(self,
                  family=socket.AF_INET,  # type: int
@@ -102,49 +109,71 @@ class SuperSocket(metaclass=_SuperSocket_metaclass):
 
     def send(self, x):
         # type: (Packet) -> int
-        """Sends a `Packet` object
+        """Sends a `Packet` object, or raw bytes
 
-        :param x: `Packet` to be send
+        :param x: `Packet` (or bytes, bytearray or memoryview) to be sent
         :return: Number of bytes that have been sent
         """
-        sx = raw(x)
-        try:
-            x.sent_time = time.time()
-        except AttributeError:
-            pass
+        if isinstance(x, (bytes, bytearray, memoryview)):
+            sx = x
+        else:
+            sx = raw(x)
+            try:
+                x.sent_time = time.time()
+            except AttributeError:
+                pass
 
         if self.outs:
             return self.outs.send(sx)
         else:
             return 0
 
+    def send_many(self, x):
+        # type: (Iterable[Union[Packet, bytes]]) -> int
+        """Sends several packets
+
+        Sockets that can send several packets at once (in one system call,
+        or through a memory mapped ring) override this method. By default,
+        the packets are sent one by one.
+
+        :param x: `Packet` objects, or raw bytes, to be sent
+        :return: Number of packets that have been sent
+        """
+        n = 0
+        for p in x:
+            self.send(p)  # type: ignore
+            n += 1
+        return n
+
     if WINDOWS:
-        def _recv_raw(self, sock, x):
-            # type: (socket.socket, int) -> Tuple[bytes, Any, Optional[float]]
+        def _recv_raw(self, sock, x, flags=0):
+            # type: (socket.socket, int, int) -> Tuple[bytes, Any, Optional[float]]
             """Internal function to receive a Packet.
 
             :param sock: Socket object from which data are received
             :param x: Number of bytes to be received
+            :param flags: flags passed to recvfrom()
             :return: Received bytes, address information and no timestamp
             """
-            pkt, sa_ll = sock.recvfrom(x)
+            pkt, sa_ll = sock.recvfrom(x, flags)
             return pkt, sa_ll, None
     else:
-        def _recv_raw(self, sock, x):
-            # type: (socket.socket, int) -> Tuple[bytes, Any, Optional[float]]
+        def _recv_raw(self, sock, x, flags=0):
+            # type: (socket.socket, int, int) -> Tuple[bytes, Any, Optional[float]]
             """Internal function to receive a Packet,
             and process ancillary data.
 
             :param sock: Socket object from which data are received
             :param x: Number of bytes to be received
+            :param flags: flags passed to recvmsg()
             :return: Received bytes, address information and an optional timestamp
             """
             timestamp = None
             if not self.auxdata_available:
-                pkt, _, _, sa_ll = sock.recvmsg(x)
+                pkt, _, _, sa_ll = sock.recvmsg(x, 0, flags)
                 return pkt, sa_ll, timestamp
             flags_len = socket.CMSG_LEN(4096)
-            pkt, ancdata, flags, sa_ll = sock.recvmsg(x, flags_len)
+            pkt, ancdata, flags, sa_ll = sock.recvmsg(x, flags_len, flags)
             if not pkt:
                 return pkt, sa_ll, timestamp
             for cmsg_lvl, cmsg_type, cmsg_data in ancdata:
@@ -202,7 +231,44 @@ class SuperSocket(metaclass=_SuperSocket_metaclass):
         :param x: Maximum number of bytes to be received, defaults to MTU
         :return: The received `Packet` object, or None
         """
+        pending = _pop_pending(self, 1)
+        if pending:
+            return pending[0]
         cls, val, ts = self.recv_raw(x)
+        return self._dissect(cls, val, ts, **kwargs)
+
+    def recv_many(self, count=64, x=None, **kwargs):
+        # type: (int, Optional[int], **Any) -> List[Packet]
+        """Receive the Packets that are available, as a list.
+
+        Sockets that can receive several packets at once (in one system
+        call, or from a memory mapped ring) override this method. By default,
+        a single packet is received.
+
+        :param count: Maximum number of packets to be received
+        :param x: Maximum number of bytes to be received for each packet,
+                  defaults to the default of recv()
+        :return: A list of `Packet` objects, possibly empty
+        """
+        pending = _pop_pending(self, count)
+        if pending:
+            return pending
+        if x is None:
+            pkt = self.recv(**kwargs)
+        else:
+            pkt = self.recv(x, **kwargs)
+        if pkt is None:
+            return []
+        return [pkt]
+
+    def _dissect(self,
+                 cls,  # type: Optional[Type[Packet]]
+                 val,  # type: Optional[bytes]
+                 ts,  # type: Optional[float]
+                 **kwargs  # type: Any
+                 ):
+        # type: (...) -> Optional[Packet]
+        """Build a Packet from the output of recv_raw()"""
         if not val or not cls:
             return None
         try:
@@ -604,12 +670,43 @@ class L2ListenTcpdump(SuperSocket):
 
 # More abstract objects
 
+def _iter_linktype(pkt):
+    # type: (Union[bytes, Packet]) -> int
+    """The link type of a packet read by IterSocket"""
+    if isinstance(pkt, bytes):
+        return DLT_EN10MB
+    return conf.l2types.layer2num.get(pkt.__class__, DLT_EN10MB)
+
+
+def _iter_linktypes(obj):
+    # type: (_PacketIterable) -> Set[int]
+    """The link types of the packets that IterSocket reads from obj. A
+    Packet generates packets of its own class."""
+    if isinstance(obj, Packet):
+        return {_iter_linktype(obj)}
+    return {
+        _iter_linktype(y)
+        for x in obj
+        for y in (x if isinstance(x, tuple) else [x])
+    }
+
+
 class IterSocket(SuperSocket):
+    """A socket that reads the packets of an iterable.
+
+    :param obj: the packets (a Packet, a list, a PacketList...)
+    :param filter: a BPF filter (a pcap-filter expression, or a BPFFilter),
+                   run on the bytes of each packet. See scapy.libs.bpf for
+                   the supported syntax.
+    """
     desc = "wrapper around an iterable"
     nonblocking_socket = True
 
-    def __init__(self, obj):
-        # type: (_PacketIterable) -> None
+    def __init__(self, obj, filter=None):
+        # type: (_PacketIterable, Union[None, str, BPFFilter]) -> None
+        if isinstance(filter, str):
+            filter = BPFFilter(filter)
+        self.filter = filter
         if not obj:
             self.iter = iter([])  # type: Iterator[Packet]
         elif isinstance(obj, IterSocket):
@@ -638,11 +735,18 @@ class IterSocket(SuperSocket):
 
     def recv(self, x=None, **kwargs):
         # type: (Optional[int], Any) -> Optional[Packet]
-        try:
-            pkt = next(self.iter)
-            return pkt.__class__(bytes(pkt), **kwargs)
-        except StopIteration:
-            raise EOFError
+        while True:
+            try:
+                pkt = next(self.iter)
+            except StopIteration:
+                raise EOFError
+            s = bytes(pkt)
+            if self.filter is None:
+                break
+            if self.filter.match(s, _iter_linktype(pkt),
+                                 getattr(pkt, "wirelen", None)):
+                break
+        return pkt.__class__(s, **kwargs)
 
     def close(self):
         # type: () -> None
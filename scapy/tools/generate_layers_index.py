@@ -0,0 +1,439 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+"""
+Generate the layers_index.py file used by conf.lazy_layers.
+
+Every layer of conf.load_layers is imported in order, as scapy.all would,
+while recording:
+
+- the symbols it owns in the ``from scapy.all import *`` namespace;
+- the bindings it adds to the payload_guess of other classes, in their final
+  order;
+- the registries of other layers it extends (e.g. the GSSAPI OIDs);
+- whether it has side-effects that can't be deferred (conf.l2types,
+  conf.l3types, or any container of the core), in which case it stays eager.
+
+Usage::
+
+    python -m scapy.tools.generate_layers_index [--check]
+"""
+
+import ast
+import importlib
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+
+from collections import defaultdict
+
+# The containers below are modified by layers, but only to register things
+# the modified layer doesn't need to dissect or build its own packets.
+IGNORED = {
+    # Listings
+    "layers",
+    "commands",
+    "stats_classic_protocols",
+    "stats_dot11_protocols",
+    # Handled through their own entries in the index
+    "l2types",
+    "l3types",
+    # Caches and resolvers which are only used by the registering layer
+    "netcache",
+    "neighbor",
+}
+IGNORED = {
+    ("scapy.config", cls, x) for x in IGNORED for cls in ["Conf", "conf"]
+} | {
+    # Default destinations of built packets (dns, llmnr)
+    ("scapy.fields", "DestField", "bindings"),
+    ("scapy.fields", "DestIP6Field", "bindings"),
+    ("scapy.layers.inet", "DestIPField", "bindings"),
+    # Commands of the CLI clients
+    ("scapy.utils", "CLIUtil"),
+}
+SKIP_ATTRS = {"__dict__", "__slots__", "__all_slots__", "__annotations__",
+              "payload_guess", "_overload_fields"}
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "..", "libs", "layers_index.py")
+
+HEADER = '''\
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+"""
+Index of the default layers, used by conf.lazy_layers.
+
+DO NOT EDIT: generated by scapy/tools/generate_layers_index.py
+"""
+
+# Layers which can be loaded on demand, in conf.load_layers order
+'''
+
+
+def _ignored(key):
+    return any(key[:len(ign)] == ign for ign in IGNORED)
+
+
+def _snapshot():
+    """Returns the containers reachable from scapy's modules with their
+    length, as well as the own payload_guess and _overload_fields of all
+    classes"""
+    state = {}
+    classes = {}
+    seen = set()
+
+    def walk(key, obj, depth):
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        if isinstance(obj, (dict, list, set)):
+            if not _ignored(key):
+                state[id(obj)] = (obj, key, len(obj))
+            return
+        if isinstance(obj, type):
+            if not obj.__module__.startswith("scapy"):
+                return
+        elif depth == 0 or not type(obj).__module__.startswith("scapy"):
+            return
+        try:
+            items = list(vars(obj).items())
+        except TypeError:
+            return
+        for attr, val in items:
+            if attr in SKIP_ATTRS or attr.startswith("class_"):
+                continue
+            if isinstance(val, type) and val.__module__ != key[0]:
+                continue
+            walk(key + (attr,), val, depth - 1)
+
+    for modname, mod in list(sys.modules.items()):
+        if mod is None or not modname.startswith("scapy"):
+            continue
+        for name, obj in list(vars(mod).items()):
+            if isinstance(obj, type) and obj.__module__ != modname:
+                continue
+            if type(obj).__name__ == "module":
+                continue
+            walk((modname, name), obj, 3)
+    from scapy.config import conf
+    for cls in conf.layers:
+        classes[cls] = (
+            list(vars(cls).get("payload_guess", ())),
+            dict(vars(cls).get("_overload_fields", {})),
+        )
+    return state, classes
+
+
+class _Recorder(importlib.abc.MetaPathFinder):
+    """Attributes all the side-effects of an import to the innermost layer
+    being imported"""
+
+    def __init__(self, layers):
+        self.layers = layers
+        self.stack = []
+        self.first_import = {}
+        self.changes = defaultdict(set)
+        self.keys = {}
+        self.bindings = {}
+        self.overloads = defaultdict(set)
+        self.injected = {}
+        self.module_keys = {}
+        self.last = _snapshot()
+
+    def current(self):
+        return next((m for m in reversed(self.stack) if m in self.layers),
+                    None)
+
+    def record(self):
+        state, classes = _snapshot()
+        who = self.current()
+        last_state, last_classes = self.last
+        for ident, (obj, key, length) in state.items():
+            # The first snapshot that sees a container happens right after
+            # the module defining it was executed: that's its owner.
+            key = self.keys.setdefault(ident, key)
+            if ident in last_state and last_state[ident][2] != length:
+                self.changes[who].add(key)
+        for cls, (guess, overload) in classes.items():
+            old_guess, old_overload = last_classes.get(cls, ([], {}))
+            old_ids = set(id(x) for x in old_guess)
+            for entry in guess:
+                if id(entry) not in old_ids:
+                    self.bindings[id(entry)] = (entry, who)
+            # cls._overload_fields[lower] is used when building lower()/cls()
+            for lower in set(overload) - set(old_overload):
+                self.overloads[who].add((lower, cls))
+        self.last = state, classes
+        # Symbols added to a module by another one (e.g. the functions of
+        # the AnsweringMachines in scapy.ansmachine)
+        for modname, mod in list(sys.modules.items()):
+            if mod is None or not modname.startswith("scapy"):
+                continue
+            keys = vars(mod)
+            old = self.module_keys.get(modname)
+            if old is not None and len(keys) == len(old):
+                continue
+            if old is not None and who and modname not in self.stack:
+                for key in set(keys) - old:
+                    self.injected[(modname, key)] = who
+            self.module_keys[modname] = set(keys)
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith("scapy"):
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and spec.loader is not None:
+            spec.loader = _Wrapped(self, spec.loader)
+        return spec
+
+
+class _Wrapped(importlib.abc.Loader):
+    def __init__(self, recorder, loader):
+        self.recorder = recorder
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        rec = self.recorder
+        rec.record()
+        rec.stack.append(module.__name__)
+        rec.first_import[module.__name__] = rec.current()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            rec.record()
+            rec.stack.pop()
+
+
+def _exports(mod):
+    """The symbols copied by load_layer() or a star import"""
+    if "__all__" in vars(mod):
+        return [(k, getattr(mod, k)) for k in mod.__all__]
+    return [(k, v) for k, v in vars(mod).items()
+            if k[0] != "_" and k not in ["range", "map"]]
+
+
+def _scapy_all():
+    """Splits the statements of scapy/all.py around the import of the layers"""
+    path = os.path.join(os.path.dirname(OUTPUT), "..", "all.py")
+    with open(path) as fd:
+        tree = ast.parse(fd.read())
+    for i, node in enumerate(tree.body):
+        if isinstance(node, ast.ImportFrom) and \
+                node.module == "scapy.layers.all":
+            return [
+                compile(ast.Module(body=body, type_ignores=[]), path, "exec")
+                for body in [tree.body[:i], tree.body[i + 1:]]
+            ]
+    raise ValueError("scapy.layers.all isn't imported by scapy.all")
+
+
+def _qualname(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+
+def build():
+    from scapy.config import conf
+    conf.lazy_layers = False
+    modules = ["scapy.layers." + x for x in conf.load_layers]
+    # Import what scapy.all imports before the layers
+    before, after = _scapy_all()
+    core_ns = {}  # type: dict
+    exec(before, core_ns)
+    core = set(sys.modules)
+    recorder = _Recorder(modules)
+    sys.meta_path.insert(0, recorder)
+    loaded = []
+    for mod in modules:
+        try:
+            importlib.import_module(mod)
+        except Exception as ex:
+            print("Can't import %s: %s" % (mod, ex), file=sys.stderr)
+            continue
+        loaded.append(mod)
+    sys.meta_path.remove(recorder)
+
+    def group(modname):
+        if modname in core:
+            return None
+        if modname in modules:
+            return modname
+        return recorder.first_import.get(modname)
+
+    eager = set()
+    extends = defaultdict(set)
+    for who, keys in recorder.changes.items():
+        if who is None:
+            continue
+        for key in keys:
+            owner = group(key[0])
+            if owner == who:
+                continue
+            if owner is None:
+                eager.add(who)
+            else:
+                extends[owner].add(who)
+    # cls._overload_fields[lower] is used when building lower()/cls(): it's
+    # there as soon as either of them is
+    for who, pairs in recorder.overloads.items():
+        for lower, cls in pairs:
+            owners = [group(lower.__module__), group(cls.__module__)]
+            if who is None or who in owners:
+                continue
+            owner = owners[0] or owners[1]
+            if owner is None:
+                eager.add(who)
+            else:
+                extends[owner].add(who)
+    # conf.l2types and conf.l3types are looked up by number from everywhere
+    for numtype in [conf.l2types, conf.l3types]:
+        for cls in list(numtype.num2layer.values()) + list(numtype.layer2num):
+            owner = group(cls.__module__)
+            if owner is not None:
+                eager.add(owner)
+    # Symbols, with the star-import semantics of scapy.all
+    namespace = dict(core_ns)
+    origin = dict.fromkeys(core_ns)
+    for layer in loaded:
+        for k, v in _exports(sys.modules[layer]):
+            namespace[k] = v
+            origin[k] = layer
+    after_ns = {}  # type: dict
+    exec(after, after_ns)
+    namespace.update(after_ns)
+    origin.update(dict.fromkeys(after_ns))
+    symbols = {layer: [] for layer in loaded}
+    injected = defaultdict(lambda: defaultdict(list))
+    for (modname, k), who in sorted(recorder.injected.items()):
+        if k in after_ns and after_ns[k] is vars(sys.modules[modname])[k]:
+            injected[who][modname].append(k)
+    for k, v in namespace.items():
+        if origin[k] is None:
+            continue
+        # Any layer exporting the same object will do: prefer the one
+        # defining it, then the ones loaded anyway
+        owners = [layer for layer in loaded
+                  if getattr(sys.modules[layer], k, None) is v]
+        owner = next(
+            (x for x in owners if group(getattr(v, "__module__", "")) == x),
+            next((x for x in owners if x in eager), owners[0])
+        )
+        symbols[owner].append(k)
+        # scapy.all would keep the symbol of the core until it's loaded
+        if k in core_ns and core_ns[k] is not v:
+            eager.add(owner)
+    # The extensions of an eager layer are eager
+    changed = True
+    while changed:
+        changed = False
+        for owner, whos in extends.items():
+            if owner in eager and not whos <= eager:
+                eager |= whos
+                changed = True
+    lazy = [m for m in loaded if m not in eager]
+    # Bindings
+    guess = {}
+    for cls in conf.layers:
+        entries = vars(cls).get("payload_guess")
+        if not entries:
+            continue
+        tags = []
+        for entry in entries:
+            who = recorder.bindings.get(id(entry), (None, None))[1]
+            tags.append((who, _qualname(entry[1])))
+        # Only keep the classes to which several layers bind, as their order
+        # may change
+        whos = [who for who, _ in tags]
+        if len(set(whos)) == 1:
+            continue
+        # The order is restored by sorting the bindings by layer
+        uppers = defaultdict(set)
+        for who, upper in tags:
+            uppers[upper].add(who)
+        if sum(a != b for a, b in zip(whos, whos[1:])) >= len(set(whos)) or \
+                any(len(x) > 1 for x in uppers.values()):
+            raise ValueError("Can't order the bindings of %s" % cls)
+        guess[_qualname(cls)] = tags
+
+    def short(mod):
+        return mod and mod[len("scapy.layers."):]
+
+    return {
+        "LAZY": [short(m) for m in lazy],
+        "SYMBOLS": {short(m): sorted(symbols[m]) for m in loaded},
+        "PAYLOAD_GUESS": {k: [(short(who) or "", up) for who, up in v]
+                          for k, v in sorted(guess.items())},
+        "INJECTED": {short(k): v for k, v in injected.items() if k in lazy},
+        "EXTENDS": {short(k): sorted(short(w) for w in v if w in lazy)
+                    for k, v in sorted(extends.items())
+                    if k in lazy and v & set(lazy)},
+    }
+
+
+def _wrap(words, indent):
+    """Splits whitespace-separated words in string literals of 79 chars"""
+    lines = [""]
+    for word in words:
+        if lines[-1] and len(indent) + len(lines[-1]) + len(word) + 3 > 79:
+            lines.append("")
+        lines[-1] += word + " "
+    lines[-1] = lines[-1].rstrip()
+    return "\n".join('%s"%s"' % (indent, x) for x in lines)
+
+
+def render(index):
+    out = HEADER
+    out += "LAZY = [\n%s\n]\n\n" % "\n".join(
+        "    %r," % x for x in index["LAZY"])
+    out += "# Layers to load when another one is loaded\n"
+    out += "EXTENDS = {\n%s\n}\n\n" % "\n".join(
+        "    %r: %r," % (k, v) for k, v in index["EXTENDS"].items())
+    out += "# Symbols exported by each layer (whitespace-separated)\n"
+    out += "SYMBOLS = {\n"
+    for layer, names in index["SYMBOLS"].items():
+        out += "    %r: (\n%s\n    ),\n" % (layer, _wrap(names, " " * 8))
+    out += "}\n\n"
+    out += "# Symbols added by each layer to modules imported by scapy.all\n"
+    out += "INJECTED = {\n"
+    for layer, modules in index["INJECTED"].items():
+        out += "    %r: {\n" % layer
+        for modname, names in sorted(modules.items()):
+            out += "        %r: (\n%s\n        ),\n" % (
+                modname, _wrap(names, " " * 12)
+            )
+        out += "    },\n"
+    out += "}\n\n"
+    out += "# Final payload_guess of the classes that lazy layers bind to,\n"
+    out += "# as (layer, upper class) in order\n"
+    out += "PAYLOAD_GUESS = {\n"
+    for lower, entries in index["PAYLOAD_GUESS"].items():
+        out += "    %r: [\n" % lower
+        for entry in entries:
+            out += "        %r,\n" % (entry,)
+        out += "    ],\n"
+    out += "}\n"
+    return out
+
+
+def main(argv):
+    data = render(build())
+    if "--check" in argv:
+        with open(OUTPUT) as fd:
+            if fd.read() != data:
+                print("%s is outdated" % OUTPUT, file=sys.stderr)
+                return 1
+        return 0
+    with open(OUTPUT, "w") as fd:
+        fd.write(data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -10,12 +10,13 @@ General utility functions.
 
 from decimal import Decimal
 from io import StringIO
-from itertools import zip_longest
+from itertools import islice, zip_longest
 from uuid import UUID
 
 import argparse
 import array
 import base64
+import bisect
 import collections
 import decimal
 import difflib
@@ -23,6 +24,7 @@ import gzip
 import inspect
 import locale
 import math
+import mmap
 import os
 import pickle
 import random
@@ -62,8 +64,10 @@ from typing import (
     Any,
     AnyStr,
     Callable,
+    Deque,
     Dict,
     IO,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -82,6 +86,7 @@ if TYPE_CHECKING:
     from scapy.packet import Packet
     from scapy.plist import _PacketIterable, PacketList
     from scapy.supersocket import SuperSocket
+    from scapy.libs.bpf import BPFFilter
     import prompt_toolkit
 
 _ByteStream = Union[IO[bytes], gzip.GzipFile]
@@ -1220,6 +1225,51 @@ class Enum_metaclass(type):
         return "<%s>" % self.__dict__.get("name", self.__name__)
 
 
+class LRUDict(collections.OrderedDict):  # type: ignore
+    """
+    A dict that holds at most ``maxsize`` items: when full, setting a new
+    item removes the least recently used one. Getting an item marks it as
+    recently used.
+
+    :param maxsize: the maximum number of items. None for no limit.
+    """
+
+    def __init__(self, maxsize=None):
+        # type: (Optional[int]) -> None
+        super(LRUDict, self).__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        # type: (Any) -> Any
+        value = super(LRUDict, self).__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        # type: (Any, Any) -> Any
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        # type: (Any, Any) -> None
+        super(LRUDict, self).__setitem__(key, value)
+        self.move_to_end(key)
+        if self.maxsize is not None and len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def copy(self):
+        # type: () -> LRUDict
+        new = LRUDict(self.maxsize)
+        new.update(self.items())
+        return new
+
+    def __reduce__(self):
+        # type: () -> Tuple[Any, ...]
+        return self.__class__, (self.maxsize,), None, None, iter(self.items())
+
+
 ###################
 #  Object saving  #
 ###################
@@ -1332,18 +1382,222 @@ def wrpcapng(filename,  # type: str
 
 
 @conf.commands.register
-def rdpcap(filename, count=-1):
-    # type: (Union[IO[bytes], str], int) -> PacketList
+def rdpcap(filename, count=-1, compact=False):
+    # type: (Union[IO[bytes], str], int, bool) -> PacketList
     """Read a pcap or pcapng file and return a packet list
 
     :param count: read only <count> packets
+    :param compact: if True, return a CompactPacketList, in which the
+                    packets are only dissected when they are accessed
     """
     # Rant: Our complicated use of metaclasses and especially the
     # __call__ function is, of course, not supported by MyPy.
     # One day we should simplify this mess and use a much simpler
     # layout that will actually be supported and properly dissected.
     with PcapReader(filename) as fdesc:  # type: ignore
-        return fdesc.read_all(count=count)
+        return fdesc.read_all(count=count, compact=compact)
+
+
+def _bpf_filter(flt, linktypes=()):
+    # type: (str, Iterable[int]) -> Optional[BPFFilter]
+    """Compile a BPF filter with Scapy's own compiler, for each of the
+    link types. Returns None if it is not supported: tcpdump must then be
+    used."""
+    from scapy.libs.bpf import BPFCompileError, BPFFilter
+    try:
+        bpf = BPFFilter(flt)
+        for linktype in linktypes:
+            bpf.program(linktype)
+    except BPFCompileError:
+        return None
+    return bpf
+
+
+def _pcap_linktypes(reader):
+    # type: (RawPcapReader) -> Optional[List[int]]
+    """The link types of the packets of a capture file, or None when they
+    are not known before reading it (a pcapng stream)"""
+    if not isinstance(reader, RawPcapNgReader):
+        return [reader.linktype]
+    try:
+        index = reader.get_index()
+    except Scapy_Exception:
+        # Not seekable
+        return None
+    return [linktype for linktype, _, _ in index.interfaces]
+
+
+def _open_pcap_filtered(src, flt, quiet=False):
+    # type: (Any, Optional[str], bool) -> PcapReader
+    """Open a capture file whose packets are filtered by flt: with Scapy's
+    own BPF compiler when it supports flt for the link types of the file,
+    or with tcpdump otherwise."""
+    if flt is None:
+        return PcapReader(src)
+    bpf = _bpf_filter(flt)
+    if bpf is not None:
+        pos = None
+        if not isinstance(src, str):
+            try:
+                pos = src.tell()
+            except (AttributeError, OSError):
+                pass
+        reader = PcapReader(src)
+        linktypes = _pcap_linktypes(reader)
+        if linktypes is None or _bpf_filter(flt, linktypes) is not None:
+            reader.filter = bpf
+            return reader
+        if isinstance(src, str):
+            reader.close()
+        elif pos is None:
+            # The file can't be read again by tcpdump
+            reader.filter = bpf
+            return reader
+        else:
+            src.seek(pos)
+    return PcapReader(tcpdump(src, args=["-w", "-"], flt=flt, getfd=True,
+                              quiet=quiet))
+
+
+def _dissect_pcap_chunk(filename,  # type: str
+                        offset,  # type: Optional[int]
+                        state,  # type: Any
+                        end,  # type: Optional[int]
+                        prn,  # type: Optional[Callable[[Packet], Any]]
+                        lfilter,  # type: Optional[Callable[[Packet], bool]]
+                        store,  # type: bool
+                        flt,  # type: Optional[str]
+                        ):
+    # type: (...) -> List[Tuple[Any, Optional[Tuple[bytes, Type[Packet], int, Optional[int]]]]]  # noqa: E501
+    """Dissect the packets of a capture file from offset up to the packet
+    at offset end, in a worker process of dissect_pcaps(). Returns the
+    result of prn and, if store is True, the record of each packet that
+    lfilter accepts."""
+    if offset is None:
+        reader = _open_pcap_filtered(filename, flt, quiet=True)
+    else:
+        # dissect_pcaps() checked that Scapy's compiler supports flt
+        reader = PcapReader(filename, filter=flt)
+    res = []  # type: List[Tuple[Any, Optional[Tuple[bytes, Type[Packet], int, Optional[int]]]]]  # noqa: E501
+    with reader:
+        if offset is not None:
+            reader.f.seek(offset)
+            reader._set_state(state)
+        while True:
+            try:
+                p = reader.read_packet()
+            except EOFError:
+                break
+            # The packets that the filter rejects are skipped: the packet
+            # ends after end when it belongs to the next chunk
+            if end is not None and reader.f.tell() > end:
+                break
+            if lfilter and not lfilter(p):
+                continue
+            record = None
+            if store:
+                record = (bytes(p.original), p.__class__, p.time_ns,
+                          p.wirelen)
+            res.append((prn(p) if prn else None, record))
+    return res
+
+
+def dissect_pcaps(filenames,  # type: Union[str, List[str]]
+                  prn=None,  # type: Optional[Callable[[Packet], Any]]
+                  lfilter=None,  # type: Optional[Callable[[Packet], bool]]
+                  workers=None,  # type: Optional[int]
+                  ordered=True,  # type: bool
+                  store=False,  # type: bool
+                  chunk_size=20000,  # type: int
+                  flt=None,  # type: Optional[str]
+                  ):
+    # type: (...) -> Iterator[Tuple[Any, Optional[Tuple[bytes, Type[Packet], int, Optional[int]]]]]  # noqa: E501
+    """Dissect capture files in a pool of processes.
+
+    The files are split in chunks of <chunk_size> packets, using their
+    index (see PcapIndex), that are dissected by the workers. Only the
+    results are sent back: the result of prn for each packet that lfilter
+    accepts and, if store is True, its bytes, class, time (in ns) and
+    wirelen, as stored by CompactPacketList.
+
+    prn and lfilter are sent to the workers, and must be picklable (e.g.
+    functions defined at the top level of a module).
+
+    :param filenames: a capture file, or a list of capture files
+    :param workers: the number of processes (default: the number of CPUs)
+    :param ordered: if True, the results are yielded in the order of the
+                    files. Otherwise, they are yielded as soon as a chunk
+                    is dissected.
+    :param flt: a BPF filter. It is applied by tcpdump when Scapy's own
+                compiler does not support it. The files are then not
+                split.
+    :returns: an iterator of (prn result, record) tuples
+    """
+    import concurrent.futures
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    tasks = []  # type: List[Tuple[Any, ...]]
+    for fname in filenames:
+        chunks = [(None, None, None)]  # type: List[Tuple[Optional[int], Any, Optional[int]]]  # noqa: E501
+        with PcapReader(fname) as reader:
+            linktypes = _pcap_linktypes(reader)
+            # With a filter that tcpdump applies, the file is read as a
+            # stream
+            if flt is None or linktypes is not None and \
+                    _bpf_filter(flt, linktypes) is not None:
+                try:
+                    index = reader.get_index()
+                except Scapy_Exception:
+                    # Not seekable
+                    pass
+                else:
+                    chunks = [
+                        (index.offsets[i],
+                         reader._index_state(index.offsets[i]),
+                         index.offsets[i + chunk_size]
+                         if i + chunk_size < len(index) else None)
+                        for i in range(0, len(index), chunk_size)
+                    ]
+        tasks.extend((fname, offset, state, end, prn, lfilter, store, flt)
+                     for offset, state, end in chunks)
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        # Keep a few chunks per worker in flight
+        window = 2 * workers
+        pending = collections.deque()  # type: Deque[concurrent.futures.Future[Any]]  # noqa: E501
+        todo = iter(tasks)
+        try:
+            for task in islice(todo, window):
+                pending.append(pool.submit(_dissect_pcap_chunk, *task))
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    done, _ = concurrent.futures.wait(
+                        pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    future = next(f for f in pending if f in done)
+                    pending.remove(future)
+                for task in islice(todo, 1):
+                    pending.append(pool.submit(_dissect_pcap_chunk, *task))
+                for res in future.result():
+                    yield res
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _pop_pending(sock, count):
+    # type: (Any, int) -> List[Packet]
+    """Returns, and forgets, up to count of the packets that sniff() kept
+    from the last recv_many() calls on sock, because it didn't use them"""
+    pending = sock._pending  # type: Optional[List[Packet]]
+    if not pending:
+        return []
+    pkts = pending[:count]
+    del pending[:count]
+    return pkts
 
 
 # NOTE: Type hinting
@@ -1370,8 +1624,8 @@ class PcapReader_metaclass(type):
             dct['alternative'].alternative = newcls
         return newcls
 
-    def __call__(cls, filename):
-        # type: (Union[IO[bytes], str]) -> Any
+    def __call__(cls, filename, **kwargs):
+        # type: (Union[IO[bytes], str], **Any) -> Any
         """Creates a cls instance, use the `alternative` if that
         fails.
 
@@ -1388,7 +1642,7 @@ class PcapReader_metaclass(type):
                 "No data could be read!"
             )
         try:
-            i.__init__(filename, fdesc, magic)
+            i.__init__(filename, fdesc, magic, **kwargs)
             return i
         except (Scapy_Exception, EOFError):
             pass
@@ -1402,7 +1656,7 @@ class PcapReader_metaclass(type):
                 cls.__dict__  # type: ignore
             )
             try:
-                i.__init__(filename, fdesc, magic)
+                i.__init__(filename, fdesc, magic, **kwargs)
                 return i
             except (Scapy_Exception, EOFError):
                 pass
@@ -1431,19 +1685,167 @@ class PcapReader_metaclass(type):
         return filename, fdesc, magic
 
 
+class _MmapFile(object):
+    """A read-only file object over a memory-mapped file. read() returns
+    memoryview slices of the mapping instead of copies.
+    """
+
+    def __init__(self, fdesc):
+        # type: (IO[bytes]) -> None
+        self.fdesc = fdesc
+        self.name = getattr(fdesc, "name", "No name")
+        self.mm = mmap.mmap(fdesc.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self.mm)
+        self.pos = fdesc.tell()
+
+    def read(self, n=-1):
+        # type: (int) -> memoryview
+        start = self.pos
+        end = len(self.buf) if n < 0 else min(start + n, len(self.buf))
+        self.pos = max(start, end)
+        return self.buf[start:end]
+
+    def seek(self, offset, whence=0):
+        # type: (int, int) -> int
+        if whence == 1:
+            offset += self.pos
+        elif whence == 2:
+            offset += len(self.buf)
+        self.pos = max(offset, 0)
+        return self.pos
+
+    def tell(self):
+        # type: () -> int
+        return self.pos
+
+    def seekable(self):
+        # type: () -> bool
+        return True
+
+    def fileno(self):
+        # type: () -> int
+        return self.fdesc.fileno()
+
+    def close(self):
+        # type: () -> None
+        self.buf.release()
+        try:
+            self.mm.close()
+        except BufferError:
+            # Slices returned by read() are still alive: the mapping is
+            # released when the last one is garbage collected.
+            pass
+        self.fdesc.close()
+
+
+class PcapIndex(object):
+    """The offsets and timestamps (in nanoseconds) of the packets of a
+    capture file, used by the readers for random access.
+
+    It can be saved to a sidecar file, which is only loaded back if the
+    capture file has not changed since (same size and mtime).
+    """
+
+    MAGIC = b"SCPYIDX1"
+    # magic, capture size, capture mtime_ns, packets count, meta count
+    HEADER = struct.Struct("<8sQqQQ")
+
+    def __init__(self):
+        # type: () -> None
+        self.offsets = array.array("Q")
+        self.times = array.array("q")
+        # pcapng only: offsets of the blocks holding the state of the
+        # reader (SHB, IDB and PIB), replayed when the index is loaded
+        self.meta = array.array("Q")
+        self.sections = []  # type: List[Tuple[int, str]]
+        self.interfaces = []  # type: List[Tuple[int, int, Dict[str, Any]]]
+        self.process_information = []  # type: List[Dict[str, Any]]
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.offsets)
+
+    def find_time(self, ts):
+        # type: (float) -> int
+        """Return the index of the first packet sent at, or after, ts.
+        The capture is assumed to be sorted by time."""
+        return bisect.bisect_left(self.times, int(ts * 1000000000))
+
+    def endian(self, offset):
+        # type: (int) -> str
+        """Return the endianness of the pcapng section holding offset"""
+        i = bisect.bisect_right(self.sections, (offset, "~")) - 1
+        return self.sections[max(i, 0)][1]
+
+    def save(self, filename, st):
+        # type: (str, os.stat_result) -> None
+        arrays = [self.offsets, self.times, self.meta]
+        if sys.byteorder == "big":
+            arrays = [array.array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as fd:
+            fd.write(self.HEADER.pack(self.MAGIC, st.st_size, st.st_mtime_ns,
+                                      len(self.offsets), len(self.meta)))
+            for a in arrays:
+                a.tofile(fd)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename, st):
+        # type: (str, os.stat_result) -> Optional[PcapIndex]
+        """Load an index, or return None if it is missing or outdated"""
+        try:
+            with open(filename, "rb") as fd:
+                hdr = fd.read(cls.HEADER.size)
+                if len(hdr) != cls.HEADER.size:
+                    return None
+                magic, size, mtime, count, nmeta = cls.HEADER.unpack(hdr)
+                if (magic, size, mtime) != (cls.MAGIC, st.st_size,
+                                            st.st_mtime_ns):
+                    return None
+                index = cls()
+                index.offsets.fromfile(fd, count)
+                index.times.fromfile(fd, count)
+                index.meta.fromfile(fd, nmeta)
+        except (OSError, EOFError):
+            return None
+        if sys.byteorder == "big":
+            for a in [index.offsets, index.times, index.meta]:
+                a.byteswap()
+        return index
+
+
 class RawPcapReader(metaclass=PcapReader_metaclass):
-    """A stateful pcap reader. Each packet is returned as a string"""
+    """A stateful pcap reader. Each packet is returned as a string
+
+    The packets can also be accessed at random, with ``reader[i]``,
+    slices or :meth:`seek_time`: this relies on an index of the file,
+    built on first use.
+
+    :param use_mmap: if True, memory-map the file and return each packet
+                     as a memoryview of the mapping, without copying it.
+                     Only works with uncompressed files.
+    :param index: the path of a sidecar file in which the index is saved,
+                  to be reused when the file is opened again. If True,
+                  ``<filename>.idx`` is used. The index is then built (or
+                  loaded) when the file is opened.
+    """
 
     # TODO: use Generics to properly type the various readers.
     # As of right now, RawPcapReader is typed as if it returned packets
     # because all of its child do. Fix that
 
     nonblocking_socket = True
+    # Packets returned by recv_many() that sniff() did not use
+    _pending = None  # type: Optional[List[Packet]]
     PacketMetadata = collections.namedtuple("PacketMetadata",
                                             ["sec", "usec", "wirelen", "caplen"])  # noqa: E501
 
-    def __init__(self, filename, fdesc=None, magic=None):  # type: ignore
-        # type: (str, _ByteStream, bytes) -> None
+    def __init__(self, filename, fdesc=None, magic=None,  # type: ignore
+                 use_mmap=False, index=None):
+        # type: (str, _ByteStream, bytes, bool, Union[None, bool, str]) -> None  # noqa: E501
         self.filename = filename
         self.f = fdesc
         if magic == b"\xa1\xb2\xc3\xd4":  # big endian
@@ -1462,6 +1864,7 @@ class RawPcapReader(metaclass=PcapReader_metaclass):
             raise Scapy_Exception(
                 "Not a pcap capture file (bad magic: %r)" % magic
             )
+        self._init_index(use_mmap, index)
         hdr = self.f.read(20)
         if len(hdr) < 20:
             raise Scapy_Exception("Invalid pcap file (too short)")
@@ -1470,6 +1873,143 @@ class RawPcapReader(metaclass=PcapReader_metaclass):
         )
         self.linktype = linktype
         self.snaplen = snaplen
+        if index:
+            self.get_index()
+
+    def _init_index(self, use_mmap, index):
+        # type: (bool, Union[None, bool, str]) -> None
+        """Called once the magic was checked, to map the file and set up
+        the index"""
+        # Offset of the magic
+        self._start = 0
+        try:
+            self._start = self.f.tell() - 4
+        except (AttributeError, OSError):
+            pass
+        try:
+            self._stat = os.fstat(
+                self.f.fileno()
+            )  # type: Optional[os.stat_result]
+        except (AttributeError, OSError, ValueError):
+            self._stat = None
+        if use_mmap:
+            if self._stat is None or isinstance(self.f, gzip.GzipFile):
+                warning("%s cannot be memory-mapped !" % self.filename)
+            else:
+                self.f = _MmapFile(self.f)  # type: ignore
+        self._index = None  # type: Optional[PcapIndex]
+        self._index_file = None  # type: Optional[str]
+        if index is True:
+            self._index_file = self.filename + ".idx"
+        elif index:
+            self._index_file = index
+
+    def get_index(self):
+        # type: () -> PcapIndex
+        """Return the index of the packets, building it if needed"""
+        if self._index is not None:
+            return self._index
+        if not self.f.seekable():
+            raise Scapy_Exception("%s is not seekable !" % self.filename)
+        index = None
+        if self._index_file and self._stat is not None:
+            index = PcapIndex.load(self._index_file, self._stat)
+        pos, state = self.f.tell(), self._get_state()
+        try:
+            if index is None:
+                index = PcapIndex()
+                self._scan(index)
+                if self._index_file and self._stat is not None:
+                    try:
+                        index.save(self._index_file, self._stat)
+                    except OSError as ex:
+                        warning("Could not save the index: %s" % ex)
+            else:
+                self._replay(index)
+        finally:
+            self.f.seek(pos)
+            self._set_state(state)
+        self._index = index
+        return index
+
+    def _scan(self, index):
+        # type: (PcapIndex) -> None
+        """Fill the index, reading the whole file"""
+        factor = 1 if self.nano else 1000
+        pos = self._start + 24
+        self.f.seek(pos)
+        fmt = self.endian + "IIII"
+        while True:
+            hdr = self.f.read(16)
+            if len(hdr) < 16:
+                break
+            sec, usec, caplen, _ = struct.unpack(fmt, hdr)
+            index.offsets.append(pos)
+            index.times.append(sec * 1000000000 + usec * factor)
+            pos += 16 + caplen
+            self.f.seek(pos)
+
+    def _replay(self, index):
+        # type: (PcapIndex) -> None
+        """Restore the state needed to read at random from a loaded index"""
+        pass
+
+    def _get_state(self):
+        # type: () -> Any
+        """Return the state of the reader, which depends on the blocks
+        read so far (pcapng only)"""
+        return None
+
+    def _set_state(self, state):
+        # type: (Any) -> None
+        pass
+
+    def _index_state(self, offset):
+        # type: (int) -> Any
+        """Return the state required to read the packet at offset"""
+        return None
+
+    def _read_at(self, offset):
+        # type: (int) -> Any
+        pos, state = self.f.tell(), self._get_state()
+        self.f.seek(offset)
+        self._set_state(self._index_state(offset))
+        try:
+            return next(self)
+        except StopIteration:
+            raise IndexError("Truncated capture file")
+        finally:
+            self.f.seek(pos)
+            self._set_state(state)
+
+    def __getitem__(self, item):
+        # type: (Union[int, slice]) -> Any
+        """Read the packet(s) at the given index or slice, without
+        changing the position of the reader"""
+        index = self.get_index()
+        if isinstance(item, slice):
+            return [self._read_at(index.offsets[i])
+                    for i in range(*item.indices(len(index)))]
+        return self._read_at(index.offsets[item])
+
+    def seek_packet(self, i):
+        # type: (int) -> None
+        """Move the reader to the i-th packet"""
+        index = self.get_index()
+        if i >= len(index):
+            self.f.seek(0, 2)
+            return
+        self.f.seek(index.offsets[i])
+        self._set_state(self._index_state(index.offsets[i]))
+
+    def seek_time(self, ts):
+        # type: (float) -> int
+        """Move the reader to the first packet sent at, or after, ts
+        (in seconds since the epoch). Return the index of that packet.
+        The capture is assumed to be sorted by time."""
+        i = self.get_index().find_time(ts)
+        self.seek_packet(i)
+        return i
 
     def __enter__(self):
         # type: () -> RawPcapReader
@@ -1518,6 +2058,24 @@ class RawPcapReader(metaclass=PcapReader_metaclass):
             "_read_packet()"
         )
 
+    def _read_frame(self):
+        # type: () -> Tuple[bytes, Optional[int]]
+        """Read the bytes of a packet, and its time in nanoseconds"""
+        s, pkt_info = self._read_packet()
+        factor = 1 if self.nano else 1000
+        return s, pkt_info.sec * 1000000000 + pkt_info.usec * factor
+
+    def iter_frames(self):
+        # type: () -> Iterator[Tuple[bytes, Optional[int]]]
+        """Iterate over the remaining packets, without dissecting them.
+        Yields their bytes and their time in nanoseconds (None when the
+        file does not store it)."""
+        while True:
+            try:
+                yield self._read_frame()
+            except EOFError:
+                return
+
     def dispatch(self,
                  callback  # type: Callable[[Tuple[bytes, RawPcapReader.PacketMetadata]], Any]  # noqa: E501
                  ):
@@ -1575,9 +2133,22 @@ class RawPcapReader(metaclass=PcapReader_metaclass):
 
 
 class PcapReader(RawPcapReader):
-    def __init__(self, filename, fdesc=None, magic=None):  # type: ignore
-        # type: (str, IO[bytes], bytes) -> None
-        RawPcapReader.__init__(self, filename, fdesc, magic)
+    """A stateful pcap reader. Each packet is returned as a Packet.
+
+    :param lazy: if True, the payload of each layer is only dissected the
+                 first time it is accessed. Defaults to conf.lazy_dissection
+    :param filter: a BPF filter (a pcap-filter expression, or a BPFFilter).
+                   The packets that it rejects are skipped before being
+                   dissected. See scapy.libs.bpf for the supported syntax.
+    """
+
+    def __init__(self, filename, fdesc=None, magic=None,  # type: ignore
+                 lazy=None, use_mmap=False, index=None, filter=None):
+        # type: (str, IO[bytes], bytes, Optional[bool], bool, Union[None, bool, str], Union[None, str, BPFFilter]) -> None  # noqa: E501
+        RawPcapReader.__init__(self, filename, fdesc, magic,
+                               use_mmap=use_mmap, index=index)
+        self.lazy = conf.lazy_dissection if lazy is None else lazy
+        self.filter = filter
         try:
             self.LLcls = conf.l2types.num2layer[
                 self.linktype
@@ -1593,13 +2164,29 @@ class PcapReader(RawPcapReader):
         # type: () -> PcapReader
         return self
 
+    def _match_filter(self, s, linktype, wirelen):
+        # type: (bytes, int, int) -> bool
+        """Whether the BPF filter of the reader accepts a packet"""
+        if isinstance(self.filter, str):
+            from scapy.libs.bpf import BPFFilter
+            self.filter = BPFFilter(self.filter)
+        return self.filter.match(s, linktype, wirelen)  # type: ignore
+
     def read_packet(self, size=MTU, **kwargs):
         # type: (int, **Any) -> Packet
-        rp = super(PcapReader, self)._read_packet(size=size)
-        if rp is None:
-            raise EOFError
-        s, pkt_info = rp
+        while True:
+            rp = super(PcapReader, self)._read_packet(size=size)
+            if rp is None:
+                raise EOFError
+            s, pkt_info = rp
+            if self.filter is None or \
+                    self._match_filter(s, self.linktype, pkt_info.wirelen):
+                break
+        if isinstance(s, memoryview):
+            s = s.tobytes()
 
+        if self.lazy:
+            kwargs.setdefault("lazy_dissection", True)
         try:
             p = self.LLcls(s, **kwargs)  # type: Packet
         except KeyboardInterrupt:
@@ -1613,15 +2200,38 @@ class PcapReader(RawPcapReader):
                 # conf.raw_layer is set on import
                 import scapy.packet  # noqa: F401
             p = conf.raw_layer(s)
-        power = Decimal(10) ** Decimal(-9 if self.nano else -6)
-        p.time = EDecimal(pkt_info.sec + power * pkt_info.usec)
+        p.time_ns = pkt_info.sec * 1000000000 + pkt_info.usec * (
+            1 if self.nano else 1000
+        )
+        if not self.nano:
+            # Keep the 6 decimals of microsecond captures in p.time
+            p._time_prec = 6
         p.wirelen = pkt_info.wirelen
         return p
 
     def recv(self, size=MTU, **kwargs):  # type: ignore
         # type: (int, **Any) -> Packet
+        pending = _pop_pending(self, 1)
+        if pending:
+            return pending[0]
         return self.read_packet(size=size, **kwargs)
 
+    def recv_many(self, count=64, size=MTU, **kwargs):
+        # type: (int, int, **Any) -> List[Packet]
+        """Emulate SuperSocket.recv_many(): read up to count packets.
+        EOFError is only raised when no packet is left."""
+        res = _pop_pending(self, count)
+        if res:
+            return res
+        while len(res) < count:
+            try:
+                res.append(self.read_packet(size=size, **kwargs))
+            except EOFError:
+                if not res:
+                    raise
+                break
+        return res
+
     def __next__(self):  # type: ignore
         # type: () -> Packet
         try:
@@ -1629,11 +2239,55 @@ class PcapReader(RawPcapReader):
         except EOFError:
             raise StopIteration
 
-    def read_all(self, count=-1):
-        # type: (int) -> PacketList
-        res = self._read_all(count)
+    def _read_raw_record(self):
+        # type: () -> Tuple[bytes, Type[Packet], int, int]
+        """Read a packet without dissecting it. Returns its bytes, its
+        class, its time in nanoseconds and its wirelen."""
+        s, pkt_info = self._read_packet()
+        factor = 1 if self.nano else 1000
+        return (s, self.LLcls,
+                pkt_info.sec * 1000000000 + pkt_info.usec * factor,
+                pkt_info.wirelen)
+
+    def to_columns(self, fields, count=-1, as_numpy=True):
+        # type: (List[str], int, bool) -> Dict[str, Any]
+        """Reads <count> packets, and extracts fields from them as NumPy
+        arrays, without dissecting them when possible.
+        See CompactPacketList.to_columns()."""
+        def records():
+            # type: () -> Iterator[Tuple[bytes, Type[Packet], int, int]]
+            n = count
+            while n != 0:
+                n -= 1
+                try:
+                    yield self._read_raw_record()
+                except EOFError:
+                    return
+        from scapy import plist
+        return plist._records_to_columns(records(), fields, as_numpy=as_numpy)
+
+    def read_all(self, count=-1, compact=False):
+        # type: (int, bool) -> PacketList
         from scapy import plist
-        return plist.PacketList(res, name=os.path.basename(self.filename))
+        name = os.path.basename(self.filename)
+        if compact:
+            res = plist.CompactPacketList(name=name)
+            while count != 0:
+                count -= 1
+                try:
+                    res.res.add(*self._read_raw_record())  # type: ignore
+                except EOFError:
+                    break
+            return res
+        return plist.PacketList(self._read_all(count), name=name)
+
+    def __getitem__(self, item):
+        # type: (Union[int, slice]) -> Any
+        res = super(PcapReader, self).__getitem__(item)
+        if isinstance(item, slice):
+            from scapy import plist
+            return plist.PacketList(res, name=os.path.basename(self.filename))
+        return res
 
 
 class RawPcapNgReader(RawPcapReader):
@@ -1650,8 +2304,9 @@ class RawPcapNgReader(RawPcapReader):
                                              "comment", "ifname", "direction",
                                              "process_information"])
 
-    def __init__(self, filename, fdesc=None, magic=None):  # type: ignore
-        # type: (str, IO[bytes], bytes) -> None
+    def __init__(self, filename, fdesc=None, magic=None,  # type: ignore
+                 use_mmap=False, index=None):
+        # type: (str, IO[bytes], bytes, bool, Union[None, bool, str]) -> None
         self.filename = filename
         self.f = fdesc
         # A list of (linktype, snaplen, tsresol); will be populated by IDBs.
@@ -1679,6 +2334,7 @@ class RawPcapNgReader(RawPcapReader):
             raise Scapy_Exception(
                 "Not a pcapng capture file (bad magic: %r)" % magic
             )
+        self._init_index(use_mmap, index)
 
         try:
             self._read_block_shb()
@@ -1686,6 +2342,95 @@ class RawPcapNgReader(RawPcapReader):
             raise Scapy_Exception(
                 "The first SHB of the pcapng file is malformed !"
             )
+        if index:
+            self.get_index()
+
+    def _get_state(self):
+        # type: () -> Any
+        return self.endian, self.interfaces, self.process_information
+
+    def _set_state(self, state):
+        # type: (Any) -> None
+        self.endian, self.interfaces, self.process_information = state
+
+    def _index_state(self, offset):
+        # type: (int) -> Any
+        index = cast(PcapIndex, self._index)
+        return (index.endian(offset), index.interfaces[:],
+                index.process_information[:])
+
+    def _replay_block(self, index, offset):
+        # type: (PcapIndex, int) -> None
+        """Process a block holding some state of the reader"""
+        self.f.seek(offset)
+        shb = self.f.read(4) == b"\x0a\x0d\x0d\x0a"
+        self.f.seek(offset)
+        self._read_block()
+        if shb:
+            index.sections.append((offset, self.endian))
+
+    def _replay(self, index):
+        # type: (PcapIndex) -> None
+        self._set_state(("!", [], []))
+        for offset in index.meta:
+            self._replay_block(index, offset)
+        index.interfaces = self.interfaces
+        index.process_information = self.process_information
+
+    def _scan(self, index):
+        # type: (PcapIndex) -> None
+        self._set_state(("!", [], []))
+        pos = self._start
+        last = 0
+        while True:
+            self.f.seek(pos)
+            hdr = self.f.read(8)
+            if len(hdr) < 8:
+                break
+            # The SHB block type is a palindrome
+            blocktype, blocklen = struct.unpack(self.endian + "II", hdr)
+            if blocktype in [0x0A0D0D0A, 1, 0x80000001]:
+                try:
+                    self._replay_block(index, pos)
+                except (EOFError, struct.error, Scapy_Exception):
+                    break
+                index.meta.append(pos)
+                pos = self.f.tell()
+                continue
+            if blocklen < 12:
+                break
+            end = pos + blocklen + (-blocklen % 4)
+            self.f.seek(end - 4)
+            if len(self.f.read(4)) < 4:
+                break
+            if blocktype in [2, 3, 6]:
+                self.f.seek(pos + 8)
+                body = self.f.read(16)
+                try:
+                    if blocktype == 6:
+                        intid, tshigh, tslow = struct.unpack(
+                            self.endian + "III", body[:12]
+                        )
+                    elif blocktype == 2:
+                        intid, _, tshigh, tslow = struct.unpack(
+                            self.endian + "HHII", body
+                        )
+                    else:
+                        # Simple Packet Blocks have no timestamp
+                        intid, tshigh, tslow = 0, None, None
+                    # Stop where reading the file would, with a warning
+                    self._check_interface_id(intid)
+                except (struct.error, EOFError):
+                    break
+                if tshigh is not None:
+                    last = ((tshigh << 32) + tslow) * 1000000000 // (
+                        self.interfaces[intid][2]["tsresol"]
+                    )
+                index.offsets.append(pos)
+                index.times.append(last)
+            pos = end
+        index.interfaces = self.interfaces
+        index.process_information = self.process_information
 
     def _read_block(self, size=MTU):
         # type: (int) -> Optional[Tuple[bytes, RawPcapNgReader.PacketMetadata]]  # noqa: E501
@@ -1790,6 +2535,15 @@ class RawPcapNgReader(RawPcapReader):
             if res is not None:
                 return res
 
+    def _read_frame(self):
+        # type: () -> Tuple[bytes, Optional[int]]
+        s, pkt_info = self._read_packet()
+        if pkt_info.tshigh is None:
+            return s, None
+        return s, ((pkt_info.tshigh << 32) + pkt_info.tslow) * (
+            1000000000
+        ) // pkt_info.tsresol
+
     def _read_options(self, options):
         # type: (bytes) -> Dict[int, bytes]
         opts = dict()
@@ -1801,7 +2555,7 @@ class RawPcapNgReader(RawPcapReader):
                         "%d !" % len(options))
                 raise EOFError
             if code != 0 and 4 + length < len(options):
-                opts[code] = options[4:4 + length]
+                opts[code] = bytes(options[4:4 + length])
             if code == 0:
                 if length != 0:
                     warning("PcapNg: invalid option "
@@ -2054,9 +2808,13 @@ class PcapNgReader(RawPcapNgReader, PcapReader):
 
     alternative = PcapReader
 
-    def __init__(self, filename, fdesc=None, magic=None):  # type: ignore
-        # type: (str, IO[bytes], bytes) -> None
-        RawPcapNgReader.__init__(self, filename, fdesc, magic)
+    def __init__(self, filename, fdesc=None, magic=None,  # type: ignore
+                 lazy=None, use_mmap=False, index=None, filter=None):
+        # type: (str, IO[bytes], bytes, Optional[bool], bool, Union[None, bool, str], Union[None, str, BPFFilter]) -> None  # noqa: E501
+        RawPcapNgReader.__init__(self, filename, fdesc, magic,
+                                 use_mmap=use_mmap, index=index)
+        self.lazy = conf.lazy_dissection if lazy is None else lazy
+        self.filter = filter
 
     def __enter__(self):
         # type: () -> PcapNgReader
@@ -2064,10 +2822,18 @@ class PcapNgReader(RawPcapNgReader, PcapReader):
 
     def read_packet(self, size=MTU, **kwargs):
         # type: (int, **Any) -> Packet
-        rp = super(PcapNgReader, self)._read_packet(size=size)
-        if rp is None:
-            raise EOFError
-        s, (linktype, tsresol, tshigh, tslow, wirelen, comment, ifname, direction, process_information) = rp  # noqa: E501
+        while True:
+            rp = super(PcapNgReader, self)._read_packet(size=size)
+            if rp is None:
+                raise EOFError
+            s, (linktype, tsresol, tshigh, tslow, wirelen, comment, ifname, direction, process_information) = rp  # noqa: E501
+            if self.filter is None or \
+                    self._match_filter(s, linktype, wirelen):
+                break
+        if isinstance(s, memoryview):
+            s = s.tobytes()
+        if self.lazy:
+            kwargs.setdefault("lazy_dissection", True)
         try:
             cls = conf.l2types.num2layer[linktype]  # type: Type[Packet]
             p = cls(s, **kwargs)  # type: Packet
@@ -2091,8 +2857,23 @@ class PcapNgReader(RawPcapNgReader, PcapReader):
         return p
 
     def recv(self, size: int = MTU, **kwargs: Any) -> 'Packet':  # type: ignore
+        pending = _pop_pending(self, 1)
+        if pending:
+            return pending[0]
         return self.read_packet(size=size, **kwargs)
 
+    def _read_raw_record(self):
+        # type: () -> Tuple[bytes, Type[Packet], int, int]
+        s, pkt_info = self._read_packet()
+        cls = conf.l2types.num2layer.get(pkt_info.linktype, conf.raw_layer)
+        if pkt_info.tshigh is not None:
+            time_ns = ((pkt_info.tshigh << 32) + pkt_info.tslow) * (
+                1000000000
+            ) // pkt_info.tsresol
+        else:
+            time_ns = time.time_ns()
+        return s, cls, time_ns, pkt_info.wirelen
+
 
 class GenericPcapWriter(object):
     nano = False
@@ -2112,6 +2893,7 @@ class GenericPcapWriter(object):
                       comment=None,  # type: Optional[bytes]
                       ifname=None,  # type: Optional[bytes]
                       direction=None,  # type: Optional[int]
+                      time_ns=None,  # type: Optional[int]
                       ):
         # type: (...) -> None
         raise NotImplementedError
@@ -2122,13 +2904,6 @@ class GenericPcapWriter(object):
                   usec  # type: Optional[int]
                   ):
         # type: (...) -> Tuple[float, int]
-        if hasattr(packet, "time"):
-            if sec is None:
-                packet_time = packet.time
-                tmp = int(packet_time)
-                usec = int(round((packet_time - tmp) *
-                           (1000000000 if self.nano else 1000000)))
-                sec = float(packet_time)
         if sec is not None and usec is None:
             usec = 0
         return sec, usec  # type: ignore
@@ -2182,6 +2957,8 @@ class GenericPcapWriter(object):
         :rtype: None
         """
         f_sec, usec = self._get_time(packet, sec, usec)
+        # The time of the packet, unless sec is given
+        time_ns = None if sec is not None else getattr(packet, "time_ns", None)
 
         rawpkt = bytes_encode(packet)
         caplen = len(rawpkt) if caplen is None else caplen
@@ -2205,7 +2982,7 @@ class GenericPcapWriter(object):
             ifname = str(ifname).encode('utf-8')
         self._write_packet(
             rawpkt,
-            sec=f_sec, usec=usec,
+            sec=f_sec, usec=usec, time_ns=time_ns,
             caplen=caplen, wirelen=wirelen,
             comment=comment,
             ifname=ifname,
@@ -2365,6 +3142,7 @@ class RawPcapWriter(GenericRawPcapWriter):
                       comment=None,  # type: Optional[bytes]
                       ifname=None,  # type: Optional[bytes]
                       direction=None,  # type: Optional[int]
+                      time_ns=None,  # type: Optional[int]
                       ):
         # type: (...) -> None
         """
@@ -2377,9 +3155,12 @@ class RawPcapWriter(GenericRawPcapWriter):
         :param sec: time the packet was captured, in seconds since epoch. If
                     not supplied, defaults to now.
         :type sec: float
-        :param usec: not used with pcapng
+        :param usec: number of microseconds after the second the
                      packet was captured
         :type usec: int or long
+        :param time_ns: time the packet was captured, in nanoseconds since
+                        epoch. Used instead of sec and usec.
+        :type time_ns: int
         :param caplen: The length of the packet in the capture file. If not
                        specified, uses ``len(packet)``.
         :type caplen: int
@@ -2393,7 +3174,12 @@ class RawPcapWriter(GenericRawPcapWriter):
             caplen = len(packet)
         if wirelen is None:
             wirelen = caplen
-        if sec is None or usec is None:
+        if time_ns is not None:
+            if self.nano:
+                sec, usec = divmod(time_ns, 1000000000)
+            else:
+                sec, usec = divmod((time_ns + 500) // 1000, 1000000)
+        elif sec is None or usec is None:
             t = time.time()
             it = int(t)
             if sec is None:
@@ -2431,21 +3217,6 @@ class RawPcapNgWriter(GenericRawPcapWriter):
         self.filename = filename
         self.f = open(filename, "wb", 4096)
 
-    def _get_time(self,
-                  packet,  # type: Union[bytes, Packet]
-                  sec,  # type: Optional[float]
-                  usec  # type: Optional[int]
-                  ):
-        # type: (...) -> Tuple[float, int]
-        if hasattr(packet, "time"):
-            if sec is None:
-                sec = float(packet.time)
-
-        if usec is None:
-            usec = 0
-
-        return sec, usec  # type: ignore
-
     def _add_padding(self, raw_data):
         # type: (bytes) -> bytes
         raw_data += ((-len(raw_data)) % 4) * b"\x00"
@@ -2542,15 +3313,18 @@ class RawPcapNgWriter(GenericRawPcapWriter):
                          orglen=None,  # type: Optional[int]
                          comment=None,  # type: Optional[bytes]
                          flags=None,  # type: Optional[int]
+                         time_ns=None,  # type: Optional[int]
                          ):
         # type: (...) -> None
 
-        if timestamp:
+        if time_ns is not None:
+            tmp_ts = time_ns * self.tsresol // 1000000000
+        elif timestamp:
             tmp_ts = int(timestamp * self.tsresol)
-            ts_high = tmp_ts >> 32
-            ts_low = tmp_ts & 0xFFFFFFFF
         else:
-            ts_high = ts_low = 0
+            tmp_ts = 0
+        ts_high = tmp_ts >> 32
+        ts_low = tmp_ts & 0xFFFFFFFF
 
         if not caplen:
             caplen = len(raw_pkt)
@@ -2599,6 +3373,7 @@ class RawPcapNgWriter(GenericRawPcapWriter):
                       comment=None,  # type: Optional[bytes]
                       ifname=None,  # type: Optional[bytes]
                       direction=None,  # type: Optional[int]
+                      time_ns=None,  # type: Optional[int]
                       ):
         # type: (...) -> None
         """
@@ -2611,6 +3386,12 @@ class RawPcapNgWriter(GenericRawPcapWriter):
         :param sec: time the packet was captured, in seconds since epoch. If
                     not supplied, defaults to now.
         :type sec: float
+        :param usec: number of microseconds after the second the
+                     packet was captured
+        :type usec: int or long
+        :param time_ns: time the packet was captured, in nanoseconds since
+                        epoch. Used instead of sec and usec.
+        :type time_ns: int
         :param caplen: The length of the packet in the capture file. If not
                        specified, uses ``len(packet)``.
         :type caplen: int
@@ -2653,7 +3434,11 @@ class RawPcapNgWriter(GenericRawPcapWriter):
         else:
             flags = None
 
-        self._write_block_epb(packet, timestamp=sec, caplen=caplen,
+        if time_ns is None and sec is not None:
+            # usec is added to sec, which keeps its fractional part
+            time_ns = (int(sec * 1000000) + (usec or 0)) * 1000
+
+        self._write_block_epb(packet, time_ns=time_ns, caplen=caplen,
                               orglen=wirelen, comment=comment, ifid=ifid, flags=flags)
         if self.sync:
             self.f.flush()
@@ -2667,21 +3452,6 @@ class PcapWriter(RawPcapWriter):
 class PcapNgWriter(RawPcapNgWriter):
     """A stream pcapng writer with more control than wrpcapng()"""
 
-    def _get_time(self,
-                  packet,  # type: Union[bytes, Packet]
-                  sec,  # type: Optional[float]
-                  usec  # type: Optional[int]
-                  ):
-        # type: (...) -> Tuple[float, int]
-        if hasattr(packet, "time"):
-            if sec is None:
-                sec = float(packet.time)
-
-        if usec is None:
-            usec = 0
-
-        return sec, usec  # type: ignore
-
 
 @conf.commands.register
 def rderf(filename, count=-1):
@@ -2695,12 +3465,12 @@ def rderf(filename, count=-1):
 
 
 class ERFEthernetReader_metaclass(PcapReader_metaclass):
-    def __call__(cls, filename):
-        # type: (Union[IO[bytes], str]) -> Any
+    def __call__(cls, filename, **kwargs):
+        # type: (Union[IO[bytes], str], **Any) -> Any
         i = cls.__new__(cls, cls.__name__, cls.__bases__, cls.__dict__)  # type: ignore
         filename, fdesc = cls.open(filename)
         try:
-            i.__init__(filename, fdesc)
+            i.__init__(filename, fdesc, **kwargs)
             return i
         except (Scapy_Exception, EOFError):
             pass
@@ -2714,7 +3484,7 @@ class ERFEthernetReader_metaclass(PcapReader_metaclass):
                 cls.__dict__  # type: ignore
             )
             try:
-                i.__init__(filename, fdesc)
+                i.__init__(filename, fdesc, **kwargs)
                 return i
             except (Scapy_Exception, EOFError):
                 pass
@@ -3144,7 +3914,13 @@ def tcpdump(
                 else:
                     linktype = rd.linktype
         from scapy.arch.common import compile_filter
-        compile_filter(flt, linktype=linktype)
+        from scapy.libs.bpf import BPFCompileError
+        try:
+            compile_filter(flt, linktype=linktype)
+        except BPFCompileError:
+            # Not supported by Scapy's own compiler, used when libpcap is
+            # missing: let tcpdump check it
+            pass
         args.append(flt)
 
     stdout = subprocess.PIPE if dump or getfd else None
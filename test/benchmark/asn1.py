@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+# Measures the BER decoding of large SNMP and LDAP messages, as raw ASN.1
+# objects and as packets
+
+from common import *
+from scapy.layers.ldap import *
+from scapy.layers.snmp import *
+import time
+
+N = 3
+
+
+def bench(name, size, func):
+    times = []
+    for i in range(N):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    print("%-28s %8i bytes %.3fs" % (name, size, min(times)))
+
+
+for n in [500, 2000, 8000]:
+    # An SNMP bulk walk response with n variable bindings
+    pkt = SNMP(PDU=SNMPresponse(varbindlist=[
+        SNMPvarbind(oid="1.3.6.1.2.1.2.2.1.%i.%i" % (i % 22, i),
+                    value=ASN1_STRING(b"x" * 20))
+        for i in range(n)
+    ]))
+    s = bytes(pkt)
+    bench("SNMP %i varbinds (raw)" % n, len(s),
+          lambda: BERcodec_Object.dec(s, context=ASN1_Class_SNMP))
+    bench("SNMP %i varbinds (packet)" % n, len(s), lambda: SNMP(s))
+
+for n in [100, 400, 1600]:
+    # An LDAP search result entry with n attributes of 20 values
+    pkt = LDAP(protocolOp=LDAP_SearchResponseEntry(
+        objectName=b"cn=foo",
+        attributes=[
+            LDAP_PartialAttribute(
+                type=b"attr%i" % i,
+                values=[LDAP_AttributeValue(value=b"v" * 30)] * 20
+            )
+            for i in range(n)
+        ]
+    ))
+    s = bytes(pkt)
+    # The same structure with UNIVERSAL tags, as the LDAP application tags
+    # can't be decoded without the packet definitions
+    r = bytes(ASN1_SEQUENCE([
+        ASN1_INTEGER(0),
+        ASN1_SEQUENCE([
+            ASN1_STRING(b"cn=foo"),
+            ASN1_SEQUENCE([
+                ASN1_SEQUENCE([
+                    ASN1_STRING(b"attr%i" % i),
+                    ASN1_SET([ASN1_STRING(b"v" * 30)] * 20),
+                ])
+                for i in range(n)
+            ]),
+        ]),
+    ]))
+    bench("LDAP %i attributes (raw)" % n, len(r),
+          lambda: BERcodec_Object.dec(r))
+    bench("LDAP %i attributes (packet)" % n, len(s), lambda: LDAP(s))
+
+# Nesting depth, that the decoding of packets follows
+for n in [100, 900]:
+    s = BERcodec_INTEGER.enc(42)
+    for i in range(n):
+        s = BERcodec_SEQUENCE.enc(s)
+    bench("%i nested SEQUENCEs (raw)" % n, len(s),
+          lambda: BERcodec_Object.dec(s))
@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+from common import *
+import tempfile
+import time
+
+N = 20000
+
+# Build a large capture of Ether/IP/TCP frames
+fd, filename = tempfile.mkstemp(suffix=".pcap")
+os.close(fd)
+frame = raw(Ether() / IP(dst="127.0.0.1") / TCP(flags="PA") / (b"X" * 64))
+with PcapWriter(filename, linktype=DLT_EN10MB) as fdesc:
+    for i in range(N):
+        fdesc.write(frame)
+
+start = time.time()
+with RawPcapReader(filename) as fdesc:
+    for data, _ in fdesc:
+        pass
+read = time.time() - start
+print("Read - %.2fs" % read)
+
+start = time.time()
+with RawPcapReader(filename) as fdesc:
+    for data, _ in fdesc:
+        p = Ether(data)
+dissect = time.time() - start
+print("Read & dissect - %.2fs (%.2fus per packet)" % (
+    dissect,
+    (dissect - read) * 1e6 / N
+))
+
+os.unlink(filename)
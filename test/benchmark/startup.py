@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# This file is part of Scapy
+# See https://scapy.net/ for more information
+
+# Measures the time and memory needed to import scapy.all, with and without
+# conf.lazy_layers. Each run happens in a fresh interpreter.
+
+import os
+import statistics
+import subprocess
+import sys
+
+scapy_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+N = 5
+
+CODE = """
+import resource, time
+start = time.time()
+%s
+print(time.time() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+CASES = [
+    ("from scapy.all import *", "from scapy.all import *"),
+    ("from scapy.all import IP, TCP",
+     "from scapy.all import IP, TCP"),
+    ("... and dissect IP/TCP",
+     "from scapy.all import IP, TCP; IP(bytes(IP() / TCP()))"),
+]
+
+print("Python %s" % sys.version.replace("\n", ""))
+for name, code in CASES:
+    for lazy in ["n", "y"]:
+        env = dict(os.environ, SCAPY_LAZY_LAYERS=lazy, PYTHONPATH=scapy_path)
+        times, rss = [], []
+        for i in range(N):
+            out = subprocess.check_output(
+                [sys.executable, "-c", CODE % code], env=env
+            ).split()
+            times.append(float(out[0]))
+            rss.append(int(out[1]))
+        print("%-35s lazy_layers=%-5s %.2fs %6.1f MB" % (
+            name,
+            lazy == "y",
+            statistics.median(times),
+            # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+            statistics.median(rss) / (1 << 20 if sys.platform == "darwin"
+                                      else 1 << 10),
+        ))